@@ -0,0 +1,264 @@
+"""
+Controle de admissão das rotas /api/calculate/*, /api/grid e /api/uncertainty
+pelo custo estimado
+
+Antes de qualquer cálculo, o custo da requisição (segundos de CPU, no pior
+caso) é estimado a partir do modelo e de s, K, N, do número de classes ou
+do número de células/sorteios (ver CUSTOS). Nos modelos finitos a soma em
+alta precisão (O(K) ou O(N)) só entra no custo quando o caminho float64,
+que é O(1) e roda na estimativa, marca o cenário como suspeito:
+- custo ≤ custo_inline: roda na própria thread da requisição, sem fila;
+- custo > prazo: recusada na hora (CustoExcedido → 400), pois não
+  terminaria a tempo;
+- demais: vão para um pool limitado de threads. Se as threads e a fila de
+  espera estiverem ocupadas, a requisição é recusada na hora (Ocupado →
+  503); se o resultado não sair dentro do prazo, o cálculo é cancelado
+  (app/models/prazo.py) e a requisição responde 504 (Expirada).
+
+Assim as requisições caras disputam no máximo `threads` threads, e as
+baratas nunca esperam atrás delas numa fila.
+
+Configuração (variáveis de ambiente):
+- FILAS_PRAZO: prazo de cada requisição, em segundos (padrão 10)
+- FILAS_CUSTO_INLINE: custo máximo calculado sem o pool, em segundos
+  (padrão 0.02)
+- FILAS_POOL_THREADS: threads do pool (padrão: metade das CPUs)
+- FILAS_POOL_FILA: requisições caras à espera de uma thread (padrão 8)
+"""
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from app.models.batch import calculate_mm1k_batch, calculate_mm1n_batch, calculate_mmsk_batch, calculate_mmsn_batch
+from app.models.precision import MAX_TERMOS_CENARIO, MAX_TERMOS_LOTE, Orcamento, com_orcamento
+from app.models.prazo import Prazo, PrazoExcedido, com_prazo
+from app.models.qed import S_MIN, TOLERANCIA_QED, erlang_qed
+
+DEFAULT_PRAZO = 10.0
+DEFAULT_CUSTO_INLINE = 0.02
+DEFAULT_FILA = 8
+
+# Segundos por unidade de trabalho (medidos; só a ordem de grandeza importa)
+SEGUNDOS_BASE = 1e-3          # modelos O(1) (fórmulas fechadas, overhead do NumPy)
+SEGUNDOS_POR_SERVIDOR = 6e-8  # soma O(s) do M/M/s exato (log-sum-exp vetorizado)
+SEGUNDOS_POR_ESTADO = 2.5e-6  # soma dos estados em alta precisão (Decimal)
+SEGUNDOS_POR_CLASSE = 2e-6    # laços por classe das prioridades
+SEGUNDOS_POR_CELULA = 1e-6    # célula de grade ou sorteio de Monte Carlo (modelos vetorizados)
+
+# Modelos cujos cenários suspeitos são refinados em alta precisão
+MODELOS_REFINADOS = ('mm1k', 'mm1n', 'mmsk', 'mmsn')
+
+
+class Recusada(Exception):
+    """Requisição recusada pelo controle de admissão (status: código HTTP)"""
+
+    status = 503
+
+
+class CustoExcedido(Recusada, ValueError):
+    """O custo estimado passa do orçamento de uma requisição"""
+
+    status = 400
+
+
+class Ocupado(Recusada):
+    """Pool e fila de espera cheios"""
+
+    status = 503
+
+
+class Expirada(Recusada):
+    """O cálculo não terminou dentro do prazo"""
+
+    status = 504
+
+
+def _custo_constante(*args, **kwargs):
+    return SEGUNDOS_BASE
+
+
+def _custo_mms(lambda_, mu, s, n=None, r=None, t=None, tolerancia=TOLERANCIA_QED):
+    # Mesmo despacho de calculate_mms: a aproximação QED é O(1)
+    s = int(s)
+    if s >= S_MIN and (n is None or n >= s) and (r is None or r >= s) and 0 < lambda_ < s * mu:
+        if float(erlang_qed(lambda_ / mu, s)['erro']) <= tolerancia:
+            return SEGUNDOS_BASE
+    termos = s + 1
+    if r is not None and r < s:
+        termos += r + 1
+    return SEGUNDOS_BASE + termos * SEGUNDOS_POR_SERVIDOR
+
+
+def _custo_estados(func, estados, *args):
+    # O caminho float64 é O(1); a soma em alta precisão só entra se ele marcar o
+    # cenário como suspeito (avaliado sem orçamento, sem refinar) e se couber em
+    # MAX_TERMOS_CENARIO estados (acima disso fica no float64)
+    estados = int(estados) + 1
+    with com_orcamento(Orcamento(0)):
+        suspeito = bool(func(*args)['precisaoLimitada'])
+    if not suspeito or estados > MAX_TERMOS_CENARIO:
+        return SEGUNDOS_BASE
+    return SEGUNDOS_BASE + estados * SEGUNDOS_POR_ESTADO
+
+
+def _custo_prioridade(s, mu, lambdas):
+    return SEGUNDOS_BASE + len(lambdas) * SEGUNDOS_POR_CLASSE
+
+
+def _custo_refino(modelo, orcamento=None):
+    # Pior caso do refino de um lote: o orçamento inteiro em Decimal
+    if modelo not in MODELOS_REFINADOS:
+        return 0.0
+    return (orcamento.restante if orcamento is not None else MAX_TERMOS_LOTE) * SEGUNDOS_POR_ESTADO
+
+
+def _custo_grade(modelo, eixo_x, eixo_y, fixos=None, metricas=None, orcamento=None):
+    celulas = int(eixo_x[3]) * int(eixo_y[3])
+    return SEGUNDOS_BASE + celulas * SEGUNDOS_POR_CELULA + _custo_refino(modelo, orcamento)
+
+
+def _custo_incerteza(modelo, parametros, amostras):
+    return SEGUNDOS_BASE + int(amostras) * SEGUNDOS_POR_CELULA + _custo_refino(modelo)
+
+
+# Modelo (nome usado nas rotas e no cache) ou análise -> estimador, chamado
+# com os mesmos argumentos do cálculo
+CUSTOS = {
+    'mm1': _custo_constante,
+    'mms': _custo_mms,
+    'mmsm': _custo_constante,
+    'mm1k': lambda lambda_, mu, K, n=None: _custo_estados(calculate_mm1k_batch, K, lambda_, mu, K),
+    'mm1n': lambda lambda_, mu, N, n=None: _custo_estados(calculate_mm1n_batch, N, lambda_, mu, N),
+    'mmsk': lambda lambda_, mu, s, K, n=None: _custo_estados(calculate_mmsk_batch, K, lambda_, mu, s, K),
+    'mmsn': lambda lambda_, mu, s, N, n=None: _custo_estados(calculate_mmsn_batch, N, lambda_, mu, s, N),
+    'mg1': _custo_constante,
+    'gg1': _custo_constante,
+    'ggs': _custo_constante,
+    'priority-sem': _custo_prioridade,
+    'priority-com': _custo_prioridade,
+    'grid': _custo_grade,
+    'uncertainty': _custo_incerteza,
+}
+
+
+def estimate_cost(modelo, *args, **kwargs) -> float:
+    """
+    Custo estimado de um cálculo, em segundos (pior caso)
+
+    Parâmetros inválidos não são recusados aqui: recebem o custo mínimo e
+    o próprio modelo levanta o ValueError de sempre.
+
+    Exemplo:
+        >>> estimate_cost('mmsk', 1e7, 1.0, 2, 10**5 - 1)  # ≈ 0.25 (refino em Decimal)
+    """
+    estimador = CUSTOS.get(modelo, _custo_constante)
+    try:
+        return float(estimador(*args, **kwargs))
+    except (TypeError, ValueError, ZeroDivisionError, OverflowError):
+        return SEGUNDOS_BASE
+
+
+class Admissao:
+    """
+    Execução limitada dos cálculos caros
+
+    Args:
+        prazo (float): Prazo de cada requisição, em segundos
+        custo_inline (float): Custo máximo calculado na própria thread
+        threads (int): Threads do pool
+        fila (int): Requisições caras à espera de uma thread
+    """
+
+    def __init__(self, prazo=DEFAULT_PRAZO, custo_inline=DEFAULT_CUSTO_INLINE, threads=None, fila=DEFAULT_FILA):
+        if threads is None:
+            threads = max(1, (os.cpu_count() or 2) // 2)
+        self.prazo = float(prazo)
+        self.custo_inline = float(custo_inline)
+        self.threads = int(threads)
+        self.fila = int(fila)
+        self._vagas = threading.BoundedSemaphore(self.threads + self.fila)
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='calculo')
+        self._pid = os.getpid()
+
+    def admitir(self, modelo, *args, **kwargs) -> float:
+        """
+        Custo estimado do cálculo, recusando-o se passar do prazo
+
+        Raises:
+            CustoExcedido: Se o custo estimado for maior que o prazo
+        """
+        custo = estimate_cost(modelo, *args, **kwargs)
+        if custo > self.prazo:
+            raise CustoExcedido(
+                f"Requisição cara demais: custo estimado de {custo:.3g} s, acima do limite de "
+                f"{self.prazo:.3g} s por requisição. Reduza s, K, N, o número de classes, de células ou de sorteios."
+            )
+        return custo
+
+    def executar(self, custo, func, *args, **kwargs):
+        """
+        Calcula func(*args, **kwargs) na própria thread (barato) ou no pool
+
+        Raises:
+            Ocupado: Se o pool e a fila de espera estiverem cheios
+            Expirada: Se o cálculo não terminar dentro do prazo
+        """
+        if custo <= self.custo_inline:
+            return func(*args, **kwargs)
+        if not self._vagas.acquire(blocking=False):
+            raise Ocupado("Servidor ocupado com outros cálculos longos; tente novamente em instantes.")
+        prazo = Prazo(self.prazo)
+        try:
+            # Cópia do contexto: o cálculo enxerga os ContextVars da requisição
+            futuro = self._pool.submit(contextvars.copy_context().run, _rodar, prazo, func, args, kwargs)
+        except BaseException:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        try:
+            return futuro.result(timeout=max(prazo.restante(), 0.0))
+        except (FuturesTimeoutError, PrazoExcedido):
+            prazo.cancelar()
+            futuro.cancel()
+            raise Expirada(f"O cálculo não terminou dentro do prazo de {self.prazo:.3g} s.") from None
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _rodar(prazo, func, args, kwargs):
+    # Na thread do pool: desiste logo se o prazo acabou na fila
+    with com_prazo(prazo):
+        if prazo.esgotado():
+            raise PrazoExcedido("Prazo esgotado antes do início do cálculo")
+        return func(*args, **kwargs)
+
+
+_admissao = None
+
+
+def configure(prazo=DEFAULT_PRAZO, custo_inline=DEFAULT_CUSTO_INLINE, threads=None, fila=DEFAULT_FILA):
+    """Reconfigura o controle de admissão deste processo"""
+    global _admissao
+    if _admissao is not None:
+        _admissao.shutdown()
+    _admissao = Admissao(prazo, custo_inline, threads, fila)
+    return _admissao
+
+
+def get_admissao():
+    """Controle configurado (lido das variáveis de ambiente na primeira chamada)"""
+    global _admissao
+    if _admissao is not None and _admissao._pid != os.getpid():
+        # Threads não sobrevivem ao fork: mesma configuração, pool novo
+        _admissao = Admissao(_admissao.prazo, _admissao.custo_inline, _admissao.threads, _admissao.fila)
+    if _admissao is None:
+        threads = os.environ.get('FILAS_POOL_THREADS')
+        configure(
+            float(os.environ.get('FILAS_PRAZO', DEFAULT_PRAZO)),
+            float(os.environ.get('FILAS_CUSTO_INLINE', DEFAULT_CUSTO_INLINE)),
+            int(threads) if threads else None,
+            int(os.environ.get('FILAS_POOL_FILA', DEFAULT_FILA)),
+        )
+    return _admissao
@@ -0,0 +1,2 @@
+# Módulo de análises sobre vários cenários (superfícies de parâmetros)
+from app.analysis.grid import compute_grid, axis_values
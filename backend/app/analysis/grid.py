@@ -0,0 +1,178 @@
+"""
+Superfícies de métricas sobre grades 2-D de parâmetros
+
+Calcula uma métrica (W, Wq, PK, ...) em todos os pontos de uma grade
+(eixo X × eixo Y), como (λ, s), (λ, K) ou (μ, N), usando as versões
+vetorizadas dos modelos (app/models/batch.py). A grade é processada em
+blocos de linhas para limitar a memória intermediária.
+
+O resultado é uma matriz float32 (metricas × passos Y × passos X); células
+instáveis ou inválidas recebem NaN (máscara). Os blocos dividem um único
+orçamento de alta precisão (app/models/precision.py): esgotado, as células
+restantes ficam no float64 e são contadas em orcamento.limitados. As rotas
+usam o orçamento menor MAX_TERMOS_GRADE, para a grade continuar interativa.
+"""
+import numpy as np
+
+from app.models.batch import (
+    calculate_gg1_batch,
+    calculate_ggs_batch,
+    calculate_mg1_batch,
+    calculate_mm1_batch,
+    calculate_mm1k_batch,
+    calculate_mm1n_batch,
+    calculate_mms_batch,
+    calculate_mmsk_batch,
+    calculate_mmsm_batch,
+    calculate_mmsn_batch,
+)
+from app.models.precision import Orcamento, com_orcamento
+from app.models.prazo import verificar_prazo
+
+# Modelo -> (função vetorizada, parâmetros na ordem da função)
+MODELOS = {
+    'mm1': (calculate_mm1_batch, ('lambda', 'mu')),
+    'mms': (calculate_mms_batch, ('lambda', 'mu', 's')),
+    'mmsm': (calculate_mmsm_batch, ('lambda', 'mu', 's', 'theta')),
+    'mm1k': (calculate_mm1k_batch, ('lambda', 'mu', 'K')),
+    'mmsk': (calculate_mmsk_batch, ('lambda', 'mu', 's', 'K')),
+    'mm1n': (calculate_mm1n_batch, ('lambda', 'mu', 'N')),
+    'mmsn': (calculate_mmsn_batch, ('lambda', 'mu', 's', 'N')),
+    'mg1': (calculate_mg1_batch, ('lambda', 'mu', 'varService')),
+    'gg1': (calculate_gg1_batch, ('lambda', 'mu', 'ca2', 'cs2')),
+    'ggs': (calculate_ggs_batch, ('lambda', 'mu', 's', 'ca2', 'cs2')),
+}
+
+PARAMETROS_INTEIROS = ('s', 'K', 'N')
+
+METRICAS_PADRAO = ('W', 'Wq')
+
+MAX_PASSOS = 2000
+MAX_CELULAS = 1_000_000
+
+# Células calculadas por bloco
+CHUNK_CELULAS = 65536
+
+# Estados somados em alta precisão numa grade das rotas (~0.25 s de Decimal)
+MAX_TERMOS_GRADE = 100_000
+
+
+def axis_values(parametro, inicio, fim, passos):
+    """
+    Valores de um eixo: `passos` pontos igualmente espaçados de início a fim
+
+    Parâmetros inteiros (s, K, N) são arredondados.
+    """
+    passos = int(passos)
+    if not (1 <= passos <= MAX_PASSOS):
+        raise ValueError(f"O número de passos de '{parametro}' deve estar entre 1 e {MAX_PASSOS}.")
+    valores = np.linspace(float(inicio), float(fim), passos)
+    if not np.all(np.isfinite(valores)):
+        raise ValueError(f"O intervalo de '{parametro}' deve ser finito.")
+    if parametro in PARAMETROS_INTEIROS:
+        valores = np.round(valores)
+    return valores
+
+
+def compute_grid(modelo, eixo_x, eixo_y, fixos=None, metricas=None, chunk_celulas=CHUNK_CELULAS, orcamento=None):
+    """
+    Calcula métricas de um modelo em todos os pontos de uma grade 2-D
+
+    Args:
+        modelo (str): Um de MODELOS (ex.: 'mmsk')
+        eixo_x (tuple): (parametro, inicio, fim, passos) das colunas
+        eixo_y (tuple): (parametro, inicio, fim, passos) das linhas
+        fixos (dict, optional): Valores dos demais parâmetros do modelo
+        metricas (list, optional): Métricas a calcular (padrão: W e Wq)
+        chunk_celulas (int): Células calculadas por bloco
+        orcamento (Orcamento, optional): Orçamento de alta precisão da grade
+            inteira (padrão: MAX_TERMOS_LOTE); depois do cálculo,
+            orcamento.limitados conta as células que ficaram no float64
+
+    Returns:
+        tuple: (matriz, valores_x, valores_y, metricas)
+            - matriz: np.ndarray float32 (len(metricas), passos_y, passos_x),
+              com NaN nas células instáveis ou inválidas
+
+    Raises:
+        ValueError: Se o modelo, os eixos, os parâmetros ou as métricas forem inválidos
+
+    Exemplo:
+        >>> matriz, xs, ys, nomes = compute_grid('mms', ('lambda', 1, 50, 500), ('s', 1, 40, 40), {'mu': 2})
+    """
+    blocos = iter_grid(modelo, eixo_x, eixo_y, fixos, metricas, chunk_celulas, orcamento)
+    valores_x, valores_y, metricas = next(blocos)
+    matriz = np.empty((len(metricas), valores_y.size, valores_x.size), dtype=np.float32)
+    for inicio, fim, bloco in blocos:
+        matriz[:, inicio:fim] = bloco
+    return matriz, valores_x, valores_y, metricas
+
+
+def iter_grid(modelo, eixo_x, eixo_y, fixos=None, metricas=None, chunk_celulas=CHUNK_CELULAS, orcamento=None):
+    """
+    Versão incremental de compute_grid: a grade em blocos de linhas
+
+    O primeiro item, gerado depois de todas as validações, é
+    (valores_x, valores_y, metricas); os seguintes são (inicio, fim, bloco),
+    com bloco float32 (len(metricas), fim - inicio, passos_x) e NaN nas
+    células instáveis. Fechar o gerador (ex.: cliente desconectado) ou o
+    fim do prazo ativo (app/models/prazo.py) interrompe o cálculo no próximo
+    bloco.
+
+    Raises:
+        ValueError: Ver compute_grid (no primeiro next)
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo '{modelo}' inválido. Use um de: {', '.join(MODELOS)}.")
+    func, parametros = MODELOS[modelo]
+    fixos = dict(fixos or {})
+    metricas = list(metricas or METRICAS_PADRAO)
+    if not metricas:
+        raise ValueError("Informe pelo menos uma métrica.")
+
+    param_x, param_y = eixo_x[0], eixo_y[0]
+    for parametro in (param_x, param_y):
+        if parametro not in parametros:
+            raise ValueError(
+                f"Parâmetro '{parametro}' inválido para o modelo {modelo}. Use um de: {', '.join(parametros)}."
+            )
+    if param_x == param_y:
+        raise ValueError("Os eixos X e Y devem usar parâmetros diferentes.")
+    faltando = [p for p in parametros if p not in (param_x, param_y) and p not in fixos]
+    if faltando:
+        raise ValueError(f"Parâmetros fixos obrigatórios: {', '.join(faltando)}")
+
+    valores_x = axis_values(*eixo_x)
+    valores_y = axis_values(*eixo_y)
+    nx, ny = valores_x.size, valores_y.size
+    if nx * ny > MAX_CELULAS:
+        raise ValueError(f"A grade deve ter no máximo {MAX_CELULAS} células.")
+
+    def argumentos(xs, ys):
+        return [xs if p == param_x else ys if p == param_y else float(fixos[p]) for p in parametros]
+
+    # Validar as métricas antes da grade, com uma única célula
+    disponiveis = [k for k in func(*argumentos(valores_x[:1], valores_y[:1])) if k != 'estavel']
+    invalidas = [nome for nome in metricas if nome not in disponiveis]
+    if invalidas:
+        raise ValueError(
+            f"Métrica '{invalidas[0]}' inválida para o modelo {modelo}. Use uma de: {', '.join(disponiveis)}."
+        )
+
+    yield valores_x, valores_y, metricas
+
+    linhas = max(1, int(chunk_celulas) // nx)
+    if orcamento is None:
+        orcamento = Orcamento()
+    for inicio in range(0, ny, linhas):
+        verificar_prazo()
+        fim = min(ny, inicio + linhas)
+        with com_orcamento(orcamento):
+            bloco = func(*argumentos(valores_x[None, :], valores_y[inicio:fim, None]))
+
+        matriz = np.empty((len(metricas), fim - inicio, nx), dtype=np.float32)
+        validas = np.broadcast_to(bloco['estavel'], (fim - inicio, nx))
+        for i, nome in enumerate(metricas):
+            valores = np.broadcast_to(bloco[nome], (fim - inicio, nx))
+            matriz[i] = np.where(validas & np.isfinite(valores), valores, np.nan)
+        yield inicio, fim, matriz
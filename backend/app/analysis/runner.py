@@ -0,0 +1,269 @@
+"""
+Execução em lote de cenários a partir de arquivos (sem o servidor Flask)
+
+Lê um arquivo de cenários (CSV ou Parquet), uma linha por cenário, em blocos
+de `chunk_linhas` linhas, avalia cada bloco com a versão vetorizada do
+modelo (app/models/batch.py) em um pool de processos e grava os resultados
+em um arquivo de saída conforme os blocos ficam prontos, na ordem de entrada.
+No máximo `2 × workers` blocos ficam em memória ao mesmo tempo, então o uso
+de memória não depende do tamanho do arquivo.
+
+Colunas de entrada: os parâmetros do modelo com os mesmos nomes da API
+(lambda, mu, s, K, N, theta, varService) e, quando o modelo aceita, os
+opcionais (t, n). As demais colunas (ex.: um id do cenário) são copiadas
+para a saída, seguidas das métricas e de `estavel`. Cenários instáveis ou
+inválidos saem com NaN nas métricas.
+
+A leitura, o parsing e a formatação dos blocos CSV também rodam nos
+processos do pool (o processo principal só separa linhas e grava texto);
+por isso cada cenário deve ocupar uma única linha do CSV.
+
+Parquet exige o pacote opcional `pyarrow`.
+
+Exemplo:
+    python run_batch.py cenarios.csv resultados.csv --modelo mmsk --workers 8
+"""
+import csv
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from app.analysis.grid import MODELOS
+
+# Parâmetros opcionais aceitos por cada modelo vetorizado
+OPCIONAIS = {
+    'mms': ('t',),
+    'mmsm': ('t',),
+    'mm1k': ('n',),
+    'mmsk': ('n',),
+    'mm1n': ('n',),
+    'mmsn': ('n',),
+}
+
+FORMATOS = ('csv', 'parquet')
+
+# Cenários avaliados por bloco
+CHUNK_LINHAS = 100_000
+
+
+def _formato(path, formato=None):
+    formato = formato or os.path.splitext(path)[1].lstrip('.').lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato '{formato}' inválido. Use um de: {', '.join(FORMATOS)}.")
+    return formato
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError("Arquivos Parquet exigem o pacote opcional 'pyarrow' (pip install pyarrow).")
+    return pyarrow
+
+
+def _ler_csv(path, chunk_linhas):
+    # Blocos de linhas cruas; o parsing fica com os processos do pool
+    with open(path, newline='') as f:
+        cabecalho = f.readline()
+        if not cabecalho.strip():
+            return
+        cabecalho = [nome.strip() for nome in next(csv.reader([cabecalho]))]
+        while True:
+            linhas = list(islice(f, chunk_linhas))
+            if not linhas:
+                return
+            yield cabecalho, linhas
+
+
+def _colunas_csv(cabecalho, linhas):
+    linhas = [linha for linha in csv.reader(linhas) if linha]
+    if any(len(linha) != len(cabecalho) for linha in linhas):
+        raise ValueError(f"CSV malformado: cada linha deve ter {len(cabecalho)} colunas.")
+    if not linhas:
+        return {nome: [] for nome in cabecalho}
+    return {nome: list(coluna) for nome, coluna in zip(cabecalho, zip(*linhas))}
+
+
+def _ler_parquet(path, chunk_linhas):
+    pq = _pyarrow().parquet
+    for lote in pq.ParquetFile(path).iter_batches(batch_size=chunk_linhas):
+        yield None, {nome: lote.column(i).to_numpy(zero_copy_only=False)
+                     for i, nome in enumerate(lote.schema.names)}
+
+
+def _texto_csv(colunas):
+    # Linhas CSV de um bloco (sem cabeçalho); floats com repr, como o csv.writer
+    textos = []
+    for valores in colunas.values():
+        valores = np.asarray(valores)
+        if valores.dtype.kind == 'f':
+            textos.append(list(map(repr, valores.tolist())))
+        elif valores.dtype.kind in 'biu':
+            textos.append(list(map(str, valores.tolist())))
+        else:
+            buffer = io.StringIO()
+            csv.writer(buffer, lineterminator='\n').writerows([v] for v in valores.tolist())
+            textos.append(buffer.getvalue().splitlines())
+    return ''.join(','.join(linha) + '\r\n' for linha in zip(*textos))
+
+
+class _EscritorCSV:
+    def __init__(self, path):
+        self._arquivo = open(path, 'w', newline='')
+        self._cabecalho = False
+
+    def escrever(self, nomes, bloco):
+        if not self._cabecalho:
+            csv.writer(self._arquivo).writerow(nomes)
+            self._cabecalho = True
+        self._arquivo.write(bloco)
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class _EscritorParquet:
+    def __init__(self, path):
+        self._path = path
+        self._pa = _pyarrow()
+        self._escritor = None
+
+    def escrever(self, nomes, bloco):
+        tabela = self._pa.table({nome: np.asarray(bloco[nome]) for nome in nomes})
+        if self._escritor is None:
+            self._escritor = self._pa.parquet.ParquetWriter(self._path, tabela.schema)
+        self._escritor.write_table(tabela)
+
+    def fechar(self):
+        if self._escritor is not None:
+            self._escritor.close()
+
+
+def _processar_bloco(modelo, cabecalho, bloco, metricas, formato_saida):
+    # Executado nos processos do pool: parsing, modelo e formatação da saída
+    colunas = _colunas_csv(cabecalho, bloco) if cabecalho is not None else bloco
+    saida = evaluate_chunk(modelo, colunas, metricas)
+    estaveis = int(np.count_nonzero(saida['estavel']))
+    conteudo = _texto_csv(saida) if formato_saida == 'csv' else saida
+    return list(saida), conteudo, len(saida['estavel']), estaveis
+
+
+def evaluate_chunk(modelo, colunas, metricas=None):
+    """
+    Avalia um bloco de cenários com a versão vetorizada do modelo
+
+    Args:
+        modelo (str): Um de MODELOS (ex.: 'mmsk')
+        colunas (dict): Coluna -> valores (um por cenário)
+        metricas (list, optional): Métricas de saída (padrão: todas)
+
+    Returns:
+        dict: Colunas de saída: as colunas que não são parâmetros, as
+            métricas e `estavel`, cada uma com um valor por cenário
+
+    Raises:
+        ValueError: Se faltar um parâmetro, um valor não for numérico ou
+            uma métrica for inválida
+    """
+    func, parametros = MODELOS[modelo]
+    faltando = [p for p in parametros if p not in colunas]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias para o modelo {modelo}: {', '.join(faltando)}")
+    opcionais = [p for p in OPCIONAIS.get(modelo, ()) if p in colunas]
+
+    def numerica(nome):
+        try:
+            return np.asarray(colunas[nome], dtype=np.float64)
+        except ValueError:
+            raise ValueError(f"A coluna '{nome}' deve ser numérica.")
+
+    linhas = len(next(iter(colunas.values())))
+    with np.errstate(all='ignore'):
+        resultado = func(*(numerica(p) for p in parametros), **{p: numerica(p) for p in opcionais})
+
+    disponiveis = [k for k in resultado if k != 'estavel']
+    nomes = list(metricas or disponiveis)
+    invalidas = [nome for nome in nomes if nome not in disponiveis]
+    if invalidas:
+        raise ValueError(
+            f"Métrica '{invalidas[0]}' inválida para o modelo {modelo}. Use uma de: {', '.join(disponiveis)}."
+        )
+
+    entrada = set(parametros) | set(opcionais)
+    saida = {nome: colunas[nome] for nome in colunas if nome not in entrada}
+    for nome in parametros + tuple(opcionais):
+        saida[nome] = numerica(nome)
+    estavel = np.broadcast_to(resultado['estavel'], (linhas,))
+    for nome in nomes:
+        valores = np.broadcast_to(resultado[nome], (linhas,))
+        if valores.dtype.kind == 'f':
+            valores = np.where(estavel, valores, np.nan)
+        saida[nome] = valores
+    saida['estavel'] = estavel
+    return saida
+
+
+def run_file(entrada, saida, modelo, metricas=None, workers=None, chunk_linhas=CHUNK_LINHAS,
+             formato_entrada=None, formato_saida=None) -> dict:
+    """
+    Avalia todos os cenários de um arquivo e grava os resultados em outro
+
+    Args:
+        entrada (str): Arquivo de cenários (.csv ou .parquet)
+        saida (str): Arquivo de resultados (.csv ou .parquet)
+        modelo (str): Um de MODELOS
+        metricas (list, optional): Métricas de saída (padrão: todas)
+        workers (int, optional): Processos do pool (padrão: um por núcleo;
+            1 avalia no próprio processo)
+        chunk_linhas (int): Cenários por bloco
+        formato_entrada, formato_saida (str, optional): 'csv' ou 'parquet'
+            (padrão: pela extensão do arquivo)
+
+    Returns:
+        dict: Resumo da execução (cenarios, blocos, estaveis)
+
+    Raises:
+        ValueError: Se o modelo, o formato, as colunas ou as métricas forem inválidos
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo '{modelo}' inválido. Use um de: {', '.join(MODELOS)}.")
+    chunk_linhas = int(chunk_linhas)
+    if chunk_linhas < 1:
+        raise ValueError("O tamanho do bloco deve ser um inteiro positivo.")
+    workers = int(workers or os.cpu_count() or 1)
+
+    ler = _ler_csv if _formato(entrada, formato_entrada) == 'csv' else _ler_parquet
+    formato_saida = _formato(saida, formato_saida)
+    escritor = (_EscritorCSV if formato_saida == 'csv' else _EscritorParquet)(saida)
+    resumo = {'cenarios': 0, 'blocos': 0, 'estaveis': 0}
+
+    def gravar(processado):
+        nomes, conteudo, cenarios, estaveis = processado
+        escritor.escrever(nomes, conteudo)
+        resumo['cenarios'] += cenarios
+        resumo['blocos'] += 1
+        resumo['estaveis'] += estaveis
+
+    try:
+        if workers == 1:
+            for cabecalho, bloco in ler(entrada, chunk_linhas):
+                gravar(_processar_bloco(modelo, cabecalho, bloco, metricas, formato_saida))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pendentes = deque()
+                for cabecalho, bloco in ler(entrada, chunk_linhas):
+                    pendentes.append(pool.submit(_processar_bloco, modelo, cabecalho, bloco,
+                                                 metricas, formato_saida))
+                    # Limitar os blocos em memória, gravando na ordem de entrada
+                    if len(pendentes) >= 2 * workers:
+                        gravar(pendentes.popleft().result())
+                while pendentes:
+                    gravar(pendentes.popleft().result())
+    finally:
+        escritor.fechar()
+    return resumo
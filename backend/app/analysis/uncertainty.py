@@ -0,0 +1,262 @@
+"""
+Propagação de incerteza dos parâmetros por Monte Carlo
+
+Os parâmetros dos modelos (λ, μ, s, ...) podem ser dados como distribuições
+em vez de valores pontuais. São sorteadas `amostras` combinações de
+parâmetros, o modelo é avaliado em todas elas pela versão vetorizada
+(app/models/batch.py), em blocos para limitar a memória, e o resultado traz
+faixas de percentis das métricas e a probabilidade de instabilidade, que a
+estimativa pontual esconde perto de ρ → 1.
+
+Especificação de cada parâmetro:
+- número: valor fixo
+- {'tipo': 'normal', 'media': m, 'desvio': d}
+- {'tipo': 'lognormal', 'media': m, 'desvio': d}   (média e desvio da
+  própria variável, não do log; sempre positiva)
+- {'tipo': 'empirica', 'amostras': [...]}           (reamostragem com reposição)
+- lista de especificações: um valor por classe (lambdas do priority-sem)
+
+Parâmetros inteiros (s, K, N) são arredondados. Sorteios inválidos (ex.: λ
+negativo de uma normal) contam como instáveis. Os percentis são calculados
+só sobre os sorteios estáveis (condicionados à estabilidade).
+"""
+import numpy as np
+
+from app.analysis.grid import MODELOS as MODELOS_GRADE
+from app.models.batch import calculate_priority_sem_batch
+from app.models.precision import Orcamento, com_orcamento
+from app.models.prazo import verificar_prazo
+
+# Modelo -> (função vetorizada, parâmetros na ordem da função)
+MODELOS = dict(MODELOS_GRADE)
+MODELOS['priority-sem'] = (calculate_priority_sem_batch, ('s', 'mu', 'lambdas'))
+
+PARAMETROS_INTEIROS = ('s', 'K', 'N')
+
+TIPOS = ('normal', 'lognormal', 'empirica')
+
+METRICAS_PADRAO = ('L', 'W', 'Wq', 'PK')
+
+PERCENTIS_PADRAO = (5, 25, 50, 75, 95)
+
+AMOSTRAS_PADRAO = 1_000_000
+MAX_AMOSTRAS = 5_000_000
+
+# Sorteios avaliados por bloco
+CHUNK_AMOSTRAS = 1 << 17
+
+# Quantil da normal para o intervalo de confiança de 95% (iter_uncertainty)
+Z_IC95 = 1.959963984540054
+
+
+def _amostrador(nome, spec):
+    """Converte a especificação de um parâmetro em uma função rng, n -> valores"""
+    if isinstance(spec, (list, tuple)):
+        if not spec:
+            raise ValueError(f"'{nome}' deve ter pelo menos um valor.")
+        partes = [_amostrador(f'{nome}[{i}]', s) for i, s in enumerate(spec)]
+        return lambda rng, n: np.stack([p(rng, n) for p in partes], axis=-1)
+
+    if not isinstance(spec, dict):
+        try:
+            valor = float(spec)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{nome}' deve ser um número ou uma distribuição.")
+        return lambda rng, n: np.full(n, valor)
+
+    tipo = spec.get('tipo')
+    if tipo not in TIPOS:
+        raise ValueError(f"Distribuição de '{nome}' inválida. Use um de: {', '.join(TIPOS)}.")
+
+    if tipo == 'empirica':
+        amostras = np.asarray(spec.get('amostras') or [], dtype=np.float64)
+        if amostras.ndim != 1 or amostras.size == 0 or not np.all(np.isfinite(amostras)):
+            raise ValueError(f"A distribuição empírica de '{nome}' exige uma lista de amostras finitas.")
+        return lambda rng, n: rng.choice(amostras, size=n)
+
+    try:
+        media, desvio = float(spec['media']), float(spec['desvio'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"A distribuição de '{nome}' exige 'media' e 'desvio' numéricos.")
+    if not (np.isfinite(media) and np.isfinite(desvio) and desvio >= 0):
+        raise ValueError(f"A distribuição de '{nome}' exige média finita e desvio não-negativo.")
+
+    if tipo == 'normal':
+        return lambda rng, n: rng.normal(media, desvio, n)
+
+    if media <= 0:
+        raise ValueError(f"A distribuição lognormal de '{nome}' exige média positiva.")
+    # Parâmetros do log a partir da média e do desvio da variável
+    sigma2 = np.log1p((desvio / media) ** 2)
+    mu_log = np.log(media) - sigma2 / 2
+    return lambda rng, n: rng.lognormal(mu_log, np.sqrt(sigma2), n)
+
+
+def _faixas(valores, percentis):
+    # Média e percentis ao longo dos sorteios (eixo 0); None sem sorteios
+    if valores.shape[0] == 0:
+        vazio = [None] * valores.shape[1] if valores.ndim > 1 else None
+        return {'media': vazio, 'percentis': {str(p): vazio for p in percentis}}
+    bandas = np.percentile(valores, percentis, axis=0)
+    return {
+        'media': valores.mean(axis=0).tolist(),
+        'percentis': {str(p): banda.tolist() for p, banda in zip(percentis, bandas)},
+    }
+
+
+def propagate_uncertainty(modelo, parametros, amostras=AMOSTRAS_PADRAO, metricas=None,
+                          percentis=PERCENTIS_PADRAO, semente=None,
+                          chunk_amostras=CHUNK_AMOSTRAS) -> dict:
+    """
+    Propaga a incerteza dos parâmetros de um modelo por Monte Carlo
+
+    Args:
+        modelo (str): Um de MODELOS (ex.: 'mmsk', 'priority-sem')
+        parametros (dict): Parâmetro -> número ou distribuição (ver o módulo)
+        amostras (int): Número de sorteios
+        metricas (list, optional): Métricas (padrão: L, W, Wq e PK, as que
+            o modelo tiver)
+        percentis (list): Percentis das faixas (0 a 100)
+        semente (int, optional): Semente do gerador (resultado reprodutível)
+        chunk_amostras (int): Sorteios avaliados por bloco
+
+    Returns:
+        dict: Resultado
+            - amostras: Número de sorteios
+            - probInstabilidade: Fração de sorteios instáveis ou inválidos
+            - precisaoLimitada: Sorteios mal condicionados que ficaram no
+              float64 (orçamento de alta precisão esgotado, ver
+              app/models/precision.py)
+            - metricas: Métrica -> {media, percentis: {p: valor}}, sobre os
+              sorteios estáveis (no priority-sem, listas com um valor por classe)
+
+    Raises:
+        ValueError: Se o modelo, os parâmetros, as métricas ou os percentis
+            forem inválidos
+    """
+    for evento, dados in iter_uncertainty(modelo, parametros, amostras, metricas, percentis, semente,
+                                          chunk_amostras, progresso=False):
+        if evento == 'resultado':
+            return dados
+
+
+class _MediaAcumulada:
+    # Média e variância acumuladas bloco a bloco (fórmula de Chan et al.)
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+
+    def update(self, valores):
+        n = valores.shape[0]
+        if n == 0:
+            return
+        media = valores.mean(axis=0)
+        m2 = ((valores - media) ** 2).sum(axis=0)
+        total = self.n + n
+        delta = media - self.media
+        self.media = self.media + delta * n / total
+        self.m2 = self.m2 + m2 + delta ** 2 * self.n * n / total
+        self.n = total
+
+    def intervalo(self, z=Z_IC95):
+        """Média e intervalo de confiança (normal) da média"""
+        if self.n == 0:
+            return {'media': None, 'ic95': None}
+        erro = z * np.sqrt(self.m2 / max(self.n - 1, 1) / self.n)
+        media = np.asarray(self.media)
+        return {'media': media.tolist(), 'ic95': [(media - erro).tolist(), (media + erro).tolist()]}
+
+
+def iter_uncertainty(modelo, parametros, amostras=AMOSTRAS_PADRAO, metricas=None,
+                     percentis=PERCENTIS_PADRAO, semente=None,
+                     chunk_amostras=CHUNK_AMOSTRAS, progresso=True):
+    """
+    Versão incremental de propagate_uncertainty: eventos (nome, dados)
+
+    - ('inicio', {modelo, amostras, metricas}), depois das validações;
+    - com progresso, ('progresso', {...}) a cada bloco de sorteios: sorteios
+      feitos, probInstabilidade até ali e, por métrica, a média e o
+      intervalo de confiança de 95% da média (ic95) sobre os sorteios
+      estáveis até ali;
+    - ('resultado', dict de propagate_uncertainty), no fim.
+
+    Fechar o gerador (ex.: cliente desconectado) ou o fim do prazo ativo
+    (app/models/prazo.py) interrompe o Monte Carlo no próximo bloco.
+
+    Raises:
+        ValueError: Ver propagate_uncertainty (no primeiro next)
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo '{modelo}' inválido. Use um de: {', '.join(MODELOS)}.")
+    func, nomes = MODELOS[modelo]
+    faltando = [p for p in nomes if p not in parametros]
+    if faltando:
+        raise ValueError(f"Parâmetros obrigatórios: {', '.join(faltando)}")
+    amostras = int(amostras)
+    if not (1 <= amostras <= MAX_AMOSTRAS):
+        raise ValueError(f"O número de amostras deve estar entre 1 e {MAX_AMOSTRAS}.")
+    percentis = [float(p) for p in percentis]
+    if not percentis or not all(0 <= p <= 100 for p in percentis):
+        raise ValueError("Os percentis devem estar entre 0 e 100.")
+    percentis = [int(p) if p.is_integer() else p for p in percentis]
+
+    amostradores = [_amostrador(p, parametros[p]) for p in nomes]
+    rng = np.random.default_rng(semente)
+
+    def sortear(n):
+        valores = [a(rng, n) for a in amostradores]
+        return [np.round(v) if p in PARAMETROS_INTEIROS else v for p, v in zip(nomes, valores)]
+
+    # Validar as métricas antes do Monte Carlo, com um único sorteio
+    disponiveis = [k for k in func(*sortear(1)) if k != 'estavel']
+    metricas = list(metricas) if metricas else [m for m in METRICAS_PADRAO if m in disponiveis]
+    invalidas = [nome for nome in metricas if nome not in disponiveis]
+    if invalidas:
+        raise ValueError(
+            f"Métrica '{invalidas[0]}' inválida para o modelo {modelo}. Use uma de: {', '.join(disponiveis)}."
+        )
+
+    yield 'inicio', {'modelo': modelo, 'amostras': amostras, 'metricas': metricas}
+
+    estavel = np.empty(amostras, dtype=bool)
+    valores = {}
+    acumuladas = {nome: _MediaAcumulada() for nome in metricas}
+    # Um orçamento de alta precisão para todos os blocos (app/models/precision.py)
+    orcamento = Orcamento()
+    for inicio in range(0, amostras, int(chunk_amostras)):
+        verificar_prazo()
+        fim = min(amostras, inicio + int(chunk_amostras))
+        with np.errstate(all='ignore'), com_orcamento(orcamento):
+            bloco = func(*sortear(fim - inicio))
+        estavel[inicio:fim] = bloco['estavel']
+        for nome in metricas:
+            v = np.asarray(bloco[nome], dtype=np.float64)
+            if nome not in valores:
+                valores[nome] = np.empty((amostras,) + v.shape[1:])
+            valores[nome][inicio:fim] = np.broadcast_to(v, (fim - inicio,) + v.shape[1:])
+        if progresso:
+            for nome in metricas:
+                v = valores[nome][inicio:fim][estavel[inicio:fim]]
+                acumuladas[nome].update(v[np.all(np.isfinite(v), axis=tuple(range(1, v.ndim)))])
+            yield 'progresso', {
+                'amostras': fim,
+                'total': amostras,
+                'probInstabilidade': float(1 - estavel[:fim].mean()),
+                'metricas': {nome: acumuladas[nome].intervalo() for nome in metricas},
+            }
+
+    resultado = {
+        'modelo': modelo,
+        'amostras': amostras,
+        'probInstabilidade': float(1 - estavel.mean()),
+        'precisaoLimitada': orcamento.limitados,
+        'metricas': {},
+    }
+    for nome in metricas:
+        v = valores[nome][estavel]
+        # Valores infinitos/NaN em sorteios estáveis (ex.: PK → underflow) ficam de fora
+        finitos = np.all(np.isfinite(v), axis=tuple(range(1, v.ndim)))
+        resultado['metricas'][nome] = _faixas(v[finitos], percentis)
+    yield 'resultado', resultado
@@ -0,0 +1,217 @@
+"""
+Cache de resultados compartilhado entre workers (SQLite em disco)
+
+Os resultados das rotas /api/calculate/* são guardados em uma tabela SQLite
+indexada pela tupla canônica de parâmetros (modelo + argumentos). Como o
+arquivo é compartilhado, um cenário calculado por um worker fica disponível
+para todos, e o cache sobrevive a reinícios do servidor.
+
+- Tamanho limitado: ao passar de `max_entries`, os menos usados recentemente
+  são removidos (LRU pelo instante do último acesso, regravado no máximo uma
+  vez a cada TOUCH_INTERVAL segundos por resultado, para que os acertos não
+  disputem a trava de escrita do SQLite).
+- Versão: a chave inclui um hash do código de app/models, então qualquer
+  mudança nas fórmulas invalida automaticamente os resultados antigos.
+- Falhas do SQLite nunca derrubam a requisição: o modelo é simplesmente
+  calculado de novo.
+
+Configuração (variáveis de ambiente):
+- FILAS_CACHE_PATH: arquivo do banco (vazio/ausente = cache desligado)
+- FILAS_CACHE_MAX: número máximo de resultados (padrão 100000)
+"""
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from app.models.results import para_json
+
+DEFAULT_MAX_ENTRIES = 100_000
+
+# Verificar o limite de tamanho a cada N inserções
+EVICT_EVERY = 64
+
+# Só regravar o instante de acesso de um resultado se o guardado for mais
+# antigo que isto (segundos): leituras quentes não viram escritas
+TOUCH_INTERVAL = 60.0
+
+_MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+
+
+def _models_version():
+    # Hash do código-fonte dos modelos
+    h = hashlib.sha1()
+    for caminho in sorted(glob.glob(os.path.join(_MODELS_DIR, '*.py'))):
+        with open(caminho, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()[:12]
+
+
+MODELS_VERSION = _models_version()
+
+
+def canonical_key(modelo, args, kwargs):
+    """Chave canônica de um cálculo: modelo, versão e argumentos normalizados"""
+    return json.dumps(
+        [modelo, MODELS_VERSION, list(args), sorted(kwargs.items())],
+        separators=(',', ':'),
+        ensure_ascii=False,
+    )
+
+
+class ResultCache:
+    """
+    Cache de resultados em SQLite, seguro para vários processos
+
+    Args:
+        path (str): Caminho do arquivo do banco
+        max_entries (int): Número máximo de resultados guardados
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._inserts = 0
+
+        diretorio = os.path.dirname(os.path.abspath(path))
+        os.makedirs(diretorio, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS resultados (
+                    chave TEXT PRIMARY KEY,
+                    modelo TEXT NOT NULL,
+                    resultado TEXT NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados (ultimo_acesso)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        # Uma conexão por thread e por processo (conexões não sobrevivem ao fork)
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.conn = self._connect()
+            self._local.touch = None
+            self._local.pid = pid
+        return self._local.conn
+
+    def _touch_conn(self):
+        # Conexão que desiste na hora se o banco estiver ocupado (sem esperar o timeout)
+        self._conn()
+        if self._local.touch is None:
+            self._local.touch = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        return self._local.touch
+
+    def get(self, chave):
+        """
+        Resultado guardado para a chave, ou None
+
+        A leitura não trava o banco: o instante de acesso (usado pelo LRU) só
+        é regravado quando está mais de TOUCH_INTERVAL segundos desatualizado,
+        e uma falha nessa escrita (banco ocupado) não impede a resposta.
+        """
+        conn = self._conn()
+        linha = conn.execute(
+            "SELECT resultado, ultimo_acesso FROM resultados WHERE chave = ?", (chave,)
+        ).fetchone()
+        if linha is None:
+            return None
+        agora = time.time()
+        if agora - linha[1] > TOUCH_INTERVAL:
+            try:
+                self._touch_conn().execute(
+                    "UPDATE resultados SET ultimo_acesso = ? WHERE chave = ?", (agora, chave)
+                )
+            except sqlite3.OperationalError:
+                pass
+        return json.loads(linha[0])
+
+    def put(self, chave, modelo, resultado):
+        """Guarda um resultado, removendo os mais antigos se passar do limite"""
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO resultados (chave, modelo, resultado, ultimo_acesso) VALUES (?, ?, ?, ?)",
+            (chave, modelo, json.dumps(resultado, default=para_json), time.time()),
+        )
+        self._inserts += 1
+        if self._inserts % EVICT_EVERY == 0 or self._inserts == 1:
+            self.evict()
+
+    def evict(self):
+        """Remove os resultados menos usados recentemente além de max_entries"""
+        conn = self._conn()
+        excesso = conn.execute("SELECT COUNT(*) FROM resultados").fetchone()[0] - self.max_entries
+        if excesso > 0:
+            conn.execute(
+                "DELETE FROM resultados WHERE chave IN "
+                "(SELECT chave FROM resultados ORDER BY ultimo_acesso ASC LIMIT ?)",
+                (excesso,),
+            )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM resultados")
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM resultados").fetchone()[0]
+
+
+_cache = None
+_configurado = False
+
+
+def configure(path=None, max_entries=DEFAULT_MAX_ENTRIES):
+    """Liga (path) ou desliga (None) o cache deste processo"""
+    global _cache, _configurado
+    _cache = ResultCache(path, max_entries) if path else None
+    _configurado = True
+    return _cache
+
+
+def get_cache():
+    """Cache configurado (lido das variáveis de ambiente na primeira chamada)"""
+    if not _configurado:
+        configure(
+            os.environ.get('FILAS_CACHE_PATH') or None,
+            int(os.environ.get('FILAS_CACHE_MAX', DEFAULT_MAX_ENTRIES)),
+        )
+    return _cache
+
+
+def cached(modelo, func, *args, **kwargs):
+    """
+    Calcula func(*args, **kwargs) passando pelo cache compartilhado
+
+    Exemplo:
+        >>> result = cached('mm1', calculate_mm1, 3.0, 5.0, n=None, r=None, t=None)
+    """
+    cache = get_cache()
+    if cache is None:
+        return func(*args, **kwargs)
+
+    chave = canonical_key(modelo, args, kwargs)
+    try:
+        resultado = cache.get(chave)
+    except sqlite3.Error:
+        return func(*args, **kwargs)
+    if resultado is not None:
+        return resultado
+
+    resultado = func(*args, **kwargs)
+    try:
+        cache.put(chave, modelo, resultado)
+    except sqlite3.Error:
+        pass
+    return resultado
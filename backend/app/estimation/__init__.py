@@ -0,0 +1,5 @@
+# Módulo para estimação de parâmetros a partir de logs e fluxos de eventos
+from app.estimation.stats import RunningMoments, SlidingMoments, evaluate_model
+from app.estimation.logs import estimate_from_logs, calculate_from_logs, iter_log_chunks
+from app.estimation.streaming import StreamingEstimator
+from app.estimation.trace import LindleyTrace, simulate_trace, simulate_from_logs
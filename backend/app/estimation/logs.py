@@ -0,0 +1,294 @@
+"""
+Estimação de parâmetros (λ, μ, σ²) a partir de logs de eventos
+
+Os logs são lidos por mapeamento de memória (mmap / np.memmap) e processados
+em blocos, então um log com 10^8 eventos não precisa caber na RAM.
+
+Formatos aceitos:
+- CSV / texto: valores separados por vírgula ou espaço, um evento por linha.
+  Uma linha de cabeçalho não numérica é ignorada.
+- .npy: array NumPy 1-D ou 2-D (aberto com mmap_mode='r').
+- Binário cru (.bin, .f64, .dat): float64 little-endian, `num_colunas`
+  valores por evento.
+
+Log de chegadas: uma coluna com o instante de cada chegada (ordem crescente).
+Log de atendimento: uma coluna com a duração de cada atendimento ou duas
+colunas (início, fim), informadas em `colunas_servico`.
+"""
+import mmap
+import os
+import warnings
+
+import numpy as np
+
+from app.estimation.stats import RunningMoments, evaluate_model
+
+# Tamanho de cada bloco lido do arquivo (bytes)
+CHUNK_BYTES = 64 * 1024 * 1024
+
+BINARY_EXTENSIONS = ('.bin', '.f64', '.dat')
+
+
+def _is_numeric_line(line):
+    campos = line.replace(b',', b' ').split()
+    if not campos:
+        return False
+    try:
+        for campo in campos:
+            float(campo)
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_text_block(block, num_colunas):
+    with warnings.catch_warnings():
+        # np.fromstring só avisa (DeprecationWarning) quando encontra texto inválido
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            values = np.fromstring(block.replace(b',', b' '), dtype=np.float64, sep=' ')
+        except (DeprecationWarning, ValueError):
+            raise ValueError("Log malformado: foram encontrados valores não numéricos.")
+
+    if values.size % num_colunas != 0:
+        raise ValueError(f"Log malformado: cada linha deve ter {num_colunas} colunas.")
+    return values.reshape(-1, num_colunas)
+
+
+def _iter_text_chunks(path, chunk_bytes):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = 0
+
+            # Cabeçalho opcional e número de colunas (pela primeira linha de dados)
+            fim_linha = mm.find(b'\n')
+            primeira = mm[:fim_linha if fim_linha != -1 else size]
+            if not _is_numeric_line(primeira):
+                pos = fim_linha + 1 if fim_linha != -1 else size
+                fim_linha = mm.find(b'\n', pos)
+                primeira = mm[pos:fim_linha if fim_linha != -1 else size]
+            num_colunas = len(primeira.replace(b',', b' ').split())
+            if num_colunas == 0:
+                return
+
+            while pos < size:
+                end = min(pos + chunk_bytes, size)
+                if end < size:
+                    # Cortar o bloco sempre no fim de uma linha
+                    nl = mm.rfind(b'\n', pos, end)
+                    if nl == -1:
+                        nl = mm.find(b'\n', end)
+                    end = size if nl == -1 else nl + 1
+                yield _parse_text_block(mm[pos:end], num_colunas)
+                pos = end
+
+
+def _iter_array_chunks(arr, chunk_bytes):
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, 1)
+    linhas_por_bloco = max(1, chunk_bytes // (arr.shape[1] * 8))
+    for inicio in range(0, arr.shape[0], linhas_por_bloco):
+        # Copiar apenas o bloco atual para a memória
+        yield np.array(arr[inicio:inicio + linhas_por_bloco], dtype=np.float64)
+
+
+def iter_log_chunks(path, num_colunas=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Lê um log em blocos, sem carregá-lo inteiro na memória
+
+    Args:
+        path (str): Caminho do arquivo (CSV/texto, .npy ou binário float64)
+        num_colunas (int): Colunas por evento nos arquivos binários crus
+        chunk_bytes (int): Tamanho aproximado de cada bloco em bytes
+
+    Yields:
+        np.ndarray: Bloco 2-D (eventos × colunas) de float64
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == '.npy':
+        yield from _iter_array_chunks(np.load(path, mmap_mode='r'), chunk_bytes)
+    elif ext in BINARY_EXTENSIONS:
+        if os.path.getsize(path) == 0:
+            return
+        arr = np.memmap(path, dtype='<f8', mode='r')
+        if arr.size % num_colunas != 0:
+            raise ValueError(f"Log binário malformado: tamanho não é múltiplo de {num_colunas} colunas.")
+        yield from _iter_array_chunks(arr.reshape(-1, num_colunas), chunk_bytes)
+    else:
+        yield from _iter_text_chunks(path, chunk_bytes)
+
+
+def _select_column(bloco, coluna):
+    if coluna >= bloco.shape[1]:
+        raise ValueError(f"O log possui {bloco.shape[1]} coluna(s); coluna {coluna} não existe.")
+    return bloco[:, coluna]
+
+
+def iter_interarrivals(path, coluna=0, num_colunas=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Tempos entre chegadas de um log de instantes, em blocos
+
+    Yields:
+        np.ndarray: Intervalos de cada bloco (o último instante de um bloco é
+            carregado para o seguinte, então nenhum intervalo se perde)
+    """
+    ultimo = None
+
+    for bloco in iter_log_chunks(path, num_colunas, chunk_bytes):
+        instantes = _select_column(bloco, coluna)
+        if instantes.size == 0:
+            continue
+        # Carregar o último instante do bloco anterior para não perder um intervalo
+        if ultimo is not None:
+            instantes = np.concatenate(([ultimo], instantes))
+        intervalos = np.diff(instantes)
+        if np.any(intervalos < 0):
+            raise ValueError("Log de chegadas fora de ordem: os instantes devem ser crescentes.")
+        ultimo = instantes[-1]
+        yield intervalos
+
+
+def iter_service_times(path, colunas=(0,), num_colunas=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Tempos de atendimento de um log, em blocos
+
+    Args:
+        colunas (tuple): (duração,) ou (início, fim)
+
+    Yields:
+        np.ndarray: Durações de cada bloco
+    """
+    for bloco in iter_log_chunks(path, num_colunas, chunk_bytes):
+        if len(colunas) == 2:
+            duracoes = _select_column(bloco, colunas[1]) - _select_column(bloco, colunas[0])
+        else:
+            duracoes = _select_column(bloco, colunas[0])
+        if np.any(duracoes < 0):
+            raise ValueError("Log de atendimento inválido: durações negativas.")
+        yield duracoes
+
+
+def estimate_arrivals(path, coluna=0, num_colunas=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Estima os momentos dos tempos entre chegadas a partir de um log de instantes
+
+    Returns:
+        RunningMoments: Momentos dos tempos entre chegadas
+    """
+    momentos = RunningMoments()
+    for intervalos in iter_interarrivals(path, coluna, num_colunas, chunk_bytes):
+        momentos.update(intervalos)
+    return momentos
+
+
+def estimate_services(path, colunas=(0,), num_colunas=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Estima os momentos dos tempos de atendimento
+
+    Args:
+        colunas (tuple): (duração,) ou (início, fim)
+
+    Returns:
+        RunningMoments: Momentos dos tempos de atendimento
+    """
+    momentos = RunningMoments()
+    for duracoes in iter_service_times(path, colunas, num_colunas, chunk_bytes):
+        momentos.update(duracoes)
+    return momentos
+
+
+def estimate_from_logs(arrivals_path, services_path=None, coluna_chegada=0,
+                       colunas_servico=(0,), num_colunas=1, chunk_bytes=CHUNK_BYTES):
+    """
+    Estima λ, μ, σ² e os coeficientes de variação a partir de logs
+
+    Args:
+        arrivals_path (str): Log com os instantes de chegada
+        services_path (str, optional): Log com os tempos de atendimento
+        coluna_chegada (int): Coluna com o instante de chegada
+        colunas_servico (tuple): (duração,) ou (início, fim) no log de atendimento
+        num_colunas (int): Colunas por evento nos arquivos binários crus
+        chunk_bytes (int): Tamanho aproximado de cada bloco em bytes
+
+    Returns:
+        dict: Estimativas
+            - lambda: Taxa de chegada (1 / média entre chegadas)
+            - mediaEntreChegadas / varEntreChegadas: Momentos entre chegadas
+            - ca2: Coeficiente de variação² das chegadas
+            - numChegadas: Número de chegadas no log
+            - mu (se houver log de atendimento): Taxa de atendimento
+            - mediaServico / varServico: Momentos do atendimento (σ²)
+            - cs2: Coeficiente de variação² do atendimento
+            - numServicos: Número de atendimentos no log
+
+    Raises:
+        ValueError: Se os logs tiverem poucos eventos ou estiverem malformados
+    """
+    chegadas = estimate_arrivals(arrivals_path, coluna_chegada, num_colunas, chunk_bytes)
+    if chegadas.count < 1 or chegadas.mean <= 0:
+        raise ValueError("O log de chegadas precisa de pelo menos 2 eventos em instantes distintos.")
+
+    result = {
+        'lambda': 1 / chegadas.mean,
+        'mediaEntreChegadas': chegadas.mean,
+        'varEntreChegadas': chegadas.variance,
+        'ca2': chegadas.scv,
+        'numChegadas': chegadas.count + 1,
+    }
+
+    if services_path is not None:
+        servicos = estimate_services(services_path, tuple(colunas_servico), num_colunas, chunk_bytes)
+        if servicos.count < 1 or servicos.mean <= 0:
+            raise ValueError("O log de atendimento precisa de pelo menos 1 atendimento com duração positiva.")
+        result.update({
+            'mu': 1 / servicos.mean,
+            'mediaServico': servicos.mean,
+            'varServico': servicos.variance,
+            'cs2': servicos.scv,
+            'numServicos': servicos.count,
+        })
+
+    return result
+
+
+def calculate_from_logs(modelo, arrivals_path, services_path, coluna_chegada=0,
+                        colunas_servico=(0,), num_colunas=1, chunk_bytes=CHUNK_BYTES, **params):
+    """
+    Estima os parâmetros a partir dos logs e calcula o modelo escolhido
+
+    As opções de leitura (coluna_chegada, colunas_servico, num_colunas e
+    chunk_bytes) são as de estimate_from_logs; os demais parâmetros vão para
+    o modelo.
+
+    Exemplo:
+        >>> calculate_from_logs('mms', 'chegadas.csv', 'atendimentos.csv', colunas_servico=(0, 1), s=3)
+    """
+    estimativa = estimate_from_logs(arrivals_path, services_path, coluna_chegada,
+                                    colunas_servico, num_colunas, chunk_bytes)
+    return evaluate_model(modelo, estimativa, **params)
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from app.models.results import para_json
+
+    parser = argparse.ArgumentParser(description="Estima λ, μ e σ² a partir de logs de eventos.")
+    parser.add_argument('chegadas', help="Log com os instantes de chegada")
+    parser.add_argument('atendimentos', nargs='?', help="Log com os tempos de atendimento")
+    parser.add_argument('--modelo', help="Modelo a calcular com a estimativa (mm1, mms, mm1k, mmsk, mg1, gg1, ggs)")
+    parser.add_argument('--s', type=int, help="Número de servidores")
+    parser.add_argument('--K', type=int, help="Capacidade do sistema")
+    args = parser.parse_args()
+
+    estimativa = estimate_from_logs(args.chegadas, args.atendimentos)
+    saida = {'estimativa': estimativa}
+    if args.modelo:
+        params = {k: v for k, v in (('s', args.s), ('K', args.K)) if v is not None}
+        saida['resultado'] = evaluate_model(args.modelo, estimativa, **params)
+    print(json.dumps(saida, indent=2, ensure_ascii=False, default=para_json))
@@ -0,0 +1,182 @@
+"""
+Registro dos fluxos de estimação online (e das sessões what-if) usados pelas rotas
+
+Em desenvolvimento (um único processo) os estimadores ficam em memória. No
+servidor de produção há vários workers, e requisições seguidas do mesmo fluxo
+caem em workers diferentes: o estado de cada StreamingEstimator é então
+guardado em um banco SQLite compartilhado, e cada requisição o carrega,
+atualiza e grava dentro de uma única transação (BEGIN IMMEDIATE), que também
+serializa as atualizações concorrentes do mesmo fluxo.
+
+Os fluxos mais antigos (pelo último acesso) são descartados ao passar de
+`max_streams`.
+
+As sessões incrementais de what-if (app/models/incremental.py) usam o mesmo
+mecanismo, em outra tabela do mesmo banco (get_session_registry).
+
+Configuração (variável de ambiente):
+- FILAS_STREAMS_PATH: arquivo do banco (vazio/ausente = registro em memória)
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+MAX_STREAMS = 64
+MAX_SESSIONS = 256
+
+
+class StreamNotFound(KeyError):
+    """Fluxo inexistente (ou já descartado)"""
+
+
+class MemoryStreamRegistry:
+    """Fluxos guardados em memória (apenas para um único processo)"""
+
+    def __init__(self, max_streams=MAX_STREAMS):
+        self.max_streams = max_streams
+        self._streams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, estimador):
+        """Registra um estimador e devolve o id do fluxo"""
+        stream_id = uuid.uuid4().hex
+        with self._lock:
+            self._streams[stream_id] = (estimador, threading.Lock())
+            while len(self._streams) > self.max_streams:
+                self._streams.popitem(last=False)
+        return stream_id
+
+    def update(self, stream_id, func):
+        """
+        Aplica func(estimador) com o fluxo travado e devolve o seu resultado
+
+        Raises:
+            StreamNotFound: Se o fluxo não existir
+        """
+        with self._lock:
+            if stream_id not in self._streams:
+                raise StreamNotFound(stream_id)
+            estimador, lock = self._streams[stream_id]
+            self._streams.move_to_end(stream_id)
+        with lock:
+            return func(estimador)
+
+
+class SQLiteStreamRegistry:
+    """
+    Fluxos guardados em SQLite, compartilhados entre os workers
+
+    Args:
+        path (str): Caminho do arquivo do banco
+        max_streams (int): Número máximo de fluxos guardados
+        tabela (str): Tabela do banco ('fluxos' ou 'sessoes')
+    """
+
+    def __init__(self, path, max_streams=MAX_STREAMS, tabela='fluxos'):
+        self.path = path
+        self.max_streams = max_streams
+        self.tabela = tabela
+        self._local = threading.local()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.tabela} (
+                    id TEXT PRIMARY KEY,
+                    estado BLOB NOT NULL,
+                    ultimo_acesso REAL NOT NULL
+                )
+            """)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _conn(self):
+        # Uma conexão por thread e por processo (conexões não sobrevivem ao fork)
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn
+
+    def create(self, estimador):
+        """Registra um estimador e devolve o id do fluxo"""
+        stream_id = uuid.uuid4().hex
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(f"INSERT INTO {self.tabela} (id, estado, ultimo_acesso) VALUES (?, ?, ?)",
+                         (stream_id, pickle.dumps(estimador), time.time()))
+            conn.execute(
+                f"DELETE FROM {self.tabela} WHERE id IN (SELECT id FROM {self.tabela} ORDER BY ultimo_acesso DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_streams,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return stream_id
+
+    def update(self, stream_id, func):
+        """
+        Carrega o estimador, aplica func(estimador), grava o novo estado e
+        devolve o resultado de func, tudo na mesma transação
+
+        Raises:
+            StreamNotFound: Se o fluxo não existir
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            linha = conn.execute(f"SELECT estado FROM {self.tabela} WHERE id = ?", (stream_id,)).fetchone()
+            if linha is None:
+                raise StreamNotFound(stream_id)
+            estimador = pickle.loads(linha[0])
+            resultado = func(estimador)
+            conn.execute(f"UPDATE {self.tabela} SET estado = ?, ultimo_acesso = ? WHERE id = ?",
+                         (pickle.dumps(estimador), time.time(), stream_id))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return resultado
+
+
+_registry = None
+_sessions = None
+
+
+def configure(path=None, max_streams=MAX_STREAMS, max_sessions=MAX_SESSIONS):
+    """Usa um banco SQLite compartilhado (path) ou a memória do processo (None)"""
+    global _registry, _sessions
+    if path:
+        _registry = SQLiteStreamRegistry(path, max_streams)
+        _sessions = SQLiteStreamRegistry(path, max_sessions, tabela='sessoes')
+    else:
+        _registry = MemoryStreamRegistry(max_streams)
+        _sessions = MemoryStreamRegistry(max_sessions)
+    return _registry
+
+
+def get_registry():
+    """Registro configurado (lido da variável de ambiente na primeira chamada)"""
+    if _registry is None:
+        configure(os.environ.get('FILAS_STREAMS_PATH') or None)
+    return _registry
+
+
+def get_session_registry():
+    """Registro das sessões what-if (mesmo banco dos fluxos, tabela 'sessoes')"""
+    if _sessions is None:
+        configure(os.environ.get('FILAS_STREAMS_PATH') or None)
+    return _sessions
@@ -0,0 +1,170 @@
+"""
+Estatísticas incrementais usadas na estimação de parâmetros
+
+Os momentos são acumulados em uma única passada, bloco a bloco, usando a
+fórmula de combinação de Chan et al. (generalização do algoritmo de Welford).
+Assim a memória usada não depende do tamanho do log.
+"""
+import math
+
+import numpy as np
+
+from app.models.mm1 import calculate_mm1
+from app.models.mms import calculate_mms
+from app.models.mm1k import calculate_mm1k
+from app.models.mmsk import calculate_mmsk
+from app.models.mg1 import calculate_mg1
+from app.models.ggs import calculate_gg1, calculate_ggs
+
+
+class RunningMoments:
+    """
+    Média e variância acumuladas de uma sequência de valores
+
+    Atributos:
+        count (int): Quantidade de valores observados
+        mean (float): Média dos valores
+        m2 (float): Soma dos quadrados dos desvios em relação à média
+    """
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        """Incorpora um bloco (array NumPy) de valores de uma só vez"""
+        values = np.asarray(values, dtype=np.float64)
+        n_b = values.size
+        if n_b == 0:
+            return
+        mean_b = float(values.mean())
+        m2_b = float(np.square(values - mean_b).sum())
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        # Combinação de Chan: (n_a, mean_a, m2_a) + (n_b, mean_b, m2_b)
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * n_a * n_b / n
+        self.count = n
+
+    @property
+    def variance(self):
+        """Variância amostral (divisor n - 1)"""
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def scv(self):
+        """Coeficiente de variação ao quadrado (variância / média²)"""
+        if self.mean == 0:
+            return math.nan
+        return self.variance / (self.mean ** 2)
+
+
+class SlidingMoments:
+    """
+    Média e variância dos últimos `janela` valores (algoritmo de Welford)
+
+    Cada novo valor entra na média e o mais antigo sai dela, então cada
+    atualização custa O(1) e a memória é fixa (apenas o buffer da janela),
+    por mais longo que seja o fluxo. A soma dos desvios é recalculada a cada
+    volta completa do buffer para limitar o acúmulo de erro de arredondamento.
+    """
+
+    __slots__ = ('buffer', 'count', 'mean', 'm2', '_index', '_pushes')
+
+    def __init__(self, janela):
+        if janela < 2:
+            raise ValueError("A janela deve ter pelo menos 2 valores.")
+        self.buffer = np.empty(int(janela), dtype=np.float64)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._index = 0
+        self._pushes = 0
+
+    def push(self, x):
+        """Inclui um valor, descartando o mais antigo se a janela estiver cheia"""
+        x = float(x)
+        janela = self.buffer.size
+
+        if self.count == janela:
+            # Remover o valor mais antigo (Welford inverso)
+            y = self.buffer[self._index]
+            mean_sem_y = self.mean + (self.mean - y) / (self.count - 1)
+            self.m2 -= (y - self.mean) * (y - mean_sem_y)
+            self.mean = mean_sem_y
+            self.count -= 1
+
+        self.buffer[self._index] = x
+        self._index = (self._index + 1) % janela
+
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+        self._pushes += 1
+        if self._pushes % janela == 0:
+            self.mean = float(self.buffer.mean())
+            self.m2 = float(np.square(self.buffer - self.mean).sum())
+
+    @property
+    def variance(self):
+        """Variância amostral da janela (divisor n - 1)"""
+        if self.count < 2:
+            return 0.0
+        return max(self.m2, 0.0) / (self.count - 1)
+
+    @property
+    def scv(self):
+        """Coeficiente de variação ao quadrado (variância / média²)"""
+        if self.mean == 0:
+            return math.nan
+        return self.variance / (self.mean ** 2)
+
+
+# Modelos que podem ser alimentados diretamente por uma estimativa.
+# Cada entrada recebe a estimativa e os parâmetros estruturais (s, K, n, ...).
+MODEL_EVALUATORS = {
+    'mm1': lambda e, p: calculate_mm1(e['lambda'], e['mu'], **p),
+    'mms': lambda e, p: calculate_mms(e['lambda'], e['mu'], **p),
+    'mm1k': lambda e, p: calculate_mm1k(e['lambda'], e['mu'], **p),
+    'mmsk': lambda e, p: calculate_mmsk(e['lambda'], e['mu'], **p),
+    'mg1': lambda e, p: calculate_mg1(e['lambda'], e['mu'], e['varServico'], **p),
+    'gg1': lambda e, p: calculate_gg1(e['lambda'], e['mu'], e['ca2'], e['cs2'], **p),
+    'ggs': lambda e, p: calculate_ggs(e['lambda'], e['mu'], ca2=e['ca2'], cs2=e['cs2'], **p),
+}
+
+
+def evaluate_model(modelo, estimativa, **params):
+    """
+    Calcula um modelo de fila a partir de uma estimativa de parâmetros
+
+    Args:
+        modelo (str): Nome do modelo ('mm1', 'mms', 'mm1k', 'mmsk', 'mg1', 'gg1', 'ggs')
+        estimativa (dict): Resultado de estimate_from_logs (precisa de
+            'lambda', 'mu' e, para o M/G/1, 'varServico'; para o G/G/1 e o
+            G/G/s, 'ca2' e 'cs2')
+        **params: Parâmetros estruturais do modelo (ex.: s=3, K=10, n=2)
+
+    Returns:
+        Resultado: Métricas calculadas pelo modelo (acesso como dict, ver
+            app/models/results.py)
+
+    Raises:
+        ValueError: Se o modelo não for suportado ou faltarem estimativas
+    """
+    if modelo not in MODEL_EVALUATORS:
+        suportados = ', '.join(sorted(MODEL_EVALUATORS))
+        raise ValueError(f"Modelo '{modelo}' não suportado. Use um de: {suportados}.")
+
+    if 'mu' not in estimativa:
+        raise ValueError("A estimativa não contém μ: informe também o log de atendimento.")
+
+    return MODEL_EVALUATORS[modelo](estimativa, params)
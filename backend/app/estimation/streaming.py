@@ -0,0 +1,178 @@
+"""
+Estimação contínua (online) de parâmetros a partir de um fluxo de eventos
+
+Os eventos chegam um a um (gerador ou endpoint local) e alimentam janelas
+deslizantes de média/variância. A cada `cadencia` eventos a estimativa é
+comparada com a última usada no modelo; o modelo `calculate_*` só é
+recalculado quando λ, μ ou σ² (e, no G/G/1 e G/G/s, ca2) mudaram mais do
+que `tolerancia` (variação relativa). A memória usada é constante, por mais longo que seja o fluxo.
+
+Formato dos eventos (dict ou tupla):
+- {'tipo': 'chegada', 't': instante}                     ou ('chegada', t)
+- {'tipo': 'conclusao', 't': instante, 'duracao': d}     ou ('conclusao', t, d)
+"""
+from app.estimation.stats import SlidingMoments, evaluate_model, MODEL_EVALUATORS
+
+# Modelos que usam a variabilidade das chegadas (ca2), além de λ, μ e σ²
+MODELOS_CA2 = ('gg1', 'ggs')
+
+
+def _numero(valor, campo):
+    # Converte um campo numérico do evento, com erro de validação claro
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        raise ValueError(f"O campo '{campo}' do evento deve ser numérico (recebido: {valor!r}).") from None
+
+
+def _parse_event(evento):
+    if isinstance(evento, dict):
+        tipo, t, duracao = evento.get('tipo'), evento.get('t'), evento.get('duracao')
+    elif isinstance(evento, (list, tuple)) and 2 <= len(evento) <= 3:
+        tipo, t, duracao = (*evento, None)[:3]
+    else:
+        raise ValueError(f"Evento malformado: {evento!r} (use um dict ou uma tupla (tipo, t[, duracao])).")
+
+    if tipo == 'chegada':
+        return tipo, _numero(t, 't'), None
+    if tipo == 'conclusao':
+        if duracao is None:
+            raise ValueError("Eventos de conclusão precisam de uma duração não-negativa.")
+        return tipo, _numero(t, 't'), _numero(duracao, 'duracao')
+    raise ValueError(f"Tipo de evento desconhecido: '{tipo}' (use 'chegada' ou 'conclusao').")
+
+
+def _relative_change(novo, antigo):
+    if antigo == 0:
+        return float('inf') if novo != 0 else 0.0
+    return abs(novo - antigo) / abs(antigo)
+
+
+class StreamingEstimator:
+    """
+    Estimador online de λ, μ e σ² com reavaliação periódica do modelo
+
+    Args:
+        modelo (str): Modelo a recalcular ('mm1', 'mms', 'mm1k', 'mmsk', 'mg1')
+        janela (int): Quantidade de intervalos/atendimentos na janela deslizante
+        cadencia (int): Verificar a estimativa a cada `cadencia` eventos
+        tolerancia (float): Variação relativa mínima para recalcular o modelo
+        on_update (callable, optional): Chamado com cada nova publicação
+        **params: Parâmetros estruturais do modelo (ex.: s=3, K=10)
+    """
+
+    def __init__(self, modelo, janela=1000, cadencia=100, tolerancia=0.01, on_update=None, **params):
+        if modelo not in MODEL_EVALUATORS:
+            suportados = ', '.join(sorted(MODEL_EVALUATORS))
+            raise ValueError(f"Modelo '{modelo}' não suportado. Use um de: {suportados}.")
+        if cadencia < 1:
+            raise ValueError("A cadência deve ser de pelo menos 1 evento.")
+        if tolerancia < 0:
+            raise ValueError("A tolerância deve ser não-negativa.")
+
+        self.modelo = modelo
+        self.params = params
+        self.cadencia = int(cadencia)
+        self.tolerancia = tolerancia
+        self.on_update = on_update
+
+        self.chegadas = SlidingMoments(janela)
+        self.servicos = SlidingMoments(janela)
+        self.num_eventos = 0
+        self.num_avaliacoes = 0
+        self.ultimo = None
+
+        self._ultima_chegada = None
+        self._estimativa_avaliada = None
+
+    @property
+    def estimate(self):
+        """Estimativa atual da janela (None enquanto não houver dados suficientes)"""
+        if self.chegadas.count < 1 or self.chegadas.mean <= 0:
+            return None
+        est = {
+            'lambda': 1 / self.chegadas.mean,
+            'mediaEntreChegadas': self.chegadas.mean,
+            'varEntreChegadas': self.chegadas.variance,
+            'ca2': self.chegadas.scv,
+        }
+        if self.servicos.count >= 1 and self.servicos.mean > 0:
+            est.update({
+                'mu': 1 / self.servicos.mean,
+                'mediaServico': self.servicos.mean,
+                'varServico': self.servicos.variance,
+                'cs2': self.servicos.scv,
+            })
+        return est
+
+    def _moved(self, est):
+        anterior = self._estimativa_avaliada
+        if anterior is None:
+            return True
+        chaves = ('lambda', 'mu', 'varServico') + (('ca2',) if self.modelo in MODELOS_CA2 else ())
+        return any(
+            _relative_change(est[chave], anterior[chave]) > self.tolerancia
+            for chave in chaves
+        )
+
+    def _evaluate(self):
+        est = self.estimate
+        if est is None or 'mu' not in est or not self._moved(est):
+            return None
+
+        try:
+            resultado = evaluate_model(self.modelo, est, **self.params)
+        except ValueError as e:
+            # Ex.: janela atual indica sistema instável
+            resultado = {'error': str(e)}
+
+        self._estimativa_avaliada = est
+        self.num_avaliacoes += 1
+        self.ultimo = {
+            'modelo': self.modelo,
+            'eventos': self.num_eventos,
+            'estimativa': est,
+            'resultado': resultado,
+        }
+        if self.on_update is not None:
+            self.on_update(self.ultimo)
+        return self.ultimo
+
+    def push(self, evento):
+        """
+        Processa um evento
+
+        Returns:
+            dict | None: Nova publicação, se o modelo foi recalculado
+        """
+        tipo, t, duracao = _parse_event(evento)
+
+        if tipo == 'chegada':
+            if self._ultima_chegada is not None:
+                if t < self._ultima_chegada:
+                    raise ValueError("Evento de chegada fora de ordem: os instantes devem ser crescentes.")
+                self.chegadas.push(t - self._ultima_chegada)
+            self._ultima_chegada = t
+        else:
+            if duracao < 0:
+                raise ValueError("Eventos de conclusão precisam de uma duração não-negativa.")
+            self.servicos.push(duracao)
+
+        self.num_eventos += 1
+        if self.num_eventos % self.cadencia == 0:
+            return self._evaluate()
+        return None
+
+    def consume(self, eventos):
+        """
+        Consome um gerador/iterável de eventos, produzindo cada nova publicação
+
+        Exemplo:
+            >>> est = StreamingEstimator('mms', s=3, cadencia=500)
+            >>> for publicacao in est.consume(fonte_de_eventos()):
+            ...     print(publicacao['resultado']['Wq'])
+        """
+        for evento in eventos:
+            publicacao = self.push(evento)
+            if publicacao is not None:
+                yield publicacao
@@ -0,0 +1,235 @@
+"""
+G/G/1 dirigido por traços: espera de cada cliente pela recursão de Lindley
+
+Em vez de supor uma distribuição, os tempos entre chegadas e de atendimento
+reais (arrays ou logs) são reproduzidos em um servidor FIFO:
+    Wq(k) = max(0, Wq(k-1) + S(k-1) - A(k))
+A recursão é resolvida sem laço em Python: com X(k) = S(k-1) - A(k) e a soma
+acumulada P(k) = X(1) + ... + X(k),
+    Wq(k) = P(k) - min(-Wq(0), P(1), ..., P(k)),
+ou seja, uma soma acumulada e um mínimo acumulado (np.cumsum e
+np.minimum.accumulate). O traço é processado em blocos de `chunk_clientes`
+clientes; a espera e o atendimento do último cliente de um bloco são
+carregados para o seguinte, e a soma acumulada recomeça a cada bloco (o
+erro de arredondamento não cresce com o tamanho do traço).
+
+Os percentis vêm de histogramas logarítmicos com erro relativo de até
+RESOLUCAO/2; esperas nulas são contadas à parte (exatas). A memória usada
+não depende do número de clientes.
+"""
+from itertools import chain
+
+import numpy as np
+
+from app.estimation.logs import CHUNK_BYTES, iter_interarrivals, iter_service_times
+
+# Clientes por bloco
+CHUNK_CLIENTES = 1 << 20
+
+PERCENTIS_PADRAO = (50, 90, 95, 99)
+
+# Largura relativa das classes dos histogramas de percentis
+RESOLUCAO = 1e-3
+
+# Faixa dos histogramas, em décadas acima e abaixo do atendimento médio do 1º bloco
+DECADAS = 9
+
+
+class LindleyTrace:
+    """
+    Recursão de Lindley acumulada bloco a bloco
+
+    Atributos:
+        clientes (int): Clientes processados
+    """
+
+    def __init__(self):
+        self.clientes = 0
+        self._espera = None
+        self._servico = None
+        self._soma_chegadas = 0.0
+        self._soma_servicos = 0.0
+        self._soma_esperas = 0.0
+        self._esperas_nulas = 0
+        self._log_min = None
+        self._hist_wq = None
+        self._hist_w = None
+
+    def _classes(self, valores):
+        # Índice da classe logarítmica de cada valor positivo
+        idx = np.floor((np.log(valores) - self._log_min) / np.log1p(RESOLUCAO))
+        return np.clip(idx, 0, self._hist_wq.size - 1).astype(np.intp)
+
+    def update(self, entre_chegadas, servicos):
+        """
+        Processa o próximo bloco de clientes
+
+        Args:
+            entre_chegadas (array_like): Tempo desde a chegada anterior (o do
+                primeiro cliente do traço é ignorado)
+            servicos (array_like): Tempo de atendimento de cada cliente
+
+        Returns:
+            np.ndarray: Espera na fila de cada cliente do bloco
+        """
+        A = np.asarray(entre_chegadas, dtype=np.float64)
+        S = np.asarray(servicos, dtype=np.float64)
+        if A.shape != S.shape or A.ndim != 1:
+            raise ValueError("Os traços de chegada e de atendimento devem ter o mesmo número de clientes.")
+        if A.size == 0:
+            return A
+        if not (np.all(A >= 0) and np.all(S >= 0) and np.all(np.isfinite(A)) and np.all(np.isfinite(S))):
+            raise ValueError("Os tempos entre chegadas e de atendimento devem ser finitos e não-negativos.")
+
+        incremento = np.empty(A.size)
+        incremento[1:] = S[:-1] - A[1:]
+        if self._espera is None:
+            # Primeiro cliente encontra o sistema vazio
+            incremento[0] = 0.0
+            espera_inicial = 0.0
+            self._soma_chegadas += float(A[1:].sum())
+            self._log_min = np.log(max(float(S.mean()), np.finfo(np.float64).tiny)) - DECADAS * np.log(10)
+            classes = int(np.ceil(2 * DECADAS * np.log(10) / np.log1p(RESOLUCAO))) + 1
+            self._hist_wq = np.zeros(classes, dtype=np.int64)
+            self._hist_w = np.zeros(classes, dtype=np.int64)
+        else:
+            incremento[0] = self._servico - A[0]
+            espera_inicial = self._espera
+            self._soma_chegadas += float(A.sum())
+
+        P = np.cumsum(incremento)
+        esperas = P - np.minimum.accumulate(np.minimum(P, -espera_inicial))
+
+        self.clientes += A.size
+        self._soma_servicos += float(S.sum())
+        self._soma_esperas += float(esperas.sum())
+        positivas = esperas[esperas > 0]
+        self._esperas_nulas += A.size - positivas.size
+        self._hist_wq += np.bincount(self._classes(positivas), minlength=self._hist_wq.size)
+        sistema = esperas + S
+        self._hist_w += np.bincount(self._classes(sistema[sistema > 0]), minlength=self._hist_w.size)
+
+        self._espera = float(esperas[-1])
+        self._servico = float(S[-1])
+        return esperas
+
+    def _percentil(self, hist, nulos, p):
+        # Menor valor com pelo menos p% dos clientes até ele (centro geométrico da classe)
+        posicao = max(1, int(np.ceil(p / 100 * self.clientes)))
+        if posicao <= nulos:
+            return 0.0
+        classe = int(np.searchsorted(np.cumsum(hist), posicao - nulos))
+        return float(np.exp(self._log_min + (classe + 0.5) * np.log1p(RESOLUCAO)))
+
+    def result(self, percentis=PERCENTIS_PADRAO) -> dict:
+        """
+        Métricas do traço processado até aqui
+
+        Returns:
+            dict: As chaves de calculate_mg1 (rho, P0, Lq, Wq, L, W, com
+                Lq = λ×Wq e L = λ×W) e clientes, lambda, mu, PWqIgualZero,
+                percentisWq e percentisW ({p: valor})
+        """
+        if self.clientes < 2 or self._soma_chegadas <= 0 or self._soma_servicos <= 0:
+            raise ValueError("O traço precisa de pelo menos 2 clientes, com chegadas e atendimentos não nulos.")
+        percentis = [float(p) for p in percentis]
+        if not all(0 <= p <= 100 for p in percentis):
+            raise ValueError("Os percentis devem estar entre 0 e 100.")
+        percentis = [int(p) if p.is_integer() else p for p in percentis]
+
+        lambda_ = (self.clientes - 1) / self._soma_chegadas
+        mu = self.clientes / self._soma_servicos
+        Wq = self._soma_esperas / self.clientes
+        W = Wq + 1 / mu
+        # Fração do tempo com o servidor livre, da 1ª chegada à última saída
+        horizonte = self._soma_chegadas + self._espera + self._servico
+        return {
+            'rho': lambda_ / mu,
+            'P0': max(0.0, 1 - self._soma_servicos / horizonte),
+            'Lq': lambda_ * Wq,
+            'Wq': Wq,
+            'L': lambda_ * W,
+            'W': W,
+            'clientes': self.clientes,
+            'lambda': lambda_,
+            'mu': mu,
+            'PWqIgualZero': self._esperas_nulas / self.clientes,
+            'percentisWq': {str(p): self._percentil(self._hist_wq, self._esperas_nulas, p) for p in percentis},
+            'percentisW': {str(p): self._percentil(self._hist_w, 0, p) for p in percentis},
+        }
+
+
+def simulate_trace(entre_chegadas, servicos, percentis=PERCENTIS_PADRAO, chunk_clientes=CHUNK_CLIENTES) -> dict:
+    """
+    Reproduz um traço (arrays, inclusive np.memmap) em um G/G/1
+
+    Args:
+        entre_chegadas (array_like): Tempo desde a chegada anterior
+        servicos (array_like): Tempo de atendimento de cada cliente
+        percentis (list): Percentis de Wq e W (0 a 100)
+        chunk_clientes (int): Clientes por bloco
+
+    Returns:
+        dict: Ver LindleyTrace.result
+
+    Exemplo:
+        >>> rng = np.random.default_rng(1)
+        >>> simulate_trace(rng.exponential(1 / 4, 10**6), rng.exponential(1 / 5, 10**6))['Wq']  # ≈ 0.8
+    """
+    if len(entre_chegadas) != len(servicos):
+        raise ValueError("Os traços de chegada e de atendimento devem ter o mesmo número de clientes.")
+    traco = LindleyTrace()
+    for inicio in range(0, len(servicos), int(chunk_clientes)):
+        fim = inicio + int(chunk_clientes)
+        traco.update(entre_chegadas[inicio:fim], servicos[inicio:fim])
+    return traco.result(percentis)
+
+
+def simulate_from_logs(arrivals_path, services_path, coluna_chegada=0, colunas_servico=(0,),
+                       num_colunas=1, chunk_bytes=CHUNK_BYTES, percentis=PERCENTIS_PADRAO) -> dict:
+    """
+    Reproduz os logs de chegada e de atendimento em um G/G/1
+
+    O i-ésimo atendimento do log é o do i-ésimo cliente a chegar. Os dois
+    logs são lidos em blocos (ver iter_log_chunks) e alinhados cliente a
+    cliente.
+
+    Returns:
+        dict: Ver LindleyTrace.result
+
+    Raises:
+        ValueError: Se os logs tiverem números de clientes diferentes
+    """
+    # O primeiro cliente não tem intervalo de chegada: prefixar com 0
+    chegadas = iter_interarrivals(arrivals_path, coluna_chegada, num_colunas, chunk_bytes)
+    chegadas = chain([np.zeros(1)], chegadas)
+    servicos = iter_service_times(services_path, tuple(colunas_servico), num_colunas, chunk_bytes)
+
+    traco = LindleyTrace()
+    for A, S in _alinhar(chegadas, servicos):
+        traco.update(A, S)
+    return traco.result(percentis)
+
+
+def _alinhar(blocos_a, blocos_b):
+    # Pares de blocos de mesmo tamanho a partir de dois fluxos com cortes diferentes
+    resto_a, resto_b = np.empty(0), np.empty(0)
+    fim_a = fim_b = False
+    while True:
+        while resto_a.size == 0 and not fim_a:
+            try:
+                resto_a = np.concatenate((resto_a, next(blocos_a)))
+            except StopIteration:
+                fim_a = True
+        while resto_b.size == 0 and not fim_b:
+            try:
+                resto_b = np.concatenate((resto_b, next(blocos_b)))
+            except StopIteration:
+                fim_b = True
+        n = min(resto_a.size, resto_b.size)
+        if n == 0:
+            if resto_a.size or resto_b.size:
+                raise ValueError("Os logs de chegada e de atendimento devem ter o mesmo número de clientes.")
+            return
+        yield resto_a[:n], resto_b[:n]
+        resto_a, resto_b = resto_a[n:], resto_b[n:]
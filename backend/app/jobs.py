@@ -0,0 +1,348 @@
+"""
+Fila local de tarefas em segundo plano para os cálculos longos
+
+Alguns cálculos (ex.: o dimensionamento de uma semana inteira, Monte Carlo
+com milhões de sorteios, grades enormes) demoram mais que o timeout de uma
+requisição HTTP. Pelas rotas /api/jobs (app/routes/job_routes.py) eles são
+enviados como tarefas: a requisição volta na hora com o id, e o cliente
+consulta o andamento e busca o resultado depois.
+
+- Execução: um pool limitado de threads por processo, que consome os
+  mesmos geradores das rotas /stream (iter_staffing, iter_uncertainty,
+  iter_grid). Entre um evento e outro a thread grava o progresso e verifica
+  se a tarefa foi cancelada. Se as threads e a fila de espera estiverem
+  ocupadas, o envio é recusado na hora (Ocupado → 503).
+- Persistência: estado, progresso e resultado ficam em SQLite, então
+  qualquer worker responde às consultas e os resultados sobrevivem a
+  reinícios. Tarefas de um processo que morreu (ex.: worker reciclado) são
+  marcadas como falhas na próxima consulta; não há retomada.
+- Deduplicação: envios idênticos (tipo, parâmetros normalizados e versão dos
+  modelos) recebem a tarefa já existente, pendente ou concluída. Tarefas
+  com falha ou canceladas são recalculadas.
+- Cancelamento: no processo que executa a tarefa, imediato (prazo cancelado,
+  ver app/models/prazo.py); a partir de outro worker, no próximo evento.
+- Ficam guardadas no máximo `max_jobs` tarefas terminadas (as mais antigas
+  são descartadas).
+
+Tudo roda em uma única máquina, sem broker externo. Cada worker do servidor
+de produção tem seu próprio pool: no total são workers × threads tarefas
+simultâneas.
+
+Configuração (variáveis de ambiente):
+- FILAS_JOBS_PATH: arquivo do banco (padrão instance/jobs.sqlite3)
+- FILAS_JOBS_THREADS: threads do pool por processo (padrão 2)
+- FILAS_JOBS_FILA: tarefas à espera de uma thread, por processo (padrão 32)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.admission import Ocupado
+from app.cache import MODELS_VERSION
+from app.models.prazo import Prazo, PrazoExcedido, com_prazo
+from app.models.results import para_json
+
+DEFAULT_PATH = 'instance/jobs.sqlite3'
+DEFAULT_THREADS = 2
+DEFAULT_FILA = 32
+MAX_JOBS = 1000
+
+# Estados de uma tarefa
+NA_FILA = 'na_fila'
+EXECUTANDO = 'executando'
+CONCLUIDO = 'concluido'
+FALHOU = 'falhou'
+CANCELADO = 'cancelado'
+
+PENDENTES = (NA_FILA, EXECUTANDO)
+TERMINADOS = (CONCLUIDO, FALHOU, CANCELADO)
+
+
+class JobNotFound(KeyError):
+    """Tarefa inexistente (ou já descartada)"""
+
+
+def job_key(tipo, parametros):
+    """Chave de deduplicação: tipo, versão dos modelos e parâmetros normalizados"""
+    texto = json.dumps([tipo, MODELS_VERSION, parametros], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()
+
+
+def _processo_vivo(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobQueue:
+    """
+    Tarefas em segundo plano com estado em SQLite
+
+    Args:
+        path (str): Caminho do arquivo do banco
+        threads (int): Threads do pool deste processo
+        fila (int): Tarefas à espera de uma thread
+        max_jobs (int): Número máximo de tarefas terminadas guardadas
+    """
+
+    def __init__(self, path=DEFAULT_PATH, threads=DEFAULT_THREADS, fila=DEFAULT_FILA, max_jobs=MAX_JOBS):
+        self.path = path
+        self.threads = int(threads)
+        self.fila = int(fila)
+        self.max_jobs = int(max_jobs)
+        self._local = threading.local()
+        self._vagas = threading.BoundedSemaphore(self.threads + self.fila)
+        self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='tarefa')
+        self._prazos = {}
+        self._pid = os.getpid()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS tarefas (
+                    id TEXT PRIMARY KEY,
+                    chave TEXT NOT NULL,
+                    tipo TEXT NOT NULL,
+                    parametros TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    cancelar INTEGER NOT NULL DEFAULT 0,
+                    progresso TEXT,
+                    resultado TEXT,
+                    erro TEXT,
+                    criado REAL NOT NULL,
+                    iniciado REAL,
+                    terminado REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tarefas_chave ON tarefas (chave)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_tarefas_terminado ON tarefas (terminado)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        # Uma conexão por thread e por processo (conexões não sobrevivem ao fork)
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn
+
+    def _linha(self, conn, job_id):
+        conn.row_factory = sqlite3.Row
+        try:
+            linha = conn.execute("SELECT * FROM tarefas WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.row_factory = None
+        if linha is None:
+            raise JobNotFound(job_id)
+        if linha['status'] in PENDENTES and linha['pid'] != os.getpid() and not _processo_vivo(linha['pid']):
+            # O processo que executava a tarefa morreu
+            conn.execute(
+                "UPDATE tarefas SET status = ?, erro = ?, terminado = ? WHERE id = ? AND status IN (?, ?)",
+                (FALHOU, 'Processo encerrado antes de concluir a tarefa', time.time(), job_id, *PENDENTES),
+            )
+            return self._linha(conn, job_id)
+        return linha
+
+    @staticmethod
+    def _resumo(linha):
+        return {
+            'id': linha['id'],
+            'tipo': linha['tipo'],
+            'status': linha['status'],
+            'progresso': json.loads(linha['progresso']) if linha['progresso'] else None,
+            'error': linha['erro'],
+            'criado': linha['criado'],
+            'iniciado': linha['iniciado'],
+            'terminado': linha['terminado'],
+        }
+
+    def submit(self, tipo, parametros, eventos):
+        """
+        Enfileira uma tarefa (ou devolve a idêntica já existente)
+
+        Args:
+            tipo (str): Tipo da tarefa (ex.: 'staffing')
+            parametros (dict): Parâmetros normalizados (JSON), para a deduplicação
+            eventos (generator): Gerador de eventos (nome, dados) já validado
+                (primeiro evento consumido); 'progresso' vira o progresso da
+                tarefa e 'resultado', o resultado
+
+        Returns:
+            dict: Resumo da tarefa, com 'duplicado'
+
+        Raises:
+            Ocupado: Se o pool e a fila de espera estiverem cheios
+        """
+        chave = job_key(tipo, parametros)
+        job_id = uuid.uuid4().hex
+        conn = self._conn()
+        # A transação serializa envios idênticos vindos de workers diferentes
+        reservada = False
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for linha in conn.execute("SELECT id FROM tarefas WHERE chave = ? AND status NOT IN (?, ?) "
+                                      "ORDER BY criado DESC", (chave, FALHOU, CANCELADO)).fetchall():
+                existente = self._linha(conn, linha[0])
+                if existente['status'] not in (FALHOU, CANCELADO):
+                    conn.execute("COMMIT")
+                    eventos.close()
+                    return {**self._resumo(existente), 'duplicado': True}
+
+            if not self._vagas.acquire(blocking=False):
+                raise Ocupado("Fila de tarefas cheia; tente novamente em instantes.")
+            reservada = True
+            conn.execute(
+                "INSERT INTO tarefas (id, chave, tipo, parametros, status, pid, criado) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, chave, tipo, json.dumps(parametros), NA_FILA, os.getpid(), time.time()),
+            )
+            conn.execute(
+                "DELETE FROM tarefas WHERE id IN (SELECT id FROM tarefas WHERE status IN (?, ?, ?) "
+                "ORDER BY terminado DESC LIMIT -1 OFFSET ?)",
+                (*TERMINADOS, self.max_jobs),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            if reservada:
+                self._vagas.release()
+            eventos.close()
+            raise
+
+        prazo = self._prazos[job_id] = Prazo(float('inf'))
+        try:
+            futuro = self._pool.submit(self._executar, job_id, prazo, eventos)
+        except BaseException:
+            self._prazos.pop(job_id, None)
+            self._vagas.release()
+            conn.execute("UPDATE tarefas SET status = ?, erro = ?, terminado = ? WHERE id = ?",
+                         (FALHOU, 'Fila de tarefas encerrada', time.time(), job_id))
+            eventos.close()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        return {**self.status(job_id), 'duplicado': False}
+
+    def _executar(self, job_id, prazo, eventos):
+        conn = self._conn()
+        try:
+            iniciada = conn.execute(
+                "UPDATE tarefas SET status = ?, iniciado = ? WHERE id = ? AND status = ?",
+                (EXECUTANDO, time.time(), job_id, NA_FILA),
+            ).rowcount
+            if not iniciada:
+                # Cancelada (ou descartada) enquanto esperava
+                eventos.close()
+                return
+            status, resultado, erro = CANCELADO, None, None
+            try:
+                with com_prazo(prazo):
+                    for nome, dados in eventos:
+                        if nome == 'resultado':
+                            resultado = json.dumps(dados, default=para_json)
+                            status = CONCLUIDO
+                        elif nome == 'progresso':
+                            conn.execute("UPDATE tarefas SET progresso = ? WHERE id = ?",
+                                         (json.dumps(dados, default=para_json), job_id))
+                        cancelar = conn.execute("SELECT cancelar FROM tarefas WHERE id = ?", (job_id,)).fetchone()
+                        if cancelar is None or cancelar[0]:
+                            status = CANCELADO
+                            break
+            except PrazoExcedido:
+                status = CANCELADO
+            except Exception as e:
+                status, erro = FALHOU, str(e) if isinstance(e, ValueError) else f'Erro interno: {str(e)}'
+            finally:
+                eventos.close()
+            conn.execute(
+                "UPDATE tarefas SET status = ?, resultado = ?, erro = ?, terminado = ? WHERE id = ?",
+                (status, resultado if status == CONCLUIDO else None, erro, time.time(), job_id),
+            )
+        finally:
+            self._prazos.pop(job_id, None)
+
+    def status(self, job_id):
+        """
+        Resumo da tarefa: status, progresso, erro e instantes
+
+        Raises:
+            JobNotFound: Se a tarefa não existir
+        """
+        return self._resumo(self._linha(self._conn(), job_id))
+
+    def result(self, job_id):
+        """
+        Resumo da tarefa e o resultado em JSON (texto), ou None se não concluída
+
+        Raises:
+            JobNotFound: Se a tarefa não existir
+        """
+        linha = self._linha(self._conn(), job_id)
+        return self._resumo(linha), linha['resultado']
+
+    def cancel(self, job_id):
+        """
+        Cancela a tarefa, se ainda não terminou, e devolve o seu resumo
+
+        Raises:
+            JobNotFound: Se a tarefa não existir
+        """
+        conn = self._conn()
+        self._linha(conn, job_id)
+        conn.execute(
+            "UPDATE tarefas SET status = ?, terminado = ? WHERE id = ? AND status = ?",
+            (CANCELADO, time.time(), job_id, NA_FILA),
+        )
+        conn.execute("UPDATE tarefas SET cancelar = 1 WHERE id = ? AND status = ?", (job_id, EXECUTANDO))
+        prazo = self._prazos.get(job_id)
+        if prazo is not None:
+            prazo.cancelar()
+        return self.status(job_id)
+
+    def shutdown(self):
+        for prazo in list(self._prazos.values()):
+            prazo.cancelar()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_jobs = None
+
+
+def configure(path=DEFAULT_PATH, threads=DEFAULT_THREADS, fila=DEFAULT_FILA, max_jobs=MAX_JOBS):
+    """Reconfigura a fila de tarefas deste processo"""
+    global _jobs
+    if _jobs is not None:
+        _jobs.shutdown()
+    _jobs = JobQueue(path, threads, fila, max_jobs)
+    return _jobs
+
+
+def get_jobs():
+    """Fila configurada (lida das variáveis de ambiente na primeira chamada)"""
+    global _jobs
+    if _jobs is not None and _jobs._pid != os.getpid():
+        # Threads não sobrevivem ao fork: mesma configuração, pool novo
+        _jobs = JobQueue(_jobs.path, _jobs.threads, _jobs.fila, _jobs.max_jobs)
+    if _jobs is None:
+        configure(
+            os.environ.get('FILAS_JOBS_PATH') or DEFAULT_PATH,
+            int(os.environ.get('FILAS_JOBS_THREADS', DEFAULT_THREADS)),
+            int(os.environ.get('FILAS_JOBS_FILA', DEFAULT_FILA)),
+        )
+    return _jobs
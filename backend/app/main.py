@@ -3,30 +3,141 @@ Aplicação Flask principal para cálculo de Teoria das Filas
 
 Este é o ponto de entrada da aplicação.
 Configure as rotas e o CORS aqui.
+
+create_app() monta o app só com o essencial (JSON, CORS e /api/health). Os
+blueprints, e com eles o NumPy, o SciPy e os modelos, são carregados no
+primeiro acesso ao seu prefixo de URL (ver BLUEPRINTS). Assim, testes,
+ferramentas de linha de comando e workers recém-criados não pagam a
+importação de tudo para responder o health check. O servidor de produção
+carrega todos antes do fork (load_blueprints), e os workers os herdam.
+
+Como o Flask não aceita novas rotas depois da primeira requisição, cada
+blueprint carregado sob demanda ganha um app Flask próprio, com a mesma
+configuração (app.config compartilhado, JSON e CORS), para o qual o app
+principal repassa as requisições do prefixo.
 """
+import importlib
+import threading
 
 from flask import Flask
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 
-app = Flask(__name__)
+from app.models.results import Resultado
+from app.routes import GRID_HEADERS
+
+# Prefixo da URL -> (módulo, blueprint), registrado em /api no primeiro acesso
+BLUEPRINTS = {
+    '/api/calculate/': ('app.routes.queue_routes', 'queue_bp'),
+    '/api/estimation/': ('app.routes.estimation_routes', 'estimation_bp'),
+    '/api/solve/': ('app.routes.solver_routes', 'solver_bp'),
+    '/api/grid': ('app.routes.analysis_routes', 'analysis_bp'),
+    '/api/uncertainty': ('app.routes.analysis_routes', 'analysis_bp'),
+    '/api/sessions': ('app.routes.session_routes', 'session_bp'),
+    '/api/jobs': ('app.routes.job_routes', 'job_bp'),
+}
+
+
+class ProvedorJSON(DefaultJSONProvider):
+    """JSON das respostas: resultados dos modelos (app/models/results.py) viram dict"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Resultado):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+
+def _configurar(app):
+    app.json = ProvedorJSON(app)
+
+    # Configurar CORS para permitir requisições do frontend React
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": ["http://localhost:5173"],  # Porta padrão do Vite
+            "methods": ["GET", "POST"],
+            "allow_headers": ["Content-Type"],
+            "expose_headers": GRID_HEADERS
+        }
+    })
+
+
+class BlueprintsPreguicosos:
+    """
+    Middleware WSGI que carrega cada blueprint no primeiro acesso ao seu prefixo
+
+    Args:
+        app (Flask): App principal (fornece a configuração e atende o resto)
+        blueprints (dict): Prefixo da URL -> (módulo, nome do blueprint)
+    """
 
-# Configurar CORS para permitir requisições do frontend React
-CORS(app, resources={
-    r"/api/*": {
-        "origins": ["http://localhost:5173"],  # Porta padrão do Vite
-        "methods": ["GET", "POST"],
-        "allow_headers": ["Content-Type"]
-    }
-})
+    def __init__(self, app, blueprints):
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self.blueprints = blueprints
+        self._apps = {}
+        self._trava = threading.Lock()
 
-# ==========================================
-# Importar e registrar rotas
-# ==========================================
-from app.routes.queue_routes import queue_bp
-app.register_blueprint(queue_bp, url_prefix='/api')
+    def carregar(self, modulo, nome):
+        """App Flask com o blueprint (importado e registrado só na primeira vez)"""
+        sub_app = self._apps.get(modulo)
+        if sub_app is None:
+            with self._trava:
+                sub_app = self._apps.get(modulo)
+                if sub_app is None:
+                    sub_app = Flask(self.app.import_name)
+                    sub_app.config = self.app.config
+                    _configurar(sub_app)
+                    blueprint = getattr(importlib.import_module(modulo), nome)
+                    sub_app.register_blueprint(blueprint, url_prefix='/api')
+                    self._apps[modulo] = sub_app
+        return sub_app
+
+    def carregados(self):
+        """Módulos de rotas já carregados"""
+        return sorted(self._apps)
+
+    def __call__(self, environ, start_response):
+        caminho = environ.get('PATH_INFO', '')
+        for prefixo, (modulo, nome) in self.blueprints.items():
+            if caminho.startswith(prefixo):
+                return self.carregar(modulo, nome)(environ, start_response)
+        return self.wsgi_app(environ, start_response)
 
 
-@app.route('/api/health')
 def health():
     """Endpoint para verificar se o servidor está rodando"""
     return {"status": "ok", "message": "Backend Flask está rodando!"}, 200
+
+
+def create_app(preguicoso=True):
+    """
+    Cria o app Flask
+
+    Args:
+        preguicoso (bool): Carregar os blueprints só no primeiro acesso
+            (False: carrega todos agora)
+
+    Returns:
+        Flask: App com /api/health e os blueprints de BLUEPRINTS
+    """
+    app = Flask(__name__)
+    _configurar(app)
+    app.add_url_rule('/api/health', 'health', health)
+
+    rotas = BlueprintsPreguicosos(app, BLUEPRINTS)
+    app.wsgi_app = rotas
+    app.extensions['blueprints_preguicosos'] = rotas
+    if not preguicoso:
+        load_blueprints(app)
+    return app
+
+
+def load_blueprints(app):
+    """Carrega todos os blueprints de um app criado por create_app (ex.: antes do fork)"""
+    rotas = app.extensions['blueprints_preguicosos']
+    for modulo, nome in rotas.blueprints.values():
+        rotas.carregar(modulo, nome)
+
+
+app = create_app()
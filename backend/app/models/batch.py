@@ -0,0 +1,684 @@
+"""
+Versões vetorizadas (NumPy) dos modelos de fila
+
+Cada função recebe arrays (ou escalares) com broadcast entre os parâmetros e
+devolve um dict de arrays com as mesmas chaves do modelo escalar
+correspondente. Cenários inválidos ou instáveis não geram exceção: recebem NaN
+nas métricas e False em 'estavel', para que um lote grande não seja
+interrompido por um único cenário ruim.
+"""
+import numpy as np
+
+from app.models.debug import fase, registrar, termos
+from app.models.erlang import _CDF_MIN, erlang_a_batch, erlang_b_batch, log_erlang_c_batch
+from app.models.numeric import log_factorial
+from app.models.precision import (
+    EPS, LOG_TINY, TOLERANCIA, mmsk_high_precision, mmsn_high_precision, refine,
+)
+from app.models.qed import TOLERANCIA_QED, erlang_qed
+
+
+def _inteiro(x):
+    # Parâmetros como s, K e N devem ser inteiros
+    return x == np.floor(x)
+
+
+def _log_exp_parcial(a, s):
+    # log Σ(n=0 até s-1) a^n/n! = a + log Q(s, a)  (Q = gama incompleta regularizada superior)
+    # Se Q sofrer underflow (a >> s): a^(s-1)/(s-1)! / B(s-1, a)
+    from scipy.special import gammaincc
+    with np.errstate(divide='ignore', under='ignore'):
+        q = gammaincc(s, a)
+        log_soma = a + np.log(q)
+    ruins = ~(q > _CDF_MIN)
+    if ruins.any():
+        log_soma = np.array(log_soma)
+        a_r, s_r = a[ruins], s[ruins]
+        log_soma[ruins] = (s_r - 1) * np.log(a_r) - log_factorial(s_r - 1) - np.log(erlang_b_batch(a_r, s_r - 1))
+    return log_soma
+
+
+def _geometrica_truncada(log_rho, m):
+    # Para pesos ρ^j, j = 0..m: devolve log Σ ρ^j, a média E[j] e o número de
+    # condição da média. Sem overflow para ρ > 1 (reflexão j → m - j).
+    refletir = log_rho > 0
+    x = -np.abs(log_rho)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_G = np.log(-np.expm1((m + 1) * x)) - np.log(-np.expm1(x))
+        media = 1 / np.expm1(-x) - (m + 1) / np.expm1(-(m + 1) * x)
+    # Perto de ρ = 1 a média é uma diferença de termos ~1/|x|: usar a expansão
+    # de Taylor (cumulantes da uniforme discreta em 0..m)
+    xm = np.abs(x) * (m + 1)
+    perto = xm < 1e-4
+    variancia = m * (m + 2) / 12
+    log_G = np.where(perto, np.log(m + 1) + x * m / 2 + x ** 2 * variancia / 2, log_G)
+    media = np.where(perto, m / 2 + x * variancia, media)
+    with np.errstate(divide='ignore'):
+        condicao = np.where(perto, xm ** 3 / EPS, 2 / xm)
+    log_G = np.where(refletir, log_G + m * log_rho, log_G)
+    media = np.where(refletir, m - media, media)
+    return log_G, media, condicao
+
+
+def _fila_finita_serie(M, x):
+    # Fila j = n - s da população finita com pesos t_j = Π(i=1 até j) (M-i+1)×x:
+    # devolve Σ j×t_j / Σ t_j (termos decrescentes quando M×x < 1). Só os
+    # elementos ainda não convergidos seguem para a próxima iteração.
+    soma = np.ones_like(x)
+    soma_j = np.zeros_like(x)
+    ativos = np.arange(x.size)
+    M_a, x_a, termo = M.ravel(), x.ravel(), np.ones(x.size)
+    j = 1
+    while ativos.size:
+        termos(ativos.size)
+        termo = np.where(j <= M_a, termo * (M_a - j + 1) * x_a, 0.0)
+        soma.flat[ativos] += termo
+        soma_j.flat[ativos] += j * termo
+        seguir = j * termo > 1e-17 * soma_j.flat[ativos]
+        ativos, M_a, x_a, termo = ativos[seguir], M_a[seguir], x_a[seguir], termo[seguir]
+        j += 1
+    return soma_j / soma
+
+
+def calculate_mm1_batch(lambda_, mu) -> dict:
+    """
+    Calcula métricas do modelo M/M/1 para vários cenários de uma vez
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento
+
+    Returns:
+        dict: Arrays com rho, L, Lq, W, Wq, P0, estavel
+    """
+    lambda_, mu = np.broadcast_arrays(
+        np.asarray(lambda_, dtype=np.float64), np.asarray(mu, dtype=np.float64)
+    )
+    estavel = (lambda_ > 0) & (mu > 0) & (lambda_ < mu)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = lambda_ / mu
+        L = rho / (1 - rho)
+        Lq = rho * L
+        W = 1 / (mu - lambda_)
+        Wq = rho * W
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    return {
+        'rho': rho,
+        'L': mascarar(L),
+        'Lq': mascarar(Lq),
+        'W': mascarar(W),
+        'Wq': mascarar(Wq),
+        'P0': mascarar(1 - rho),
+        'estavel': estavel,
+    }
+
+
+def calculate_mms_batch(lambda_, mu, s, t=None, tolerancia=TOLERANCIA_QED) -> dict:
+    """
+    Calcula métricas do modelo M/M/s para vários cenários de uma vez
+
+    Cenários com s muito grande no regime de Halfin–Whitt usam a aproximação
+    assintótica O(1) de app/models/qed.py quando a estimativa de erro dela
+    fica dentro de `tolerancia`; os demais usam o Erlang exato.
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento por servidor
+        s (array_like): Número de servidores
+        t (array_like, optional): Tempo para calcular P(Wq>t) e P(W>t)
+        tolerancia (float): Erro relativo máximo aceito na aproximação
+            assintótica (padrão: TOLERANCIA_QED)
+
+    Returns:
+        dict: Arrays com rho, L, Lq, W, Wq, P0, PWqIgualZero, C, estavel,
+            assintotico (cenários pela aproximação QED) e, se t for
+            informado, PWqMaiorQueT e PWMaiorQueT
+    """
+    from scipy.special import gammaincc
+    lambda_, mu, s = np.broadcast_arrays(
+        np.asarray(lambda_, dtype=np.float64),
+        np.asarray(mu, dtype=np.float64),
+        np.asarray(s, dtype=np.float64),
+    )
+    estavel = (lambda_ > 0) & (mu > 0) & (s > 0) & _inteiro(s) & (lambda_ < s * mu)
+
+    with np.errstate(divide='ignore', invalid='ignore', under='ignore'):
+        a = np.where(estavel, lambda_ / mu, 0.5)
+        s_ok = np.where(estavel, s, 1.0)
+        rho = lambda_ / (s * mu)
+        rho_ok = np.where(estavel, rho, 0.5)
+
+        # Aproximação assintótica onde o erro estimado cabe na tolerância;
+        # o Erlang exato só para os demais cenários
+        with fase('assintotico'):
+            qed = erlang_qed(a, s_ok)
+            assintotico = estavel & (qed['erro'] <= tolerancia)
+            B, log_cdf = qed['B'], qed['logCdf']
+        exato = ~assintotico
+        if exato.any():
+            with fase('erlangExato'):
+                B, log_cdf = np.array(B), np.array(log_cdf)
+                B[exato] = erlang_b_batch(a[exato], s_ok[exato])
+                log_cdf[exato] = np.log(gammaincc(s_ok[exato] + 1, a[exato]))
+        registrar(cenariosAssintoticos=int(np.count_nonzero(assintotico)))
+        C = s_ok * B / (s_ok - a * (1 - B))
+
+        # P0 = e^(-a) / P(X ≤ s) / (1 - B + B/(1-ρ)),  X ~ Poisson(a)
+        P0 = np.exp(-a - log_cdf) / (1 - B + B / (1 - rho_ok))
+
+        Lq = C * rho_ok / (1 - rho_ok)
+        L = Lq + a
+        Wq = Lq / np.where(estavel, lambda_, 1.0)
+        W = Wq + 1 / np.where(estavel, mu, 1.0)
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    result = {
+        'rho': rho,
+        'L': mascarar(L),
+        'Lq': mascarar(Lq),
+        'W': mascarar(W),
+        'Wq': mascarar(Wq),
+        'P0': mascarar(P0),
+        'PWqIgualZero': mascarar(1 - C),
+        'C': mascarar(C),
+        's': s,
+        'estavel': estavel,
+        'assintotico': assintotico,
+    }
+
+    if t is not None:
+        t = np.asarray(t, dtype=np.float64)
+        taxa = s_ok * mu - lambda_
+        with np.errstate(over='ignore', under='ignore'):
+            result['PWqMaiorQueT'] = mascarar(C * np.exp(-taxa * t))
+            # Mesma aproximação do modelo escalar para P(W>t)
+            result['PWMaiorQueT'] = mascarar(np.where(t > 1 / mu, C * np.exp(-taxa * (t - 1 / mu)), 1.0))
+
+    return result
+
+
+def calculate_mmsm_batch(lambda_, mu, s, theta, t=None) -> dict:
+    """
+    Calcula métricas do modelo M/M/s+M (Erlang A) para vários cenários de uma vez
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento por servidor
+        s (array_like): Número de servidores
+        theta (array_like): Taxa de abandono
+        t (array_like, optional): Tempo para calcular P(Wq>t)
+
+    Returns:
+        dict: Arrays com rho, L, Lq, W, Wq, P0, PWqIgualZero, PAbandono,
+            lambdaEfetivo, estavel e, se t for informado, PWqMaiorQueT
+    """
+    lambda_, mu, s, theta = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, s, theta))
+    )
+    # Com abandono todo cenário com parâmetros válidos é estável
+    estavel = (lambda_ > 0) & (mu > 0) & (s > 0) & _inteiro(s) & (theta > 0)
+
+    lambda_ok = np.where(estavel, lambda_, 1.0)
+    mu_ok = np.where(estavel, mu, 1.0)
+    r = erlang_a_batch(lambda_ok, mu_ok, np.where(estavel, s, 1.0), np.where(estavel, theta, 1.0), t)
+
+    lambda_eff = lambda_ok * (1 - r['PAbandono'])
+    L = r['Lq'] + lambda_eff / mu_ok
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = lambda_ / (s * mu)
+
+    result = {
+        'rho': rho,
+        'L': mascarar(L),
+        'Lq': mascarar(r['Lq']),
+        'W': mascarar(L / lambda_ok),
+        'Wq': mascarar(r['Lq'] / lambda_ok),
+        'P0': mascarar(r['P0']),
+        'PWqIgualZero': mascarar(r['livre']),
+        'PAbandono': mascarar(r['PAbandono']),
+        'lambdaEfetivo': mascarar(lambda_eff),
+        's': s,
+        'estavel': estavel,
+    }
+    if t is not None:
+        result['PWqMaiorQueT'] = mascarar(r['PWqMaiorQueT'])
+
+    return result
+
+
+def calculate_mmsk_batch(lambda_, mu, s, K, n=None) -> dict:
+    """
+    Calcula métricas do modelo M/M/s/K para vários cenários de uma vez
+
+    Os pesos dos estados são a^n/n! (n < s) e a^s/s! × ρ^(n-s) (s ≤ n ≤ K);
+    as duas somas são calculadas em escala logarítmica (gama incompleta e
+    série geométrica truncada), em O(1) por cenário, sem overflow para s ou
+    K grandes. Cenários mal condicionados (ver app/models/precision.py) são
+    recalculados em alta precisão.
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento por servidor
+        s (array_like): Número de servidores (s ≥ 1)
+        K (array_like): Capacidade máxima do sistema (K ≥ s)
+        n (array_like, optional): Número de clientes para calcular P(n)
+
+    Returns:
+        dict: Arrays com rho, P0, PK, lambdaEfetivo, L, Lq, W, Wq, estavel,
+            altaPrecisao, precisaoLimitada e, se n for informado, Pn
+    """
+    lambda_, mu, s, K = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, s, K))
+    )
+    # Com capacidade finita todo cenário com parâmetros válidos é estável
+    estavel = (lambda_ > 0) & (mu > 0) & (s >= 1) & (K >= s) & _inteiro(s) & _inteiro(K)
+
+    a = np.where(estavel, lambda_ / mu, 1.0)
+    s_ok = np.where(estavel, s, 1.0)
+    m = np.where(estavel, K - s, 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        with fase('normalizacao'):
+            log_rho = np.log(a) - np.log(s_ok)
+            log_G, fila_media, condicao = _geometrica_truncada(log_rho, m)
+
+            # 1/P0 = Σ(n<s) a^n/n! + a^s/s! × Σ(j=0 até K-s) ρ^j
+            log_topo = s_ok * np.log(a) - log_factorial(s_ok)
+            log_cauda = log_topo + log_G
+            log_parcial = _log_exp_parcial(a, s_ok)
+            log_Z = np.logaddexp(log_parcial, log_cauda)
+
+            P0 = np.exp(-log_Z)
+            PK = np.exp(log_topo + m * log_rho - log_Z)
+            # 1 - PK = Z(K-1)/Z(K), sem a subtração (PK ≈ 1 com λ >> sμ)
+            log_G_ant, _, _ = _geometrica_truncada(log_rho, m - 1)
+            log_Z_ant = np.logaddexp(log_parcial, np.where(m > 0, log_topo + log_G_ant, -np.inf))
+            nao_bloqueio = np.exp(log_Z_ant - log_Z)
+
+        with fase('metricas'):
+            Lq = fila_media * np.exp(log_cauda - log_Z)
+            lambda_eff = lambda_ * nao_bloqueio
+            # Servidores ocupados em média: λ_eff/μ
+            L = Lq + a * nao_bloqueio
+            W = L / lambda_eff
+            Wq = Lq / lambda_eff
+            rho = lambda_ / (s * mu)
+
+        with fase('estimativaErro'):
+            # Erro relativo estimado: exponenciais de logs grandes e média da fila
+            # perto de ρ = 1
+            erro = EPS * (8 + np.abs(log_cauda) + np.abs(log_Z) + np.abs(log_Z_ant) + condicao)
+            suspeitos = estavel & ~((erro <= TOLERANCIA) & np.isfinite(log_Z) & np.isfinite(W))
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    result = {
+        'rho': rho,
+        'P0': mascarar(P0),
+        'PK': mascarar(PK),
+        'lambdaEfetivo': mascarar(lambda_eff),
+        'L': mascarar(L),
+        'Lq': mascarar(Lq),
+        'W': mascarar(W),
+        'Wq': mascarar(Wq),
+        'estavel': estavel,
+    }
+
+    if n is not None:
+        n = np.asarray(n, dtype=np.float64)
+        n_ok = np.clip(n, 0, K)
+        with np.errstate(divide='ignore', invalid='ignore', under='ignore'), fase('Pn'):
+            log_w = np.where(
+                n_ok < s_ok,
+                n_ok * np.log(a) - log_factorial(n_ok),
+                log_topo + (n_ok - s_ok) * log_rho,
+            )
+            result['Pn'] = np.where(estavel & (n >= 0) & (n <= K), np.exp(log_w - log_Z), np.nan)
+
+    return refine(result, suspeitos, mmsk_high_precision, (lambda_, mu, s, K), n, estados=K + 1)
+
+
+def calculate_mm1k_batch(lambda_, mu, K, n=None) -> dict:
+    """
+    Calcula métricas do modelo M/M/1/K para vários cenários de uma vez
+
+    Caso particular de calculate_mmsk_batch com s = 1.
+
+    Returns:
+        dict: Arrays com rho, L, Lq, W, Wq, P0, PK, lambdaEfetivo, K, estavel,
+            altaPrecisao, precisaoLimitada e, se n for informado, Pn
+    """
+    result = calculate_mmsk_batch(lambda_, mu, 1, K, n)
+    result['K'] = np.broadcast_to(np.asarray(K, dtype=np.float64), result['estavel'].shape)
+    return result
+
+
+def calculate_mm1n_batch(lambda_, mu, N, n=None) -> dict:
+    """
+    Calcula métricas do modelo M/M/1/N para vários cenários de uma vez
+
+    Caso particular de calculate_mmsn_batch com s = 1.
+
+    Returns:
+        dict: Arrays com rho, P0, L, Lq, W, Wq, lambdaEfetivo,
+            numOperacionais, estavel, altaPrecisao, precisaoLimitada e, se n for informado, Pn
+    """
+    result = calculate_mmsn_batch(lambda_, mu, 1, N, n)
+    del result['PWqIgualZero']
+    return result
+
+
+def calculate_mmsn_batch(lambda_, mu, s, N, n=None) -> dict:
+    """
+    Calcula métricas do modelo M/M/s/N para vários cenários de uma vez
+
+    Pesos dos estados (fonte finita, chegadas (N-n)×λ, atendimento min(n,s)×μ):
+        n < s:  C(N,n) × a^n
+        n ≥ s:  N!/(N-n)! × a^n / (s! × s^(n-s))
+    A primeira soma é uma acumulada da binomial,
+    Σ(n<s) C(N,n)×a^n = (1+a)^N × P(Bin(N, a/(1+a)) ≤ s-1), e a segunda,
+    com k = N - n e y = s/a, uma soma parcial da exponencial,
+    N!×(a/s)^N × s^s/s! × Σ(k=0 até N-s) y^k/k!. O custo é O(1) por cenário;
+    cenários mal condicionados (ver app/models/precision.py) são
+    recalculados em alta precisão.
+
+    Args:
+        lambda_ (array_like): Taxa de chegada por cliente (quando fora do sistema)
+        mu (array_like): Taxa de atendimento por servidor
+        s (array_like): Número de servidores (s ≥ 1)
+        N (array_like): Tamanho da população (N ≥ s)
+        n (array_like, optional): Número de clientes para calcular P(n)
+
+    Returns:
+        dict: Arrays com rho, P0, L, Lq, W, Wq, lambdaEfetivo,
+            numOperacionais, PWqIgualZero, estavel, altaPrecisao, precisaoLimitada e,
+            se n for informado, Pn
+    """
+    from scipy.special import betainc
+    lambda_, mu, s, N = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, s, N))
+    )
+    estavel = (lambda_ > 0) & (mu > 0) & (s >= 1) & (N >= s) & _inteiro(s) & _inteiro(N)
+
+    a = np.where(estavel, lambda_ / mu, 1.0)
+    s_ok = np.where(estavel, s, 1.0)
+    N_ok = np.where(estavel, N, 1.0)
+    M = N_ok - s_ok
+    x = a / s_ok
+    y = 1 / x
+    p = a / (1 + a)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        with fase('normalizacao'):
+            # n < s: P(Bin(N, p) ≤ s-1) = I_{1-p}(N-s+1, s) e Σ n×C(N,n)×a^n = N×p×(1+a)^N × P(Bin(N-1, p) ≤ s-2)
+            log_1 = N_ok * np.log1p(a)
+            F1 = betainc(N_ok - s_ok + 1, s_ok, 1 - p)
+            G1 = np.where(s_ok >= 2, betainc(N_ok - s_ok + 1, s_ok - 1, 1 - p), 0.0)
+            log_T1 = log_1 + np.log(F1)
+
+            # n ≥ s: log Σ = s×log s - log s! + log N! + N×log x + log Σ(k=0 até N-s) y^k/k!
+            log_T2 = (s_ok * np.log(s_ok) - log_factorial(s_ok) + log_factorial(N_ok) + N_ok * np.log(x)
+                      + _log_exp_parcial(y, M + 1))
+            log_Z = np.logaddexp(log_T1, log_T2)
+
+            P0 = np.exp(-log_Z)
+            PWqIgualZero = np.exp(log_T1 - log_Z)
+            P_fila = np.exp(log_T2 - log_Z)  # P(n ≥ s)
+
+        with fase('Lq'):
+            # Fila média dado n ≥ s: E[j] = M - y×(1 - B(M, y)), com B = Erlang B.
+            # Quando a massa se concentra em n = s a diferença perde precisão e
+            # E[j] é somado diretamente pela série.
+            curta = M * x < 0.5
+            fila_media = np.empty_like(x)
+            fila_media[curta] = _fila_finita_serie(M[curta], x[curta])
+            longa = ~curta
+            fila_media[longa] = M[longa] - y[longa] * (1 - erlang_b_batch(y[longa], M[longa]))
+            Lq = fila_media * P_fila
+
+        with fase('L'):
+            # Servidores ocupados em média: Σ(n<s) n×P(n) + s×P(n ≥ s)
+            ocupados = N_ok * p * np.exp(log_1 - log_Z) * G1 + s_ok * P_fila
+            L = ocupados + Lq
+            # Balanço de fluxo: λ×(N - L) = μ × ocupados (evita a diferença N - L)
+            num_operacionais = ocupados / a
+            lambda_eff = lambda_ * num_operacionais
+            rho = N * lambda_ / (s * mu)
+
+        with fase('estimativaErro'):
+            # Underflow da acumulada binomial quando a sua escala ainda pesaria no resultado
+            underflow = (F1 < np.exp(LOG_TINY)) & (log_1 + LOG_TINY > log_T2 + np.log(EPS))
+            # Erro relativo estimado: exponenciais de logs grandes e cancelamento
+            # na fila média (fora da série)
+            erro = EPS * (64 + np.abs(log_1) + np.abs(log_T2) + np.where(curta, 0.0, (M + y) / fila_media))
+            suspeitos = estavel & (underflow | ~((erro <= TOLERANCIA) & np.isfinite(log_Z) & np.isfinite(L)))
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    result = {
+        'rho': rho,
+        'P0': mascarar(P0),
+        'L': mascarar(L),
+        'Lq': mascarar(Lq),
+        'W': mascarar(L / lambda_eff),
+        'Wq': mascarar(Lq / lambda_eff),
+        'lambdaEfetivo': mascarar(lambda_eff),
+        'numOperacionais': mascarar(num_operacionais),
+        'PWqIgualZero': mascarar(PWqIgualZero),
+        'estavel': estavel,
+    }
+
+    if n is not None:
+        n = np.asarray(n, dtype=np.float64)
+        n_ok = np.clip(n, 0, N_ok)
+        with np.errstate(divide='ignore', invalid='ignore', under='ignore'), fase('Pn'):
+            log_w = log_factorial(N_ok) - log_factorial(N_ok - n_ok) + n_ok * np.log(a)
+            log_w = log_w - np.where(
+                n_ok < s_ok,
+                log_factorial(n_ok),
+                log_factorial(s_ok) + (n_ok - s_ok) * np.log(s_ok),
+            )
+            result['Pn'] = np.where(estavel & (n >= 0) & (n <= N), np.exp(log_w - log_Z), np.nan)
+
+    return refine(result, suspeitos, mmsn_high_precision, (lambda_, mu, s, N), n, estados=N + 1)
+
+
+def calculate_mg1_batch(lambda_, mu, var_service) -> dict:
+    """
+    Calcula métricas do modelo M/G/1 (Pollaczek-Khinchine) para vários cenários de uma vez
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento
+        var_service (array_like): Variância do tempo de atendimento (σ²)
+
+    Returns:
+        dict: Arrays com rho, P0, Lq, Wq, L, W, estavel
+    """
+    lambda_, mu, var_service = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, var_service))
+    )
+    estavel = (lambda_ > 0) & (mu > 0) & (var_service >= 0) & (lambda_ < mu)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rho = lambda_ / mu
+        Lq = (lambda_ ** 2 * var_service + rho ** 2) / (2 * (1 - rho))
+        Wq = Lq / lambda_
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    return {
+        'rho': rho,
+        'P0': mascarar(1 - rho),
+        'Lq': mascarar(Lq),
+        'Wq': mascarar(Wq),
+        'L': mascarar(rho + Lq),
+        'W': mascarar(Wq + 1 / mu),
+        'estavel': estavel,
+    }
+
+
+def calculate_gg1_batch(lambda_, mu, ca2, cs2) -> dict:
+    """
+    Aproximação de Kingman do G/G/1 para vários cenários de uma vez
+
+    Parte do M/G/1 (Pollaczek-Khinchine, σ² = cs²/μ²) e corrige a fila pela
+    variabilidade das chegadas:
+        Wq ≈ Wq(M/G/1) × (ca² + cs²)/(1 + cs²) = ρ/(1-ρ) × (ca² + cs²)/2 × 1/μ
+    Exata para chegadas de Poisson (ca² = 1).
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento
+        ca2 (array_like): Coeficiente de variação² dos tempos entre chegadas
+        cs2 (array_like): Coeficiente de variação² do tempo de atendimento
+
+    Returns:
+        dict: Arrays com rho, P0, Lq, Wq, L, W, estavel
+    """
+    lambda_, mu, ca2, cs2 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, ca2, cs2))
+    )
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mg1 = calculate_mg1_batch(lambda_, mu, cs2 / mu ** 2)
+        estavel = mg1['estavel'] & (ca2 >= 0) & (cs2 >= 0)
+        fator = (ca2 + cs2) / (1 + cs2)
+        Lq = mg1['Lq'] * fator
+        Wq = mg1['Wq'] * fator
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    return {
+        'rho': mg1['rho'],
+        'P0': mascarar(mg1['P0']),
+        'Lq': mascarar(Lq),
+        'Wq': mascarar(Wq),
+        'L': mascarar(mg1['rho'] + Lq),
+        'W': mascarar(Wq + 1 / mu),
+        'estavel': estavel,
+    }
+
+
+def calculate_ggs_batch(lambda_, mu, s, ca2, cs2) -> dict:
+    """
+    Aproximação de Allen–Cunneen do G/G/s para vários cenários de uma vez
+
+    Parte do M/M/s (Erlang C estável, com a aproximação assintótica para s
+    grande) e multiplica a espera pela variabilidade média:
+        Wq ≈ Wq(M/M/s) × (ca² + cs²)/2
+    Com s = 1 coincide com a aproximação de Kingman; com ca² = cs² = 1, com
+    o M/M/s. A probabilidade de espera (C e PWqIgualZero) é a do M/M/s, usada
+    como aproximação.
+
+    Args:
+        lambda_ (array_like): Taxa de chegada
+        mu (array_like): Taxa de atendimento por servidor
+        s (array_like): Número de servidores
+        ca2 (array_like): Coeficiente de variação² dos tempos entre chegadas
+        cs2 (array_like): Coeficiente de variação² do tempo de atendimento
+
+    Returns:
+        dict: Arrays com rho, L, Lq, W, Wq, PWqIgualZero, C, s, estavel
+    """
+    lambda_, mu, s, ca2, cs2 = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, s, ca2, cs2))
+    )
+    mms = calculate_mms_batch(lambda_, mu, s)
+    estavel = mms['estavel'] & (ca2 >= 0) & (cs2 >= 0)
+
+    with np.errstate(invalid='ignore'):
+        Wq = mms['Wq'] * (ca2 + cs2) / 2
+        Lq = lambda_ * Wq
+
+    def mascarar(x):
+        return np.where(estavel, x, np.nan)
+
+    return {
+        'rho': mms['rho'],
+        'L': mascarar(Lq + lambda_ / mu),
+        'Lq': mascarar(Lq),
+        'W': mascarar(Wq + 1 / mu),
+        'Wq': mascarar(Wq),
+        'PWqIgualZero': mascarar(mms['PWqIgualZero']),
+        'C': mascarar(mms['C']),
+        's': s,
+        'estavel': estavel,
+    }
+
+
+def calculate_priority_sem_batch(s, mu, lambdas) -> dict:
+    """
+    Calcula o M/M/s com prioridade sem interrupção para vários cenários de uma vez
+
+    O termo A da fórmula do PDF,
+        A = s!×(s×μ - λ)/r^s × Σ(j=0 até s-1) r^j/j! + s×μ,   r = λ/μ,
+    é igual a s×μ/C(s, r) (C = Erlang C), calculado sem fatoriais nem r^s.
+    Cada linha de `lambdas` é um cenário (classes da maior para a menor
+    prioridade); `s` e `mu` fazem broadcast com o número de cenários.
+
+    Args:
+        s (array_like): Número de servidores de cada cenário
+        mu (array_like): Taxa de atendimento por servidor
+        lambdas (array_like): Taxas de chegada por classe, formato (classes,)
+            ou (cenários, classes)
+
+    Returns:
+        dict: Arrays com rho, lambdaTotal, capacidadeTotal, termoA, logTermoA,
+            estavel (por cenário) e sigma, W, Wq, L, Lq (por cenário e classe)
+    """
+    lambdas = np.asarray(lambdas, dtype=np.float64)
+    s, mu = np.broadcast_arrays(np.asarray(s, dtype=np.float64), np.asarray(mu, dtype=np.float64))
+    forma = np.broadcast_shapes(s.shape, lambdas.shape[:-1])
+    lambdas = np.broadcast_to(lambdas, forma + lambdas.shape[-1:])
+    s, mu = np.broadcast_to(s, forma), np.broadcast_to(mu, forma)
+
+    lambda_total = lambdas.sum(axis=-1)
+    capacidade = s * mu
+    estavel = ((s >= 1) & _inteiro(s) & (mu > 0) & np.all(lambdas >= 0, axis=-1)
+               & (lambda_total > 0) & (lambda_total < capacidade))
+
+    # C(s, r) pode sofrer underflow para s muito grande: A passa de 1e308
+    # (termoA = ∞, mas logTermoA segue finito) e Wq → 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        rho = lambda_total / capacidade
+        r = np.where(estavel, lambda_total / mu, 0.5)
+        s_ok = np.where(estavel, s, 1.0)
+        log_termo_A = np.log(np.where(estavel, mu, 1.0) * s_ok) - log_erlang_c_batch(r, s_ok)
+        termo_A = np.exp(log_termo_A)
+
+        # σ_k = Σ(i ≤ k) λ_i/(s×μ);  W_k = 1/[A×(1 - σ_{k-1})×(1 - σ_k)] + 1/μ
+        sigma = np.cumsum(lambdas, axis=-1) / capacidade[..., None]
+        sigma_anterior = np.concatenate([np.zeros(forma + (1,)), sigma[..., :-1]], axis=-1)
+        Wq = 1 / (termo_A[..., None] * (1 - sigma_anterior) * (1 - sigma))
+        W = Wq + 1 / mu[..., None]
+
+    def mascarar(x):
+        return np.where(estavel if x.ndim == estavel.ndim else estavel[..., None], x, np.nan)
+
+    return {
+        'rho': rho,
+        'lambdaTotal': lambda_total,
+        'capacidadeTotal': capacidade,
+        'termoA': mascarar(termo_A),
+        'logTermoA': mascarar(log_termo_A),
+        'sigma': sigma,
+        'W': mascarar(W),
+        'Wq': mascarar(Wq),
+        'L': mascarar(lambdas * W),
+        'Lq': mascarar(lambdas * Wq),
+        'estavel': estavel,
+    }
@@ -0,0 +1,136 @@
+"""
+Rastreamento leve das fases dos cálculos
+
+As funções de app/models marcam suas fases (ex.: normalização, Lq,
+refinamento em alta precisão) com `fase(nome)`, contam os termos somados com
+`termos(n)` e informam o caminho numérico com `registrar(...)`. Nada disso é
+guardado fora de um bloco `rastrear()`: sem rastreamento ativo, `fase`
+devolve um objeto nulo compartilhado e o custo é uma leitura de ContextVar.
+
+Uso por chamada:
+    >>> with rastrear() as r:
+    ...     calculate_mmsn(1 / 30, 1 / 3, 2, 5)
+    >>> r.resumo()
+    {'tempoTotalMs': ..., 'fases': {'normalizacao': {...}, ...}, 'info': {...}}
+
+ou `com_debug(func, *args)`, que devolve o resultado com a chave 'debug'.
+Nas rotas, `"debug": true` no corpo (ou `?debug=1`) faz o mesmo.
+
+Fases com o mesmo nome (ex.: um refinamento por cenário de um lote) são
+acumuladas: tempo total, número de chamadas e termos.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.models.results import Resultado
+
+_atual = ContextVar('rastreamento', default=None)
+
+
+class Rastreamento:
+    """
+    Tempos, termos e caminhos registrados durante um bloco rastrear()
+
+    Atributos:
+        fases (dict): Nome -> {'tempoMs', 'chamadas', 'termos'}
+        info (dict): Informações avulsas (ex.: caminho numérico)
+    """
+
+    __slots__ = ('fases', 'info', '_pilha', '_inicio', '_fim')
+
+    def __init__(self):
+        self.fases = {}
+        self.info = {}
+        self._pilha = []
+        self._inicio = time.perf_counter()
+        self._fim = None
+
+    def resumo(self) -> dict:
+        """Dados coletados, prontos para JSON"""
+        fim = self._fim if self._fim is not None else time.perf_counter()
+        return {
+            'tempoTotalMs': (fim - self._inicio) * 1000,
+            'fases': {nome: dict(dados) for nome, dados in self.fases.items()},
+            'info': dict(self.info),
+        }
+
+
+class _Fase:
+    __slots__ = ('_rastreamento', '_dados', '_inicio')
+
+    def __init__(self, rastreamento, nome):
+        self._rastreamento = rastreamento
+        self._dados = rastreamento.fases.setdefault(nome, {'tempoMs': 0.0, 'chamadas': 0, 'termos': 0})
+
+    def __enter__(self):
+        self._rastreamento._pilha.append(self._dados)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._dados['tempoMs'] += (time.perf_counter() - self._inicio) * 1000
+        self._dados['chamadas'] += 1
+        self._rastreamento._pilha.pop()
+        return False
+
+
+class _FaseNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULA = _FaseNula()
+
+
+def fase(nome):
+    """Context manager que mede uma fase (nulo sem rastreamento ativo)"""
+    rastreamento = _atual.get()
+    if rastreamento is None:
+        return _NULA
+    return _Fase(rastreamento, nome)
+
+
+def termos(n):
+    """Soma n termos à fase aberta mais interna"""
+    rastreamento = _atual.get()
+    if rastreamento is not None and rastreamento._pilha:
+        rastreamento._pilha[-1]['termos'] += int(n)
+
+
+def registrar(**dados):
+    """Guarda informações avulsas (ex.: caminho='assintotico-qed')"""
+    rastreamento = _atual.get()
+    if rastreamento is not None:
+        rastreamento.info.update(dados)
+
+
+def ativo() -> bool:
+    """Indica se há um rastreamento ativo (para coletas que têm custo próprio)"""
+    return _atual.get() is not None
+
+
+@contextmanager
+def rastrear():
+    """Ativa o rastreamento dentro do bloco e devolve o Rastreamento"""
+    rastreamento = Rastreamento()
+    token = _atual.set(rastreamento)
+    try:
+        yield rastreamento
+    finally:
+        rastreamento._fim = time.perf_counter()
+        _atual.reset(token)
+
+
+def com_debug(func, *args, **kwargs) -> dict:
+    """Chama func com rastreamento e devolve o resultado com a chave 'debug'"""
+    with rastrear() as rastreamento:
+        resultado = func(*args, **kwargs)
+        resultado = resultado.to_dict() if isinstance(resultado, Resultado) else dict(resultado)
+    resultado['debug'] = rastreamento.resumo()
+    return resultado
@@ -0,0 +1,232 @@
+"""
+Fórmulas de Erlang B, Erlang C e Erlang A vetorizadas
+
+Base numérica compartilhada pelos modelos de múltiplos servidores.
+
+Referência das fórmulas (a = λ/μ carga oferecida, s servidores):
+- B(s, a) = (a^s/s!) / Σ(n=0 até s) a^n/n!   (Erlang B, perda)
+- C(s, a) = s×B / (s - a×(1 - B))             (Erlang C, espera; a < s)
+
+Em vez de somar a^n/n! (overflow para s grande), B é calculado como a razão
+entre a função de probabilidade e a acumulada de uma Poisson(a):
+    B = P(X = s) / P(X ≤ s),   P(X ≤ s) = Q(s+1, a)  (gama incompleta regularizada)
+o que custa O(1) por elemento e funciona para s na casa dos milhares ou mais.
+Quando P(X ≤ s) sofre underflow (s muito menor que a), usa-se a série
+1/B = Σ(k=0 até s) s!/((s-k)! a^k), que converge rapidamente nesse regime.
+"""
+import numpy as np
+
+from app.models.numeric import log_factorial
+
+# Abaixo deste valor P(X ≤ s) é considerado impreciso (underflow)
+_CDF_MIN = 1e-280
+
+
+def _erlang_b_series(a, s):
+    # 1/B = Σ t_k,  t_0 = 1,  t_k = t_{k-1} × (s-k+1)/a   (termos decrescentes quando s < a)
+    soma = np.ones_like(a)
+    termo = np.ones_like(a)
+    k = 1
+    ativo = np.ones(a.shape, dtype=bool)
+    while ativo.any():
+        termo = np.where(ativo & (k <= s), termo * (s - k + 1) / a, 0.0)
+        soma += termo
+        ativo = termo > 1e-17 * soma
+        k += 1
+    return 1 / soma
+
+
+def log_erlang_b_batch(a, s, log_fatorial_s=None):
+    """
+    log B(s, a), vetorizado e sem underflow (B pode ser menor que 1e-308)
+
+    Args:
+        a (array_like): Carga oferecida λ/μ (> 0)
+        s (array_like): Número de servidores (inteiro ≥ 0)
+        log_fatorial_s (array_like, optional): log(s!) já calculado
+
+    Returns:
+        np.ndarray: log B(s, a)
+    """
+    from scipy.special import gammaincc
+    a, s = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(s, dtype=np.float64))
+    if log_fatorial_s is None:
+        log_fatorial_s = log_factorial(s)
+    with np.errstate(divide='ignore', under='ignore'):
+        log_pmf = s * np.log(a) - a - log_fatorial_s
+        cdf = gammaincc(s + 1, a)
+        log_B = log_pmf - np.log(cdf)
+
+    ruins = ~(cdf > _CDF_MIN)
+    if ruins.any():
+        log_B = np.array(log_B, dtype=np.float64)
+        log_B[ruins] = np.log(_erlang_b_series(a[ruins], s[ruins]))
+    return np.minimum(log_B, 0.0)
+
+
+def erlang_b_batch(a, s, log_fatorial_s=None):
+    """
+    Probabilidade de bloqueio de Erlang B, vetorizada
+
+    Args:
+        a (array_like): Carga oferecida λ/μ (> 0)
+        s (array_like): Número de servidores (inteiro ≥ 0)
+        log_fatorial_s (array_like, optional): log(s!) já calculado, para quem
+            avalia B várias vezes com os mesmos s (ex.: solvers iterativos)
+
+    Returns:
+        np.ndarray: B(s, a) com o formato resultante do broadcast de a e s
+    """
+    with np.errstate(under='ignore'):
+        return np.exp(log_erlang_b_batch(a, s, log_fatorial_s))
+
+
+def erlang_c_batch(a, s):
+    """
+    Probabilidade de espera de Erlang C, vetorizada
+
+    Elementos instáveis (a ≥ s) recebem C = 1.
+
+    Args:
+        a (array_like): Carga oferecida λ/μ (> 0)
+        s (array_like): Número de servidores (inteiro ≥ 1)
+
+    Returns:
+        np.ndarray: C(s, a)
+    """
+    with np.errstate(under='ignore'):
+        return np.exp(log_erlang_c_batch(a, s))
+
+
+def log_erlang_c_batch(a, s):
+    """
+    log C(s, a), vetorizado e sem underflow (ver erlang_c_batch)
+
+    Elementos instáveis (a ≥ s) recebem log C = 0.
+    """
+    a, s = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(s, dtype=np.float64))
+    log_B = log_erlang_b_batch(a, s)
+    with np.errstate(divide='ignore', invalid='ignore', under='ignore'):
+        # C = s×B/(s - a×(1 - B))
+        log_C = np.log(s) + log_B - np.log(s - a * (1 - np.exp(log_B)))
+    return np.where(a < s, np.clip(log_C, -np.inf, 0.0), 0.0)
+
+
+def erlang_b(a, s):
+    """Erlang B escalar (ver erlang_b_batch)"""
+    return float(erlang_b_batch(a, s))
+
+
+def erlang_c(a, s):
+    """Erlang C escalar (ver erlang_c_batch)"""
+    return float(erlang_c_batch(a, s))
+
+
+def _erlang_a_series(x, y, z=None):
+    # A = Σ q_j e J = Σ j×q_j, com q_0 = 1 e q_j = q_{j-1} × x/(y+j)
+    # (termos decrescentes quando x < y). Com z, soma também Σ q_j × z^j.
+    A = np.ones_like(x)
+    J = np.zeros_like(x)
+    Az = np.ones_like(x)
+    q = np.ones_like(x)
+    qz = np.ones_like(x)
+    j = 1
+    ativo = np.ones(x.shape, dtype=bool)
+    while ativo.any():
+        q = np.where(ativo, q * x / (y + j), 0.0)
+        A += q
+        J += j * q
+        if z is not None:
+            qz = np.where(ativo, qz * x * z / (y + j), 0.0)
+            Az += qz
+        ativo = q > 1e-17 * A
+        j += 1
+    return A, J, Az
+
+
+def erlang_a_batch(lambda_, mu, s, theta, t=None):
+    """
+    Modelo de Erlang A (M/M/s+M, com abandono), vetorizado
+
+    Com x = λ/θ e y = s×μ/θ, a fila a partir de s clientes tem pesos
+    q_j = Π(k=1 até j) λ/(s×μ + k×θ), cuja soma é
+        A(x, y) = Σ q_j = e^x × x^(-y) × Γ(y+1) × P(y, x)
+    (P = gama incompleta regularizada inferior). Usa-se a forma fechada, em
+    escala logarítmica, quando x ≥ 0,9×y; caso contrário (ou se P(y, x) sofrer
+    underflow) soma-se a série, que então converge geometricamente.
+
+    Returns:
+        dict: Arrays com PW (P(espera > 0)), livre (P(n < s) = 1 - PW, sem
+            cancelamento), PAbandono, Lq, piS (P(n = s)), P0 e, se t for
+            informado, PWqMaiorQueT (espera ofertada V > t)
+    """
+    from scipy.special import gammainc, gammaincc, gammaln
+    lambda_, mu, s, theta = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (lambda_, mu, s, theta))
+    )
+    a = lambda_ / mu
+    x = lambda_ / theta
+    y = s * mu / theta
+    B = erlang_b_batch(a, s)
+
+    with np.errstate(divide='ignore', over='ignore', under='ignore', invalid='ignore'):
+        P_yx = gammainc(y, x)
+        fechada = (x >= 0.9 * y) & (P_yx > _CDF_MIN)
+
+        # Forma fechada: trabalhar com 1/A, que não sofre overflow quando x >> y
+        log_A = x - y * np.log(x) + gammaln(y + 1) + np.log(P_yx)
+        inv_A = np.exp(-log_A)
+        J_sobre_A = y * inv_A + (x - y)  # J/A, pois J = y + (x - y)×A
+
+        if not fechada.all():
+            serie = ~fechada
+            A_s, J_s, _ = _erlang_a_series(x[serie], y[serie])
+            inv_A = np.array(inv_A)
+            J_sobre_A = np.array(J_sobre_A)
+            inv_A[serie] = 1 / A_s
+            J_sobre_A[serie] = J_s / A_s
+
+        k = (1 - B) / B * inv_A
+        PW = 1 / (1 + k)
+        piS = inv_A / (1 + k)
+        Lq = J_sobre_A / (1 + k)
+
+        # P(n < s) = 1 - P(W>0) sem cancelamento (k = ∞ quando B sofre underflow)
+        livre = 1 / (1 + B / ((1 - B) * inv_A))
+        # Abaixo de s a distribuição é uma Poisson(a) truncada em s-1:
+        # P0 = P(n < s) × e^(-a) / P(X ≤ s-1),  P(X ≤ s-1) = Q(s, a)
+        # Com Q(s, a) em underflow (a >> s), π_s não é pequeno: P0 = π_s × s!/a^s
+        Q = gammaincc(s, a)
+        P0 = np.where(
+            Q > _CDF_MIN,
+            livre * np.exp(-a) / Q,
+            np.exp(np.log(piS) - s * np.log(a) + log_factorial(s)),
+        )
+
+    result = {
+        'PW': PW,
+        'PAbandono': theta * Lq / lambda_,
+        'Lq': Lq,
+        'piS': piS,
+        'P0': P0,
+        'livre': livre,
+    }
+
+    if t is not None:
+        z = np.exp(-theta * np.asarray(t, dtype=np.float64))
+        with np.errstate(divide='ignore', over='ignore', under='ignore', invalid='ignore'):
+            # Espera ofertada: P(V > t) = P(V > 0) × P(y, x×e^(-θt)) / P(y, x)
+            PV = PW * gammainc(y, x * z) / P_yx
+            if not fechada.all():
+                PV = np.array(PV)
+                serie = ~fechada
+                # Forma equivalente pela série: π_s × A(x×e^(-θt), y) × e^(x(1 - e^(-θt)) - sμt)
+                zs = np.broadcast_to(z, x.shape)[serie]
+                ts = np.broadcast_to(np.asarray(t, dtype=np.float64), x.shape)[serie]
+                _, _, Az_s = _erlang_a_series(x[serie], y[serie], zs)
+                PV[serie] = piS[serie] * Az_s * np.exp(
+                    x[serie] * (1 - zs) - s[serie] * mu[serie] * ts
+                )
+        result['PWqMaiorQueT'] = np.clip(PV, 0.0, 1.0)
+
+    return result
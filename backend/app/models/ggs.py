@@ -0,0 +1,93 @@
+"""
+Modelos G/G/1 e G/G/s (chegadas e atendimentos com distribuição geral)
+
+Aproximações pelos dois primeiros momentos, a partir dos coeficientes de
+variação² das chegadas (ca²) e do atendimento (cs²):
+- G/G/1 (Kingman): Wq ≈ ρ/(1-ρ) × (ca² + cs²)/2 × 1/μ, calculado sobre o
+  M/G/1 (exato para chegadas de Poisson)
+- G/G/s (Allen–Cunneen): Wq ≈ C(s, λ/μ)/(s×μ - λ) × (ca² + cs²)/2, sobre o
+  Erlang C do M/M/s
+
+As versões vetorizadas estão em app/models/batch.py.
+"""
+from app.models.batch import calculate_gg1_batch, calculate_ggs_batch
+from app.models.mg1 import ResultadoMG1
+from app.models.results import Resultado
+
+
+class ResultadoGGS(Resultado):
+    """Métricas do G/G/s"""
+
+    __slots__ = ('rho', 'L', 'Lq', 'W', 'Wq', 'PWqIgualZero', 's')
+    _METRICAS = ('rho', 'L', 'Lq', 'W', 'Wq', 'PWqIgualZero')
+    _BASICAS = _METRICAS + ('s',)
+
+    def __init__(self, r, s):
+        for chave in self._METRICAS:
+            setattr(self, chave, float(r[chave]))
+        self.s = s
+
+
+def _validar(lambda_, mu, ca2, cs2):
+    if not (lambda_ > 0 and mu > 0):
+        raise ValueError("As taxas de chegada (λ) e atendimento (μ) devem ser positivas.")
+    if not (ca2 >= 0 and cs2 >= 0):
+        raise ValueError("Os coeficientes de variação² (ca2, cs2) devem ser não-negativos.")
+
+
+def calculate_gg1(lambda_: float, mu: float, ca2: float, cs2: float) -> ResultadoMG1:
+    """
+    Calcula métricas do modelo G/G/1 (aproximação de Kingman)
+
+    Args:
+        lambda_ (float): Taxa de chegada
+        mu (float): Taxa de atendimento
+        ca2 (float): Coeficiente de variação² dos tempos entre chegadas
+        cs2 (float): Coeficiente de variação² do tempo de atendimento
+
+    Returns:
+        ResultadoMG1: Métricas calculadas (acesso como dict)
+            - rho: Taxa de ocupação
+            - P0: Probabilidade de sistema vazio (1 - ρ)
+            - Lq, Wq: Fila e espera (aproximadas)
+            - L, W: Clientes e tempo no sistema
+
+    Raises:
+        ValueError: Se ρ ≥ 1 (sistema instável) ou valores inválidos
+    """
+    _validar(lambda_, mu, ca2, cs2)
+    if lambda_ >= mu:
+        raise ValueError(f"Sistema instável. Taxa de utilização (ρ) é {lambda_ / mu:.4f} (deve ser < 1).")
+
+    r = calculate_gg1_batch(lambda_, mu, ca2, cs2)
+    return ResultadoMG1(*(float(r[chave]) for chave in ResultadoMG1._BASICAS))
+
+
+def calculate_ggs(lambda_: float, mu: float, s: int, ca2: float, cs2: float) -> ResultadoGGS:
+    """
+    Calcula métricas do modelo G/G/s (aproximação de Allen–Cunneen)
+
+    Args:
+        lambda_ (float): Taxa de chegada
+        mu (float): Taxa de atendimento por servidor
+        s (int): Número de servidores
+        ca2 (float): Coeficiente de variação² dos tempos entre chegadas
+        cs2 (float): Coeficiente de variação² do tempo de atendimento
+
+    Returns:
+        ResultadoGGS: Métricas calculadas (acesso como dict)
+            - rho: Taxa de ocupação por servidor
+            - L, Lq, W, Wq: Métricas de desempenho (aproximadas)
+            - PWqIgualZero: Probabilidade de não esperar (a do M/M/s)
+            - s: Número de servidores
+
+    Raises:
+        ValueError: Se λ ≥ s×μ (sistema instável) ou valores inválidos
+    """
+    _validar(lambda_, mu, ca2, cs2)
+    if s < 1:
+        raise ValueError("O número de servidores (s) deve ser positivo.")
+    if lambda_ >= s * mu:
+        raise ValueError("Sistema instável: a taxa de chegada (λ) deve ser menor que a capacidade total de atendimento (s * μ).")
+
+    return ResultadoGGS(calculate_ggs_batch(lambda_, mu, s, ca2, cs2), s)
@@ -0,0 +1,345 @@
+"""
+Sessões incrementais (what-if) dos modelos M/M/s/K e M/M/s/N
+
+Numa sessão interativa o usuário move um controle de cada vez (K → K+1,
+N → N+1, ...). Em vez de refazer todas as somas a cada passo, a sessão guarda
+o vetor de pesos dos estados (em log) e as somas acumuladas (prefixos) que
+dão as métricas, e cada mudança de K ou N só calcula os termos novos:
+
+- M/M/s/K: pesos w_n (n = 0..K), com prefixos de Σ w_n, Σ n×w_n e
+  Σ (n-s)×w_n (n > s). Mudar K custa O(Δ) (ou O(1) para um K já visto).
+- M/M/s/N: com j = N - n (clientes operacionais), os pesos dos estados com
+  fila (n ≥ s) são v_j = (s/a)^j/j!, que não dependem de N; os prefixos de
+  Σ v_j e T_m = Σ(j<m) S_j (fila média, T_{m+1} = T_m + S_m) crescem com
+  N - s. Mudar N custa O(Δ + s): os s estados sem fila são recalculados.
+
+Todas as somas são de termos positivos em escala logarítmica (sem
+cancelamento nem overflow), e λ_eff no M/M/s/K usa Z(K-1)/Z(K) em vez de
+1 - PK. Mudar λ, μ ou s reconstrói os prefixos até o K/N atual (vetorizado).
+Os prefixos calculados ficam guardados até o maior K/N já visto, então ir e
+voltar com o controle não refaz nada.
+
+Os prefixos (O(K) ou O(N) floats) não fazem parte do estado serializado da
+sessão: com o registro em SQLite (app/estimation/registry.py) cada passo
+carrega e grava só os parâmetros. Os arrays ficam num cache do processo,
+por sessão, limitado a CACHE_ESTADOS estados; quando o passo cai num worker
+sem o cache (ou com prefixos de outros parâmetros), eles são reconstruídos
+até o K/N atual, numa única passada vetorizada.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+
+from app.models.numeric import log_factorial, log_sum_exp
+
+# Limite de estados guardados por sessão (K+1 ou N-s+1)
+MAX_ESTADOS = 1_000_000
+
+# Estados guardados no cache de prefixos do processo, somando todas as sessões
+CACHE_ESTADOS = 2_000_000
+
+MODELOS = ('mm1k', 'mmsk', 'mm1n', 'mmsn')
+
+
+def _acumular(inicio, log_termos):
+    # Prefixos log Σ a partir do valor acumulado anterior (inicio = -inf: do zero)
+    return np.logaddexp.accumulate(np.concatenate(([inicio], log_termos)))[1:]
+
+
+class _Prefixos:
+    """Arrays com capacidade que dobra ao crescer (extensão em O(Δ) amortizado)"""
+
+    def __init__(self, nomes):
+        self.nomes = nomes
+        self.tamanho = 0
+        self.dados = {nome: np.empty(0) for nome in nomes}
+
+    def anexar(self, valores):
+        novos = len(next(iter(valores.values())))
+        fim = self.tamanho + novos
+        for nome in self.nomes:
+            atual = self.dados[nome]
+            if fim > atual.size:
+                maior = np.empty(max(fim, 2 * atual.size))
+                maior[:self.tamanho] = atual[:self.tamanho]
+                self.dados[nome] = atual = maior
+            atual[self.tamanho:fim] = valores[nome]
+        self.tamanho = fim
+
+    def ultimo(self, nome):
+        return self.dados[nome][self.tamanho - 1] if self.tamanho else -np.inf
+
+    def __getitem__(self, chave):
+        nome, i = chave
+        return self.dados[nome][i]
+
+
+# Sessão -> (λ, μ, s dos prefixos, _Prefixos), do uso mais antigo ao mais recente
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _prefixos_em_cache(chave, parametros, nomes):
+    # Prefixos da sessão neste processo; vazios se não houver ou se forem de outros parâmetros
+    with _cache_lock:
+        guardado = _cache.get(chave)
+        if guardado is None or guardado[0] != parametros:
+            guardado = _cache[chave] = (parametros, _Prefixos(nomes))
+        _cache.move_to_end(chave)
+        total = sum(p.tamanho for _, p in _cache.values())
+        while total > CACHE_ESTADOS and next(iter(_cache)) != chave:
+            total -= _cache.popitem(last=False)[1][1].tamanho
+        return guardado[1]
+
+
+class _Sessao:
+    # Estado serializado: só os parâmetros (os prefixos ficam em _cache)
+
+    _PARAMETROS = ()
+    _PREFIXOS = ()
+
+    def __init__(self):
+        self.termos = 0
+        self._chave = uuid.uuid4().hex
+
+    def _prefixos(self):
+        # Prefixos até o K/N atual (reconstruídos se o cache do processo não os tiver)
+        p = _prefixos_em_cache(self._chave, (self.lambda_, self.mu, self.s), self._PREFIXOS)
+        if self._ultimo() >= p.tamanho:
+            self._estender(p, self._ultimo())
+        return p
+
+    def __getstate__(self):
+        return {nome: getattr(self, nome) for nome in ('termos', '_chave', 'a') + self._PARAMETROS}
+
+    def __setstate__(self, estado):
+        for nome, valor in estado.items():
+            setattr(self, nome, valor)
+
+
+def _validar(lambda_, mu, s, limite, nome):
+    if not (lambda_ > 0 and mu > 0):
+        raise ValueError("λ > 0 e μ > 0 são necessários.")
+    if not (s >= 1 and float(s).is_integer()):
+        raise ValueError("O número de servidores (s) deve ser um inteiro ≥ 1.")
+    if not (limite >= s and float(limite).is_integer()):
+        raise ValueError(f"{nome} deve ser um inteiro maior ou igual a s.")
+
+
+class MMsKSession(_Sessao):
+    """
+    Sessão incremental do M/M/s/K (M/M/1/K com s = 1)
+
+    Args:
+        lambda_ (float): Taxa de chegada
+        mu (float): Taxa de atendimento por servidor
+        s (int): Número de servidores (s ≥ 1)
+        K (int): Capacidade máxima do sistema (K ≥ s)
+    """
+
+    modelo = 'mmsk'
+    _PARAMETROS = ('lambda_', 'mu', 's', 'K')
+    _PREFIXOS = ('log_w', 'log_Z', 'log_L', 'log_Lq')
+
+    def __init__(self, lambda_, mu, s, K):
+        super().__init__()
+        self.lambda_, self.mu, self.s, self.K = float(lambda_), float(mu), int(s), int(K)
+        self.update()
+
+    def _ultimo(self):
+        return self.K
+
+    def _estender(self, p, ate):
+        # Pesos e prefixos dos estados n = calculados..ate
+        n = np.arange(p.tamanho, ate + 1, dtype=np.float64)
+        log_topo = self.s * np.log(self.a) - log_factorial(self.s)
+        with np.errstate(divide='ignore'):
+            log_w = np.where(
+                n < self.s,
+                n * np.log(self.a) - log_factorial(np.minimum(n, self.s)),
+                log_topo + (n - self.s) * (np.log(self.a) - np.log(self.s)),
+            )
+            log_n = np.log(n)
+            log_fila = np.log(np.maximum(n - self.s, 0))
+        p.anexar({
+            'log_w': log_w,
+            'log_Z': _acumular(p.ultimo('log_Z'), log_w),
+            'log_L': _acumular(p.ultimo('log_L'), log_n + log_w),
+            'log_Lq': _acumular(p.ultimo('log_Lq'), log_fila + log_w),
+        })
+        self.termos += n.size
+
+    def update(self, lambda_=None, mu=None, s=None, K=None):
+        """
+        Altera um ou mais parâmetros, recalculando só o necessário
+
+        Returns:
+            int: Número de estados calculados nesta atualização
+
+        Raises:
+            ValueError: Se os novos parâmetros forem inválidos
+        """
+        novos = {
+            'lambda_': float(lambda_) if lambda_ is not None else self.lambda_,
+            'mu': float(mu) if mu is not None else self.mu,
+            's': int(s) if s is not None else self.s,
+            'K': int(K) if K is not None else self.K,
+        }
+        _validar(novos['lambda_'], novos['mu'], novos['s'], novos['K'], "A capacidade (K)")
+        if novos['K'] + 1 > MAX_ESTADOS:
+            raise ValueError(f"A sessão é limitada a {MAX_ESTADOS} estados (K < {MAX_ESTADOS}).")
+
+        # Novos λ, μ ou s usam outros prefixos (ver _prefixos_em_cache)
+        self.lambda_, self.mu, self.s, self.K = novos['lambda_'], novos['mu'], novos['s'], novos['K']
+        self.a = self.lambda_ / self.mu
+
+        inicio = self.termos
+        self._prefixos()
+        return self.termos - inicio
+
+    def result(self) -> dict:
+        """Métricas no K atual (mesmas chaves de calculate_mmsk)"""
+        p, K = self._prefixos(), self.K
+        log_Z = p['log_Z', K]
+        PK = np.exp(p['log_w', K] - log_Z)
+        # 1 - PK = Z(K-1)/Z(K), sem cancelamento com PK ≈ 1
+        lambda_eff = self.lambda_ * np.exp(p['log_Z', K - 1] - log_Z) if K >= 1 else 0.0
+        L = np.exp(p['log_L', K] - log_Z)
+        Lq = np.exp(p['log_Lq', K] - log_Z)
+        return {
+            'rho': self.lambda_ / (self.s * self.mu),
+            'P0': float(np.exp(p['log_w', 0] - log_Z)),
+            'PK': float(PK),
+            'lambdaEfetivo': float(lambda_eff),
+            'L': float(L),
+            'Lq': float(Lq),
+            'W': float(L / lambda_eff),
+            'Wq': float(Lq / lambda_eff),
+            's': self.s,
+            'K': K,
+        }
+
+
+class MMsNSession(_Sessao):
+    """
+    Sessão incremental do M/M/s/N (M/M/1/N com s = 1)
+
+    Args:
+        lambda_ (float): Taxa de chegada por cliente (quando fora do sistema)
+        mu (float): Taxa de atendimento por servidor
+        s (int): Número de servidores (s ≥ 1)
+        N (int): Tamanho da população (N ≥ s)
+    """
+
+    modelo = 'mmsn'
+    _PARAMETROS = ('lambda_', 'mu', 's', 'N')
+    _PREFIXOS = ('log_S', 'log_T')
+
+    def __init__(self, lambda_, mu, s, N):
+        super().__init__()
+        self.lambda_, self.mu, self.s, self.N = float(lambda_), float(mu), int(s), int(N)
+        self.update()
+
+    def _ultimo(self):
+        return self.N - self.s
+
+    def _estender(self, p, ate):
+        # Estados com fila, j = N - n = calculados..ate: v_j = y^j/j!, y = s/a
+        j = np.arange(p.tamanho, ate + 1, dtype=np.float64)
+        log_v = j * (np.log(self.s) - np.log(self.a)) - log_factorial(j)
+        log_S = _acumular(p.ultimo('log_S'), log_v)
+        # T_0 = 0 e T_{m+1} = T_m + S_m
+        anteriores = np.concatenate(([p.ultimo('log_S')], log_S[:-1]))
+        log_T = _acumular(p.ultimo('log_T'), anteriores) if p.tamanho else \
+            np.concatenate(([-np.inf], _acumular(-np.inf, log_S[:-1])))
+        p.anexar({'log_S': log_S, 'log_T': log_T})
+        self.termos += j.size
+
+    def update(self, lambda_=None, mu=None, s=None, N=None):
+        """
+        Altera um ou mais parâmetros, recalculando só o necessário
+
+        Returns:
+            int: Número de estados calculados nesta atualização (os s estados
+                sem fila são sempre recalculados no resultado)
+
+        Raises:
+            ValueError: Se os novos parâmetros forem inválidos
+        """
+        novos = {
+            'lambda_': float(lambda_) if lambda_ is not None else self.lambda_,
+            'mu': float(mu) if mu is not None else self.mu,
+            's': int(s) if s is not None else self.s,
+            'N': int(N) if N is not None else self.N,
+        }
+        _validar(novos['lambda_'], novos['mu'], novos['s'], novos['N'], "A população (N)")
+        if novos['N'] - novos['s'] + 1 > MAX_ESTADOS:
+            raise ValueError(f"A sessão é limitada a {MAX_ESTADOS} estados com fila (N - s < {MAX_ESTADOS}).")
+
+        # Novos λ, μ ou s usam outros prefixos (ver _prefixos_em_cache)
+        self.lambda_, self.mu, self.s, self.N = novos['lambda_'], novos['mu'], novos['s'], novos['N']
+        self.a = self.lambda_ / self.mu
+
+        inicio = self.termos
+        self._prefixos()
+        return self.termos - inicio
+
+    def result(self) -> dict:
+        """Métricas no N atual (mesmas chaves de calculate_mmsn)"""
+        p, s, N, a = self._prefixos(), self.s, self.N, self.a
+        M = N - s
+
+        # Estados sem fila (n < s), na mesma escala de v_j: O(s)
+        n = np.arange(s, dtype=np.float64)
+        log_livres = (log_factorial(s) + M * np.log(s) - log_factorial(N - n)
+                      - (N - n) * np.log(a) - log_factorial(n))
+        log_livre = log_sum_exp(log_livres)
+        with np.errstate(divide='ignore'):
+            log_ocupados_livres = log_sum_exp(np.log(n) + log_livres)
+
+        log_S, log_T = p['log_S', M], p['log_T', M]
+        log_Z = np.logaddexp(log_S, log_livre)
+        Lq = np.exp(log_T - log_Z)
+        # Servidores ocupados em média: Σ(n<s) n×P(n) + s×P(n ≥ s)
+        ocupados = np.exp(log_ocupados_livres - log_Z) + s * np.exp(log_S - log_Z)
+        L = ocupados + Lq
+        num_operacionais = ocupados / a
+        lambda_eff = self.lambda_ * num_operacionais
+        return {
+            'rho': N * self.lambda_ / (s * self.mu),
+            'P0': float(np.exp(log_livres[0] - log_Z)),
+            'L': float(L),
+            'Lq': float(Lq),
+            'W': float(L / lambda_eff),
+            'Wq': float(Lq / lambda_eff),
+            'lambdaEfetivo': float(lambda_eff),
+            'numOperacionais': float(num_operacionais),
+            'PWqIgualZero': float(np.exp(log_livre - log_Z)),
+            's': s,
+            'N': N,
+        }
+
+
+def create_session(modelo, lambda_, mu, s=1, K=None, N=None):
+    """
+    Cria uma sessão incremental
+
+    Args:
+        modelo (str): 'mm1k', 'mmsk', 'mm1n' ou 'mmsn' (mm1k/mm1n fixam s = 1)
+
+    Raises:
+        ValueError: Se o modelo ou os parâmetros forem inválidos
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo '{modelo}' inválido. Use um de: {', '.join(MODELOS)}.")
+    if modelo in ('mm1k', 'mm1n'):
+        s = 1
+    if modelo.endswith('k'):
+        if K is None:
+            raise ValueError("O modelo exige a capacidade do sistema (K).")
+        return MMsKSession(lambda_, mu, s, K)
+    if N is None:
+        raise ValueError("O modelo exige o tamanho da população (N).")
+    return MMsNSession(lambda_, mu, s, N)
@@ -1,5 +1,18 @@
 import math
 
+from app.models.results import Resultado
+
+
+class ResultadoMG1(Resultado):
+    """Métricas do M/G/1 (também usadas pelo G/G/1)"""
+
+    __slots__ = ('rho', 'P0', 'Lq', 'Wq', 'L', 'W')
+    _BASICAS = ('rho', 'P0', 'Lq', 'Wq', 'L', 'W')
+
+    def __init__(self, rho, P0, Lq, Wq, L, W):
+        self.rho, self.P0, self.Lq, self.Wq, self.L, self.W = rho, P0, Lq, Wq, L, W
+
+
 def calculate_mg1(lambda_val, mu_val, var_service):
     """
     Interface para API - calcula métricas M/G/1
@@ -10,7 +23,7 @@ def calculate_mg1(lambda_val, mu_val, var_service):
     var_service (float): Variância do tempo de serviço (σ²)
 
     Retorna:
-    dict: Métricas calculadas
+    ResultadoMG1: Métricas calculadas (acesso como dict)
 
     Lança:
     ValueError: Se o sistema for instável (ρ >= 1)
@@ -28,7 +41,7 @@ def calcular_metricas_mg1(lambda_taxa, mu_taxa, variancia):
     variancia (float): Variância do tempo de serviço (σ²)
 
     Retorna:
-    dict: Um dicionário com as métricas calculadas ou None se o sistema for instável.
+    ResultadoMG1: As métricas calculadas (acesso como dict).
     """
 
     # --- 1. Calcular Rho (ρ) ---
@@ -56,16 +69,7 @@ def calcular_metricas_mg1(lambda_taxa, mu_taxa, variancia):
     W = Wq + (1 / mu_taxa)
 
     # --- 8. Retornar os resultados ---
-    metricas = {
-        "rho": rho,
-        "P0": P0,
-        "Lq": Lq,
-        "Wq": Wq,
-        "L": L,
-        "W": W
-    }
-
-    return metricas
+    return ResultadoMG1(rho, P0, Lq, Wq, L, W)
 
 def obter_entrada_float(prompt):
     """
@@ -18,7 +18,49 @@ Referência das fórmulas:
 
 import math
 
-def calculate_mm1(lambda_: float, mu: float, n: int = None, r: int = None, t: float = None) -> dict:
+from app.models.results import Resultado, preguicosa
+
+
+class ResultadoMM1(Resultado):
+    """Métricas do M/M/1; as opcionais são calculadas no primeiro acesso"""
+
+    __slots__ = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0', 'n', 'r', 't', '_folga',
+                 'Pn', 'PnMaiorQueR', 'PWMaiorQueT', 'PWqMaiorQueT')
+    _BASICAS = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0')
+    _OPCIONAIS = (('n', ('Pn', 'n')), ('r', ('PnMaiorQueR', 'r')), ('t', ('PWMaiorQueT', 'PWqMaiorQueT', 't')))
+
+    def __init__(self, lambda_, mu, n, r, t):
+        self.rho = rho = lambda_ / mu
+        self.L = rho / (1 - rho)
+        self.Lq = rho**2 / (1 - rho)
+        self.W = 1 / (mu - lambda_)
+        self.Wq = lambda_ / (mu * (mu - lambda_))
+        self.P0 = 1 - rho
+        self.n, self.r, self.t = n, r, t
+        self._folga = mu - lambda_
+
+    @preguicosa
+    def _Pn(self):
+        # P(n) = P0 * ρ^n
+        return self.P0 * (self.rho ** self.n)
+
+    @preguicosa
+    def _PnMaiorQueR(self):
+        # P(n>r) = ρ^(r+1)
+        return self.rho ** (self.r + 1)
+
+    @preguicosa
+    def _PWMaiorQueT(self):
+        # P(W>t) = e^(-(μ-λ)t)
+        return math.exp(-self._folga * self.t)
+
+    @preguicosa
+    def _PWqMaiorQueT(self):
+        # P(Wq>t) = ρ * e^(-(μ-λ)t)
+        return self.rho * self.PWMaiorQueT
+
+
+def calculate_mm1(lambda_: float, mu: float, n: int = None, r: int = None, t: float = None) -> ResultadoMM1:
     """
     Calcula métricas do modelo M/M/1
 
@@ -30,7 +72,8 @@ def calculate_mm1(lambda_: float, mu: float, n: int = None, r: int = None, t: fl
         t (float, optional): Tempo para calcular P(W>t) e P(Wq>t)
 
     Returns:
-        dict: Dicionário com as métricas calculadas:
+        ResultadoMM1: Métricas calculadas (acesso como dict; as opcionais
+        são calculadas no primeiro acesso):
             - rho: Utilização do servidor
             - L: Número médio de clientes no sistema
             - Lq: Número médio de clientes na fila
@@ -46,7 +89,7 @@ def calculate_mm1(lambda_: float, mu: float, n: int = None, r: int = None, t: fl
         ValueError: Se lambda >= mu (sistema instável) ou valores inválidos
 
     Exemplo:
-        >>> calculate_mm1(3, 5, n=2, r=3, t=1)
+        >>> calculate_mm1(3, 5, n=2, r=3, t=1).to_dict()
         {
             'rho': 0.6,
             'L': 1.5,
@@ -67,45 +110,11 @@ def calculate_mm1(lambda_: float, mu: float, n: int = None, r: int = None, t: fl
     if lambda_ >= mu:
         raise ValueError("Sistema instável: a taxa de chegada (λ) deve ser menor que a taxa de atendimento (μ).")
 
-    rho = lambda_ / mu
-    L = rho / (1 - rho)
-    Lq = rho**2 / (1 - rho)
-    W = 1 / (mu - lambda_)
-    Wq = lambda_ / (mu * (mu - lambda_))
-    P0 = 1 - rho
-
-    # Construir resultado com métricas básicas
-    result = {
-        'rho': rho,
-        'L': L,
-        'Lq': Lq,
-        'W': W,
-        'Wq': Wq,
-        'P0': P0
-    }
-
-    # Cálculos opcionais
-    if n is not None:
-        if n < 0:
-            raise ValueError("O número de clientes (n) deve ser não-negativo.")
-        # P(n) = P0 * ρ^n
-        result['Pn'] = P0 * (rho ** n)
-        result['n'] = n
-
-    if r is not None:
-        if r < 0:
-            raise ValueError("O limite (r) deve ser não-negativo.")
-        # P(n>r) = ρ^(r+1)
-        result['PnMaiorQueR'] = rho ** (r + 1)
-        result['r'] = r
-
-    if t is not None:
-        if t < 0:
-            raise ValueError("O tempo (t) deve ser não-negativo.")
-        # P(W>t) = e^(-(μ-λ)t)
-        result['PWMaiorQueT'] = math.exp(-(mu - lambda_) * t)
-        # P(Wq>t) = ρ * e^(-(μ-λ)t)
-        result['PWqMaiorQueT'] = rho * math.exp(-(mu - lambda_) * t)
-        result['t'] = t
+    if n is not None and n < 0:
+        raise ValueError("O número de clientes (n) deve ser não-negativo.")
+    if r is not None and r < 0:
+        raise ValueError("O limite (r) deve ser não-negativo.")
+    if t is not None and t < 0:
+        raise ValueError("O tempo (t) deve ser não-negativo.")
 
-    return result
+    return ResultadoMM1(lambda_, mu, n, r, t)
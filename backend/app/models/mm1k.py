@@ -1,4 +1,26 @@
-def calculate_mm1k(lambda_: float, mu: float, K: int, n: int = None) -> dict:
+"""
+Modelo M/M/1/K - Fila com 1 servidor e capacidade máxima K
+
+- P(n) = P0 × ρ^n (0 ≤ n ≤ K), ρ = λ/μ (pode ser > 1)
+- L = ρ/(1-ρ) - (K+1)×ρ^(K+1)/(1-ρ^(K+1)),  Lq = L - (1 - P0)
+
+Avaliado como o M/M/s/K com s = 1 (escala logarítmica, sem cancelamento
+perto de ρ = 1, com recálculo em alta precisão quando necessário).
+"""
+from app.models.batch import calculate_mm1k_batch
+from app.models.debug import registrar
+from app.models.mmsk import ResultadoMMSK
+from app.models.precision import verificar_resultado
+
+
+class ResultadoMM1K(ResultadoMMSK):
+    """Métricas do M/M/1/K (as do M/M/s/K com s = 1, mais K)"""
+
+    __slots__ = ()
+    _BASICAS = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0', 'PK', 'lambdaEfetivo', 'K', 'caminhoNumerico')
+
+
+def calculate_mm1k(lambda_: float, mu: float, K: int, n: int = None) -> ResultadoMM1K:
     """
     Calcula métricas do modelo M/M/1/K
 
@@ -9,7 +31,8 @@ def calculate_mm1k(lambda_: float, mu: float, K: int, n: int = None) -> dict:
         n (int, optional): Número de clientes para calcular P(n) (0 ≤ n ≤ K)
 
     Returns:
-        dict: Métricas calculadas
+        ResultadoMM1K: Métricas calculadas (acesso como dict; Pn é
+        calculado no primeiro acesso)
             - rho: λ/μ (pode ser > 1)
             - L: Número médio de clientes no sistema
             - Lq: Número médio de clientes na fila
@@ -19,49 +42,17 @@ def calculate_mm1k(lambda_: float, mu: float, K: int, n: int = None) -> dict:
             - PK: Probabilidade de sistema cheio (bloqueio)
             - lambdaEfetivo: Taxa efetiva de entrada
             - K: Capacidade do sistema
+            - caminhoNumerico: 'float64', 'alta-precisao' ou 'float64-limitado'
             - Pn (opcional): Probabilidade de n clientes
     """
     if not (lambda_ > 0 and mu > 0 and K > 0):
         raise ValueError("As taxas de chegada (λ), atendimento (μ) e a capacidade (K) devem ser positivas.")
+    if n is not None and (n < 0 or n > K):
+        raise ValueError(f"O número de clientes (n) deve estar entre 0 e K={K}.")
 
-    rho = lambda_ / mu
-    
-    if rho == 1:
-        P0 = 1 / (K + 1)
-        L = K / 2
-    else:
-        P0 = (1 - rho) / (1 - rho**(K + 1))
-        L_num = rho * (1 - (K + 1) * rho**K + K * rho**(K + 1))
-        L_den = (1 - rho) * (1 - rho**(K + 1))
-        L = L_num / L_den
-
-    PK = P0 * (rho**K)
-    lambda_eff = lambda_ * (1 - PK)
-
-    W = L / lambda_eff
-    Lq = L - (1 - P0)
-    Wq = Lq / lambda_eff
-
-    # Construir resultado com métricas básicas
-    result = {
-        'rho': rho,
-        'L': L,
-        'Lq': Lq,
-        'W': W,
-        'Wq': Wq,
-        'P0': P0,
-        'PK': PK,
-        'lambdaEfetivo': lambda_eff,
-        'K': K
-    }
-
-    # Cálculos opcionais
-    if n is not None:
-        if n < 0 or n > K:
-            raise ValueError(f"O número de clientes (n) deve estar entre 0 e K={K}.")
-
-        # P(n) = P0 * ρ^n (para 0 ≤ n ≤ K)
-        result['Pn'] = P0 * (rho ** n)
-        result['n'] = n
+    r = calculate_mm1k_batch(lambda_, mu, K)
+    verificar_resultado(r)
 
+    result = ResultadoMM1K(r, lambda_, mu, 1, K, n)
+    registrar(caminho=result.caminhoNumerico)
     return result
@@ -1,6 +1,101 @@
 import math
 
-def calculate_mms(lambda_: float, mu: float, s: int, n: int = None, r: int = None, t: float = None) -> dict:
+import numpy as np
+
+from app.models.batch import calculate_mms_batch
+from app.models.debug import fase, registrar, termos
+from app.models.numeric import log_power_ratio, log_sum_power_ratios
+from app.models.precision import CAMINHO_RAPIDO
+from app.models.qed import CAMINHO_ASSINTOTICO, S_MIN, TOLERANCIA_QED, erlang_qed
+from app.models.results import Resultado, preguicosa
+
+
+class ResultadoMMS(Resultado):
+    """
+    Métricas do M/M/s; as opcionais são calculadas no primeiro acesso
+
+    Guarda P0 (e log P0, que não sofre underflow), Lq e C; as probabilidades
+    de estado e de espera saem de C (estados n ≥ s: P(n) = C×(1-ρ)×ρ^(n-s))
+    e de log P0 (n < s: P(n) = P0×a^n/n!, pelo núcleo de app/models/numeric.py).
+    """
+
+    __slots__ = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0', 's', 'caminhoNumerico', 'erroEstimado', 'n', 'r', 't',
+                 '_lambda', '_mu', '_log_P0', 'C', 'PWqIgualZero', 'Pn', 'PnMaiorQueR', 'PWMaiorQueT', 'PWqMaiorQueT')
+    _BASICAS = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0', 's', 'caminhoNumerico', 'PWqIgualZero')
+    _OPCIONAIS = (
+        ('erroEstimado', ('erroEstimado',)),
+        ('n', ('Pn', 'n')),
+        ('r', ('PnMaiorQueR', 'r')),
+        ('t', ('PWqMaiorQueT', 'PWMaiorQueT', 't')),
+    )
+
+    def __init__(self, lambda_, mu, s, P0, Lq, caminho_numerico, n, r, t, C=None, erro_estimado=None,
+                 log_P0=None):
+        self.rho = lambda_ / (s * mu)
+        self.Lq = Lq
+        self.L = Lq + lambda_ / mu
+        self.Wq = Lq / lambda_
+        self.W = self.Wq + 1 / mu
+        self.P0 = P0
+        self.s = s
+        self.caminhoNumerico = caminho_numerico
+        self.erroEstimado = erro_estimado
+        self.n, self.r, self.t = n, r, t
+        self._lambda, self._mu = lambda_, mu
+        if log_P0 is None:
+            log_P0 = math.log(P0) if P0 > 0 else -math.inf
+        self._log_P0 = log_P0
+        if C is not None:
+            self.C = C
+
+    @preguicosa
+    def _C(self):
+        """Probabilidade de Erlang C (todos os servidores ocupados)"""
+        return self.Lq * (1 - self.rho) / self.rho
+
+    @preguicosa
+    def _PWqIgualZero(self):
+        # Probabilidade de não esperar na fila (atendimento imediato)
+        return 1 - self.C
+
+    def _probabilidade(self, n):
+        if n >= self.s:
+            # n >= s: P(n) = P0 * (λ/μ)^n / (s! * s^(n-s)) = C * (1-ρ) * ρ^(n-s)
+            return self.C * (1 - self.rho) * self.rho ** (n - self.s)
+        # n < s: P(n) = P0 * (λ/μ)^n / n!
+        return math.exp(self._log_P0 + float(log_power_ratio(self._lambda / self._mu, n)))
+
+    @preguicosa
+    def _Pn(self):
+        return self._probabilidade(self.n)
+
+    @preguicosa
+    def _PnMaiorQueR(self):
+        # P(n>r) - Probabilidade de mais de r clientes
+        if self.r >= self.s:
+            # Quando r >= s: P(n>r) = P(r) * ρ/(1-ρ) = C * ρ^(r-s+1)
+            return self.C * self.rho ** (self.r - self.s + 1)
+        # Para r < s: P(n>r) = 1 - sum(P(i) for i=0 to r) = 1 - P0 * Σ(i=0 até r) a^i/i!
+        with fase('PnMaiorQueR'):
+            sum_prob = math.exp(self._log_P0 + log_sum_power_ratios(self._lambda / self._mu, self.r + 1))
+            termos(self.r + 1)
+        return 1 - sum_prob
+
+    @preguicosa
+    def _PWqMaiorQueT(self):
+        # P(Wq>t) = C * e^(-s*μ*(1-ρ)*t)
+        return self.C * math.exp(-self.s * self._mu * (1 - self.rho) * self.t)
+
+    @preguicosa
+    def _PWMaiorQueT(self):
+        # Aproximação: P(W>t) ≈ C * e^(-s*μ*(1-ρ)*(t - 1/μ)) se t > 1/μ, senão 1.0
+        if self.t > 1 / self._mu:
+            return self.C * math.exp(-self.s * self._mu * (1 - self.rho) * (self.t - 1 / self._mu))
+        return 1.0
+
+
+def calculate_mms(lambda_: float, mu: float, s: int, n: int = None, r: int = None, t: float = None,
+                  tolerancia: float = TOLERANCIA_QED) -> ResultadoMMS:
     """
     Calcula métricas do modelo M/M/s
 
@@ -11,20 +106,30 @@ def calculate_mms(lambda_: float, mu: float, s: int, n: int = None, r: int = Non
         n (int, optional): Número de clientes para calcular P(n)
         r (int, optional): Limite para calcular P(n>r)
         t (float, optional): Tempo para calcular P(W>t) e P(Wq>t)
+        tolerancia (float): Erro relativo máximo aceito na aproximação
+            assintótica (padrão: TOLERANCIA_QED)
 
     Returns:
-        dict: Métricas calculadas
+        ResultadoMMS: Métricas calculadas (acesso como dict; as opcionais
+        são calculadas no primeiro acesso)
             - rho: Taxa de ocupação por servidor
             - L: Número médio de clientes no sistema
             - Lq: Número médio de clientes na fila
             - W: Tempo médio no sistema
             - Wq: Tempo médio na fila
             - P0: Probabilidade de sistema vazio
-            - PWqIgualZero (opcional): Probabilidade de não esperar
+            - PWqIgualZero: Probabilidade de não esperar
             - Pn (opcional): Probabilidade de n clientes
             - PnMaiorQueR (opcional): Probabilidade de mais de r clientes
             - PWMaiorQueT (opcional): Probabilidade de W > t
             - PWqMaiorQueT (opcional): Probabilidade de Wq > t
+            - caminhoNumerico: 'float64' (exato) ou 'assintotico-qed'
+            - erroEstimado (só no caminho assintótico): Limite estimado do
+              erro relativo de C, Lq e Wq
+
+    Com s ≥ S_MIN a aproximação de Halfin–Whitt/QED (app/models/qed.py) é
+    usada quando o erro estimado fica dentro de `tolerancia` e n e r (se
+    informados) são ≥ s; caso contrário o cálculo é o exato.
 
     Raises:
         ValueError: Se lambda >= s*mu (sistema instável) ou valores inválidos
@@ -35,83 +140,40 @@ def calculate_mms(lambda_: float, mu: float, s: int, n: int = None, r: int = Non
     if lambda_ >= s * mu:
         raise ValueError("Sistema instável: a taxa de chegada (λ) deve ser menor que a capacidade total de atendimento (s * μ).")
 
+    if n is not None and n < 0:
+        raise ValueError("O número de clientes (n) deve ser não-negativo.")
+    if r is not None and r < 0:
+        raise ValueError("O limite (r) deve ser não-negativo.")
+    if t is not None and t < 0:
+        raise ValueError("O tempo (t) deve ser não-negativo.")
+    if not tolerancia > 0:
+        raise ValueError("A tolerância deve ser positiva.")
+
+    # Servidores demais para as somas O(s): aproximação assintótica, se couber na tolerância
+    if s >= S_MIN and (n is None or n >= s) and (r is None or r >= s):
+        erro = float(erlang_qed(lambda_ / mu, s)['erro'])
+        if erro <= tolerancia:
+            # Métricas pela aproximação QED (app/models/qed.py), sem somas O(s)
+            b = calculate_mms_batch(lambda_, mu, s, tolerancia=tolerancia)
+            registrar(caminho=CAMINHO_ASSINTOTICO, erroEstimado=erro)
+            return ResultadoMMS(lambda_, mu, s, float(b['P0']), float(b['Lq']), CAMINHO_ASSINTOTICO,
+                                n, r, t, C=float(b['C']), erro_estimado=erro)
+
+    registrar(caminho=CAMINHO_RAPIDO)
     rho = lambda_ / (s * mu)
-    
-    # Cálculo de P0
-    sum_part = sum([(s * rho)**n / math.factorial(n) for n in range(s)])
-    last_part = (s * rho)**s / (math.factorial(s) * (1 - rho))
-    P0 = 1 / (sum_part + last_part)
-
-    # Cálculo de Lq (Erlang C)
-    Lq = (P0 * (s * rho)**s * rho) / (math.factorial(s) * (1 - rho)**2)
-    
-    # Outras métricas
-    L = Lq + lambda_ / mu
-    Wq = Lq / lambda_
-    W = Wq + 1 / mu
-
-    # Construir resultado com métricas básicas
-    result = {
-        'rho': rho,
-        'L': L,
-        'Lq': Lq,
-        'W': W,
-        'Wq': Wq,
-        'P0': P0,
-        's': s
-    }
-
-    # Calcular C (Probabilidade de Erlang C - todos servidores ocupados)
-    # C é útil para vários cálculos opcionais
-    C = P0 * ((s * rho) ** s) / (math.factorial(s) * (1 - rho))
-
-    # Probabilidade de não esperar na fila (atendimento imediato)
-    # Sempre calculamos isso para M/M/s
-    result['PWqIgualZero'] = 1 - C
-
-    # Função auxiliar para calcular P(n)
-    def calculate_Pn(n_val):
-        if n_val < s:
-            # n < s: P(n) = P0 * (λ/μ)^n / n!
-            return P0 * ((lambda_ / mu) ** n_val) / math.factorial(n_val)
-        else:
-            # n >= s: P(n) = P0 * (λ/μ)^n / (s! * s^(n-s))
-            return P0 * ((lambda_ / mu) ** n_val) / (math.factorial(s) * (s ** (n_val - s)))
-
-    # Cálculos opcionais
-    if n is not None:
-        if n < 0:
-            raise ValueError("O número de clientes (n) deve ser não-negativo.")
-        result['Pn'] = calculate_Pn(n)
-        result['n'] = n
-
-    if r is not None:
-        if r < 0:
-            raise ValueError("O limite (r) deve ser não-negativo.")
-        # P(n>r) - Probabilidade de mais de r clientes
-        if r >= s:
-            # Quando r >= s, usar fórmula: P(n>r) = P(r) * ρ/(1-ρ)
-            Pr = calculate_Pn(r)
-            result['PnMaiorQueR'] = Pr * rho / (1 - rho)
-        else:
-            # Para r < s, calcular soma das probabilidades
-            # P(n>r) = 1 - sum(P(i) for i=0 to r)
-            sum_prob = sum(calculate_Pn(i) for i in range(r + 1))
-            result['PnMaiorQueR'] = 1 - sum_prob
-        result['r'] = r
-
-    if t is not None:
-        if t < 0:
-            raise ValueError("O tempo (t) deve ser não-negativo.")
-        # P(Wq>t) = C * e^(-s*μ*(1-ρ)*t)
-        result['PWqMaiorQueT'] = C * math.exp(-s * mu * (1 - rho) * t)
-
-        # P(W>t) - Probabilidade de tempo no sistema > t
-        # Aproximação: P(W>t) ≈ C * e^(-s*μ*(1-ρ)*(t - 1/μ)) se t > 1/μ, senão 1.0
-        if t > 1 / mu:
-            result['PWMaiorQueT'] = C * math.exp(-s * mu * (1 - rho) * (t - 1 / mu))
-        else:
-            result['PWMaiorQueT'] = 1.0
-        result['t'] = t
-
-    return result
+    a = s * rho
+
+    # Cálculo de P0, em escala logarítmica (sem s! nem a^s: não estoura com s grande)
+    with fase('P0'):
+        # log da última parcela: a^s / (s! * (1-ρ))
+        log_last_part = float(log_power_ratio(a, s)) - math.log1p(-rho)
+        log_Z = float(np.logaddexp(log_sum_power_ratios(a, s), log_last_part))
+        P0 = math.exp(-log_Z)
+        termos(s + 1)
+
+    # Cálculo de Lq (Erlang C): C = P0 * a^s / (s! * (1-ρ)),  Lq = C * ρ/(1-ρ)
+    with fase('Lq'):
+        C = math.exp(log_last_part - log_Z)
+        Lq = C * rho / (1 - rho)
+
+    return ResultadoMMS(lambda_, mu, s, P0, Lq, CAMINHO_RAPIDO, n, r, t, C=C, log_P0=-log_Z)
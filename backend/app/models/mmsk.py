@@ -1,9 +1,56 @@
 """
 Modelo M/M/s/K - Múltiplos servidores com capacidade máxima
+
+Pesos dos estados (fórmula do PDF):
+- n < s:       P(n) = P0 × (s×ρ)^n / n!
+- s ≤ n ≤ K:   P(n) = P0 × (s×ρ)^s / s! × ρ^(n-s)
+
+As somas são avaliadas em float64 e escala logarítmica (sem fatoriais nem
+potências que estouram) e, se a estimativa de erro indicar perda de precisão
+(ex.: ρ muito grande), recalculadas em alta precisão (app/models/precision.py).
 """
 import math
+import sys
+
+from app.models.batch import calculate_mmsk_batch
+from app.models.debug import registrar
+from app.models.numeric import log_power_ratio
+from app.models.precision import caminho, verificar_resultado
+from app.models.results import Resultado, preguicosa
+
+
+def _log_peso(a, s, n):
+    # log do peso do estado n (P(n) = P0 × peso): a^n/n! ou a^s/s! × (a/s)^(n-s)
+    if n < s:
+        return float(log_power_ratio(a, n))
+    return float(log_power_ratio(a, s)) + (n - s) * math.log(a / s)
+
 
-def calculate_mmsk(lambda_: float, mu: float, s: int, K: int, n: int = None) -> dict:
+class ResultadoMMSK(Resultado):
+    """Métricas do M/M/s/K; P(n) é calculado no primeiro acesso, a partir de P0"""
+
+    __slots__ = ('rho', 'P0', 'PK', 'lambdaEfetivo', 'L', 'Lq', 'W', 'Wq', 'caminhoNumerico', 'K', 'n',
+                 '_lambda', '_mu', '_s', 'Pn')
+    _METRICAS = ('rho', 'P0', 'PK', 'lambdaEfetivo', 'L', 'Lq', 'W', 'Wq')
+    _BASICAS = _METRICAS + ('caminhoNumerico',)
+    _OPCIONAIS = (('n', ('Pn', 'n')),)
+
+    def __init__(self, r, lambda_, mu, s, K, n):
+        for chave in self._METRICAS:
+            setattr(self, chave, float(r[chave]))
+        self.caminhoNumerico = caminho(r['altaPrecisao'], r['precisaoLimitada'])
+        self.K, self.n = K, n
+        self._lambda, self._mu, self._s = lambda_, mu, s
+
+    @preguicosa
+    def _Pn(self):
+        # P(n) = P0 × peso(n) em escala logarítmica; com P0 em underflow, pelo lote
+        if self.P0 >= sys.float_info.min:
+            return math.exp(math.log(self.P0) + _log_peso(self._lambda / self._mu, self._s, self.n))
+        return float(calculate_mmsk_batch(self._lambda, self._mu, self._s, self.K, self.n)['Pn'])
+
+
+def calculate_mmsk(lambda_: float, mu: float, s: int, K: int, n: int = None) -> ResultadoMMSK:
     """
     Calcula métricas do modelo M/M/s/K
 
@@ -15,7 +62,8 @@ def calculate_mmsk(lambda_: float, mu: float, s: int, K: int, n: int = None) ->
         n (int, optional): Número de clientes para calcular P(n) (0 ≤ n ≤ K)
 
     Returns:
-        dict: Métricas calculadas
+        ResultadoMMSK: Métricas calculadas (acesso como dict; Pn é
+        calculado no primeiro acesso)
             - rho: Taxa de ocupação por servidor (λ/(s×μ))
             - P0: Probabilidade de sistema vazio
             - PK: Probabilidade de sistema cheio (bloqueio)
@@ -24,94 +72,17 @@ def calculate_mmsk(lambda_: float, mu: float, s: int, K: int, n: int = None) ->
             - Lq: Número médio de clientes na fila
             - W: Tempo médio no sistema
             - Wq: Tempo médio na fila
+            - caminhoNumerico: 'float64', 'alta-precisao' ou 'float64-limitado'
             - Pn (opcional): Probabilidade de n clientes
     """
     if not (lambda_ > 0 and mu > 0 and s >= 2 and K >= s):
         raise ValueError("λ > 0, μ > 0, s ≥ 2 e K ≥ s são necessários.")
+    if n is not None and (n < 0 or n > K):
+        raise ValueError(f"O número de clientes (n) deve estar entre 0 e K={K}.")
+
+    r = calculate_mmsk_batch(lambda_, mu, s, K)
+    verificar_resultado(r)
 
-    # ρ = λ/(s×μ)
-    rho = lambda_ / (s * mu)
-    
-    # Cálculo de P0 usando a fórmula do PDF
-    # P0 = 1 / [Σ(n=0 até s-1) (s×ρ)^n/n! + (s×ρ)^s/s! × Σ(n=s até K) ρ^(n-s)]
-    
-    # Primeira soma: n = 0 até s-1
-    sum1 = 0
-    s_rho = s * rho
-    for i in range(s):
-        sum1 += (s_rho ** i) / math.factorial(i)
-    
-    # Segunda soma: n = s até K
-    # Σ(n=s até K) ρ^(n-s) = Σ(j=0 até K-s) ρ^j (onde j = n-s)
-    if rho == 1:
-        sum2 = K - s + 1  # quando ρ=1, a soma é simplesmente o número de termos
-    else:
-        sum2 = (1 - rho**(K - s + 1)) / (1 - rho)
-    
-    # P0 = 1 / [sum1 + (s×ρ)^s/s! × sum2]
-    P0 = 1 / (sum1 + ((s_rho ** s) / math.factorial(s)) * sum2)
-    
-    # P(K) - Probabilidade de sistema cheio
-    if K < s:
-        # Se K < s (não deveria acontecer pela validação, mas por garantia)
-        PK = P0 * ((s_rho ** K) / math.factorial(K))
-    else:
-        # K ≥ s: P(K) = P0 × (s×ρ)^s/s! × ρ^(K-s)
-        PK = P0 * ((s_rho ** s) / math.factorial(s)) * (rho ** (K - s))
-    
-    # λ efetivo
-    lambda_eff = lambda_ * (1 - PK)
-    
-    # Lq - Número médio de clientes na fila
-    # Lq = P0 × (s×ρ)^s × ρ / s! × [1 - ρ^(K-s) - (K-s)×(1-ρ)×ρ^(K-s)] / (1-ρ)²
-    if rho == 1:
-        # Caso especial quando ρ = 1
-        Lq = P0 * ((s_rho ** s) / math.factorial(s)) * ((K - s) * (K - s + 1) / 2)
-    else:
-        numerator = 1 - (rho ** (K - s)) - (K - s) * (1 - rho) * (rho ** (K - s))
-        denominator = (1 - rho) ** 2
-        Lq = P0 * ((s_rho ** s) * rho / math.factorial(s)) * (numerator / denominator)
-    
-    # L - Número médio de clientes no sistema
-    # L = Lq + s - s×P0 - Σ(n=1 até s-1) (s-n)×P(n)
-    # Ou alternativamente: L = Lq + λ_eff/μ (número médio em serviço)
-    sum_busy = 0
-    for i in range(1, s):
-        # P(n) para n < s: P(n) = P0 × (s×ρ)^n / n!
-        Pn_i = P0 * ((s_rho ** i) / math.factorial(i))
-        sum_busy += (s - i) * Pn_i
-    
-    L = Lq + s - s * P0 - sum_busy
-    
-    # W e Wq usando Lei de Little
-    W = L / lambda_eff if lambda_eff > 0 else 0
-    Wq = Lq / lambda_eff if lambda_eff > 0 else 0
-    
-    # Construir resultado com métricas básicas
-    result = {
-        'rho': rho,
-        'P0': P0,
-        'PK': PK,
-        'lambdaEfetivo': lambda_eff,
-        'L': L,
-        'Lq': Lq,
-        'W': W,
-        'Wq': Wq,
-    }
-    
-    # Cálculo opcional de P(n)
-    if n is not None:
-        if n < 0 or n > K:
-            raise ValueError(f"O número de clientes (n) deve estar entre 0 e K={K}.")
-        
-        if n < s:
-            # P(n) = P0 × (s×ρ)^n / n!  para n < s
-            Pn = P0 * ((s_rho ** n) / math.factorial(n))
-        else:
-            # P(n) = P0 × (s×ρ)^s / s! × ρ^(n-s)  para s ≤ n ≤ K
-            Pn = P0 * ((s_rho ** s) / math.factorial(s)) * (rho ** (n - s))
-        
-        result['Pn'] = Pn
-        result['n'] = n
-    
+    result = ResultadoMMSK(r, lambda_, mu, s, K, n)
+    registrar(caminho=result.caminhoNumerico)
     return result
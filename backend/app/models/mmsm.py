@@ -0,0 +1,78 @@
+"""
+Modelo M/M/s+M (Erlang A) - Múltiplos servidores com abandono
+
+Cada cliente na fila desiste após um tempo exponencial de taxa θ. Como a
+fila perde clientes, o sistema é estável para qualquer λ (inclusive λ ≥ s×μ).
+
+Referência das fórmulas (x = λ/θ, y = s×μ/θ, a = λ/μ):
+- A(x, y) = e^x × x^(-y) × Γ(y+1) × P(y, x)   (P = gama incompleta regularizada)
+- P(W>0) = A×B / (1 - B + A×B), B = Erlang B(s, a)
+- P(abandono) = θ × Lq / λ
+- λ efetivo (atendidos) = λ × (1 - P(abandono))
+- P(Wq>t) = P(W>0) × P(y, x×e^(-θt)) / P(y, x)   (espera ofertada)
+"""
+from app.models.erlang import erlang_a_batch
+from app.models.results import Resultado
+
+
+class ResultadoMMSM(Resultado):
+    """
+    Métricas do M/M/s+M
+
+    P(Wq>t) sai da mesma passagem do Erlang A que as demais métricas (a
+    forma fechada e a série compartilham os termos), então não é adiada.
+    """
+
+    __slots__ = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0', 'PWqIgualZero', 'PAbandono', 'lambdaEfetivo', 's', 'theta',
+                 'PWqMaiorQueT', 't')
+    _BASICAS = ('rho', 'L', 'Lq', 'W', 'Wq', 'P0', 'PWqIgualZero', 'PAbandono', 'lambdaEfetivo', 's', 'theta')
+    _OPCIONAIS = (('t', ('PWqMaiorQueT', 't')),)
+
+    def __init__(self, r, lambda_, mu, s, theta, t):
+        self.Lq = Lq = float(r['Lq'])
+        self.PAbandono = float(r['PAbandono'])
+        self.lambdaEfetivo = lambda_eff = lambda_ * (1 - self.PAbandono)
+        self.L = L = Lq + lambda_eff / mu
+        self.Wq = Lq / lambda_
+        self.W = L / lambda_
+        self.rho = lambda_ / (s * mu)
+        self.P0 = float(r['P0'])
+        self.PWqIgualZero = float(r['livre'])
+        self.s, self.theta, self.t = s, theta, t
+        self.PWqMaiorQueT = float(r['PWqMaiorQueT']) if t is not None else None
+
+
+def calculate_mmsm(lambda_: float, mu: float, s: int, theta: float, t: float = None) -> ResultadoMMSM:
+    """
+    Calcula métricas do modelo M/M/s+M (Erlang A)
+
+    Args:
+        lambda_ (float): Taxa de chegada
+        mu (float): Taxa de atendimento por servidor
+        s (int): Número de servidores
+        theta (float): Taxa de abandono (1/paciência média)
+        t (float, optional): Tempo para calcular P(Wq>t)
+
+    Returns:
+        ResultadoMMSM: Métricas calculadas (acesso como dict)
+            - rho: λ/(s×μ) (pode ser ≥ 1)
+            - L: Número médio de clientes no sistema
+            - Lq: Número médio de clientes na fila
+            - W: Tempo médio no sistema (todos os clientes)
+            - Wq: Tempo médio na fila (todos os clientes, inclusive os que desistem)
+            - P0: Probabilidade de sistema vazio
+            - PWqIgualZero: Probabilidade de não esperar
+            - PAbandono: Probabilidade de desistir
+            - lambdaEfetivo: Taxa de clientes atendidos (throughput)
+            - PWqMaiorQueT (opcional): Probabilidade de espera ofertada > t
+
+    Raises:
+        ValueError: Se os valores forem inválidos
+    """
+    if not (lambda_ > 0 and mu > 0 and s > 0 and theta > 0):
+        raise ValueError("As taxas de chegada (λ), atendimento (μ), abandono (θ) e o número de servidores (s) devem ser positivos.")
+
+    if t is not None and t < 0:
+        raise ValueError("O tempo (t) deve ser não-negativo.")
+
+    return ResultadoMMSM(erlang_a_batch(lambda_, mu, s, theta, t), lambda_, mu, s, theta, t)
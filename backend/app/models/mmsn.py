@@ -1,9 +1,62 @@
 """
 Modelo M/M/s/N - Múltiplos servidores com população finita
+
+Com N clientes na população, a taxa de chegada no estado n é (N-n)×λ e a de
+atendimento é min(n, s)×μ:
+- n < s:       P(n) = P0 × N!/((N-n)!×n!) × (λ/μ)^n
+- s ≤ n ≤ N:   P(n) = P0 × N!/((N-n)!×s!×s^(n-s)) × (λ/μ)^n
+
+As somas são avaliadas em float64 e escala logarítmica (acumuladas da
+binomial e da Poisson, sem fatoriais de N) e, se a estimativa de erro
+indicar perda de precisão, recalculadas em alta precisão
+(app/models/precision.py).
 """
 import math
+import sys
+
+from app.models.batch import calculate_mmsn_batch
+from app.models.debug import registrar
+from app.models.numeric import log_binomial, log_factorial
+from app.models.precision import caminho, verificar_resultado
+from app.models.results import Resultado, preguicosa
+
+
+def _log_peso(a, s, N, n):
+    # log do peso do estado n (P(n) = P0 × peso)
+    # n < s: N!/((N-n)!×n!) × a^n = C(N, n) × a^n
+    log_peso = float(log_binomial(N, n)) + n * math.log(a)
+    if n < s:
+        return log_peso
+    # s ≤ n: o n! do denominador vira s!×s^(n-s)
+    return log_peso + float(log_factorial(n) - log_factorial(s)) - (n - s) * math.log(s)
+
 
-def calculate_mmsn(lambda_: float, mu: float, s: int, N: int, n: int = None) -> dict:
+class ResultadoMMSN(Resultado):
+    """Métricas do M/M/s/N; P(n) é calculado no primeiro acesso, a partir de P0"""
+
+    __slots__ = ('rho', 'P0', 'L', 'Lq', 'W', 'Wq', 'lambdaEfetivo', 'numOperacionais', 'PWqIgualZero',
+                 'caminhoNumerico', 'N', 'n', '_lambda', '_mu', '_s', 'Pn')
+    _METRICAS = ('rho', 'P0', 'L', 'Lq', 'W', 'Wq', 'lambdaEfetivo', 'numOperacionais', 'PWqIgualZero')
+    _BASICAS = _METRICAS + ('caminhoNumerico',)
+    _OPCIONAIS = (('n', ('Pn', 'n')),)
+
+    def __init__(self, r, lambda_, mu, s, N, n):
+        for chave in self._METRICAS:
+            if chave in r:
+                setattr(self, chave, float(r[chave]))
+        self.caminhoNumerico = caminho(r['altaPrecisao'], r['precisaoLimitada'])
+        self.N, self.n = N, n
+        self._lambda, self._mu, self._s = lambda_, mu, s
+
+    @preguicosa
+    def _Pn(self):
+        # P(n) = P0 × peso(n) em escala logarítmica; com P0 em underflow, pelo lote
+        if self.P0 >= sys.float_info.min:
+            return math.exp(math.log(self.P0) + _log_peso(self._lambda / self._mu, self._s, self.N, self.n))
+        return float(calculate_mmsn_batch(self._lambda, self._mu, self._s, self.N, self.n)['Pn'])
+
+
+def calculate_mmsn(lambda_: float, mu: float, s: int, N: int, n: int = None) -> ResultadoMMSN:
     """
     Calcula métricas do modelo M/M/s/N
 
@@ -15,7 +68,8 @@ def calculate_mmsn(lambda_: float, mu: float, s: int, N: int, n: int = None) ->
         n (int, optional): Número de clientes para calcular P(n) (0 ≤ n ≤ N)
 
     Returns:
-        dict: Métricas calculadas
+        ResultadoMMSN: Métricas calculadas (acesso como dict; Pn é
+        calculado no primeiro acesso)
             - rho: Fator de utilização (N×λ/(s×μ))
             - P0: Probabilidade de sistema vazio
             - L: Número médio de clientes no sistema
@@ -25,106 +79,17 @@ def calculate_mmsn(lambda_: float, mu: float, s: int, N: int, n: int = None) ->
             - lambdaEfetivo: Taxa efetiva de chegada (λ(N-L))
             - numOperacionais: Número médio de clientes operacionais (N-L)
             - PWqIgualZero: Probabilidade de não esperar na fila
+            - caminhoNumerico: 'float64', 'alta-precisao' ou 'float64-limitado'
             - Pn (opcional): Probabilidade de n clientes
     """
     if not (lambda_ > 0 and mu > 0 and s >= 2 and N > s):
         raise ValueError("λ > 0, μ > 0, s ≥ 2 e N > s são necessários.")
+    if n is not None and (n < 0 or n > N):
+        raise ValueError(f"O número de clientes (n) deve estar entre 0 e N={N}.")
+
+    r = calculate_mmsn_batch(lambda_, mu, s, N)
+    verificar_resultado(r)
 
-    # ρ = N×λ/(s×μ) - fator de utilização
-    rho = (N * lambda_) / (s * mu)
-    
-    # Cálculo de P0 usando a fórmula do PDF
-    # P0 = 1 / [Σ(n=0 até s-1) C(N,n)×(λ/μ)^n + Σ(n=s até N) C(N,n)×(λ/μ)^n×(s^s/s!)/s^n]
-    
-    # Função auxiliar para calcular combinação C(N,n)
-    def combinacao(N, n):
-        if n > N or n < 0:
-            return 0
-        return math.factorial(N) // (math.factorial(n) * math.factorial(N - n))
-    
-    # Razão λ/μ
-    lambda_mu = lambda_ / mu
-    
-    # Primeira soma: n = 0 até s-1
-    sum1 = 0
-    for i in range(min(s, N + 1)):
-        sum1 += combinacao(N, i) * (lambda_mu ** i)
-    
-    # Segunda soma: n = s até N
-    sum2 = 0
-    s_fatorial = math.factorial(s)
-    for i in range(s, N + 1):
-        # C(N,n) × (λ/μ)^n × s^s / (s! × s^n)
-        # = C(N,n) × (λ/μ)^n × s^s / (s! × s^n)
-        # = C(N,n) × (λ/μ)^n × s^(s-n) / s!
-        term = combinacao(N, i) * (lambda_mu ** i) * (s ** s) / (s_fatorial * (s ** i))
-        sum2 += term
-    
-    P0 = 1 / (sum1 + sum2)
-    
-    # Cálculo de L - número médio de clientes no sistema
-    # L = Σ(n=0 até N) n × P(n)
-    L = 0
-    for i in range(N + 1):
-        if i < s:
-            # P(n) = C(N,n) × (λ/μ)^n × P0  para n < s
-            Pn = combinacao(N, i) * (lambda_mu ** i) * P0
-        else:
-            # P(n) = C(N,n) × (λ/μ)^n × s^s / (s! × s^n) × P0  para s ≤ n ≤ N
-            Pn = combinacao(N, i) * (lambda_mu ** i) * (s ** s) / (s_fatorial * (s ** i)) * P0
-        L += i * Pn
-    
-    # λ efetivo = λ(N - L)
-    lambda_eff = lambda_ * (N - L)
-    
-    # N - L (número médio de clientes operacionais/fora do sistema)
-    num_operacionais = N - L
-    
-    # W e Wq usando Lei de Little
-    W = L / lambda_eff if lambda_eff > 0 else 0
-    
-    # Lq - número médio de clientes na fila
-    # Lq = Σ(n=s até N) (n-s) × P(n)
-    Lq = 0
-    for i in range(s, N + 1):
-        Pn = combinacao(N, i) * (lambda_mu ** i) * (s ** s) / (s_fatorial * (s ** i)) * P0
-        Lq += (i - s) * Pn
-    
-    Wq = Lq / lambda_eff if lambda_eff > 0 else 0
-    
-    # P(Wq = 0) - Probabilidade de não esperar na fila
-    # P(Wq = 0) = Σ(n=0 até s-1) P(n) (todos os clientes que chegam e não precisam esperar)
-    PWqIgualZero = 0
-    for i in range(min(s, N + 1)):
-        Pn = combinacao(N, i) * (lambda_mu ** i) * P0
-        PWqIgualZero += Pn
-    
-    # Construir resultado com métricas básicas
-    result = {
-        'rho': rho,
-        'P0': P0,
-        'L': L,
-        'Lq': Lq,
-        'W': W,
-        'Wq': Wq,
-        'lambdaEfetivo': lambda_eff,
-        'numOperacionais': num_operacionais,
-        'PWqIgualZero': PWqIgualZero,
-    }
-    
-    # Cálculo opcional de P(n)
-    if n is not None:
-        if n < 0 or n > N:
-            raise ValueError(f"O número de clientes (n) deve estar entre 0 e N={N}.")
-        
-        if n < s:
-            # P(n) = C(N,n) × (λ/μ)^n × P0  para n < s
-            Pn = combinacao(N, n) * (lambda_mu ** n) * P0
-        else:
-            # P(n) = C(N,n) × (λ/μ)^n × s^s / (s! × s^n) × P0  para s ≤ n ≤ N
-            Pn = combinacao(N, n) * (lambda_mu ** n) * (s ** s) / (s_fatorial * (s ** n)) * P0
-        
-        result['Pn'] = Pn
-        result['n'] = n
-    
+    result = ResultadoMMSN(r, lambda_, mu, s, N, n)
+    registrar(caminho=result.caminhoNumerico)
     return result
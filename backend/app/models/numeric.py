@@ -0,0 +1,151 @@
+"""
+Núcleo numérico compartilhado pelos modelos (tudo em escala logarítmica)
+
+- Tabela de log-fatoriais log(n!) = lgamma(n+1), calculada de forma
+  vetorizada e ampliada sob demanda (dobrando de tamanho), para evitar
+  math.factorial e inteiros gigantes nos laços dos modelos;
+- log-binomiais log C(n, k) a partir da mesma tabela;
+- log_sum_exp: log Σ exp(termos) sem overflow nem underflow;
+- razões x^n/n! (pesos de Poisson sem o fator e^(-x)): o termo isolado
+  (log_power_ratio) e a soma dos n primeiros (log_sum_power_ratios), em
+  blocos de memória limitada.
+
+É usado pelo Erlang B/C/A (app/models/erlang.py), pelas versões vetorizadas
+(app/models/batch.py), pelas sessões incrementais e pelos modelos escalares
+(M/M/s exato, P(n) do M/M/s/K e do M/M/s/N).
+
+No servidor de produção a tabela é pré-calculada antes do fork dos workers
+(ver app/server.py), então todos os processos a compartilham por
+copy-on-write em vez de cada um montar a sua.
+
+O scipy.special (~100 ms de importação) é importado só dentro das funções
+que o usam, aqui e nos módulos de modelos: carregar um blueprint ou
+calcular um modelo que não precisa dele (ex.: M/M/1) não paga esse custo.
+A tabela de log-fatoriais também só é montada no primeiro uso.
+"""
+import numpy as np
+
+from app.models.prazo import verificar_prazo
+
+# Tamanho pré-calculado no servidor de produção (8 MB de float64)
+PRELOAD_SIZE = 1_000_000
+
+# A tabela não cresce além disto (32 MB); acima, usa-se lgamma diretamente
+MAX_TABLE_SIZE = 1 << 22
+
+# Termos por bloco em log_sum_power_ratios (memória e intervalo entre
+# verificações de prazo)
+BLOCO_TERMOS = 1 << 16
+
+# Tamanho mínimo da tabela, montada no primeiro uso
+_TABELA_INICIAL = 1024
+
+_log_factorial = np.zeros(0)
+
+
+def log_factorial_table(n):
+    """
+    Tabela com log(k!) para k = 0..n (pelo menos)
+
+    Args:
+        n (int): Maior k necessário
+
+    Returns:
+        np.ndarray: Tabela somente leitura; tabela[k] = log(k!)
+    """
+    global _log_factorial
+    if n >= _log_factorial.size:
+        from scipy.special import gammaln
+        tamanho = max(int(n) + 1, 2 * _log_factorial.size, _TABELA_INICIAL)
+        tabela = gammaln(np.arange(1, tamanho + 1, dtype=np.float64))
+        tabela.flags.writeable = False
+        _log_factorial = tabela
+    return _log_factorial
+
+
+def log_factorial(n):
+    """
+    log(n!) para um inteiro ou array de inteiros não-negativos
+
+    Aceita também arrays float (como os parâmetros s, K e N dos modelos
+    vetorizados): valores inteiros até MAX_TABLE_SIZE vêm da tabela, os demais
+    (não inteiros, NaN ou muito grandes) de lgamma(n+1).
+    """
+    from scipy.special import gammaln
+    n = np.asarray(n)
+    if n.dtype.kind in 'iu':
+        if not n.size:
+            return np.zeros(n.shape)
+        if int(n.max()) < MAX_TABLE_SIZE and int(n.min()) >= 0:
+            return log_factorial_table(int(n.max()))[n]
+        return gammaln(n + 1.0)
+
+    n = n.astype(np.float64, copy=False)
+    with np.errstate(invalid='ignore'):
+        na_tabela = (n >= 0) & (n < MAX_TABLE_SIZE) & (n == np.floor(n))
+    if na_tabela.all():
+        if not n.size:
+            return np.zeros(n.shape)
+        indices = n.astype(np.int64)
+        return log_factorial_table(int(indices.max()))[indices]
+    result = gammaln(n + 1)
+    if na_tabela.any():
+        indices = n[na_tabela].astype(np.int64)
+        result[na_tabela] = log_factorial_table(int(indices.max()))[indices]
+    return result
+
+
+def log_binomial(n, k):
+    """
+    log C(n, k) = log(n!) - log(k!) - log((n-k)!), vetorizado (0 ≤ k ≤ n)
+    """
+    n, k = np.broadcast_arrays(np.asarray(n), np.asarray(k))
+    return log_factorial(n) - log_factorial(k) - log_factorial(n - k)
+
+
+def log_sum_exp(log_termos, axis=None):
+    """
+    log Σ exp(log_termos), sem overflow nem underflow
+
+    Termos -inf (pesos nulos) são aceitos; a soma vazia dá -inf.
+    """
+    from scipy.special import logsumexp
+    log_termos = np.asarray(log_termos, dtype=np.float64)
+    if not log_termos.size and axis is None:
+        return -np.inf
+    return logsumexp(log_termos, axis=axis)
+
+
+def log_power_ratio(x, n):
+    """
+    log(x^n/n!) = n×log x - log(n!), vetorizado (x ≥ 0, n inteiro ≥ 0)
+
+    x^0/0! = 1 também com x = 0.
+    """
+    x, n = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(n))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n == 0, 0.0, n * np.log(x)) - log_factorial(n)
+
+
+def log_sum_power_ratios(x, n):
+    """
+    log Σ(k=0 até n-1) x^k/k! para um x escalar, em O(n) e memória O(BLOCO_TERMOS)
+
+    Os termos são somados em blocos de BLOCO_TERMOS (log-sum-exp acumulado),
+    com verificação de prazo entre blocos (app/models/prazo.py).
+
+    Returns:
+        float: A soma em log (-inf se n = 0)
+    """
+    total = -np.inf
+    for inicio in range(0, int(n), BLOCO_TERMOS):
+        verificar_prazo()
+        k = np.arange(inicio, min(int(n), inicio + BLOCO_TERMOS))
+        total = np.logaddexp(total, log_sum_exp(log_power_ratio(x, k)))
+    return float(total)
+
+
+def preload_tables(n=PRELOAD_SIZE):
+    """Pré-calcula as tabelas (usado antes do fork dos workers)"""
+    log_factorial_table(n)
+
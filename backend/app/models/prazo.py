@@ -0,0 +1,61 @@
+"""
+Prazo e cancelamento cooperativo dos cálculos longos
+
+Um cálculo não pode ser interrompido de fora de uma thread; em vez disso,
+os laços longos dos modelos (ex.: a soma dos estados em alta precisão)
+chamam verificar_prazo() de tempos em tempos. Dentro de um bloco
+com_prazo(prazo), a chamada interrompe o cálculo com PrazoExcedido quando o
+prazo passa ou quando prazo.cancelar() é chamado (por outra thread). Fora de
+um bloco com_prazo o custo é uma leitura de ContextVar.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_atual = ContextVar('prazo', default=None)
+
+
+class PrazoExcedido(Exception):
+    """O cálculo passou do prazo ou foi cancelado"""
+
+
+class Prazo:
+    """
+    Instante limite de um cálculo, com cancelamento
+
+    Args:
+        segundos (float): Tempo disponível a partir de agora
+    """
+
+    __slots__ = ('limite', 'cancelado')
+
+    def __init__(self, segundos):
+        self.limite = time.monotonic() + segundos
+        self.cancelado = False
+
+    def cancelar(self):
+        self.cancelado = True
+
+    def restante(self) -> float:
+        """Segundos até o limite (negativo se já passou)"""
+        return self.limite - time.monotonic()
+
+    def esgotado(self) -> bool:
+        return self.cancelado or time.monotonic() >= self.limite
+
+
+def verificar_prazo():
+    """Interrompe o cálculo (PrazoExcedido) se o prazo ativo acabou"""
+    prazo = _atual.get()
+    if prazo is not None and prazo.esgotado():
+        raise PrazoExcedido("Cálculo cancelado" if prazo.cancelado else "Prazo do cálculo esgotado")
+
+
+@contextmanager
+def com_prazo(prazo):
+    """Ativa o prazo dentro do bloco"""
+    token = _atual.set(prazo)
+    try:
+        yield prazo
+    finally:
+        _atual.reset(token)
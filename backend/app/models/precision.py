@@ -0,0 +1,267 @@
+"""
+Política de precisão adaptativa dos modelos com capacidade/população finita
+
+Os modelos M/M/1/K, M/M/s/K, M/M/1/N e M/M/s/N são avaliados primeiro por um caminho rápido
+em float64 e escala logarítmica (app/models/batch.py). Esse caminho calcula
+também uma estimativa barata do erro relativo (número de condição das
+subtrações e detecção de underflow/overflow). Somente os cenários cuja
+estimativa passa de TOLERANCIA são recalculados aqui, somando os estados em
+aritmética decimal com PRECISAO_DIGITOS dígitos.
+
+O caminho usado é informado no resultado ('caminhoNumerico' nos modelos
+escalares, 'altaPrecisao' nas versões vetorizadas).
+
+A soma decimal custa O(K) ou O(N) operações em Python, então o trabalho é
+limitado: cenários com mais de MAX_TERMOS_CENARIO estados, ou que passariam do
+orçamento MAX_TERMOS_LOTE de uma chamada, ficam com o resultado float64 e são
+marcados em 'precisaoLimitada' (caminho 'float64-limitado'). Quem avalia um
+lote em blocos (grade, Monte Carlo) divide um único orçamento entre todos os
+blocos com `com_orcamento(Orcamento())`; sem isso, cada chamada tem o seu.
+O expoente decimal usa a faixa máxima do módulo decimal, então pesos como a^K
+com K na casa dos milhões não estouram.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import MAX_EMAX, MIN_EMIN, Decimal, localcontext
+
+import numpy as np
+
+from app.models.debug import fase, registrar, termos
+from app.models.prazo import verificar_prazo
+
+CAMINHO_RAPIDO = 'float64'
+CAMINHO_PRECISO = 'alta-precisao'
+CAMINHO_LIMITADO = 'float64-limitado'
+
+# Erro relativo máximo aceito no caminho rápido
+TOLERANCIA = 1e-9
+
+# Dígitos significativos do caminho de alta precisão
+PRECISAO_DIGITOS = 50
+
+# Limites de trabalho do caminho de alta precisão (número de estados somados)
+MAX_TERMOS_CENARIO = 100_000
+MAX_TERMOS_LOTE = 500_000
+
+EPS = np.finfo(np.float64).eps
+LOG_TINY = np.log(np.finfo(np.float64).tiny)
+
+_orcamento = ContextVar('orcamento', default=None)
+
+
+class Orcamento:
+    """
+    Estados que ainda podem ser somados em alta precisão
+
+    Args:
+        termos (int): Orçamento inicial (padrão: MAX_TERMOS_LOTE)
+
+    Atributos:
+        restante (float): Estados ainda disponíveis
+        limitados (int): Cenários suspeitos que ficaram no float64
+    """
+
+    __slots__ = ('restante', 'limitados')
+
+    def __init__(self, termos=MAX_TERMOS_LOTE):
+        self.restante = termos
+        self.limitados = 0
+
+
+@contextmanager
+def com_orcamento(orcamento):
+    """Faz as chamadas de refine dentro do bloco gastarem do mesmo orçamento"""
+    token = _orcamento.set(orcamento)
+    try:
+        yield orcamento
+    finally:
+        _orcamento.reset(token)
+
+
+def caminho(alta_precisao, limitada=False):
+    """Nome do caminho numérico usado por um cenário"""
+    if bool(limitada):
+        return CAMINHO_LIMITADO
+    return CAMINHO_PRECISO if bool(alta_precisao) else CAMINHO_RAPIDO
+
+
+def verificar_resultado(r):
+    """
+    Rejeita um cenário escalar sem resultado utilizável
+
+    Um cenário acima dos limites de trabalho fica com o resultado float64; se
+    nem esse for finito, não há o que responder.
+
+    Raises:
+        ValueError: Se o caminho float64 não deu resultado finito e o cenário
+            é grande demais para a alta precisão
+    """
+    if bool(r['precisaoLimitada']) and not np.isfinite(r['W']):
+        raise ValueError(
+            f"Cenário fora do alcance numérico: o caminho float64 não converge e a alta precisão "
+            f"é limitada a {MAX_TERMOS_CENARIO} estados."
+        )
+
+
+def _contexto(ctx):
+    # Precisão fixa e faixa de expoentes máxima (sem Overflow/Underflow)
+    ctx.prec = PRECISAO_DIGITOS
+    ctx.Emax = MAX_EMAX
+    ctx.Emin = MIN_EMIN
+
+
+def _resumo(pesos_gen, s, n):
+    # Soma os pesos dos estados em Decimal: Z, Σ n×p, Σ (n-s)×p, Σ(n<s) p, p(último),
+    # 1 - p(último) (como Z sem o último sobre Z, sem cancelamento) e p(n)
+    Z = anterior = L = Lq = livre = Decimal(0)
+    ultimo = Pn = None
+    for k, w in pesos_gen:
+        if not k & 1023:
+            # Cancelamento cooperativo (app/models/prazo.py)
+            verificar_prazo()
+        anterior = Z
+        Z += w
+        L += k * w
+        if k < s:
+            livre += w
+        else:
+            Lq += (k - s) * w
+        if k == n:
+            Pn = w
+        ultimo = w
+    return Z, L / Z, Lq / Z, livre / Z, ultimo / Z, anterior / Z, (Pn / Z if Pn is not None else None)
+
+
+def mmsk_high_precision(lambda_, mu, s, K, n=None) -> dict:
+    """
+    M/M/s/K somando os estados em aritmética decimal
+
+    Pesos: a^n/n! (n < s) e a^s/s! × ρ^(n-s) (s ≤ n ≤ K), pela recorrência
+    w_n = w_{n-1} × a/min(n, s).
+
+    Returns:
+        dict: P0, PK, L, Lq, lambdaEfetivo, W, Wq e, se n for informado, Pn
+    """
+    s, K = int(s), int(K)
+    with localcontext() as ctx:
+        _contexto(ctx)
+        a = Decimal(lambda_) / Decimal(mu)
+
+        def pesos():
+            w = Decimal(1)
+            yield 0, w
+            for k in range(1, K + 1):
+                w = w * a / min(k, s)
+                yield k, w
+
+        Z, L, Lq, _, PK, nao_bloqueio, Pn = _resumo(pesos(), s, n)
+        lambda_eff = Decimal(lambda_) * nao_bloqueio
+        result = {
+            'P0': float(1 / Z),
+            'PK': float(PK),
+            'lambdaEfetivo': float(lambda_eff),
+            'L': float(L),
+            'Lq': float(Lq),
+            'W': float(L / lambda_eff),
+            'Wq': float(Lq / lambda_eff),
+        }
+    if n is not None:
+        result['Pn'] = float(Pn) if Pn is not None else np.nan
+    return result
+
+
+def mmsn_high_precision(lambda_, mu, s, N, n=None) -> dict:
+    """
+    M/M/s/N somando os estados em aritmética decimal
+
+    Pesos pela recorrência w_n = w_{n-1} × (N-n+1)×a/min(n, s).
+
+    Returns:
+        dict: P0, L, Lq, lambdaEfetivo, numOperacionais, PWqIgualZero, W, Wq
+            e, se n for informado, Pn
+    """
+    s, N = int(s), int(N)
+    with localcontext() as ctx:
+        _contexto(ctx)
+        a = Decimal(lambda_) / Decimal(mu)
+
+        def pesos():
+            w = Decimal(1)
+            yield 0, w
+            for k in range(1, N + 1):
+                w = w * (N - k + 1) * a / min(k, s)
+                yield k, w
+
+        Z, L, Lq, livre, _, _, Pn = _resumo(pesos(), s, n)
+        lambda_eff = Decimal(lambda_) * (N - L)
+        result = {
+            'P0': float(1 / Z),
+            'L': float(L),
+            'Lq': float(Lq),
+            'W': float(L / lambda_eff),
+            'Wq': float(Lq / lambda_eff),
+            'lambdaEfetivo': float(lambda_eff),
+            'numOperacionais': float(N - L),
+            'PWqIgualZero': float(livre),
+        }
+    if n is not None:
+        result['Pn'] = float(Pn) if Pn is not None else np.nan
+    return result
+
+
+def refine(result, suspeitos, exato, params, n=None, estados=None):
+    """
+    Recalcula em alta precisão apenas os cenários suspeitos de um lote
+
+    Args:
+        result (dict): Resultado vetorizado do caminho rápido (alterado no lugar)
+        suspeitos (np.ndarray): Máscara dos cenários a recalcular
+        exato (callable): mmsk_high_precision ou mmsn_high_precision
+        params (tuple): Arrays (já com broadcast) dos parâmetros do modelo
+        n (array_like, optional): Estado para P(n)
+        estados (np.ndarray, optional): Número de estados de cada cenário (K+1
+            ou N+1), usado nos limites de trabalho
+
+    Returns:
+        dict: O próprio result, com 'altaPrecisao' e 'precisaoLimitada'
+            preenchidos
+    """
+    suspeitos = np.asarray(suspeitos)
+    if estados is None:
+        estados = np.zeros(suspeitos.shape)
+    estados = np.broadcast_to(np.asarray(estados, dtype=np.float64), suspeitos.shape)
+
+    # Dentro dos limites: os menores cenários primeiro, até o orçamento da chamada
+    # (ou o compartilhado, ver com_orcamento)
+    orcamento = _orcamento.get() or Orcamento()
+    candidatos = suspeitos & (estados <= MAX_TERMOS_CENARIO)
+    refinar = np.zeros(suspeitos.shape, dtype=bool)
+    if candidatos.any() and orcamento.restante > 0:
+        planos = np.flatnonzero(candidatos)
+        planos = planos[np.argsort(estados.ravel()[planos], kind='stable')]
+        custo = np.cumsum(estados.ravel()[planos])
+        dentro = custo <= orcamento.restante
+        refinar.ravel()[planos[dentro]] = True
+        orcamento.restante -= float(custo[dentro][-1]) if dentro.any() else 0.0
+
+    result['altaPrecisao'] = refinar
+    result['precisaoLimitada'] = suspeitos & ~refinar
+    orcamento.limitados += int(np.count_nonzero(result['precisaoLimitada']))
+    registrar(cenariosAltaPrecisao=int(np.count_nonzero(refinar)),
+              cenariosLimitados=int(np.count_nonzero(result['precisaoLimitada'])))
+    if not refinar.any():
+        return result
+    if n is not None:
+        n = np.broadcast_to(np.asarray(n), suspeitos.shape)
+    indices = [()] if refinar.ndim == 0 else [tuple(i) for i in np.argwhere(refinar)]
+    copiados = set()
+    with fase('altaPrecisao'):
+        for idx in indices:
+            valores = exato(*(float(p[idx]) for p in params), n=int(n[idx]) if n is not None else None)
+            termos(estados[idx])
+            for chave, valor in valores.items():
+                if chave not in copiados:
+                    result[chave] = np.array(result[chave], dtype=np.float64)
+                    copiados.add(chave)
+                result[chave][idx] = valor
+    return result
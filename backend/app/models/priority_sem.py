@@ -1,5 +1,7 @@
 import math
 
+from app.models.batch import calculate_priority_sem_batch
+
 def calculate_priority_sem(s, mu, lambdas):
     """
     Interface para API - calcula métricas M/M/S com Prioridade Sem Interrupção
@@ -21,78 +23,46 @@ def calcular_prioridade_mms_sem_interrupcao_api(s, mu, lambdas):
     """
     Calcula métricas de sistema M/M/S com prioridade sem interrupção
 
+    O termo A é obtido pelo Erlang C (A = s×μ/C(s, λ/μ)), sem s! nem r^s,
+    o que permite s na casa dos milhares (ver calculate_priority_sem_batch).
+    Quando A passa do maior float (C sofre underflow), termoA vem como None
+    (null no JSON) e o valor segue disponível em logTermoA.
+
     Retorna um dicionário com os resultados por classe
     """
-    num_classes = len(lambdas)
-
     # --- 2. Cálculos Preliminares ---
     lambda_total = sum(lambdas)
 
-    # r = taxa total / mu
-    r = lambda_total / mu
-
     # Rho do sistema (para verificar estabilidade)
     rho_sistema = lambda_total / (s * mu)
 
     if rho_sistema >= 1:
         raise ValueError(f"Sistema instável. Taxa de utilização (ρ) é {rho_sistema:.4f} (deve ser < 1).")
 
-    # --- 3. Cálculo do Termo Constante 'A' ---
-    # Somatório: sum_{j=0}^{s-1} (r^j / j!)
-    somatorio = 0
-    for j in range(s):
-        term = (r**j) / math.factorial(j)
-        somatorio += term
-
-    numerador_termo = math.factorial(s) * ((s * mu) - lambda_total)
-    denominador_termo = r**s
+    # --- 3 e 4. Termo A e métricas por classe (vetorizados) ---
+    r = calculate_priority_sem_batch(s, mu, lambdas)
+    if not r['estavel']:
+        raise ValueError("s ≥ 1 e taxas de chegada (λ) não-negativas, com λ total > 0, são necessários.")
 
-    # Termo A que aparece multiplicando os sigmas no denominador final
-    termo_A = ((numerador_termo / denominador_termo) * somatorio) + (s * mu)
-
-    # --- 4. Cálculo por Classe (k) ---
     classes_results = []
-
-    # Sigma anterior (sigma_{k-1}) começa com 0 para a primeira classe
-    sigma_anterior = 0.0
-
-    # Sigma atual acumulado
-    sigma_atual_acumulado = 0.0
-
-    for k in range(num_classes):
-        lambda_k = lambdas[k]
-
-        # Calcular Sigma_k
-        sigma_atual_acumulado += lambda_k / (s * mu)
-        sigma_k = sigma_atual_acumulado
-
-        # Fórmula de W (tempo no sistema)
-        denominador_W = termo_A * (1 - sigma_anterior) * (1 - sigma_k)
-        W_k = (1 / denominador_W) + (1 / mu)
-
-        # Outras métricas
-        Wq_k = W_k - (1 / mu)
-        L_k = lambda_k * W_k
-        Lq_k = lambda_k * Wq_k
-
+    for k, lambda_k in enumerate(lambdas):
         classes_results.append({
             "classe": k + 1,
-            "L": L_k,
-            "Lq": Lq_k,
-            "W": W_k,
-            "Wq": Wq_k,
+            "L": float(r['L'][k]),
+            "Lq": float(r['Lq'][k]),
+            "W": float(r['W'][k]),
+            "Wq": float(r['Wq'][k]),
             "lambda": lambda_k,
-            "sigma": sigma_k
+            "sigma": float(r['sigma'][k])
         })
 
-        # Atualiza o sigma anterior para a próxima iteração
-        sigma_anterior = sigma_k
-
+    termo_A = float(r['termoA'])
     return {
         "rho": rho_sistema,
         "lambdaTotal": lambda_total,
         "capacidadeTotal": s * mu,
-        "termoA": termo_A,
+        "termoA": termo_A if math.isfinite(termo_A) else None,
+        "logTermoA": float(r['logTermoA']),
         "classes": classes_results
     }
 
@@ -119,9 +89,6 @@ def calcular_prioridade_mms_sem_interrupcao():
     # --- 2. Cálculos Preliminares ---
     lambda_total = sum(lambdas)
     
-    # r = taxa total / mu (atenção: não é rho ainda)
-    r = lambda_total / mu
-    
     # Rho do sistema (para verificar estabilidade)
     rho_sistema = lambda_total / (s * mu)
     
@@ -134,68 +101,21 @@ def calcular_prioridade_mms_sem_interrupcao():
         print("ERRO: O sistema é instável (ρ >= 1). A fila crescerá infinitamente.")
         return
 
-    # --- 3. Cálculo do Termo Constante 'A' (Parte Grande da Fórmula) ---
-    # A fórmula tem um denominador complexo que se repete.
-    # Vamos chamar o termo dentro dos colchetes grandes de 'Denominador Base' antes de multiplicar pelos sigmas.
-    # A fórmula é: [ ( s! * (s*mu - lambda_total) / r^s ) * SOMATORIO + s*mu ]
-    
-    # Somatório: sum_{j=0}^{s-1} (r^j / j!)
-    somatorio = 0
-    for j in range(s):
-        term = (r**j) / math.factorial(j)
-        somatorio += term
-        
-
-    numerador_termo = math.factorial(s) * ((s * mu) - lambda_total)
-    
+    # --- 3. Termo A e métricas por classe ---
+    resultado = calcular_prioridade_mms_sem_interrupcao_api(s, mu, lambdas)
+    if resultado['termoA'] is None:
+        print(f"Termo A: e^{resultado['logTermoA']:.4f}")
+    else:
+        print(f"Termo A: {resultado['termoA']:.4f}")
 
-    denominador_termo = r**s
-    
-    # Montando o termo A (que aparece multiplicando os sigmas no denominador final)
-    # A = [Esquerda * Somatorio + Direita]
-    termo_A = ((numerador_termo / denominador_termo) * somatorio) + (s * mu)
-    
-    # --- 4. Cálculo por Classe (k) ---
+    # --- 4. Resultados por Classe (k) ---
     print("-" * 40)
     print(f"{'Classe':<8} | {'L':<10} | {'Lq':<10} | {'W':<10} | {'Wq':<10}")
     print("-" * 40)
-    
-    # Sigma anterior (sigma_{k-1}) começa com 0 para a primeira classe
-    sigma_anterior = 0.0 
-    
-    # Sigma atual acumulado
-    sigma_atual_acumulado = 0.0
-    
-    for k in range(num_classes):
-        lambda_k = lambdas[k]
-        
-        # Calcular Sigma_k (Soma dos lambdas até k / s*mu)
-        # Na formula da imagem: Sum(lambda_i) / s*mu
-        sigma_atual_acumulado += lambda_k / (s * mu)
-        sigma_k = sigma_atual_acumulado
-        
-        # --- APLICAÇÃO DA FÓRMULA DE W (TEMPO NO SISTEMA) ---
-        # W = 1 / [ A * (1 - sigma_{k-1}) * (1 - sigma_k) ] + 1/mu
-        
-        denominador_W = termo_A * (1 - sigma_anterior) * (1 - sigma_k)
-        
-        W_k = (1 / denominador_W) + (1 / mu)
-        
-        # --- Outras Métricas ---
-        # Wq = W - 1/mu
-        Wq_k = W_k - (1 / mu)
-        
-        # L = lambda * W
-        L_k = lambda_k * W_k
-        
-        # Lq = L - lambda/mu (ou lambda * Wq)
-        Lq_k = lambda_k * Wq_k
-        
-        # Imprimir resultados da classe
-        print(f"{k+1:<8} | {L_k:<10.4f} | {Lq_k:<10.4f} | {W_k:<10.4f} | {Wq_k:<10.4f}")
-        
-        # Atualiza o sigma anterior para a próxima iteração
-        sigma_anterior = sigma_k
+
+    for classe in resultado['classes']:
+        print(f"{classe['classe']:<8} | {classe['L']:<10.4f} | {classe['Lq']:<10.4f} | "
+              f"{classe['W']:<10.4f} | {classe['Wq']:<10.4f}")
 
     print("-" * 40)
 
@@ -0,0 +1,118 @@
+"""
+Aproximação assintótica (Halfin–Whitt / QED) do M/M/s para s muito grande
+
+No regime QED (quality-and-efficiency driven), s grande e ρ perto de 1 com
+β = (1 - ρ)×√s fixo, o Erlang C tende ao limite de Halfin–Whitt
+    C → [1 + β×Φ(β)/φ(β)]^(-1).
+Aqui é usada a versão refinada da mesma ideia, com uma estimativa explícita
+do erro. Com a = λ/μ e X ~ Poisson(a), B = P(X = s)/P(X ≤ s) e:
+
+- P(X = s) pela série de Stirling, na forma s×log(1 - δ) + s×δ com
+  δ = (s - a)/s (sem a soma de termos da ordem de s×log s, que perde
+  precisão para s grande);
+- P(X ≤ s) pela expansão de Edgeworth da Poisson com correção de
+  continuidade, até a ordem 1/a, em x = (s + 1/2 - a)/√a:
+      Φ(x) - φ(x)×(x² - 1)/(6√a) + φ(x)×(-x/24 + 7x³/72 - x⁵/72)/a
+
+O erro relativo de P(X ≤ s) é da ordem do termo seguinte, a^(-3/2); a
+estimativa usada, φ(x)×(1 + x²)⁴/a^(3/2) mais o arredondamento, majora o
+erro observado com folga em s ≥ S_MIN e x ≤ X_MAX. Além de X_MAX a cauda
+P(X > s) é majorada pelo limite de Chernoff. O mesmo limite vale para B e
+C (d log C = d log B × (s - a)/(s - a×(1 - B)) ≤ d log B). Tudo é O(1) por
+cenário e vetorizado.
+
+O despacho (calculate_mms_batch e calculate_mms) usa este resultado quando
+a estimativa de erro fica abaixo da tolerância (padrão TOLERANCIA_QED, um
+erro relativo invisível num painel; não é a TOLERANCIA do refino em alta
+precisão, app/models/precision.py) e calcula o Erlang exato só para os
+demais cenários.
+"""
+import numpy as np
+
+EPS = np.finfo(np.float64).eps
+
+CAMINHO_ASSINTOTICO = 'assintotico-qed'
+
+# Menor s aceito; a partir de x = X_MAX a cauda é tratada pelo limite de Chernoff
+S_MIN = 1000
+X_MAX = 8.0
+
+# Erro relativo máximo aceito por padrão no caminho assintótico
+TOLERANCIA_QED = 1e-6
+
+# Termos da série de log(1 - δ) + δ (u² ≤ 1/9: erro < 9^-20)
+_TERMOS_SERIE = 20
+
+
+def _log_fatorial_stirling(s):
+    # log(s!) - [s×log s - s + log(2πs)/2], série de Stirling (erro < 1/(1680 s^7))
+    s2 = s * s
+    return 1 / (12 * s) - 1 / (360 * s * s2) + 1 / (1260 * s * s2 * s2)
+
+
+def _log1m_mais(delta):
+    # log(1 - δ) + δ sem cancelamento: com u = δ/(2 - δ), log(1 - δ) = -2×atanh(u)
+    # e δ = 2u/(1 + u), então log(1 - δ) + δ = -2u²/(1 + u) - 2×Σ(k≥1) u^(2k+1)/(2k+1),
+    # todos os termos com o mesmo sinal. Para δ ≥ 1/2 a forma direta já é exata.
+    u = delta / (2 - delta)
+    u2 = u * u
+    soma = np.zeros_like(u)
+    for k in range(_TERMOS_SERIE, 0, -1):
+        soma = u2 * (1 / (2 * k + 1) + soma)
+    serie = -2 * u * (u / (1 + u) + soma)
+    return np.where(delta < 0.5, serie, np.log1p(-delta) + delta)
+
+
+def erlang_qed(a, s):
+    """
+    Erlang B e C assintóticos (QED) com estimativa de erro, vetorizados
+
+    Args:
+        a (array_like): Carga oferecida λ/μ (0 < a < s)
+        s (array_like): Número de servidores
+
+    Returns:
+        dict: Arrays com B, C, logCdf (log P(X ≤ s)), beta (Halfin–Whitt)
+            e erro (estimativa do erro relativo de B e C; inf fora do
+            domínio validado)
+    """
+    from scipy.special import ndtr
+    a, s = np.broadcast_arrays(np.asarray(a, dtype=np.float64), np.asarray(s, dtype=np.float64))
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore', under='ignore'):
+        delta = (s - a) / s
+        # s×(log(1 - δ) + δ) com erro relativo de poucos EPS (ver _log1m_mais)
+        log_razao = s * _log1m_mais(delta)
+        log_pmf = log_razao - 0.5 * np.log(2 * np.pi * s) - _log_fatorial_stirling(s)
+
+        raiz_a = np.sqrt(a)
+        x = (s + 0.5 - a) / raiz_a
+        phi = np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+        x2 = x * x
+        cdf = (ndtr(x) - phi * (x2 - 1) / (6 * raiz_a)
+               + phi * x * (-1 / 24 + x2 * (7 / 72 - x2 / 72)) / a)
+
+        erro = phi * (1 + x2) ** 4 / (a * raiz_a) / cdf
+
+        # Longe do centro (x > X_MAX) a expansão não vale, mas P(X > s) é
+        # desprezível: P(X ≤ s) ≈ 1 com erro ≤ e^(-a×h((s+1)/a)) (Chernoff),
+        # h(u) = u×log u - u + 1
+        cauda = x > X_MAX
+        s1 = s + 1
+        chernoff = np.exp(-(s1 * np.log1p((s1 - a) / a) - (s1 - a)))
+        cdf = np.where(cauda, 1.0, cdf)
+        # Arredondamento: proporcional aos logs efetivamente exponenciados
+        erro = np.where(cauda, chernoff, erro) + EPS * (64 + 8 * np.abs(log_razao) + np.log(s))
+
+        B = np.exp(log_pmf - np.log(cdf))
+        C = s * B / (s * delta + a * B)
+
+        valido = (s >= S_MIN) & (a > 0) & (delta > 0) & np.isfinite(C)
+        erro = np.where(valido, erro, np.inf)
+
+    return {
+        'B': B,
+        'C': C,
+        'logCdf': np.log(cdf),
+        'beta': delta * np.sqrt(s),
+        'erro': erro,
+    }
@@ -0,0 +1,115 @@
+"""
+Tipos de resultado dos modelos escalares
+
+Cada calculate_* devolve um objeto com __slots__ (sem um dict por chamada)
+que se comporta como um dict somente leitura: result['L'], result.L,
+'Pn' in result, dict(result), result == {...}. As métricas opcionais (Pn,
+PnMaiorQueR, PWMaiorQueT, PWqMaiorQueT, PWqIgualZero) só são calculadas no
+primeiro acesso, a partir dos intermediários guardados (P0, C, ρ, ...), e
+ficam guardadas no próprio objeto.
+
+to_dict() devolve as mesmas chaves, na mesma ordem, que os modelos devolviam
+como dict; é o formato do JSON das rotas e do cache (ver para_json).
+"""
+from collections.abc import Mapping
+
+
+def preguicosa(func):
+    """
+    Marca o método `_<nome>` como o cálculo da métrica `<nome>`
+
+    A métrica é um slot comum: o método só roda quando o slot ainda está
+    vazio (no primeiro acesso) e o valor fica guardado nele.
+    """
+    func.preguicosa = True
+    return func
+
+
+class Resultado(Mapping):
+    """
+    Base dos resultados: interface de dict somente leitura sobre os slots
+
+    As subclasses definem:
+        _BASICAS (tuple): Chaves sempre presentes, na ordem do JSON
+        _OPCIONAIS (tuple): Pares (atributo, chaves): as chaves só existem
+            quando o atributo (ex.: o parâmetro n) não é None
+    """
+
+    __slots__ = ()
+    _BASICAS = ()
+    _OPCIONAIS = ()
+    # Chave -> atributo que decide se ela existe (None: sempre existe)
+    _CONDICAO = {}
+    # Métrica -> método que a calcula (ver preguicosa)
+    _PREGUICOSAS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._CONDICAO = dict.fromkeys(cls._BASICAS)
+        for atributo, chaves in cls._OPCIONAIS:
+            cls._CONDICAO.update(dict.fromkeys(chaves, atributo))
+        cls._PREGUICOSAS = dict(cls._PREGUICOSAS)
+        for nome, func in vars(cls).items():
+            if getattr(func, 'preguicosa', False):
+                cls._PREGUICOSAS[nome[1:]] = func
+
+    def __getattr__(self, nome):
+        # Só chamado com o slot vazio: calcula a métrica e guarda no slot
+        calcular = self._PREGUICOSAS.get(nome)
+        if calcular is None:
+            raise AttributeError(f"'{type(self).__name__}' não tem o atributo '{nome}'")
+        valor = calcular(self)
+        setattr(self, nome, valor)
+        return valor
+
+    def __getstate__(self):
+        # Só os slots preenchidos, sem disparar os cálculos pendentes (pickle)
+        estado = {}
+        for cls in type(self).__mro__:
+            for nome in getattr(cls, '__slots__', ()):
+                try:
+                    estado[nome] = object.__getattribute__(self, nome)
+                except AttributeError:
+                    pass
+        return None, estado
+
+    def _chaves(self):
+        chaves = self._BASICAS
+        for atributo, opcionais in self._OPCIONAIS:
+            if getattr(self, atributo) is not None:
+                chaves += opcionais
+        return chaves
+
+    def __getitem__(self, chave):
+        try:
+            atributo = self._CONDICAO[chave]
+        except KeyError:
+            raise KeyError(chave) from None
+        if atributo is not None and getattr(self, atributo) is None:
+            raise KeyError(chave)
+        return getattr(self, chave)
+
+    def __iter__(self):
+        return iter(self._chaves())
+
+    def __len__(self):
+        return len(self._chaves())
+
+    def to_dict(self) -> dict:
+        """Métricas como dict (calcula as opcionais pendentes)"""
+        return {chave: getattr(self, chave) for chave in self._chaves()}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def para_json(obj):
+    """
+    Função `default` para json.dumps: converte os resultados em dict
+
+    Exemplo:
+        >>> json.dumps(calculate_mm1(3, 5), default=para_json)
+    """
+    if isinstance(obj, Resultado):
+        return obj.to_dict()
+    raise TypeError(f"Objeto do tipo {type(obj).__name__} não é serializável em JSON")
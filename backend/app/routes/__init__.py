@@ -1 +1,6 @@
 # Módulo de rotas da API
+
+# Cabeçalhos da resposta binária de /api/grid (expostos ao frontend via CORS).
+# Ficam aqui, e não em analysis_routes, para que app/main.py não precise
+# importar o NumPy só para configurar o CORS.
+GRID_HEADERS = ['X-Grid-Shape', 'X-Grid-Eixos', 'X-Grid-Metricas', 'X-Grid-Precisao-Limitada']
@@ -0,0 +1,201 @@
+import numpy as np
+from flask import Blueprint, Response, request, jsonify
+from app.admission import Recusada, get_admissao
+from app.analysis.grid import MAX_TERMOS_GRADE, compute_grid, iter_grid
+from app.analysis.uncertainty import AMOSTRAS_PADRAO, PERCENTIS_PADRAO, iter_uncertainty, propagate_uncertainty
+from app.models.prazo import Prazo
+from app.models.precision import Orcamento
+from app.routes import GRID_HEADERS
+from app.routes.sse import para_json, sse_response
+
+analysis_bp = Blueprint('analysis', __name__)
+
+
+def _eixo(data, chave):
+    eixo = data.get(chave)
+    if not isinstance(eixo, dict) or any(k not in eixo for k in ('parametro', 'inicio', 'fim', 'passos')):
+        raise ValueError(f"{chave} deve ter os campos: parametro, inicio, fim, passos")
+    return (eixo['parametro'], float(eixo['inicio']), float(eixo['fim']), int(eixo['passos']))
+
+
+def _args_grid(data):
+    # (modelo, eixo_x, eixo_y, fixos, metricas) do corpo de /grid e /grid/stream
+    if not data or 'modelo' not in data or 'eixoX' not in data or 'eixoY' not in data:
+        raise ValueError('Campos obrigatórios: modelo, eixoX, eixoY')
+    fixos = {k: float(v) for k, v in (data.get('fixos') or {}).items()}
+    return data['modelo'], _eixo(data, 'eixoX'), _eixo(data, 'eixoY'), fixos, data.get('metricas') or None
+
+
+def _args_uncertainty(data):
+    # Argumentos de propagate_uncertainty do corpo de /uncertainty e /uncertainty/stream
+    if not data or 'modelo' not in data or not isinstance(data.get('parametros'), dict):
+        raise ValueError('Campos obrigatórios: modelo, parametros')
+    semente = data.get('semente')
+    return dict(
+        modelo=data['modelo'],
+        parametros=data['parametros'],
+        amostras=int(data.get('amostras') or AMOSTRAS_PADRAO),
+        metricas=data.get('metricas') or None,
+        percentis=data.get('percentis') or PERCENTIS_PADRAO,
+        semente=int(semente) if semente not in (None, '') else None,
+    )
+
+
+def _custo_uncertainty(admissao, argumentos):
+    # 'modelo' também é o primeiro parâmetro de admitir: argumentos posicionais
+    return admissao.admitir('uncertainty', argumentos['modelo'], argumentos['parametros'], argumentos['amostras'])
+
+
+def _grid_json(eixo_x, eixo_y, xs, ys, matriz, metricas, limitadas=0):
+    # Grade no formato 'json' de /grid (também o resultado das tarefas 'grid')
+    return {
+        'eixoX': {'parametro': eixo_x[0], 'valores': xs.tolist()},
+        'eixoY': {'parametro': eixo_y[0], 'valores': ys.tolist()},
+        'precisaoLimitada': limitadas,
+        'metricas': {
+            nome: np.where(np.isnan(matriz[i]), None, matriz[i].astype(object)).tolist()
+            for i, nome in enumerate(metricas)
+        },
+    }
+
+
+@analysis_bp.route('/grid', methods=['POST'])
+def api_grid():
+    """
+    Superfície de métricas sobre uma grade 2-D de parâmetros
+
+    Resposta padrão (formato 'binario'): application/octet-stream com float32
+    little-endian, na ordem: valores do eixo X, valores do eixo Y e as
+    matrizes (metricas × passos Y × passos X). NaN marca células instáveis.
+    O formato vem nos cabeçalhos X-Grid-Shape ("metricas,ny,nx"),
+    X-Grid-Eixos ("x,y") e X-Grid-Metricas. Com formato 'json' a resposta é
+    JSON, com null nas células mascaradas.
+
+    A grade passa pelo controle de admissão (app/admission.py) e divide
+    MAX_TERMOS_GRADE estados de alta precisão; as células mal condicionadas
+    além disso ficam no float64 e são contadas em precisaoLimitada
+    (cabeçalho X-Grid-Precisao-Limitada no formato binário).
+    """
+    try:
+        data = request.get_json()
+        argumentos = _args_grid(data)
+        formato = data.get('formato') or 'binario'
+        if formato not in ('binario', 'json'):
+            return jsonify({'error': "formato deve ser 'binario' ou 'json'"}), 400
+
+        admissao = get_admissao()
+        orcamento = Orcamento(MAX_TERMOS_GRADE)
+        custo = admissao.admitir('grid', *argumentos, orcamento=orcamento)
+        matriz, xs, ys, metricas = admissao.executar(custo, compute_grid, *argumentos, orcamento=orcamento)
+        eixo_x, eixo_y = argumentos[1:3]
+
+        if formato == 'json':
+            return jsonify(_grid_json(eixo_x, eixo_y, xs, ys, matriz, metricas, orcamento.limitados)), 200
+
+        corpo = b''.join(np.asarray(v, dtype='<f4').tobytes() for v in (xs, ys, matriz))
+        return Response(corpo, status=200, mimetype='application/octet-stream', headers={
+            'X-Grid-Shape': ','.join(str(d) for d in matriz.shape),
+            'X-Grid-Eixos': f'{eixo_x[0]},{eixo_y[0]}',
+            'X-Grid-Metricas': ','.join(metricas),
+            'X-Grid-Precisao-Limitada': str(orcamento.limitados),
+        })
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+def _eventos_grid(blocos, eixo_x, eixo_y, orcamento):
+    # Eventos SSE a partir de iter_grid
+    xs, ys, metricas = next(blocos)
+    yield 'inicio', {
+        'eixoX': {'parametro': eixo_x[0], 'valores': xs.tolist()},
+        'eixoY': {'parametro': eixo_y[0], 'valores': ys.tolist()},
+        'metricas': metricas,
+        'shape': [len(metricas), ys.size, xs.size],
+    }
+    try:
+        for inicio, fim, bloco in blocos:
+            yield 'linhas', {
+                'inicio': inicio,
+                'fim': fim,
+                'metricas': {nome: para_json(bloco[i]) for i, nome in enumerate(metricas)},
+            }
+    finally:
+        blocos.close()
+    yield 'fim', {'linhas': int(ys.size), 'precisaoLimitada': orcamento.limitados}
+
+
+@analysis_bp.route('/grid/stream', methods=['POST'])
+def api_grid_stream():
+    """
+    Grade de /grid em Server-Sent Events (ver app/routes/sse.py)
+
+    Eventos: 'inicio' (eixos, métricas e shape "metricas, ny, nx");
+    'linhas' a cada bloco de linhas do eixo Y ({inicio, fim, metricas:
+    {nome: linhas × nx}}, com null nas células mascaradas); 'fim'
+    ({linhas, precisaoLimitada}). Admissão, orçamento e prazo como em /grid.
+    """
+    try:
+        argumentos = _args_grid(request.get_json())
+        admissao = get_admissao()
+        orcamento = Orcamento(MAX_TERMOS_GRADE)
+        admissao.admitir('grid', *argumentos, orcamento=orcamento)
+        blocos = iter_grid(*argumentos, orcamento=orcamento)
+        eventos = _eventos_grid(blocos, argumentos[1], argumentos[2], orcamento)
+        return sse_response(eventos, prazo=Prazo(admissao.prazo))
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@analysis_bp.route('/uncertainty', methods=['POST'])
+def api_uncertainty():
+    """
+    Faixas de percentis das métricas com parâmetros incertos (Monte Carlo)
+
+    Cada parâmetro é um número ou uma distribuição ({tipo: normal|lognormal,
+    media, desvio} ou {tipo: empirica, amostras}); ver app/analysis/uncertainty.py.
+    Passa pelo controle de admissão (app/admission.py).
+    """
+    try:
+        argumentos = _args_uncertainty(request.get_json())
+        admissao = get_admissao()
+        custo = _custo_uncertainty(admissao, argumentos)
+        result = admissao.executar(custo, propagate_uncertainty, **argumentos)
+        return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@analysis_bp.route('/uncertainty/stream', methods=['POST'])
+def api_uncertainty_stream():
+    """
+    Monte Carlo de /uncertainty em Server-Sent Events (ver app/routes/sse.py)
+
+    Eventos: 'inicio' ({modelo, amostras, metricas}); 'progresso' a cada
+    bloco de sorteios, com a média e o intervalo de confiança de 95% de cada
+    métrica até ali; 'resultado', igual à resposta de /uncertainty. O custo
+    estimado passa pela admissão e o cálculo inteiro, pelo prazo das
+    requisições (app/admission.py).
+    """
+    try:
+        argumentos = _args_uncertainty(request.get_json())
+        admissao = get_admissao()
+        _custo_uncertainty(admissao, argumentos)
+        return sse_response(iter_uncertainty(**argumentos), prazo=Prazo(admissao.prazo))
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
@@ -0,0 +1,69 @@
+from flask import Blueprint, request, jsonify
+from app.estimation.registry import StreamNotFound, get_registry
+from app.estimation.streaming import StreamingEstimator
+
+estimation_bp = Blueprint('estimation', __name__)
+
+
+@estimation_bp.route('/estimation/streams', methods=['POST'])
+def api_create_stream():
+    try:
+        data = request.get_json()
+        if not data or 'modelo' not in data:
+            return jsonify({'error': 'Campos obrigatórios: modelo'}), 400
+
+        params = {k: int(data[k]) for k in ('s', 'K') if data.get(k) not in (None, '')}
+        estimador = StreamingEstimator(
+            data['modelo'],
+            janela=int(data.get('janela', 1000)),
+            cadencia=int(data.get('cadencia', 100)),
+            tolerancia=float(data.get('tolerancia', 0.01)),
+            **params
+        )
+
+        return jsonify({'id': get_registry().create(estimador)}), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@estimation_bp.route('/estimation/streams/<stream_id>/events', methods=['POST'])
+def api_push_stream_events(stream_id):
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('eventos'), list):
+            return jsonify({'error': 'Campos obrigatórios: eventos (lista)'}), 400
+
+        def consumir(estimador):
+            publicacoes = list(estimador.consume(data['eventos']))
+            return {
+                'atualizado': bool(publicacoes),
+                'eventos': estimador.num_eventos,
+                'ultimo': estimador.ultimo,
+            }
+
+        return jsonify(get_registry().update(stream_id, consumir)), 200
+    except StreamNotFound:
+        return jsonify({'error': f'Fluxo {stream_id} não encontrado'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@estimation_bp.route('/estimation/streams/<stream_id>', methods=['GET'])
+def api_get_stream(stream_id):
+    def resumo(estimador):
+        return {
+            'modelo': estimador.modelo,
+            'eventos': estimador.num_eventos,
+            'avaliacoes': estimador.num_avaliacoes,
+            'estimativa': estimador.estimate,
+            'ultimo': estimador.ultimo,
+        }
+
+    try:
+        return jsonify(get_registry().update(stream_id, resumo)), 200
+    except StreamNotFound:
+        return jsonify({'error': f'Fluxo {stream_id} não encontrado'}), 404
@@ -0,0 +1,106 @@
+import numpy as np
+from flask import Blueprint, Response, request, jsonify
+from app.admission import Recusada
+from app.analysis.grid import iter_grid
+from app.analysis.uncertainty import iter_uncertainty
+from app.jobs import CONCLUIDO, PENDENTES, JobNotFound, get_jobs
+from app.models.precision import Orcamento
+from app.routes.analysis_routes import _args_grid, _args_uncertainty, _grid_json
+from app.routes.solver_routes import _args_staffing
+from app.solvers.staffing import iter_staffing
+
+job_bp = Blueprint('jobs', __name__)
+
+
+def _args_grid_job(data):
+    return dict(zip(('modelo', 'eixo_x', 'eixo_y', 'fixos', 'metricas'), _args_grid(data)))
+
+
+def _eventos_grid(modelo, eixo_x, eixo_y, fixos, metricas):
+    # iter_grid com o progresso por bloco de linhas e o resultado no formato 'json' de /grid
+    # (sem prazo de requisição, com o orçamento de alta precisão inteiro de um lote)
+    orcamento = Orcamento()
+    blocos = iter_grid(modelo, eixo_x, eixo_y, fixos, metricas, orcamento=orcamento)
+    try:
+        xs, ys, metricas = next(blocos)
+        yield 'inicio', {'shape': [len(metricas), ys.size, xs.size]}
+        matriz = np.empty((len(metricas), ys.size, xs.size), dtype=np.float32)
+        for inicio, fim, bloco in blocos:
+            matriz[:, inicio:fim] = bloco
+            yield 'progresso', {'linhas': fim, 'total': int(ys.size)}
+    finally:
+        blocos.close()
+    yield 'resultado', _grid_json(eixo_x, eixo_y, xs, ys, matriz, metricas, orcamento.limitados)
+
+
+# Tipo de tarefa -> (parâmetros do corpo, como em /solve/staffing, /uncertainty
+# e /grid; gerador de eventos)
+TIPOS = {
+    'staffing': (_args_staffing, iter_staffing),
+    'uncertainty': (_args_uncertainty, iter_uncertainty),
+    'grid': (_args_grid_job, _eventos_grid),
+}
+
+
+@job_bp.route('/jobs', methods=['POST'])
+def api_submit_job():
+    """
+    Envia um cálculo longo para a fila de tarefas (ver app/jobs.py)
+
+    Corpo: {tipo: staffing|uncertainty|grid, parametros: corpo da rota
+    síncrona}. Responde 202 com o resumo da tarefa; um envio idêntico a uma
+    tarefa pendente ou concluída devolve essa tarefa (duplicado: true).
+    """
+    try:
+        data = request.get_json()
+        if not data or 'tipo' not in data or not isinstance(data.get('parametros'), dict):
+            return jsonify({'error': 'Campos obrigatórios: tipo, parametros'}), 400
+        if data['tipo'] not in TIPOS:
+            return jsonify({'error': f"Tipo '{data['tipo']}' inválido. Use um de: {', '.join(TIPOS)}."}), 400
+
+        argumentos, gerador = TIPOS[data['tipo']]
+        parametros = argumentos(data['parametros'])
+        eventos = gerador(**parametros)
+        # Validação na própria requisição: parâmetros inválidos respondem 400
+        next(eventos)
+        return jsonify(get_jobs().submit(data['tipo'], parametros, eventos)), 202
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@job_bp.route('/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    try:
+        return jsonify(get_jobs().status(job_id)), 200
+    except JobNotFound:
+        return jsonify({'error': f'Tarefa {job_id} não encontrada'}), 404
+
+
+@job_bp.route('/jobs/<job_id>/result', methods=['GET'])
+def api_job_result(job_id):
+    """
+    Resultado da tarefa (o mesmo JSON da rota síncrona)
+
+    202 com o resumo enquanto pendente; 409 se falhou ou foi cancelada.
+    """
+    try:
+        resumo, resultado = get_jobs().result(job_id)
+    except JobNotFound:
+        return jsonify({'error': f'Tarefa {job_id} não encontrada'}), 404
+    if resumo['status'] == CONCLUIDO:
+        return Response(resultado, status=200, mimetype='application/json')
+    if resumo['status'] in PENDENTES:
+        return jsonify(resumo), 202
+    return jsonify({**resumo, 'error': resumo['error'] or f"Tarefa {resumo['status']}"}), 409
+
+
+@job_bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+def api_cancel_job(job_id):
+    try:
+        return jsonify(get_jobs().cancel(job_id)), 200
+    except JobNotFound:
+        return jsonify({'error': f'Tarefa {job_id} não encontrada'}), 404
@@ -1,16 +1,38 @@
+from functools import partial
 from flask import Blueprint, request, jsonify
+from app.admission import Recusada, get_admissao
+from app.cache import cached
+from app.models.debug import com_debug
 from app.models.mm1 import calculate_mm1
 from app.models.mms import calculate_mms
+from app.models.mmsm import calculate_mmsm
 from app.models.mm1k import calculate_mm1k
 from app.models.mm1n import calculate_mm1n
 from app.models.mmsk import calculate_mmsk
 from app.models.mmsn import calculate_mmsn
 from app.models.mg1 import calculate_mg1
+from app.models.ggs import calculate_gg1, calculate_ggs
 from app.models.priority_sem import calculate_priority_sem
 from app.models.priority_com import calculate_priority_com
+from app.models.qed import TOLERANCIA_QED
 
 queue_bp = Blueprint('queue', __name__)
 
+def _debug_pedido():
+    # "debug": true no corpo ou ?debug=1 na URL
+    data = request.get_json(silent=True) or {}
+    return bool(data.get('debug')) or request.args.get('debug') in ('1', 'true')
+
+def _calcular(modelo, func, *args, **kwargs):
+    # Custo estimado antes de tudo: o que passa do orçamento é recusado sem calcular;
+    # os caros rodam no pool limitado, com prazo (app/admission.py)
+    admissao = get_admissao()
+    custo = admissao.admitir(modelo, *args, **kwargs)
+    # Com debug o cálculo é rastreado (tempos por fase em 'debug') e não passa pelo cache
+    if _debug_pedido():
+        return admissao.executar(custo, com_debug, func, *args, **kwargs)
+    return cached(modelo, partial(admissao.executar, custo, func), *args, **kwargs)
+
 @queue_bp.route('/calculate/mm1', methods=['POST'])
 def api_calculate_mm1():
     try:
@@ -26,8 +48,10 @@ def api_calculate_mm1():
         r = int(data['r']) if 'r' in data and data['r'] is not None and data['r'] != '' else None
         t = float(data['t']) if 't' in data and data['t'] is not None and data['t'] != '' else None
 
-        result = calculate_mm1(lambda_, mu, n=n, r=r, t=t)
+        result = _calcular('mm1', calculate_mm1, lambda_, mu, n=n, r=r, t=t)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -48,9 +72,37 @@ def api_calculate_mms():
         n = int(data['n']) if 'n' in data and data['n'] is not None and data['n'] != '' else None
         r = int(data['r']) if 'r' in data and data['r'] is not None and data['r'] != '' else None
         t = float(data['t']) if 't' in data and data['t'] is not None and data['t'] != '' else None
+        # Erro relativo aceito na aproximação assintótica para s grande (padrão: 1e-6)
+        tolerancia = float(data['tolerancia']) if data.get('tolerancia') not in (None, '') else TOLERANCIA_QED
+
+        result = _calcular('mms', calculate_mms, lambda_, mu, s, n=n, r=r, t=t, tolerancia=tolerancia)
+        return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@queue_bp.route('/calculate/mmsm', methods=['POST'])
+def api_calculate_mmsm():
+    try:
+        data = request.get_json()
+        if not data or 'lambda' not in data or 'mu' not in data or 's' not in data or 'theta' not in data:
+            return jsonify({'error': 'Campos obrigatórios: lambda, mu, s, theta'}), 400
+
+        lambda_ = float(data['lambda'])
+        mu = float(data['mu'])
+        s = int(data['s'])
+        theta = float(data['theta'])
+
+        # Parâmetros opcionais
+        t = float(data['t']) if 't' in data and data['t'] is not None and data['t'] != '' else None
 
-        result = calculate_mms(lambda_, mu, s, n=n, r=r, t=t)
+        result = _calcular('mmsm', calculate_mmsm, lambda_, mu, s, theta, t=t)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -70,8 +122,10 @@ def api_calculate_mm1k():
         # Parâmetros opcionais
         n = int(data['n']) if 'n' in data and data['n'] is not None and data['n'] != '' else None
 
-        result = calculate_mm1k(lambda_, mu, K, n=n)
+        result = _calcular('mm1k', calculate_mm1k, lambda_, mu, K, n=n)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -91,8 +145,10 @@ def api_calculate_mm1n():
         # Parâmetros opcionais
         n = int(data['n']) if 'n' in data and data['n'] is not None and data['n'] != '' else None
 
-        result = calculate_mm1n(lambda_, mu, N, n=n)
+        result = _calcular('mm1n', calculate_mm1n, lambda_, mu, N, n=n)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -113,8 +169,10 @@ def api_calculate_mmsk():
         # Parâmetros opcionais
         n = int(data['n']) if 'n' in data and data['n'] is not None and data['n'] != '' else None
 
-        result = calculate_mmsk(lambda_, mu, s, K, n=n)
+        result = _calcular('mmsk', calculate_mmsk, lambda_, mu, s, K, n=n)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -135,8 +193,10 @@ def api_calculate_mmsn():
         # Parâmetros opcionais
         n = int(data['n']) if 'n' in data and data['n'] is not None and data['n'] != '' else None
 
-        result = calculate_mmsn(lambda_, mu, s, N, n=n)
+        result = _calcular('mmsn', calculate_mmsn, lambda_, mu, s, N, n=n)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -160,8 +220,58 @@ def api_calculate_mg1():
             desvio_padrao = 1.0 / mu
             var_service = desvio_padrao ** 2
 
-        result = calculate_mg1(lambda_, mu, var_service)
+        result = _calcular('mg1', calculate_mg1, lambda_, mu, var_service)
+        return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+def _coeficientes_variacao(data):
+    # ca2 e cs2 são opcionais - se não informar, usa 1 (chegadas de Poisson, atendimento exponencial)
+    return tuple(
+        float(data[campo]) if campo in data and data[campo] is not None and data[campo] != '' else 1.0
+        for campo in ('ca2', 'cs2')
+    )
+
+@queue_bp.route('/calculate/gg1', methods=['POST'])
+def api_calculate_gg1():
+    try:
+        data = request.get_json()
+        if not data or 'lambda' not in data or 'mu' not in data:
+            return jsonify({'error': 'Campos obrigatórios: lambda, mu'}), 400
+
+        lambda_ = float(data['lambda'])
+        mu = float(data['mu'])
+        ca2, cs2 = _coeficientes_variacao(data)
+
+        result = _calcular('gg1', calculate_gg1, lambda_, mu, ca2, cs2)
+        return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@queue_bp.route('/calculate/ggs', methods=['POST'])
+def api_calculate_ggs():
+    try:
+        data = request.get_json()
+        if not data or 'lambda' not in data or 'mu' not in data or 's' not in data:
+            return jsonify({'error': 'Campos obrigatórios: lambda, mu, s'}), 400
+
+        lambda_ = float(data['lambda'])
+        mu = float(data['mu'])
+        s = int(data['s'])
+        ca2, cs2 = _coeficientes_variacao(data)
+
+        result = _calcular('ggs', calculate_ggs, lambda_, mu, s, ca2, cs2)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -185,8 +295,10 @@ def api_calculate_priority_sem():
         # Converter todos os lambdas para float
         lambdas = [float(l) for l in lambdas]
 
-        result = calculate_priority_sem(s, mu, lambdas)
+        result = _calcular('priority-sem', calculate_priority_sem, s, mu, lambdas)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
@@ -210,8 +322,10 @@ def api_calculate_priority_com():
         # Converter todos os lambdas para float
         lambdas = [float(l) for l in lambdas]
 
-        result = calculate_priority_com(s, mu, lambdas)
+        result = _calcular('priority-com', calculate_priority_com, s, mu, lambdas)
         return jsonify(result), 200
+    except Recusada as e:
+        return jsonify({'error': str(e)}), e.status
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
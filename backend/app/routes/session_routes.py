@@ -0,0 +1,71 @@
+from flask import Blueprint, request, jsonify
+from app.estimation.registry import StreamNotFound, get_session_registry
+from app.models.incremental import create_session
+
+session_bp = Blueprint('sessions', __name__)
+
+# Campo da requisição -> argumento de update()
+PARAMETROS = {'lambda': 'lambda_', 'mu': 'mu', 's': 's', 'K': 'K', 'N': 'N'}
+
+
+def _parametros(data):
+    return {arg: data[campo] for campo, arg in PARAMETROS.items() if data.get(campo) not in (None, '')}
+
+
+def _resposta(stream_id, sessao, termos):
+    return {
+        'id': stream_id,
+        'modelo': sessao.modelo,
+        'termosCalculados': termos,
+        'resultado': sessao.result(),
+    }
+
+
+@session_bp.route('/sessions', methods=['POST'])
+def api_create_session():
+    try:
+        data = request.get_json()
+        if not data or 'modelo' not in data or 'lambda' not in data or 'mu' not in data:
+            return jsonify({'error': 'Campos obrigatórios: modelo, lambda, mu (e K ou N)'}), 400
+
+        parametros = _parametros(data)
+        sessao = create_session(data['modelo'], **parametros)
+        stream_id = get_session_registry().create(sessao)
+        return jsonify(_resposta(stream_id, sessao, sessao.termos)), 201
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@session_bp.route('/sessions/<session_id>', methods=['POST'])
+def api_update_session(session_id):
+    """Altera um ou mais parâmetros (ex.: {"K": 31}) e devolve as novas métricas"""
+    try:
+        data = request.get_json()
+        parametros = _parametros(data or {})
+        if not parametros:
+            return jsonify({'error': f"Informe pelo menos um parâmetro: {', '.join(PARAMETROS)}"}), 400
+
+        def atualizar(sessao):
+            if ('K' in parametros and not hasattr(sessao, 'K')) or ('N' in parametros and not hasattr(sessao, 'N')):
+                raise ValueError(f"Parâmetro inválido para o modelo {sessao.modelo}.")
+            termos = sessao.update(**parametros)
+            return _resposta(session_id, sessao, termos)
+
+        return jsonify(get_session_registry().update(session_id, atualizar)), 200
+    except StreamNotFound:
+        return jsonify({'error': f'Sessão {session_id} não encontrada'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@session_bp.route('/sessions/<session_id>', methods=['GET'])
+def api_get_session(session_id):
+    try:
+        return jsonify(get_session_registry().update(
+            session_id, lambda sessao: _resposta(session_id, sessao, 0))), 200
+    except StreamNotFound:
+        return jsonify({'error': f'Sessão {session_id} não encontrada'}), 404
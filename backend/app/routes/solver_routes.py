@@ -0,0 +1,158 @@
+from flask import Blueprint, request, jsonify
+from app.solvers.buffer import MAX_K, optimal_buffer
+from app.solvers.capacity import max_arrival_rate
+from app.solvers.repair import MAX_FROTA, max_fleet, min_repair_crew
+from app.solvers.staffing import iter_staffing, plan_staffing
+from app.routes.sse import sse_response
+
+solver_bp = Blueprint('solver', __name__)
+
+
+def _parse_bool(valor, campo):
+    # JSON booleano ou as strings "true"/"false" (bool("false") seria True)
+    if isinstance(valor, bool):
+        return valor
+    if isinstance(valor, str) and valor.strip().lower() in ('true', 'false'):
+        return valor.strip().lower() == 'true'
+    raise ValueError(f"O campo '{campo}' deve ser true ou false.")
+
+
+def _args_staffing(data):
+    # Argumentos de plan_staffing do corpo de /solve/staffing e /solve/staffing/stream
+    if not data or 'lambdas' not in data or 'mu' not in data or 'alvo' not in data:
+        raise ValueError('Campos obrigatórios: lambdas, mu, alvo')
+
+    lambdas = data['lambdas']
+    if not isinstance(lambdas, list) or len(lambdas) == 0:
+        raise ValueError('lambdas deve ser uma lista com pelo menos 1 intervalo')
+
+    # Parâmetros opcionais
+    t = float(data['t']) if 't' in data and data['t'] is not None and data['t'] != '' else None
+    duracao = data.get('duracaoIntervalo')
+    duracao = 1.0 if duracao is None or duracao == '' else float(duracao)
+    theta = float(data['theta']) if 'theta' in data and data['theta'] is not None and data['theta'] != '' else None
+
+    return dict(
+        lambdas=[float(l) for l in lambdas],
+        mu=float(data['mu']),
+        sla=data.get('sla') or 'PWqMaiorQueT',
+        alvo=float(data['alvo']),
+        t=t,
+        metodo=data.get('metodo') or 'psa',
+        duracao_intervalo=duracao,
+        periodico=_parse_bool(data.get('periodico', True), 'periodico'),
+        theta=theta,
+    )
+
+
+@solver_bp.route('/solve/staffing', methods=['POST'])
+def api_solve_staffing():
+    try:
+        result = plan_staffing(**_args_staffing(request.get_json()))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@solver_bp.route('/solve/staffing/stream', methods=['POST'])
+def api_solve_staffing_stream():
+    """
+    Dimensionamento de /solve/staffing em Server-Sent Events (ver app/routes/sse.py)
+
+    Eventos: 'inicio' ({intervalos, cargaOferecida}); 'progresso' a cada passo
+    da busca binária, com o melhor plano até ali (servidores); 'resultado',
+    igual à resposta de /solve/staffing.
+    """
+    try:
+        return sse_response(iter_staffing(**_args_staffing(request.get_json())))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@solver_bp.route('/solve/max-lambda', methods=['POST'])
+def api_solve_max_lambda():
+    try:
+        data = request.get_json()
+        if not data or 'modelo' not in data or 'mu' not in data or 'alvo' not in data:
+            return jsonify({'error': 'Campos obrigatórios: modelo, mu, alvo'}), 400
+
+        def valor(campo, padrao=None):
+            # Escalar ou lista (modo vetorizado)
+            x = data.get(campo)
+            if x is None or x == '':
+                return padrao
+            return [float(v) for v in x] if isinstance(x, list) else float(x)
+
+        result = max_arrival_rate(data['modelo'], valor('mu'), s=valor('s', 1), K=valor('K'),
+                                  alvo=valor('alvo'), t=valor('t'))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+@solver_bp.route('/solve/buffer', methods=['POST'])
+def api_solve_buffer():
+    try:
+        data = request.get_json()
+        if not data or 'modelo' not in data or 'lambda' not in data or 'mu' not in data:
+            return jsonify({'error': 'Campos obrigatórios: modelo, lambda, mu'}), 400
+
+        def valor(campo, padrao=None):
+            x = data.get(campo)
+            return padrao if x is None or x == '' else float(x)
+
+        result = optimal_buffer(
+            data['modelo'],
+            float(data['lambda']),
+            float(data['mu']),
+            s=valor('s', 1),
+            objetivo=data.get('objetivo') or 'PK',
+            alvo=valor('alvo'),
+            custo_espera=valor('custoEspera', 0.0),
+            custo_perda=valor('custoPerda', 0.0),
+            custo_posicao=valor('custoPosicao', 0.0),
+            K_max=valor('Kmax', MAX_K),
+        )
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@solver_bp.route('/solve/repair-crew', methods=['POST'])
+def api_solve_repair_crew():
+    try:
+        data = request.get_json()
+        if not data or 'lambda' not in data or 'mu' not in data or 'N' not in data or 'alvo' not in data:
+            return jsonify({'error': 'Campos obrigatórios: lambda, mu, N, alvo'}), 400
+
+        result = min_repair_crew(float(data['lambda']), float(data['mu']), float(data['N']),
+                                 sla=data.get('sla') or 'disponibilidade', alvo=float(data['alvo']))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
+
+
+@solver_bp.route('/solve/max-fleet', methods=['POST'])
+def api_solve_max_fleet():
+    try:
+        data = request.get_json()
+        if not data or 'lambda' not in data or 'mu' not in data or 's' not in data or 'alvo' not in data:
+            return jsonify({'error': 'Campos obrigatórios: lambda, mu, s, alvo'}), 400
+
+        N_max = data.get('Nmax')
+        result = max_fleet(float(data['lambda']), float(data['mu']), float(data['s']),
+                           sla=data.get('sla') or 'disponibilidade', alvo=float(data['alvo']),
+                           N_max=MAX_FROTA if N_max is None or N_max == '' else float(N_max))
+        return jsonify(result), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Erro interno: {str(e)}'}), 500
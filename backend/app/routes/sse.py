@@ -0,0 +1,94 @@
+"""
+Respostas em Server-Sent Events (SSE) para cálculos longos
+
+As rotas `.../stream` recebem o mesmo corpo da rota normal e devolvem
+text/event-stream. Cada evento é um par (nome, dados) gerado pelo cálculo
+(ex.: iter_grid, iter_uncertainty, iter_staffing), enviado como
+    event: <nome>
+    data: <dados em JSON>
+assim que fica pronto, para o frontend ir mostrando o resultado parcial
+(ex.: new EventSource não aceita POST; use fetch e leia o corpo aos poucos).
+
+O primeiro evento é gerado antes da resposta começar: erros de validação
+continuam respondendo 400 com JSON. Um erro no meio do cálculo vira um
+evento 'erro' ({'error': ...}) e encerra o fluxo.
+
+Cancelamento: quando o cliente desconecta, o servidor fecha a resposta, o
+que fecha o gerador do cálculo no próximo evento (GeneratorExit) e libera
+o worker. Com um prazo (app/models/prazo.py), o cálculo que passa dele
+termina com um evento 'erro'.
+"""
+import json
+from itertools import chain
+
+import numpy as np
+from flask import Response
+
+from app.models.prazo import PrazoExcedido, com_prazo
+
+
+def para_json(valores):
+    """Array -> listas aninhadas, com None no lugar de NaN e infinitos"""
+    valores = np.asarray(valores, dtype=np.float64)
+    return np.where(np.isfinite(valores), valores, None).tolist()
+
+
+def evento_sse(nome, dados):
+    """Um evento no formato text/event-stream"""
+    return f"event: {nome}\ndata: {json.dumps(dados, ensure_ascii=False, allow_nan=False)}\n\n"
+
+
+def ler_eventos(texto):
+    """Inverso de evento_sse: lista de (nome, dados) de um corpo text/event-stream"""
+    eventos = []
+    for bloco in texto.split('\n\n'):
+        campos = dict(linha.split(': ', 1) for linha in bloco.splitlines() if ': ' in linha)
+        if 'event' in campos:
+            eventos.append((campos['event'], json.loads(campos.get('data', 'null'))))
+    return eventos
+
+
+def sse_response(eventos, prazo=None):
+    """
+    Resposta SSE para um gerador de eventos (nome, dados)
+
+    Args:
+        eventos: Gerador de eventos (nome, dados)
+        prazo (Prazo, optional): Prazo do cálculo inteiro, ativo enquanto os
+            eventos são gerados
+
+    Raises:
+        ValueError: Se o primeiro evento falhar (validação); a rota responde 400
+    """
+    with com_prazo(prazo):
+        primeiro = next(eventos)
+
+    def proximos():
+        # O prazo só fica ativo enquanto o cálculo avança, nunca entre eventos
+        while True:
+            with com_prazo(prazo):
+                try:
+                    evento = next(eventos)
+                except StopIteration:
+                    return
+            yield evento
+
+    def corpo():
+        try:
+            for nome, dados in chain([primeiro], proximos()):
+                yield evento_sse(nome, dados)
+        except PrazoExcedido as e:
+            yield evento_sse('erro', {'error': str(e)})
+        except ValueError as e:
+            yield evento_sse('erro', {'error': str(e)})
+        except Exception as e:
+            yield evento_sse('erro', {'error': f'Erro interno: {str(e)}'})
+        finally:
+            # Cliente desconectado (ou fim): interrompe o cálculo
+            eventos.close()
+
+    return Response(corpo(), status=200, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Proxies (ex.: nginx) não devem acumular a resposta
+        'X-Accel-Buffering': 'no',
+    })
@@ -0,0 +1,158 @@
+"""
+Servidor de produção (pre-fork) para a API
+
+Usa o Gunicorn com um worker por núcleo. Antes do fork, o processo mestre
+importa todos os módulos de modelos, carrega todos os blueprints (que o app
+carregaria só no primeiro acesso, ver app/main.py) e pré-calcula as tabelas
+numéricas (log-fatoriais, usadas pelo Erlang e pelos modelos vetorizados),
+que os workers herdam por copy-on-write.
+
+Sinais suportados pelo processo mestre (padrão do Gunicorn):
+- HUP: recria os workers a partir do mestre. Com o preload (padrão), o código
+  já carregado no mestre é reaproveitado: HUP NÃO carrega código novo
+- USR2 seguido de TERM no mestre antigo: atualização de código sem queda
+  (USR2 sobe um novo mestre, que importa o código atual; quando os novos
+  workers estiverem de pé, TERM encerra o mestre antigo com seus workers)
+- TERM: desligamento gracioso, esperando `graceful_timeout` segundos
+- TTIN / TTOU: aumenta / diminui o número de workers
+
+Sem o preload (`preload=False`), cada worker importa o app por conta própria:
+HUP passa a carregar o código novo, ao custo de não compartilhar as tabelas.
+
+Os workers compartilham o cache de resultados em SQLite (app/cache.py), que
+também sobrevive a reinícios: um servidor reiniciado responde de imediato os
+cenários mais populares. Os fluxos de estimação online também ficam em SQLite
+(app/estimation/registry.py), pois requisições seguidas do mesmo fluxo caem
+em workers diferentes. A fila de tarefas em segundo plano (app/jobs.py)
+guarda estado e resultados em outro banco SQLite; cada worker executa as
+tarefas que recebeu em um pool próprio de threads.
+
+Requisições longas (ex.: M/M/s/N com N grande) são limitadas por `timeout`:
+um worker que passa esse tempo sem responder é reiniciado.
+"""
+import importlib
+import os
+
+from gunicorn.app.base import BaseApplication
+
+# Módulos importados no mestre antes do fork
+PRELOAD_MODULES = (
+    'app.models.mm1',
+    'app.models.mms',
+    'app.models.mmsm',
+    'app.models.mm1k',
+    'app.models.mmsk',
+    'app.models.mm1n',
+    'app.models.mmsn',
+    'app.models.mg1',
+    'app.models.priority_sem',
+    'app.models.priority_com',
+    'app.models.erlang',
+    'app.models.batch',
+    'app.solvers.staffing',
+    'app.analysis.grid',
+    # Importados sob demanda (staffing 'mol' e funções especiais dos modelos);
+    # no mestre, pagos uma vez só
+    'scipy.signal',
+    'scipy.special',
+)
+
+
+def preload():
+    """Importa os módulos de modelos e pré-calcula as tabelas compartilhadas"""
+    for nome in PRELOAD_MODULES:
+        importlib.import_module(nome)
+
+    from app.models.numeric import preload_tables
+    preload_tables()
+
+
+def default_workers():
+    """Um worker por núcleo disponível para este processo"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+class ProductionServer(BaseApplication):
+    """Aplicação Gunicorn que serve o app Flask já carregado no mestre"""
+
+    def __init__(self, application=None, options=None):
+        # application=None: cada worker importa o app (sem preload)
+        self.application = application
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for chave, valor in self.options.items():
+            if chave in self.cfg.settings and valor is not None:
+                self.cfg.set(chave, valor)
+
+    def load(self):
+        if self.application is None:
+            from app.main import app
+            return app
+        return self.application
+
+
+def build_options(host='0.0.0.0', port=5000, workers=None, timeout=120, graceful_timeout=30,
+                  max_requests=0, preload=True):
+    """
+    Monta a configuração do Gunicorn
+
+    Args:
+        host (str): Interface de escuta
+        port (int): Porta
+        workers (int, optional): Número de workers (padrão: um por núcleo)
+        timeout (int): Segundos sem resposta antes de reiniciar um worker
+        graceful_timeout (int): Segundos para terminar requisições na recarga/saída
+        max_requests (int): Reciclar cada worker após N requisições (0 = nunca)
+        preload (bool): Carregar app e tabelas no mestre antes do fork
+    """
+    return {
+        'bind': f'{host}:{port}',
+        'workers': workers or default_workers(),
+        'worker_class': 'sync',
+        'preload_app': preload,
+        'timeout': timeout,
+        'graceful_timeout': graceful_timeout,
+        'max_requests': max_requests,
+        'max_requests_jitter': max_requests // 10 if max_requests else 0,
+    }
+
+
+def run_production(cache_path=None, cache_max=None, streams_path=None, jobs_path=None, **kwargs):
+    """
+    Pré-carrega modelos e tabelas e inicia o servidor pre-fork
+
+    Args:
+        cache_path (str, optional): Banco SQLite do cache de resultados
+            compartilhado entre os workers (None = desligado)
+        cache_max (int, optional): Número máximo de resultados no cache
+        streams_path (str, optional): Banco SQLite dos fluxos de estimação
+            online; obrigatório com mais de um worker
+        jobs_path (str, optional): Banco SQLite da fila de tarefas (None =
+            FILAS_JOBS_PATH ou o padrão de app/jobs.py)
+        **kwargs: Opções de build_options
+    """
+    if cache_path:
+        from app import cache
+        cache.configure(cache_path, cache_max or cache.DEFAULT_MAX_ENTRIES)
+    if streams_path:
+        from app.estimation import registry
+        registry.configure(streams_path)
+    elif build_options(**kwargs)['workers'] > 1:
+        raise ValueError("Com mais de um worker os fluxos de estimação precisam de um banco compartilhado "
+                         "(streams_path).")
+    if jobs_path:
+        from app import jobs
+        jobs.configure(jobs_path)
+    opcoes = build_options(**kwargs)
+    if not opcoes['preload_app']:
+        ProductionServer(None, opcoes).run()
+        return
+    preload()
+    from app.main import app, load_blueprints
+    load_blueprints(app)
+    ProductionServer(app, opcoes).run()
@@ -0,0 +1 @@
+# Módulo de solvers (dimensionamento e problemas inversos sobre os modelos)
@@ -0,0 +1,190 @@
+"""
+Tamanho ótimo do buffer (K) para o M/M/1/K e o M/M/s/K
+
+Dois objetivos:
+- 'PK': o menor K com bloqueio P(K) ≤ α;
+- 'custo': o K que minimiza o custo por unidade de tempo
+      custoEspera × L + custoPerda × λ × P(K) + custoPosicao × K
+  (clientes no sistema, clientes perdidos e posições do buffer).
+
+Em vez de recalcular P0 e todas as somas para K = s, s+1, ..., a varredura
+mantém as somas acumuladas e acrescenta um estado por K, em O(1). Com os
+pesos divididos pelo peso do estado s (w_s = a^s/s!, a = λ/μ, r = ρ = a/s):
+    A = Σ(n<s) w_n/w_s          B = Σ(n<s) n×w_n/w_s
+    G = Σ(j=0..K-s) r^j         H = Σ(j=0..K-s) j×r^j
+    P(K) = r^(K-s)/(A + G)      L = (B + s×G + H)/(A + G)      Lq = H/(A + G)
+A e B saem uma única vez do kernel de app/models/numeric.py; G e H crescem
+um termo por K. A varredura é feita em blocos de BLOCO_TERMOS valores de K
+(somas cumulativas do NumPy, com verificação de prazo entre blocos), e as
+somas são reescaladas entre os blocos para não estourar com ρ > 1. K na
+casa dos milhões custa dezenas de milissegundos.
+
+Paradas:
+- 'PK': P(K) decresce com K; com ρ > 1 tende a 1 - 1/ρ, então alvos abaixo
+  disso são recusados sem varrer.
+- 'custo': custoEspera × L + custoPosicao × K cresce com K e é um limite
+  inferior do custo; quando passa do menor custo já visto, nenhum K maior
+  pode ser melhor.
+"""
+import math
+
+import numpy as np
+
+from app.models.numeric import BLOCO_TERMOS, log_power_ratio, log_sum_power_ratios
+from app.models.prazo import verificar_prazo
+
+MODELOS = ('mm1k', 'mmsk')
+OBJETIVOS = ('PK', 'custo')
+
+MAX_K = 10**8
+
+# Maior log de um termo dentro de um bloco (exp(600) não estoura)
+_LOG_MAX_TERMO = 600.0
+
+
+def _blocos(a, s, K_max):
+    """(K, log P(K), L, Lq) de K = s até K_max, em blocos (arrays)"""
+    r = a / s
+    log_r = math.log(r)
+    log_ws = float(log_power_ratio(a, s))
+    log_A = log_sum_power_ratios(a, s) - log_ws
+    log_B = math.log(a) + log_sum_power_ratios(a, s - 1) - log_ws if s > 1 else -math.inf
+
+    # Somas divididas por e^escala (só as razões importam)
+    escala = max(log_A, 0.0)
+    A, B = math.exp(log_A - escala), math.exp(log_B - escala)
+    G = H = 0.0
+    log_p = -escala  # log de r^j (reescalado) no início do bloco
+
+    tamanho = BLOCO_TERMOS if r <= 1 else max(1, min(BLOCO_TERMOS, int(_LOG_MAX_TERMO / log_r)))
+    total = int(K_max) - s + 1
+    for inicio in range(0, total, tamanho):
+        verificar_prazo()
+        if log_p > 0:
+            fator = math.exp(-log_p)
+            A, B, G, H = A * fator, B * fator, G * fator, H * fator
+            log_p = 0.0
+        j = np.arange(inicio, min(total, inicio + tamanho))
+        log_t = log_p + (j - inicio) * log_r
+        t = np.exp(log_t)
+        Gc = G + np.cumsum(t)
+        Hc = H + np.cumsum(j * t)
+        Z = A + Gc
+        yield s + j, log_t - np.log(Z), (B + s * Gc + Hc) / Z, Hc / Z
+        G, H = float(Gc[-1]), float(Hc[-1])
+        log_p += j.size * log_r
+
+
+def optimal_buffer(modelo, lambda_, mu, s=1, objetivo='PK', alvo=None, custo_espera=0.0, custo_perda=0.0,
+                   custo_posicao=0.0, K_max=MAX_K) -> dict:
+    """
+    Calcula o tamanho ótimo do buffer (capacidade K do sistema)
+
+    Args:
+        modelo (str): 'mm1k' ou 'mmsk'
+        lambda_ (float): Taxa de chegada
+        mu (float): Taxa de atendimento por servidor
+        s (int): Número de servidores (ignorado em mm1k; s ≥ 2 em mmsk)
+        objetivo (str): 'PK' (menor K com P(K) ≤ alvo) ou 'custo'
+        alvo (float): α, limite de P(K) (objetivo 'PK')
+        custo_espera (float): Custo por cliente no sistema por unidade de tempo
+        custo_perda (float): Custo por cliente perdido (bloqueado)
+        custo_posicao (float): Custo por posição do buffer por unidade de tempo
+        K_max (int): Maior K considerado
+
+    Returns:
+        dict: Solução
+            - K: Capacidade ótima
+            - rho, PK, lambdaEfetivo, L, Lq, W, Wq: Métricas do M/M/s/K com esse K
+            - passos: Valores de K avaliados (os blocos são avaliados
+              inteiros, então pode passar do K ótimo em até um bloco)
+            - objetivo 'custo': custo (no K ótimo) e limiteAtingido (True se
+              a varredura parou em K_max sem provar que o K é ótimo)
+
+    Raises:
+        ValueError: Se os parâmetros forem inválidos ou nenhum K ≤ K_max
+            atingir o alvo
+
+    Exemplo:
+        >>> optimal_buffer('mmsk', 9.5, 1.0, 10, alvo=1e-6)['K']
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo '{modelo}' inválido. Use um de: {', '.join(MODELOS)}.")
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo '{objetivo}' inválido. Use um de: {', '.join(OBJETIVOS)}.")
+    if modelo == 'mm1k':
+        s = 1
+    if not (lambda_ > 0 and mu > 0):
+        raise ValueError("λ > 0 e μ > 0 são necessários.")
+    if s != int(s) or s < (2 if modelo == 'mmsk' else 1):
+        raise ValueError("O número de servidores (s) deve ser um inteiro ≥ 2.")
+    s = int(s)
+    if K_max != int(K_max) or K_max < s:
+        raise ValueError(f"K_max deve ser um inteiro maior ou igual a s={s}.")
+    K_max = int(K_max)
+    a = lambda_ / mu
+    rho = a / s
+
+    if objetivo == 'PK':
+        if alvo is None or not 0 < alvo < 1:
+            raise ValueError("O alvo de PK deve estar entre 0 e 1.")
+        if rho > 1 and alvo <= 1 - 1 / rho:
+            raise ValueError(
+                f"Com ρ = {rho:.4g} > 1, P(K) nunca fica abaixo de 1 - 1/ρ = {1 - 1 / rho:.4g}, "
+                "qualquer que seja K."
+            )
+    else:
+        custos = (custo_espera, custo_perda, custo_posicao)
+        if any(not c >= 0 for c in custos):
+            raise ValueError("Os custos devem ser não-negativos.")
+        if custo_espera == 0 and custo_posicao == 0:
+            raise ValueError("custoEspera ou custoPosicao deve ser positivo (senão o melhor K é infinito).")
+
+    melhor = None
+    passos = 0
+    limite_atingido = True
+    for K, log_pk, L, Lq in _blocos(a, s, K_max):
+        passos += K.size
+        if objetivo == 'PK':
+            atende = np.flatnonzero(log_pk <= math.log(alvo))
+            if atende.size:
+                i = int(atende[0])
+                melhor = (K[i], log_pk[i], L[i], Lq[i], None)
+                break
+        else:
+            limite = custo_espera * L + custo_posicao * K
+            custo = limite + custo_perda * lambda_ * np.exp(log_pk)
+            i = int(np.argmin(custo))
+            if melhor is None or custo[i] < melhor[4]:
+                melhor = (K[i], log_pk[i], L[i], Lq[i], float(custo[i]))
+            if limite[-1] >= melhor[4]:
+                limite_atingido = False
+                break
+
+    if melhor is None:
+        raise ValueError(f"Nenhum K até K_max={K_max} atinge P(K) ≤ {alvo:g}.")
+
+    K, log_pk, L, Lq, custo = melhor
+    PK = math.exp(log_pk)
+    lambda_efetivo = lambda_ * (1 - PK)
+    result = {
+        'modelo': modelo,
+        'objetivo': objetivo,
+        'K': int(K),
+        'rho': rho,
+        'PK': PK,
+        'lambdaEfetivo': lambda_efetivo,
+        'L': float(L),
+        'Lq': float(Lq),
+        'W': float(L) / lambda_efetivo,
+        'Wq': float(Lq) / lambda_efetivo,
+        'passos': passos,
+    }
+    if modelo == 'mmsk':
+        result['s'] = s
+    if objetivo == 'PK':
+        result['alvo'] = alvo
+    else:
+        result['custo'] = custo
+        result['limiteAtingido'] = limite_atingido
+    return result
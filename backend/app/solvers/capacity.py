@@ -0,0 +1,192 @@
+"""
+Maior taxa de chegada sustentável (problema inverso do dimensionamento)
+
+Dados μ, s e (nos modelos com capacidade) K, encontra o maior λ que ainda
+atende ao nível de serviço (SLA):
+- 'PWqMaiorQueT' (M/M/1 e M/M/s): P(Wq > t) ≤ α
+- 'PK' (M/M/1/K e M/M/s/K): probabilidade de bloqueio P(K) ≤ α
+
+As duas métricas crescem com λ, então o λ máximo é a raiz de
+g(λ) = log(métrica) - log(α). A raiz é encontrada por Newton com salvaguarda:
+o intervalo [lo, hi] que contém a raiz é atualizado a cada passo, e quando o
+passo de Newton sai dele usa-se a bisseção.
+
+A derivada sai dos mesmos valores da iteração, sem cálculo extra:
+- Erlang: com B = B(s, a) (calculado uma única vez por iteração, e reaproveitado
+  por C e pela derivada), d log B/d log a = s - a×(1 - B) = D e C = s×B/D, logo
+      d log C/d log a = D + a×(1 - B)/D - a×B
+- M/M/s/K: os pesos dos estados são proporcionais a a^n, logo
+      d log P(K)/d log a = K - L
+
+O que não depende de λ é calculado uma só vez e reaproveitado de uma iteração
+para a outra (log s! de cada cenário). A métrica devolvida é a do λ
+devolvido: quando a iteração para pelo tamanho do passo, o último passo
+ainda mudou λ, e só esses cenários são reavaliados uma vez no fim. B e C em
+si mudam com λ a cada passo e não têm o que reaproveitar.
+
+Todos os parâmetros (s, K, t, α e μ) aceitam arrays com broadcast: vários alvos
+são resolvidos de uma vez, iterando apenas os cenários ainda não convergidos.
+"""
+import numpy as np
+
+from app.models.batch import calculate_mmsk_batch
+from app.models.erlang import erlang_b_batch
+from app.models.numeric import log_factorial
+
+MODELOS = ('mm1', 'mms', 'mm1k', 'mmsk')
+SLAS = {'mm1': 'PWqMaiorQueT', 'mms': 'PWqMaiorQueT', 'mm1k': 'PK', 'mmsk': 'PK'}
+
+# Convergência: passo relativo de λ ou |g| (erro relativo da métrica)
+TOLERANCIA_RELATIVA = 1e-12
+MAX_ITERACOES = 200
+
+
+def _log_pwq(lambda_, mu, s, t, log_fatorial_s):
+    # log P(Wq > t) = log C - (s×μ - λ)×t e sua derivada em λ
+    a = lambda_ / mu
+    B = erlang_b_batch(a, s, log_fatorial_s)
+    D = s - a * (1 - B)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_C = np.log(s * B / D)
+        derivada = (D + a * (1 - B) / D - a * B) / lambda_ + t
+    return np.where(a < s, log_C - (s * mu - lambda_) * t, np.inf), derivada
+
+
+def _log_pk(lambda_, mu, s, K):
+    # log P(K) e sua derivada em λ
+    r = calculate_mmsk_batch(lambda_, mu, s, K)
+    with np.errstate(divide='ignore'):
+        return np.log(r['PK']), (K - r['L']) / lambda_
+
+
+def _newton_salvaguardado(avaliar, lo, hi, log_alvo):
+    # Raiz de g(λ) = avaliar(λ) - log_alvo em (lo, hi), com g(lo) < 0 < g(hi)
+    x = (lo + hi) / 2
+    log_metrica = np.full(x.shape, np.nan)
+    avaliado = np.full(x.shape, np.nan)
+    iteracoes = np.zeros(x.shape, dtype=np.int64)
+    ativos = np.arange(x.size)
+    for _ in range(MAX_ITERACOES):
+        if ativos.size == 0:
+            break
+        xa, lo_a, hi_a = x[ativos], lo[ativos], hi[ativos]
+        log_m, derivada = avaliar(xa, ativos)
+        g = log_m - log_alvo[ativos]
+        lo_a = np.where(g <= 0, xa, lo_a)
+        hi_a = np.where(g > 0, xa, hi_a)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            novo = xa - g / derivada
+        fora = ~((novo > lo_a) & (novo < hi_a))
+        novo = np.where(fora, (lo_a + hi_a) / 2, novo)
+        raiz = np.abs(g) <= TOLERANCIA_RELATIVA
+        novo = np.where(raiz, xa, novo)
+
+        x[ativos], lo[ativos], hi[ativos] = novo, lo_a, hi_a
+        log_metrica[ativos], avaliado[ativos] = log_m, xa
+        iteracoes[ativos] += 1
+        convergiu = raiz | (np.abs(novo - xa) <= TOLERANCIA_RELATIVA * novo)
+        ativos = ativos[~convergiu]
+
+    # Convergência pelo passo (ou MAX_ITERACOES): a métrica é a do λ anterior ao
+    # último passo; reavaliar no λ devolvido, só nesses cenários
+    mudou = np.flatnonzero(x != avaliado)
+    if mudou.size:
+        log_metrica[mudou], _ = avaliar(x[mudou], mudou)
+    return x, log_metrica, iteracoes
+
+
+def max_arrival_rate(modelo, mu, s=1, K=None, alvo=0.2, t=None) -> dict:
+    """
+    Calcula o maior λ que atende ao SLA do modelo
+
+    Args:
+        modelo (str): 'mm1', 'mms', 'mm1k' ou 'mmsk'
+        mu (array_like): Taxa de atendimento por servidor
+        s (array_like): Número de servidores (ignorado em mm1/mm1k)
+        K (array_like, optional): Capacidade do sistema (mm1k/mmsk)
+        alvo (array_like): α, limite de P(Wq > t) (mm1/mms) ou de P(K) (mm1k/mmsk)
+        t (array_like, optional): Tempo de espera do SLA (mm1/mms)
+
+    Returns:
+        dict: Solução (escalares, ou listas se algum parâmetro for um array)
+            - lambdaMax: Maior taxa de chegada que atende ao SLA
+            - rho: λmax/(s×μ) correspondente
+            - PWqMaiorQueT ou PK: Valor da métrica em λmax (= α)
+            - iteracoes: Número de iterações de cada cenário
+
+    Raises:
+        ValueError: Se os parâmetros forem inválidos
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo '{modelo}' inválido. Use um de: {', '.join(MODELOS)}.")
+    sla = SLAS[modelo]
+    if modelo in ('mm1', 'mm1k'):
+        s = 1
+
+    mu, s, alvo = (np.asarray(x, dtype=np.float64) for x in (mu, s, alvo))
+    if not np.all(mu > 0):
+        raise ValueError("A taxa de atendimento (μ) deve ser positiva.")
+    if not np.all((s >= 1) & (s == np.floor(s))):
+        raise ValueError("O número de servidores (s) deve ser um inteiro ≥ 1.")
+    if not np.all((alvo > 0) & (alvo < 1)):
+        raise ValueError(f"O alvo de {sla} deve estar entre 0 e 1.")
+
+    if sla == 'PWqMaiorQueT':
+        if t is None:
+            raise ValueError("O SLA 'PWqMaiorQueT' exige um tempo (t) não-negativo.")
+        t = np.asarray(t, dtype=np.float64)
+        if not np.all(t >= 0):
+            raise ValueError("O SLA 'PWqMaiorQueT' exige um tempo (t) não-negativo.")
+        mu, s, alvo, t = np.broadcast_arrays(mu, s, alvo, t)
+        forma = mu.shape
+        mu, s, alvo, t = (np.array(x, dtype=np.float64).ravel() for x in (mu, s, alvo, t))
+        log_fatorial_s = log_factorial(s)
+
+        def avaliar(lambda_, i):
+            return _log_pwq(lambda_, mu[i], s[i], t[i], log_fatorial_s[i])
+
+        # P(Wq > t) → 0 com λ → 0 e → 1 com λ → s×μ
+        lo, hi = np.zeros_like(mu), s * mu
+    else:
+        if K is None:
+            raise ValueError("O modelo exige a capacidade do sistema (K).")
+        K = np.asarray(K, dtype=np.float64)
+        if not np.all((K == np.floor(K)) & (K >= s)):
+            raise ValueError("A capacidade (K) deve ser um inteiro maior ou igual a s.")
+        mu, s, alvo, K = np.broadcast_arrays(mu, s, alvo, K)
+        forma = mu.shape
+        mu, s, alvo, K = (np.array(x, dtype=np.float64).ravel() for x in (mu, s, alvo, K))
+
+        def avaliar(lambda_, i):
+            return _log_pk(lambda_, mu[i], s[i], K[i])
+
+        # P(K) → 1 com λ → ∞: dobrar hi até passar do alvo
+        lo, hi = np.zeros_like(mu), s * mu
+        abaixo = np.arange(mu.size)
+        while abaixo.size:
+            log_pk, _ = avaliar(hi[abaixo], abaixo)
+            abaixo = abaixo[log_pk < np.log(alvo[abaixo])]
+            lo[abaixo] = hi[abaixo]
+            hi[abaixo] *= 2
+
+    lambda_max, log_m, iteracoes = _newton_salvaguardado(avaliar, lo, hi, np.log(alvo))
+
+    def formatar(x):
+        return np.reshape(x, forma).tolist()
+
+    result = {
+        'modelo': modelo,
+        'sla': sla,
+        'alvo': formatar(alvo),
+        'lambdaMax': formatar(lambda_max),
+        'rho': formatar(lambda_max / (s * mu)),
+        sla: formatar(np.exp(log_m)),
+        'iteracoes': formatar(iteracoes),
+    }
+    if modelo in ('mms', 'mmsk'):
+        result['s'] = formatar(s.astype(np.int64))
+    if sla == 'PWqMaiorQueT':
+        result['t'] = formatar(t)
+    else:
+        result['K'] = formatar(K.astype(np.int64))
+    return result
@@ -0,0 +1,185 @@
+"""
+Dimensionamento da equipe de reparo (modelo de máquinas, população finita)
+
+N máquinas quebram, cada uma, à taxa λ enquanto funcionam, e s técnicos as
+consertam à taxa μ cada: o M/M/s/N (M/M/1/N com s = 1). Dois problemas:
+- min_repair_crew: com N fixo, o menor s que atende ao SLA;
+- max_fleet: com s fixo, a maior frota N que a equipe aguenta.
+
+SLAs: 'disponibilidade' (numOperacionais/N ≥ α) ou 'Wq' (espera média pelo
+reparo ≤ α). A disponibilidade cresce com s e cai com N; Wq faz o contrário.
+O teto da disponibilidade é 1/(1 + λ/μ), com um técnico por máquina quebrada.
+
+As duas métricas são monótonas em s e em N, então a busca avalia blocos de
+valores (o primeiro denso a partir do início, os seguintes espaçados dentro
+do intervalo que ainda contém a resposta) com calculate_mmsn_batch. Cada
+valor custa O(1): as somas dos estados saem das formas acumuladas (binomial
+e Poisson) do lote, e nenhuma soma binomial é refeita estado a estado. O
+intervalo encolhe BLOCO vezes por bloco, então até MAX_FROTA valores custam
+poucos blocos. Os valores avaliados formam a curva de compromisso devolvida
+(s ou N × disponibilidade, numOperacionais, L e Wq): densa no começo,
+esparsa perto de respostas grandes.
+"""
+import numpy as np
+
+from app.models.batch import calculate_mmsn_batch
+from app.models.prazo import verificar_prazo
+
+SLAS = ('disponibilidade', 'Wq')
+METRICAS = ('disponibilidade', 'numOperacionais', 'L', 'Wq')
+
+MAX_FROTA = 10**6
+
+# Valores avaliados por bloco da busca
+BLOCO = 256
+
+
+def _avaliar(lambda_, mu, s, N):
+    r = calculate_mmsn_batch(lambda_, mu, s, N)
+    return {
+        'disponibilidade': r['numOperacionais'] / N,
+        'numOperacionais': r['numOperacionais'],
+        'L': r['L'],
+        'Wq': r['Wq'],
+    }
+
+
+def _atende(curva, sla, alvo):
+    if sla == 'disponibilidade':
+        return curva['disponibilidade'] >= alvo
+    return curva['Wq'] <= alvo
+
+
+def _buscar(avaliar, inicio, fim, parar):
+    """
+    Primeiro x em inicio..fim com parar(curva) verdadeiro (parar é monótono em x)
+
+    O primeiro bloco é denso (x = inicio, inicio+1, ...); depois cada bloco
+    tem até BLOCO pontos espaçados no intervalo que ainda contém a resposta,
+    que encolhe BLOCO vezes por bloco (busca em k partes): 10^6 valores
+    custam ~4 blocos.
+
+    Returns:
+        tuple: (x avaliados até o que parou, em ordem, curva nesses x, índice
+            do x que parou ou None)
+    """
+    valores, partes = [], []
+    # Invariante: parar é falso em lo (ou lo < inicio) e verdadeiro em hi (ou hi > fim)
+    lo, hi = inicio - 1, fim + 1
+    x = np.arange(inicio, min(fim, inicio + BLOCO - 1) + 1)
+    while x.size:
+        verificar_prazo()
+        curva = avaliar(x)
+        valores.append(x)
+        partes.append(curva)
+        parou = np.flatnonzero(parar(curva))
+        if parou.size:
+            hi = int(x[parou[0]])
+            lo = int(x[parou[0] - 1]) if parou[0] > 0 else lo
+        else:
+            lo = int(x[-1])
+        x = np.unique(np.linspace(lo + 1, hi - 1, min(BLOCO, max(hi - lo - 1, 0))).round().astype(np.int64))
+
+    # Cada bloco fica entre lo e hi do anterior: não há x repetidos
+    x = np.concatenate(valores)
+    ordem = np.argsort(x)
+    ordem = ordem[x[ordem] <= hi]
+    curva = {k: np.concatenate([p[k] for p in partes])[ordem] for k in METRICAS}
+    return x[ordem], curva, (ordem.size - 1 if hi <= fim else None)
+
+
+def _validar(lambda_, mu, sla, alvo):
+    if not (lambda_ > 0 and mu > 0):
+        raise ValueError("λ > 0 e μ > 0 são necessários.")
+    if sla not in SLAS:
+        raise ValueError(f"SLA '{sla}' inválido. Use um de: {', '.join(SLAS)}.")
+    if sla == 'disponibilidade':
+        if not 0 < alvo < 1:
+            raise ValueError("O alvo de disponibilidade deve estar entre 0 e 1.")
+        teto = 1 / (1 + lambda_ / mu)
+        if alvo > teto:
+            raise ValueError(
+                f"Disponibilidade {alvo:g} inalcançável: mesmo com um técnico por máquina ela é "
+                f"1/(1 + λ/μ) = {teto:.6g}."
+            )
+    elif not alvo >= 0:
+        raise ValueError("O alvo de Wq deve ser não-negativo.")
+
+
+def _resultado(x, curva, i, nome):
+    result = {nome: int(x[i])}
+    result.update({k: float(curva[k][i]) for k in METRICAS})
+    result['curva'] = {nome: x.tolist(), **{k: curva[k].tolist() for k in METRICAS}}
+    return result
+
+
+def min_repair_crew(lambda_, mu, N, sla='disponibilidade', alvo=0.9) -> dict:
+    """
+    Menor número de técnicos s que atende ao SLA com N máquinas
+
+    Args:
+        lambda_ (float): Taxa de quebra de cada máquina em funcionamento
+        mu (float): Taxa de reparo de cada técnico
+        N (int): Número de máquinas
+        sla (str): 'disponibilidade' (numOperacionais/N ≥ alvo) ou 'Wq' (Wq ≤ alvo)
+        alvo (float): α do SLA
+
+    Returns:
+        dict: s, as métricas com esse s (disponibilidade, numOperacionais,
+            L, Wq) e a curva de compromisso nos s avaliados de 1 até o s
+            ótimo ({s: [...], disponibilidade: [...], ...})
+
+    Raises:
+        ValueError: Se os parâmetros forem inválidos ou o alvo inalcançável
+
+    Exemplo:
+        >>> min_repair_crew(0.01, 1.0, 10**5, alvo=0.985)['s']
+    """
+    _validar(lambda_, mu, sla, alvo)
+    if N != int(N) or N < 1:
+        raise ValueError("O número de máquinas (N) deve ser um inteiro ≥ 1.")
+    N = int(N)
+
+    x, curva, i = _buscar(lambda s: _avaliar(lambda_, mu, s, N), 1, N,
+                          lambda curva: _atende(curva, sla, alvo))
+    if i is None:
+        # Só por arredondamento: com s = N a disponibilidade é o teto e Wq = 0
+        raise ValueError(f"Nenhuma equipe com até s = N = {N} técnicos atinge o alvo.")
+    return {'sla': sla, 'alvo': alvo, 'N': N, **_resultado(x, curva, i, 's')}
+
+
+def max_fleet(lambda_, mu, s, sla='disponibilidade', alvo=0.9, N_max=MAX_FROTA) -> dict:
+    """
+    Maior número de máquinas N que s técnicos atendem dentro do SLA
+
+    Args:
+        lambda_ (float): Taxa de quebra de cada máquina em funcionamento
+        mu (float): Taxa de reparo de cada técnico
+        s (int): Número de técnicos
+        sla (str): 'disponibilidade' (numOperacionais/N ≥ alvo) ou 'Wq' (Wq ≤ alvo)
+        alvo (float): α do SLA
+        N_max (int): Maior frota considerada
+
+    Returns:
+        dict: N, as métricas com essa frota, limiteAtingido (True se a
+            frota N_max ainda atende ao SLA) e a curva de compromisso nos N
+            avaliados de s até o primeiro N que não atende ({N: [...], ...})
+
+    Raises:
+        ValueError: Se os parâmetros forem inválidos ou nem N = s atender
+    """
+    _validar(lambda_, mu, sla, alvo)
+    if s != int(s) or s < 1:
+        raise ValueError("O número de técnicos (s) deve ser um inteiro ≥ 1.")
+    s = int(s)
+    if N_max != int(N_max) or N_max < s:
+        raise ValueError(f"N_max deve ser um inteiro maior ou igual a s={s}.")
+    N_max = int(N_max)
+
+    # Com N ≤ s não há fila: N = s é o melhor caso
+    x, curva, i = _buscar(lambda N: _avaliar(lambda_, mu, s, N), s, N_max,
+                          lambda curva: ~_atende(curva, sla, alvo))
+    if i == 0:
+        raise ValueError(f"Nem com N = s = {s} máquinas o alvo é atingido.")
+    ultimo = x.size - 1 if i is None else i - 1
+    return {'sla': sla, 'alvo': alvo, 's': s, **_resultado(x, curva, ultimo, 'N'), 'limiteAtingido': i is None}
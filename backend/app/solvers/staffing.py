@@ -0,0 +1,238 @@
+"""
+Dimensionamento de servidores para uma curva de chegadas λ(t)
+
+Para cada intervalo da curva (ex.: 96 quartos de hora por dia) encontra o
+menor número de servidores s que atende ao nível de serviço (SLA) do M/M/s.
+Todos os intervalos são resolvidos ao mesmo tempo: a busca binária em s é
+feita com arrays NumPy, usando o Erlang C vetorizado.
+
+Métodos para a carga oferecida a(t) de cada intervalo:
+- 'psa' (pointwise stationary): a = λ(t)/μ
+- 'lag' (PSA com atraso): a = λ(t - 1/μ)/μ, atrasando a curva em um tempo médio de atendimento
+- 'mol' (modified offered load / fluido): a(t) = m(t), média do M_t/M/∞,
+  solução de dm/dt = λ(t) - μ×m(t)
+
+SLAs suportados:
+- 'PWqMaiorQueT': P(Wq > t) ≤ alvo
+- 'Wq': Wq ≤ alvo
+- 'rho': ρ = λ/(s×μ) ≤ alvo
+- 'PAbandono': P(abandono) ≤ alvo (somente com θ, modelo Erlang A)
+
+Com a taxa de abandono θ informada, as métricas de cada intervalo vêm do
+modelo M/M/s+M (Erlang A) em vez do M/M/s.
+"""
+import numpy as np
+
+from app.models.erlang import erlang_a_batch, erlang_c_batch
+
+METODOS = ('psa', 'lag', 'mol')
+SLAS = ('PWqMaiorQueT', 'Wq', 'rho')
+
+
+def offered_load(lambdas, mu, metodo='psa', duracao_intervalo=1.0, periodico=True):
+    """
+    Carga oferecida de cada intervalo segundo o método escolhido
+
+    Args:
+        lambdas (array_like): Taxa de chegada em cada intervalo (constante por intervalo)
+        mu (float): Taxa de atendimento por servidor
+        metodo (str): 'psa', 'lag' ou 'mol'
+        duracao_intervalo (float): Duração de cada intervalo (mesma unidade de tempo de μ)
+        periodico (bool): Se a curva se repete (ex.: dia ou semana típica)
+
+    Returns:
+        np.ndarray: Carga oferecida a de cada intervalo
+    """
+    lambdas = np.asarray(lambdas, dtype=np.float64)
+    a = lambdas / mu
+
+    if metodo == 'psa':
+        return a
+
+    if metodo == 'lag':
+        centros = (np.arange(a.size) + 0.5) * duracao_intervalo
+        if periodico:
+            return np.interp(centros - 1 / mu, centros, a, period=a.size * duracao_intervalo)
+        return np.interp(centros - 1 / mu, centros, a)
+
+    if metodo == 'mol':
+        # Importado só aqui: scipy.signal leva quase 1 s para carregar
+        from scipy.signal import lfilter
+
+        # Solução exata da EDO com λ constante em cada intervalo:
+        # m_{i+1} = a_i + (m_i - a_i)×e^(-μΔ)
+        e = np.exp(-mu * duracao_intervalo)
+        entrada = np.tile(a, 2) if periodico else a
+        fim, _ = lfilter([1 - e], [1, -e], entrada, zi=[e * a[0]])
+        inicio = np.concatenate(([a[0]], fim[:-1]))
+        if periodico:
+            # O segundo ciclo já partiu do regime periódico
+            inicio = inicio[a.size:]
+        # Média de m(t) ao longo do intervalo
+        return a + (inicio - a) * (1 - e) / (mu * duracao_intervalo)
+
+    raise ValueError(f"Método '{metodo}' inválido. Use um de: {', '.join(METODOS)}.")
+
+
+def _sla_metrics(a, s, mu, t, theta):
+    # Métricas de cada intervalo para a carga a e s servidores (M/M/s ou Erlang A)
+    if theta is None:
+        C = erlang_c_batch(a, s)
+        taxa = (s - a) * mu  # s×μ - λ
+        with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+            metricas = {'PW': C, 'Wq': np.where(a < s, C / taxa, np.inf), 'estavel': a < s}
+            if t is not None:
+                metricas['PWqMaiorQueT'] = np.where(a < s, C * np.exp(-taxa * t), 1.0)
+        return metricas
+
+    lambdas = a * mu
+    r = erlang_a_batch(lambdas, mu, s, theta, t)
+    metricas = {'PW': r['PW'], 'Wq': r['Lq'] / lambdas, 'PAbandono': r['PAbandono'],
+                'estavel': np.ones(a.shape, dtype=bool)}
+    if t is not None:
+        metricas['PWqMaiorQueT'] = r['PWqMaiorQueT']
+    return metricas
+
+
+def _meets_sla(a, s, mu, sla, alvo, t, theta):
+    metricas = _sla_metrics(a, s, mu, t, theta)
+    return metricas['estavel'] & (metricas[sla] <= alvo)
+
+
+def plan_staffing(lambdas, mu, sla='PWqMaiorQueT', alvo=0.2, t=None, metodo='psa',
+                  duracao_intervalo=1.0, periodico=True, theta=None) -> dict:
+    """
+    Calcula o número de servidores necessário em cada intervalo
+
+    Args:
+        lambdas (array_like): Curva λ(t), um valor por intervalo
+        mu (float): Taxa de atendimento por servidor
+        sla (str): 'PWqMaiorQueT', 'Wq', 'rho' ou (com θ) 'PAbandono'
+        alvo (float): Limite do SLA (α, Wq máximo, ρ máximo ou P(abandono) máxima)
+        t (float, optional): Tempo de espera do SLA 'PWqMaiorQueT'
+        metodo (str): 'psa', 'lag' ou 'mol'
+        duracao_intervalo (float): Duração de cada intervalo (unidade de tempo de μ)
+        periodico (bool): Se a curva se repete (usado por 'lag' e 'mol')
+        theta (float, optional): Taxa de abandono; se informada, usa o modelo
+            M/M/s+M (Erlang A) em vez do M/M/s
+
+    Returns:
+        dict: Plano de dimensionamento
+            - servidores: s necessário em cada intervalo
+            - cargaOferecida: Carga a usada em cada intervalo
+            - rho, Wq, PWqIgualZero: Métricas resultantes em cada intervalo
+            - PWqMaiorQueT (se t informado): P(Wq > t) em cada intervalo
+            - PAbandono (se θ informado): P(abandono) em cada intervalo
+            - servidorTempoTotal: Σ s × duração dos intervalos
+
+    Raises:
+        ValueError: Se os parâmetros forem inválidos
+    """
+    for evento, dados in iter_staffing(lambdas, mu, sla, alvo, t, metodo, duracao_intervalo, periodico, theta,
+                                       progresso=False):
+        if evento == 'resultado':
+            return dados
+
+
+def iter_staffing(lambdas, mu, sla='PWqMaiorQueT', alvo=0.2, t=None, metodo='psa',
+                  duracao_intervalo=1.0, periodico=True, theta=None, progresso=True):
+    """
+    Versão incremental de plan_staffing: eventos (nome, dados)
+
+    - ('inicio', {intervalos, cargaOferecida}), depois das validações;
+    - com progresso, ('progresso', {...}) a cada passo da busca binária:
+      iteracao, servidores (o menor s já visto que atende ao SLA em cada
+      intervalo, o melhor plano até ali), limiteInferior (maior s que não
+      atende) e convergidos (intervalos já resolvidos);
+    - ('resultado', dict de plan_staffing), no fim.
+
+    Fechar o gerador (ex.: cliente desconectado) interrompe a busca.
+
+    Raises:
+        ValueError: Ver plan_staffing (no primeiro next)
+    """
+    lambdas = np.asarray(lambdas, dtype=np.float64)
+    if lambdas.ndim != 1 or lambdas.size == 0:
+        raise ValueError("A curva de chegadas (λ) deve ser uma lista com pelo menos 1 intervalo.")
+    if np.any(lambdas < 0) or not np.all(np.isfinite(lambdas)):
+        raise ValueError("As taxas de chegada (λ) devem ser não-negativas.")
+    if not (mu > 0 and duracao_intervalo > 0):
+        raise ValueError("A taxa de atendimento (μ) e a duração do intervalo devem ser positivas.")
+    if theta is not None and not theta > 0:
+        raise ValueError("A taxa de abandono (θ) deve ser positiva.")
+    slas = SLAS + ('PAbandono',) if theta is not None else SLAS
+    if sla not in slas:
+        raise ValueError(f"SLA '{sla}' inválido. Use um de: {', '.join(slas)}.")
+    if sla == 'PWqMaiorQueT':
+        if t is None or t < 0:
+            raise ValueError("O SLA 'PWqMaiorQueT' exige um tempo (t) não-negativo.")
+        if not (0 < alvo < 1):
+            raise ValueError("O alvo de P(Wq > t) deve estar entre 0 e 1.")
+    elif sla in ('rho', 'PAbandono') and not (0 < alvo < 1):
+        raise ValueError(f"O alvo de {sla} deve estar entre 0 e 1.")
+    elif not alvo > 0:
+        raise ValueError("O alvo do SLA deve ser positivo.")
+
+    a = offered_load(lambdas, mu, metodo, duracao_intervalo, periodico)
+    com_carga = a > 0
+    a_ok = np.where(com_carga, a, 1.0)
+    yield 'inicio', {'intervalos': int(a.size), 'cargaOferecida': a.tolist()}
+
+    def passo(iteracao, lo, hi):
+        return 'progresso', {
+            'iteracao': iteracao,
+            'servidores': np.where(com_carga, np.maximum(hi, 1), 0).astype(np.int64).tolist(),
+            'limiteInferior': np.where(com_carga, lo, 0).astype(np.int64).tolist(),
+            'convergidos': int(np.count_nonzero((hi - lo <= 1) | ~com_carga)),
+        }
+
+    if sla == 'rho':
+        s = np.ceil(a_ok / alvo - 1e-12)
+    else:
+        # Busca binária vetorizada: lo não atende, hi atende
+        # (com abandono, s < a pode ser estável e atender ao SLA)
+        lo = np.floor(a_ok) if theta is None else np.zeros_like(a_ok)
+        hi = np.ceil(a_ok + 5 * np.sqrt(a_ok) + 5)
+        ok = _meets_sla(a_ok, hi, mu, sla, alvo, t, theta)
+        while not ok.all():
+            hi = np.where(ok, hi, 2 * hi)
+            ok = _meets_sla(a_ok, hi, mu, sla, alvo, t, theta)
+        iteracao = 0
+        while np.any(hi - lo > 1):
+            if progresso:
+                yield passo(iteracao, lo, hi)
+            meio = np.floor((lo + hi) / 2)
+            ok = _meets_sla(a_ok, meio, mu, sla, alvo, t, theta)
+            hi = np.where(ok, meio, hi)
+            lo = np.where(ok, lo, meio)
+            iteracao += 1
+        s = hi
+
+    s = np.where(com_carga, np.maximum(s, 1), 0).astype(np.int64)
+
+    # Métricas do plano (intervalos sem carga: sistema vazio)
+    s_ok = np.maximum(s, 1)
+    metricas = _sla_metrics(a_ok, s_ok, mu, t, theta)
+
+    def por_intervalo(x):
+        return np.where(com_carga, x, 0.0).tolist()
+
+    result = {
+        'metodo': metodo,
+        'sla': sla,
+        'alvo': alvo,
+        'servidores': s.tolist(),
+        'cargaOferecida': a.tolist(),
+        'rho': por_intervalo(a / s_ok),
+        'Wq': por_intervalo(metricas['Wq']),
+        'PWqIgualZero': (1 - np.where(com_carga, metricas['PW'], 0.0)).tolist(),
+        'servidorTempoTotal': float(s.sum() * duracao_intervalo),
+    }
+    if t is not None:
+        result['PWqMaiorQueT'] = por_intervalo(metricas['PWqMaiorQueT'])
+        result['t'] = t
+    if theta is not None:
+        result['PAbandono'] = por_intervalo(metricas['PAbandono'])
+        result['theta'] = theta
+
+    yield 'resultado', result
@@ -0,0 +1,133 @@
+"""
+Benchmark da partida a frio: do primeiro import até a resposta de /api/health
+Execute este arquivo a partir do diretório backend:
+    python bench_startup.py                          # 7 processos novos, orçamento de 100 ms para o app
+    python bench_startup.py --salvar base.json       # guarda a medição como referência
+    python bench_startup.py --referencia base.json   # acusa regressões em relação à referência
+
+Cada repetição roda em um interpretador novo e mede, dentro dele:
+- flask: importar o Flask e o flask_cors (custo fixo de qualquer app Flask);
+- app: importar app.main e criar o app (create_app);
+- health: a primeira requisição a /api/health;
+- total: a soma das três.
+O orçamento vale para a parcela do app (app + health): a importação do
+Flask é um custo fixo do ambiente (de ~40 ms a mais de 250 ms, conforme o
+disco e o cache de bytecode) que o app não tem como reduzir, e entra só no
+relatório e na comparação com a referência.
+Também lista os módulos pesados (NumPy, SciPy, ...) já carregados na
+resposta do health check: com os blueprints carregados sob demanda (ver
+app/main.py), nenhum deveria aparecer.
+
+Sai com código 1 se a mediana da parcela do app passar do orçamento, se alguma fase
+ficar mais de --tolerancia acima da referência ou se algum módulo pesado
+for carregado.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULOS_PESADOS = ('numpy', 'scipy', 'pandas', 'pyarrow')
+
+FASES = ('flask', 'app', 'health', 'total')
+
+_MEDICAO = f"""
+import json, sys, time
+t0 = time.perf_counter()
+import flask, flask_cors
+t1 = time.perf_counter()
+from app.main import create_app
+app = create_app()
+t2 = time.perf_counter()
+resposta = app.test_client().get('/api/health')
+t3 = time.perf_counter()
+print(json.dumps({{
+    'flask': (t1 - t0) * 1000,
+    'app': (t2 - t1) * 1000,
+    'health': (t3 - t2) * 1000,
+    'total': (t3 - t0) * 1000,
+    'status': resposta.status_code,
+    'pesados': [m for m in {MODULOS_PESADOS!r} if m in sys.modules],
+}}))
+"""
+
+
+def medir_uma_vez():
+    """Mede uma partida a frio em um interpretador novo (tempos em ms)"""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    saida = subprocess.run(
+        [sys.executable, '-c', _MEDICAO],
+        cwd=diretorio, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def medir(repeticoes=7):
+    """
+    Mediana e mínimo de cada fase em `repeticoes` partidas a frio
+
+    Returns:
+        dict: {'mediana': {fase: ms}, 'minimo': {fase: ms}, 'pesados': [...],
+            'repeticoes': n}
+    """
+    medicoes = [medir_uma_vez() for _ in range(repeticoes)]
+    if any(m['status'] != 200 for m in medicoes):
+        raise RuntimeError("/api/health não respondeu 200")
+    return {
+        'mediana': {f: statistics.median(m[f] for m in medicoes) for f in FASES},
+        'minimo': {f: min(m[f] for m in medicoes) for f in FASES},
+        'pesados': sorted({p for m in medicoes for p in m['pesados']}),
+        'repeticoes': repeticoes,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mede a partida a frio do app até o primeiro /api/health.")
+    parser.add_argument('--repeticoes', type=int, default=7, help="Processos medidos (padrão: 7)")
+    parser.add_argument('--orcamento-ms', type=float, default=100.0,
+                        help="Orçamento para a mediana de app + health, em ms (padrão: 100)")
+    parser.add_argument('--referencia', default=None, help="JSON de uma medição anterior (--salvar)")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Aumento relativo aceito em relação à referência (padrão: 0.2)")
+    parser.add_argument('--salvar', default=None, help="Grava a medição em JSON (para --referencia)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    resultado = medir(args.repeticoes)
+
+    print(f"Partida a frio até /api/health ({resultado['repeticoes']} processos, mediana / mínimo):")
+    for fase in FASES:
+        print(f"  {fase:<7} {resultado['mediana'][fase]:8.1f} ms / {resultado['minimo'][fase]:8.1f} ms")
+
+    problemas = []
+    proprio = resultado['mediana']['app'] + resultado['mediana']['health']
+    estado = 'dentro do' if proprio <= args.orcamento_ms else 'ACIMA DO'
+    print(f"Orçamento: app + health = {proprio:.1f} ms de {args.orcamento_ms:.0f} ms ({estado} orçamento; "
+          f"total com o Flask: {resultado['mediana']['total']:.1f} ms)")
+    if proprio > args.orcamento_ms:
+        problemas.append("app + health acima do orçamento")
+    if resultado['pesados']:
+        problemas.append(f"módulos pesados carregados na partida: {', '.join(resultado['pesados'])}")
+
+    if args.referencia:
+        with open(args.referencia, encoding='utf-8') as f:
+            referencia = json.load(f)
+        for fase in FASES:
+            antes, agora = referencia['mediana'][fase], resultado['mediana'][fase]
+            variacao = agora / antes - 1 if antes > 0 else 0.0
+            marca = '  ← regressão' if variacao > args.tolerancia else ''
+            print(f"  {fase:<7} {antes:8.1f} → {agora:8.1f} ms ({variacao:+.0%}){marca}")
+            if marca:
+                problemas.append(f"regressão em {fase} ({variacao:+.0%})")
+
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as f:
+            json.dump(resultado, f, indent=2)
+
+    for problema in problemas:
+        print(f"Erro: {problema}", file=sys.stderr)
+    sys.exit(1 if problemas else 0)
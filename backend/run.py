@@ -1,15 +1,70 @@
 """
 Script para iniciar o servidor Flask
 Execute este arquivo a partir do diretório backend:
-    python run.py
+    python run.py                 # servidor de desenvolvimento (debug)
+    python run.py --prod          # servidor de produção (pre-fork, Gunicorn)
 """
+import argparse
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Inicia a API de Teoria das Filas.")
+    parser.add_argument('--prod', action='store_true', help="Modo produção: workers pre-fork (Gunicorn)")
+    parser.add_argument('--host', default=None, help="Interface de escuta (produção: 0.0.0.0)")
+    parser.add_argument('--port', type=int, default=5000, help="Porta (padrão: 5000)")
+    parser.add_argument('--workers', type=int, default=None, help="Número de workers (padrão: um por núcleo)")
+    parser.add_argument('--timeout', type=int, default=120,
+                        help="Segundos sem resposta antes de reiniciar um worker (padrão: 120)")
+    parser.add_argument('--graceful-timeout', type=int, default=30,
+                        help="Segundos para concluir requisições na recarga/desligamento (padrão: 30)")
+    parser.add_argument('--max-requests', type=int, default=0,
+                        help="Reciclar cada worker após N requisições (padrão: nunca)")
+    parser.add_argument('--cache', default='instance/result_cache.sqlite3',
+                        help="Banco SQLite do cache de resultados compartilhado (produção)")
+    parser.add_argument('--cache-max', type=int, default=100_000,
+                        help="Número máximo de resultados no cache (padrão: 100000)")
+    parser.add_argument('--no-cache', action='store_true', help="Desliga o cache de resultados")
+    parser.add_argument('--no-preload', action='store_true',
+                        help="Não carregar o app no mestre (kill -HUP passa a carregar código novo)")
+    parser.add_argument('--streams', default='instance/streams.sqlite3',
+                        help="Banco SQLite dos fluxos de estimação online (produção)")
+    parser.add_argument('--jobs', default='instance/jobs.sqlite3',
+                        help="Banco SQLite da fila de tarefas em segundo plano (produção)")
+    return parser.parse_args()
 
-from app.main import app
 
 if __name__ == '__main__':
-    print("=" * 50)
-    print("🚀 Iniciando servidor Flask...")
-    print("📍 API disponível em: http://localhost:5000/api")
-    print("💚 Health check: http://localhost:5000/api/health")
-    print("=" * 50)
-    app.run(debug=True, port=5000)
+    args = parse_args()
+
+    if args.prod:
+        from app.server import run_production, default_workers
+        workers = args.workers or default_workers()
+        print("=" * 50)
+        print(f"🚀 Iniciando servidor de produção com {workers} worker(s)...")
+        print(f"📍 API disponível em: http://{args.host or '0.0.0.0'}:{args.port}/api")
+        if args.no_preload:
+            print("🔁 Recarga de código: kill -HUP <pid do mestre>")
+        else:
+            print("🔁 Recarga de código: kill -USR2 <pid do mestre> e depois kill -TERM <pid do mestre antigo>")
+        print("=" * 50)
+        run_production(
+            host=args.host or '0.0.0.0',
+            port=args.port,
+            workers=workers,
+            timeout=args.timeout,
+            graceful_timeout=args.graceful_timeout,
+            max_requests=args.max_requests,
+            cache_path=None if args.no_cache else args.cache,
+            cache_max=args.cache_max,
+            streams_path=args.streams,
+            jobs_path=args.jobs,
+            preload=not args.no_preload,
+        )
+    else:
+        from app.main import app
+        print("=" * 50)
+        print("🚀 Iniciando servidor Flask...")
+        print(f"📍 API disponível em: http://localhost:{args.port}/api")
+        print(f"💚 Health check: http://localhost:{args.port}/api/health")
+        print("=" * 50)
+        app.run(debug=True, host=args.host, port=args.port)
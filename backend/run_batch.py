@@ -0,0 +1,56 @@
+"""
+Avaliação em lote de cenários a partir de arquivos, sem o servidor Flask
+Execute este arquivo a partir do diretório backend:
+    python run_batch.py cenarios.csv resultados.csv --modelo mmsk
+    python run_batch.py cenarios.parquet resultados.parquet --modelo mms --workers 8 --metricas W Wq
+
+Cada linha do arquivo de entrada é um cenário, com os parâmetros do modelo
+nas colunas (lambda, mu, s, K, N, theta, varService, t, n). Ver
+app/analysis/runner.py.
+"""
+import argparse
+import sys
+import time
+
+
+def parse_args():
+    from app.analysis.grid import MODELOS
+    from app.analysis.runner import CHUNK_LINHAS, FORMATOS
+
+    parser = argparse.ArgumentParser(description="Avalia em lote os cenários de um arquivo CSV ou Parquet.")
+    parser.add_argument('entrada', help="Arquivo de cenários (.csv ou .parquet)")
+    parser.add_argument('saida', help="Arquivo de resultados (.csv ou .parquet)")
+    parser.add_argument('--modelo', required=True, choices=list(MODELOS), help="Modelo de fila")
+    parser.add_argument('--metricas', nargs='+', default=None, help="Métricas de saída (padrão: todas)")
+    parser.add_argument('--workers', type=int, default=None, help="Processos (padrão: um por núcleo)")
+    parser.add_argument('--chunk', type=int, default=CHUNK_LINHAS,
+                        help=f"Cenários por bloco (padrão: {CHUNK_LINHAS})")
+    parser.add_argument('--formato-entrada', choices=FORMATOS, default=None,
+                        help="Formato da entrada (padrão: pela extensão)")
+    parser.add_argument('--formato-saida', choices=FORMATOS, default=None,
+                        help="Formato da saída (padrão: pela extensão)")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    from app.analysis.runner import run_file
+    inicio = time.perf_counter()
+    try:
+        resumo = run_file(
+            args.entrada,
+            args.saida,
+            args.modelo,
+            metricas=args.metricas,
+            workers=args.workers,
+            chunk_linhas=args.chunk,
+            formato_entrada=args.formato_entrada,
+            formato_saida=args.formato_saida,
+        )
+    except ValueError as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        sys.exit(2)
+    duracao = time.perf_counter() - inicio
+    print(f"{resumo['cenarios']} cenário(s) em {resumo['blocos']} bloco(s), "
+          f"{resumo['estaveis']} estável(is), {duracao:.2f} s → {args.saida}")
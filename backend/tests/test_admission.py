@@ -0,0 +1,119 @@
+import unittest
+import sys
+import os
+import threading
+import time
+from unittest import mock
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import admission
+from app.models.mmsk import calculate_mmsk
+from app.models.precision import mmsk_high_precision
+from app.models.prazo import Prazo, PrazoExcedido, com_prazo
+
+class TestAdmissao(unittest.TestCase):
+    """Testes para o controle de admissão pelo custo estimado"""
+
+    def tearDown(self):
+        admission.configure()
+
+    def test_estimativas(self):
+        """Custo cresce com s, K, N e classes; a aproximação QED é barata"""
+        base = admission.estimate_cost('mm1', 3.0, 5.0)
+        # Modelos finitos: a alta precisão só entra se o caminho float64 for suspeito
+        self.assertGreater(admission.estimate_cost('mmsk', 1e300, 1.0, 2, 10**4), base)
+        self.assertGreater(admission.estimate_cost('mmsk', 1e7, 1.0, 2, 10**5 - 1),
+                           admission.estimate_cost('mmsk', 1e300, 1.0, 2, 10**4))
+        self.assertEqual(admission.estimate_cost('mmsk', 1.0, 2.0, 3, 10**5), base)
+        self.assertEqual(admission.estimate_cost('mmsn', 1.0, 1.0, 2, 10**4), base)
+        # Acima de MAX_TERMOS_CENARIO estados não há refino: fica no float64
+        self.assertEqual(admission.estimate_cost('mmsk', 1e300, 1.0, 2, 10**6), base)
+        self.assertGreater(admission.estimate_cost('priority-sem', 1, 1.0, [0.001] * 10**5), base)
+        # s = 10^5 com ρ = 0.9: QED dentro da tolerância
+        self.assertEqual(admission.estimate_cost('mms', 90_000.0, 1.0, 10**5), base)
+        self.assertGreater(admission.estimate_cost('mms', 99_000.0, 1.0, 10**5, tolerancia=1e-300), base)
+        # Parâmetros inválidos ficam para o modelo recusar
+        self.assertEqual(admission.estimate_cost('mmsk', 1.0, 2.0, 3, 'x'), base)
+        # Grades e Monte Carlo: células/sorteios e, nos modelos finitos, o orçamento de alta precisão
+        grade = ('lambda', 1, 2, 1000), ('mu', 3, 4, 1000)
+        self.assertGreater(admission.estimate_cost('grid', 'mms', *grade), 1.0)
+        self.assertGreater(admission.estimate_cost('grid', 'mmsk', *grade), admission.estimate_cost('grid', 'mms', *grade))
+        self.assertGreater(admission.estimate_cost('uncertainty', 'mms', {}, 10**6),
+                           admission.estimate_cost('uncertainty', 'mms', {}, 10**3))
+
+    def test_acima_do_orcamento_recusada_sem_calcular(self):
+        """Custo maior que o prazo: CustoExcedido (ValueError) antes do cálculo"""
+        controle = admission.configure(prazo=0.1)
+        with self.assertRaises(admission.CustoExcedido) as ctx:
+            controle.admitir('mms', 1.0, 2.0, 10**9, tolerancia=1e-300)
+        self.assertIsInstance(ctx.exception, ValueError)
+        self.assertIn('custo estimado', str(ctx.exception))
+
+    def test_baratas_na_propria_thread(self):
+        """Abaixo de custo_inline o cálculo não passa pelo pool"""
+        controle = admission.configure(custo_inline=1.0)
+        thread = controle.executar(0.001, threading.current_thread)
+        self.assertIs(thread, threading.current_thread())
+        thread = controle.executar(2.0, threading.current_thread)
+        self.assertIsNot(thread, threading.current_thread())
+
+    def test_pool_cheio(self):
+        """Sem thread nem vaga na fila, a requisição cara é recusada na hora"""
+        controle = admission.configure(custo_inline=0.0, threads=1, fila=0)
+        liberar = threading.Event()
+        primeira = threading.Thread(target=controle.executar, args=(1.0, liberar.wait))
+        primeira.start()
+        try:
+            time.sleep(0.05)
+            with self.assertRaises(admission.Ocupado):
+                controle.executar(1.0, lambda: None)
+            # Barata continua passando
+            self.assertEqual(controle.executar(0.0, lambda: 1), 1)
+        finally:
+            liberar.set()
+            primeira.join()
+        self.assertEqual(controle.executar(1.0, lambda: 2), 2)
+
+    def test_prazo_cancela_o_calculo(self):
+        """Prazo esgotado: Expirada, e o cálculo é interrompido (libera a thread)"""
+        controle = admission.configure(prazo=0.05, custo_inline=0.0, threads=1, fila=0)
+        inicio = time.perf_counter()
+        with self.assertRaises(admission.Expirada):
+            controle.executar(1.0, mmsk_high_precision, 1.0, 1.0, 1, 99_999)
+        self.assertLess(time.perf_counter() - inicio, 0.2)
+        # A thread do pool volta logo (sem esperar a soma inteira)
+        time.sleep(0.05)
+        self.assertEqual(controle.executar(1.0, calculate_mmsk, 1.0, 2.0, 2, 5), calculate_mmsk(1.0, 2.0, 2, 5))
+
+    def test_verificar_prazo(self):
+        """Fora de com_prazo nada acontece; cancelado, o laço é interrompido"""
+        mmsk_high_precision(1.0, 1.0, 1, 5000)
+        prazo = Prazo(60)
+        prazo.cancelar()
+        with com_prazo(prazo), self.assertRaises(PrazoExcedido):
+            mmsk_high_precision(1.0, 1.0, 1, 5000)
+
+    def test_rotas(self):
+        """As rotas respondem 400 acima do orçamento e 504 no prazo esgotado"""
+        from app.main import app
+        client = app.test_client()
+        admission.configure(prazo=0.1)
+        r = client.post('/api/calculate/priority-sem',
+                        json={'s': 1, 'mu': 1.0, 'lambdas': [1e-7] * 10**5})
+        self.assertEqual(r.status_code, 400)
+        self.assertIn('custo estimado', r.get_json()['error'])
+
+        # Estimativa otimista de propósito: a soma em alta precisão passa do prazo
+        admission.configure(prazo=0.05, custo_inline=0.0)
+        with mock.patch.object(admission, 'SEGUNDOS_POR_ESTADO', 1e-9):
+            r = client.post('/api/calculate/mmsk', json={'lambda': 1e7, 'mu': 1, 's': 2, 'K': 99_999})
+        self.assertEqual(r.status_code, 504)
+
+        admission.configure()
+        r = client.post('/api/calculate/mm1', json={'lambda': 3, 'mu': 5})
+        self.assertEqual(r.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
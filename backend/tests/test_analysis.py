@@ -0,0 +1,385 @@
+import unittest
+import sys
+import os
+import time
+import csv
+import tempfile
+import importlib.util
+import math
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import admission
+from app.analysis.grid import compute_grid
+from app.analysis.runner import run_file
+from app.analysis.uncertainty import iter_uncertainty, propagate_uncertainty
+from app.models.mms import calculate_mms
+from app.models.mmsk import calculate_mmsk
+from app.models.prazo import Prazo
+from app.routes.sse import ler_eventos, sse_response
+
+class TestGrid(unittest.TestCase):
+    """Testes para as superfícies em grades 2-D"""
+
+    def test_grid_matches_scalar(self):
+        """Cada célula deve bater com o modelo escalar"""
+        matriz, xs, ys, metricas = compute_grid(
+            'mmsk', ('lambda', 1, 10, 4), ('K', 3, 9, 3), {'mu': 2, 's': 3}, ['W', 'PK']
+        )
+        self.assertEqual(matriz.shape, (2, 3, 4))
+        for j, K in enumerate(ys):
+            for i, lambda_ in enumerate(xs):
+                esperado = calculate_mmsk(lambda_, 2, 3, int(K))
+                self.assertAlmostEqual(matriz[0, j, i], esperado['W'], places=5)
+                self.assertAlmostEqual(matriz[1, j, i], esperado['PK'], places=5)
+
+    def test_grid_masks_unstable(self):
+        """Células instáveis do M/M/s devem vir como NaN"""
+        matriz, xs, ys, _ = compute_grid('mms', ('lambda', 1, 20, 20), ('s', 1, 5, 5), {'mu': 2}, ['Wq'])
+        instavel = xs[None, :] >= 2 * ys[:, None]
+        self.assertTrue(np.all(np.isnan(matriz[0][instavel])))
+        self.assertFalse(np.any(np.isnan(matriz[0][~instavel])))
+        self.assertAlmostEqual(matriz[0, 4, 5], calculate_mms(xs[5], 2, 5)['Wq'], places=5)
+
+    def test_grid_masks_non_integer_servers(self):
+        """s fixo não inteiro deve mascarar a grade, não calcular um M/M/2,5"""
+        matriz, _, _, _ = compute_grid('mms', ('lambda', 1, 4, 4), ('mu', 2, 3, 2), {'s': 2.5}, ['Wq'])
+        self.assertTrue(np.all(np.isnan(matriz)))
+
+    def test_grid_validates_metrics_before_computing(self):
+        """Métrica inválida é rejeitada antes de calcular a grade"""
+        from unittest import mock
+        from app.analysis import grid
+        chamadas = []
+        original = grid.MODELOS['mms'][0]
+
+        def contado(*args):
+            chamadas.append(np.broadcast(*args).size)
+            return original(*args)
+
+        with mock.patch.dict(grid.MODELOS, {'mms': (contado, grid.MODELOS['mms'][1])}):
+            with self.assertRaises(ValueError):
+                compute_grid('mms', ('lambda', 1, 20, 200), ('s', 1, 40, 40), {'mu': 2}, ['W', 'PK'])
+        self.assertEqual(chamadas, [1])
+
+    def test_grid_chunks_are_consistent(self):
+        """O resultado não deve depender do tamanho dos blocos"""
+        args = ('mmsn', ('mu', 0.5, 5, 30), ('N', 6, 60, 25), {'lambda': 0.1, 's': 3})
+        inteiro, _, _, _ = compute_grid(*args)
+        blocos, _, _, _ = compute_grid(*args, chunk_celulas=7)
+        np.testing.assert_array_equal(inteiro, blocos)
+
+    def test_grid_500x500_under_one_second(self):
+        """Uma grade 500×500 deve ser calculada em menos de 1 s"""
+        inicio = time.perf_counter()
+        matriz, _, _, _ = compute_grid('mmsk', ('lambda', 0.5, 100, 500), ('K', 5, 1000, 500), {'mu': 2, 's': 5})
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertTrue(np.all(np.isfinite(matriz)))
+
+    def test_grid_blocking_near_one_is_fast(self):
+        """λ >> μ e K até 1000 (PK ≈ 1): sem alta precisão, a grade sai em menos de 1 s"""
+        inicio = time.perf_counter()
+        matriz, _, _, _ = compute_grid('mm1k', ('lambda', 1e9, 1e10, 500), ('K', 1, 1000, 500), {'mu': 1})
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        self.assertTrue(np.all(np.isfinite(matriz)))
+
+    def test_grid_invalid(self):
+        """Modelo, eixos, fixos e métricas inválidos devem gerar ValueError"""
+        with self.assertRaises(ValueError):
+            compute_grid('xyz', ('lambda', 1, 2, 2), ('mu', 1, 2, 2))
+        with self.assertRaises(ValueError):
+            compute_grid('mms', ('lambda', 1, 2, 2), ('lambda', 1, 2, 2), {'mu': 1, 's': 1})
+        with self.assertRaises(ValueError):
+            compute_grid('mms', ('lambda', 1, 2, 2), ('mu', 1, 2, 2))
+        with self.assertRaises(ValueError):
+            compute_grid('mm1', ('lambda', 1, 2, 2), ('mu', 1, 2, 2), metricas=['PK'])
+
+class TestGridRoute(unittest.TestCase):
+    """Testes para o endpoint /api/grid"""
+
+    def setUp(self):
+        from app.main import app
+        self.client = app.test_client()
+        self.corpo = {
+            'modelo': 'mm1k',
+            'eixoX': {'parametro': 'lambda', 'inicio': 1, 'fim': 5, 'passos': 5},
+            'eixoY': {'parametro': 'K', 'inicio': 2, 'fim': 4, 'passos': 3},
+            'fixos': {'mu': 2},
+            'metricas': ['W', 'PK'],
+        }
+
+    def test_binary_response(self):
+        """A resposta binária deve trazer eixos e matrizes em float32"""
+        resposta = self.client.post('/api/grid', json=self.corpo)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.headers['X-Grid-Shape'], '2,3,5')
+        self.assertEqual(resposta.headers['X-Grid-Metricas'], 'W,PK')
+        dados = np.frombuffer(resposta.data, dtype='<f4')
+        self.assertEqual(dados.size, 5 + 3 + 2 * 3 * 5)
+        np.testing.assert_allclose(dados[:5], [1, 2, 3, 4, 5])
+        matriz = dados[8:].reshape(2, 3, 5)
+        esperado, _, _, _ = compute_grid('mm1k', ('lambda', 1, 5, 5), ('K', 2, 4, 3), {'mu': 2}, ['W', 'PK'])
+        np.testing.assert_array_equal(matriz, esperado)
+
+    def test_json_response(self):
+        """Com formato json, células mascaradas devem vir como null"""
+        self.corpo.update({'modelo': 'mm1', 'eixoY': {'parametro': 'mu', 'inicio': 2, 'fim': 4, 'passos': 2},
+                           'fixos': {}, 'metricas': ['W'], 'formato': 'json'})
+        resposta = self.client.post('/api/grid', json=self.corpo)
+        self.assertEqual(resposta.status_code, 200)
+        W = resposta.get_json()['metricas']['W']
+        self.assertIsNone(W[0][2])
+        self.assertAlmostEqual(W[1][0], 1 / 3, places=5)
+
+    def test_invalid_request(self):
+        """Campos faltando ou inválidos devem retornar 400"""
+        self.assertEqual(self.client.post('/api/grid', json={'modelo': 'mm1'}).status_code, 400)
+        self.corpo['fixos'] = {}
+        self.assertEqual(self.client.post('/api/grid', json=self.corpo).status_code, 400)
+
+    def test_stream(self):
+        """Em SSE, as linhas recompõem a mesma grade da rota normal"""
+        resposta = self.client.post('/api/grid/stream', json=self.corpo)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.mimetype, 'text/event-stream')
+        eventos = ler_eventos(resposta.get_data(as_text=True))
+        self.assertEqual(eventos[0][0], 'inicio')
+        self.assertEqual(eventos[0][1]['shape'], [2, 3, 5])
+        self.assertEqual(eventos[-1][0], 'fim')
+        esperado, _, _, _ = compute_grid('mm1k', ('lambda', 1, 5, 5), ('K', 2, 4, 3), {'mu': 2}, ['W', 'PK'])
+        matriz = np.full(esperado.shape, -1.0, dtype=np.float32)
+        for nome, dados in eventos[1:-1]:
+            self.assertEqual(nome, 'linhas')
+            for i, metrica in enumerate(['W', 'PK']):
+                linhas = np.array(dados['metricas'][metrica], dtype=np.float64)
+                matriz[i, dados['inicio']:dados['fim']] = linhas
+        np.testing.assert_array_equal(matriz, esperado)
+
+    def test_stream_invalid(self):
+        """Erros de validação continuam respondendo 400 em JSON"""
+        resposta = self.client.post('/api/grid/stream', json={**self.corpo, 'metricas': ['Pw']})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('error', resposta.get_json())
+
+    def test_limited_precision_and_admission(self):
+        """Células mal condicionadas além do orçamento da grade são contadas; grades caras são recusadas"""
+        self.addCleanup(admission.configure)
+        self.corpo.update({'eixoX': {'parametro': 'lambda', 'inicio': 1e299, 'fim': 1e300, 'passos': 10},
+                           'eixoY': {'parametro': 'K', 'inicio': 7000, 'fim': 9000, 'passos': 10},
+                           'fixos': {'mu': 1}, 'metricas': ['W'], 'formato': 'json'})
+        inicio = time.perf_counter()
+        resposta = self.client.post('/api/grid', json=self.corpo)
+        self.assertLess(time.perf_counter() - inicio, 2.0)
+        self.assertEqual(resposta.status_code, 200)
+        corpo = resposta.get_json()
+        # 100 células de ~8000 estados: no máximo MAX_TERMOS_GRADE / 7001 refinadas
+        self.assertGreaterEqual(corpo['precisaoLimitada'], 100 - 100_000 // 7001)
+        self.assertTrue(all(v is not None for linha in corpo['metricas']['W'] for v in linha))
+
+        eventos = ler_eventos(self.client.post('/api/grid/stream', json=self.corpo).get_data(as_text=True))
+        self.assertEqual(eventos[-1], ('fim', {'linhas': 10, 'precisaoLimitada': corpo['precisaoLimitada']}))
+
+        # O pior caso do refino (~0.25 s) passa do prazo: recusada sem calcular
+        admission.configure(prazo=0.1)
+        self.assertEqual(self.client.post('/api/grid', json=self.corpo).status_code, 400)
+        self.assertEqual(self.client.post('/api/grid/stream', json=self.corpo).status_code, 400)
+
+class TestBatchRunner(unittest.TestCase):
+    """Testes para a execução em lote a partir de arquivos"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.dir.cleanup)
+        self.entrada = os.path.join(self.dir.name, 'cenarios.csv')
+        with open(self.entrada, 'w', newline='') as f:
+            escritor = csv.writer(f)
+            escritor.writerow(['id', 'lambda', 'mu', 's', 'K'])
+            for i in range(1000):
+                escritor.writerow([f'c{i}', 0.5 + (i % 40) * 0.25, 2, 1 + i % 5, 5 + i % 30])
+
+    def _ler(self, path):
+        with open(path, newline='') as f:
+            return list(csv.DictReader(f))
+
+    def test_matches_scalar_with_pool(self):
+        """Blocos avaliados no pool batem com o modelo escalar, na ordem de entrada"""
+        saida = os.path.join(self.dir.name, 'resultados.csv')
+        resumo = run_file(self.entrada, saida, 'mmsk', metricas=['L', 'W', 'PK'], workers=2, chunk_linhas=64)
+        self.assertEqual(resumo['cenarios'], 1000)
+        self.assertEqual(resumo['blocos'], 16)
+        linhas = self._ler(saida)
+        self.assertEqual([l['id'] for l in linhas], [f'c{i}' for i in range(1000)])
+        for linha in linhas[::97]:
+            s = int(float(linha['s']))
+            if s < 2:
+                continue
+            esperado = calculate_mmsk(float(linha['lambda']), 2, s, int(float(linha['K'])))
+            self.assertAlmostEqual(float(linha['W']), esperado['W'], places=9)
+            self.assertAlmostEqual(float(linha['PK']), esperado['PK'], places=9)
+
+    def test_chunks_and_workers_do_not_change_output(self):
+        """O arquivo de saída não depende do tamanho dos blocos nem do número de processos"""
+        a = os.path.join(self.dir.name, 'a.csv')
+        b = os.path.join(self.dir.name, 'b.csv')
+        run_file(self.entrada, a, 'mms', workers=1, chunk_linhas=1000)
+        run_file(self.entrada, b, 'mms', workers=3, chunk_linhas=33)
+        with open(a) as fa, open(b) as fb:
+            self.assertEqual(fa.read(), fb.read())
+        linhas = self._ler(a)
+        instavel = [l for l in linhas if l['estavel'] == 'False']
+        self.assertTrue(instavel)
+        self.assertTrue(all(l['Wq'] == 'nan' for l in instavel))
+
+    def test_invalid(self):
+        """Coluna obrigatória ausente, métrica e formato inválidos geram ValueError"""
+        saida = os.path.join(self.dir.name, 'r.csv')
+        with self.assertRaises(ValueError):
+            run_file(self.entrada, saida, 'mmsn', workers=1)
+        with self.assertRaises(ValueError):
+            run_file(self.entrada, saida, 'mms', metricas=['XYZ'], workers=1)
+        with self.assertRaises(ValueError):
+            run_file(self.entrada, os.path.join(self.dir.name, 'r.xlsx'), 'mms', workers=1)
+
+    @unittest.skipUnless(importlib.util.find_spec('pyarrow'), "pyarrow não instalado")
+    def test_parquet_round_trip(self):
+        """CSV → Parquet → CSV preserva os resultados"""
+        parquet = os.path.join(self.dir.name, 'r.parquet')
+        a = os.path.join(self.dir.name, 'a.csv')
+        run_file(self.entrada, parquet, 'mms', metricas=['Wq'], workers=1, chunk_linhas=100)
+        run_file(self.entrada, a, 'mms', metricas=['Wq'], workers=1, chunk_linhas=100)
+        import pyarrow.parquet as pq
+        tabela = pq.read_table(parquet)
+        esperado = [float(l['Wq']) for l in self._ler(a)]
+        np.testing.assert_allclose(tabela.column('Wq').to_numpy(), esperado, equal_nan=True)
+
+class TestUncertainty(unittest.TestCase):
+    """Testes para a propagação de incerteza por Monte Carlo"""
+
+    def test_fixed_parameters_match_point_estimate(self):
+        """Sem incerteza, todas as faixas coincidem com o valor pontual"""
+        result = propagate_uncertainty('mmsk', {'lambda': 4, 'mu': 2, 's': 3, 'K': 10}, amostras=1000)
+        esperado = calculate_mmsk(4, 2, 3, 10)
+        self.assertEqual(result['probInstabilidade'], 0.0)
+        for nome in ('L', 'W', 'Wq', 'PK'):
+            for valor in result['metricas'][nome]['percentis'].values():
+                self.assertAlmostEqual(valor, esperado[nome], places=10)
+
+    def test_instability_probability(self):
+        """P(instável) = P(λ ≥ s×μ) para λ normal"""
+        result = propagate_uncertainty(
+            'mms', {'lambda': {'tipo': 'normal', 'media': 9, 'desvio': 0.5}, 'mu': 1, 's': 10},
+            amostras=200_000, semente=7,
+        )
+        esperado = 0.5 * math.erfc((10 - 9) / (0.5 * math.sqrt(2)))
+        self.assertAlmostEqual(result['probInstabilidade'], esperado, delta=0.003)
+        bandas = result['metricas']['Wq']['percentis']
+        self.assertLess(bandas['5'], bandas['50'])
+        self.assertLess(bandas['50'], bandas['95'])
+
+    def test_lognormal_and_empirical(self):
+        """A lognormal respeita média e desvio dados; a empírica só sorteia as amostras"""
+        result = propagate_uncertainty(
+            'mm1', {'lambda': {'tipo': 'lognormal', 'media': 1, 'desvio': 0.2},
+                    'mu': {'tipo': 'empirica', 'amostras': [4, 5]}},
+            amostras=200_000, metricas=['rho'], percentis=[0, 100], semente=3,
+        )
+        # ρ = λ/μ, com λ e μ independentes: E[ρ] = E[λ]×E[1/μ]
+        self.assertAlmostEqual(result['metricas']['rho']['media'], 1 * (1 / 4 + 1 / 5) / 2, places=3)
+        self.assertGreater(result['metricas']['rho']['percentis']['0'], 0)
+
+    def test_seed_and_chunks_reproducible(self):
+        """A mesma semente dá o mesmo resultado"""
+        parametros = {'lambda': {'tipo': 'normal', 'media': 0.8, 'desvio': 0.1}, 'mu': 1, 'N': 10}
+        a = propagate_uncertainty('mm1n', parametros, amostras=5000, semente=11)
+        b = propagate_uncertainty('mm1n', parametros, amostras=5000, semente=11)
+        self.assertEqual(a, b)
+
+    def test_priority_per_class(self):
+        """No priority-sem, as faixas vêm por classe"""
+        result = propagate_uncertainty(
+            'priority-sem', {'s': 10, 'mu': 1, 'lambdas': [{'tipo': 'normal', 'media': 3, 'desvio': 0.3}, 4]},
+            amostras=20_000, semente=5,
+        )
+        self.assertEqual(len(result['metricas']['Wq']['media']), 2)
+        mediana = result['metricas']['Wq']['percentis']['50']
+        self.assertLess(mediana[0], mediana[1])
+
+    def test_million_draws(self):
+        """10^6 sorteios do M/M/s/K em poucos segundos"""
+        inicio = time.perf_counter()
+        result = propagate_uncertainty(
+            'mmsk', {'lambda': {'tipo': 'normal', 'media': 9, 'desvio': 0.5}, 'mu': 1, 's': 10, 'K': 30},
+        )
+        self.assertLess(time.perf_counter() - inicio, 10.0)
+        self.assertEqual(result['amostras'], 1_000_000)
+
+    def test_invalid(self):
+        """Modelo, parâmetros, distribuições e métricas inválidos geram ValueError"""
+        casos = [
+            ('xyz', {'lambda': 1, 'mu': 2}, {}),
+            ('mm1', {'lambda': 1}, {}),
+            ('mm1', {'lambda': {'tipo': 'gama'}, 'mu': 2}, {}),
+            ('mm1', {'lambda': {'tipo': 'normal', 'media': 1}, 'mu': 2}, {}),
+            ('mm1', {'lambda': {'tipo': 'lognormal', 'media': -1, 'desvio': 1}, 'mu': 2}, {}),
+            ('mm1', {'lambda': {'tipo': 'empirica', 'amostras': []}, 'mu': 2}, {}),
+            ('mm1', {'lambda': 1, 'mu': 2}, {'metricas': ['PK']}),
+            ('mm1', {'lambda': 1, 'mu': 2}, {'amostras': 0}),
+        ]
+        for modelo, parametros, extras in casos:
+            with self.assertRaises(ValueError):
+                propagate_uncertainty(modelo, parametros, **extras)
+
+    def test_route(self):
+        """A rota devolve as faixas em JSON e 400 para entradas inválidas"""
+        from app.main import app
+        client = app.test_client()
+        resp = client.post('/api/uncertainty', json={
+            'modelo': 'mm1k', 'amostras': 10_000, 'semente': 1,
+            'parametros': {'lambda': {'tipo': 'normal', 'media': 1.5, 'desvio': 0.2}, 'mu': 2, 'K': 5},
+        })
+        self.assertEqual(resp.status_code, 200)
+        corpo = resp.get_json()
+        self.assertIn('PK', corpo['metricas'])
+        self.assertEqual(set(corpo['metricas']['PK']['percentis']), {'5', '25', '50', '75', '95'})
+        resp = client.post('/api/uncertainty', json={'modelo': 'mm1k', 'parametros': {'lambda': 1}})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_stream_deadline(self):
+        """Passado o prazo, o Monte Carlo para no próximo bloco com um evento 'erro'"""
+        eventos = iter_uncertainty('mm1', {'lambda': {'tipo': 'normal', 'media': 1, 'desvio': 0.1}, 'mu': 2},
+                                   amostras=10_000)
+        resposta = sse_response(eventos, prazo=Prazo(0))
+        eventos = ler_eventos(resposta.get_data(as_text=True))
+        self.assertEqual([e for e, _ in eventos], ['inicio', 'erro'])
+        self.assertIn('Prazo', eventos[1][1]['error'])
+
+    def test_stream(self):
+        """Em SSE: intervalos de confiança a cada bloco e o mesmo resultado final"""
+        from app.main import app
+        client = app.test_client()
+        corpo = {
+            'modelo': 'mms', 'amostras': 300_000, 'semente': 3,
+            'parametros': {'lambda': {'tipo': 'normal', 'media': 8, 'desvio': 0.5}, 'mu': 1, 's': 10},
+        }
+        resp = client.post('/api/uncertainty/stream', json=corpo)
+        self.assertEqual(resp.status_code, 200)
+        eventos = ler_eventos(resp.get_data(as_text=True))
+        self.assertEqual([e for e, _ in eventos], ['inicio'] + ['progresso'] * 3 + ['resultado'])
+        self.assertEqual([d['amostras'] for e, d in eventos if e == 'progresso'], [131_072, 262_144, 300_000])
+        self.assertEqual(eventos[-1][1], client.post('/api/uncertainty', json=corpo).get_json())
+
+        # O intervalo final contém a média de todos os sorteios estáveis
+        ic = eventos[-2][1]['metricas']['W']
+        self.assertLess(ic['ic95'][0], ic['media'])
+        self.assertLess(ic['media'], ic['ic95'][1])
+        self.assertLess(ic['ic95'][1] - ic['ic95'][0], 0.01)
+        self.assertAlmostEqual(eventos[-1][1]['metricas']['W']['media'], ic['media'], places=9)
+
+        resp = client.post('/api/uncertainty/stream', json={'modelo': 'mm1k', 'parametros': {'lambda': 1}})
+        self.assertEqual(resp.status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
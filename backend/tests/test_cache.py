@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import cache
+from app.models.mm1 import calculate_mm1
+
+class TestResultCache(unittest.TestCase):
+    """Testes para o cache de resultados em SQLite"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'cache.sqlite3')
+        self.cache = cache.configure(self.path, max_entries=10)
+        self.chamadas = 0
+
+    def tearDown(self):
+        cache.configure(None)
+        self.tmpdir.cleanup()
+
+    def _mm1_contado(self, *args, **kwargs):
+        self.chamadas += 1
+        return calculate_mm1(*args, **kwargs)
+
+    def test_hit_skips_computation(self):
+        """O segundo pedido igual vem do cache"""
+        r1 = cache.cached('mm1', self._mm1_contado, 3.0, 5.0, n=2)
+        r2 = cache.cached('mm1', self._mm1_contado, 3.0, 5.0, n=2)
+        self.assertEqual(self.chamadas, 1)
+        self.assertEqual(r1, r2)
+
+    def test_survives_restart(self):
+        """Um novo processo/instância lê os resultados já gravados"""
+        cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+        cache.configure(self.path, max_entries=10)
+        cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+        self.assertEqual(self.chamadas, 1)
+
+    def test_errors_are_not_cached(self):
+        """Erros de validação não são guardados"""
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                cache.cached('mm1', self._mm1_contado, 5.0, 3.0)
+        self.assertEqual(self.chamadas, 2)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_size_bounded_eviction(self):
+        """Passando do limite, os menos usados recentemente saem"""
+        for i in range(30):
+            cache.cached('mm1', self._mm1_contado, 1.0 + i / 100, 5.0)
+        self.cache.evict()
+        self.assertEqual(len(self.cache), 10)
+        # O mais recente continua no cache
+        self.chamadas = 0
+        cache.cached('mm1', self._mm1_contado, 1.29, 5.0)
+        self.assertEqual(self.chamadas, 0)
+
+    def test_hit_does_not_write_fresh_entries(self):
+        """Acerto em resultado recente não regrava o instante de acesso"""
+        cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+        chave = cache.canonical_key('mm1', (3.0, 5.0), {})
+        consulta = "SELECT ultimo_acesso FROM resultados WHERE chave = ?"
+        antes = self.cache._conn().execute(consulta, (chave,)).fetchone()[0]
+        cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+        self.assertEqual(self.cache._conn().execute(consulta, (chave,)).fetchone()[0], antes)
+
+        # Resultado com acesso antigo: o acerto atualiza o LRU
+        self.cache._conn().execute("UPDATE resultados SET ultimo_acesso = 0")
+        cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+        self.assertGreater(self.cache._conn().execute(consulta, (chave,)).fetchone()[0], 0)
+
+    def test_hit_while_database_is_locked(self):
+        """Com outro processo escrevendo, o acerto responde sem esperar a trava"""
+        import sqlite3
+        import time
+        cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+        self.cache._conn().execute("UPDATE resultados SET ultimo_acesso = 0")
+        escritor = sqlite3.connect(self.path, isolation_level=None)
+        escritor.execute("BEGIN IMMEDIATE")
+        try:
+            inicio = time.perf_counter()
+            cache.cached('mm1', self._mm1_contado, 3.0, 5.0)
+            self.assertLess(time.perf_counter() - inicio, 1.0)
+            self.assertEqual(self.chamadas, 1)
+        finally:
+            escritor.execute("ROLLBACK")
+            escritor.close()
+
+    def test_route_uses_cache(self):
+        """As rotas /api/calculate/* passam pelo cache"""
+        from app.main import app
+        client = app.test_client()
+        r1 = client.post('/api/calculate/mms', json={'lambda': 8, 'mu': 5, 's': 2})
+        r2 = client.post('/api/calculate/mms', json={'lambda': 8, 'mu': 5, 's': 2})
+        self.assertEqual(r1.get_json(), r2.get_json())
+        self.assertEqual(len(self.cache), 1)
+
+if __name__ == '__main__':
+    unittest.main()
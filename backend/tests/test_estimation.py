@@ -0,0 +1,344 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.estimation import (
+    LindleyTrace, RunningMoments, SlidingMoments, StreamingEstimator, calculate_from_logs, estimate_from_logs,
+    evaluate_model, simulate_from_logs, simulate_trace,
+)
+from app.estimation.trace import RESOLUCAO
+from app.models.mg1 import calculate_mg1
+
+class TestRunningMoments(unittest.TestCase):
+    """Testes para os momentos acumulados em blocos"""
+
+    def test_update_in_chunks_matches_numpy(self):
+        """Combinar blocos deve dar a mesma média e variância do NumPy"""
+        rng = np.random.default_rng(1)
+        valores = rng.exponential(2.0, 10_001)
+        momentos = RunningMoments()
+        for bloco in np.array_split(valores, 7):
+            momentos.update(bloco)
+        self.assertEqual(momentos.count, valores.size)
+        self.assertAlmostEqual(momentos.mean, valores.mean(), places=10)
+        self.assertAlmostEqual(momentos.variance, valores.var(ddof=1), places=8)
+
+class TestLogEstimation(unittest.TestCase):
+    """Testes para a estimação a partir de logs"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(42)
+        self.intervalos = rng.exponential(1 / 4.0, 20_000)
+        self.instantes = np.cumsum(self.intervalos)
+        self.servicos = rng.exponential(1 / 5.0, 20_000)
+
+        self.csv_chegadas = os.path.join(self.tmpdir.name, 'chegadas.csv')
+        with open(self.csv_chegadas, 'w') as f:
+            f.write('timestamp\n')
+            f.write('\n'.join(repr(v) for v in self.instantes))
+            f.write('\n')
+
+        # Atendimento em duas colunas (início, fim)
+        self.csv_servicos = os.path.join(self.tmpdir.name, 'servicos.csv')
+        with open(self.csv_servicos, 'w') as f:
+            f.write('inicio,fim\n')
+            for inicio, dur in zip(self.instantes, self.servicos):
+                f.write(f'{inicio!r},{inicio + dur!r}\n')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_csv_estimates(self):
+        """λ, μ e σ² estimados devem bater com os dados gerados"""
+        est = estimate_from_logs(self.csv_chegadas, self.csv_servicos, colunas_servico=(0, 1))
+        self.assertEqual(est['numChegadas'], 20_000)
+        self.assertAlmostEqual(est['lambda'], 1 / np.diff(self.instantes).mean(), places=6)
+        self.assertAlmostEqual(est['mu'], 1 / self.servicos.mean(), places=6)
+        self.assertAlmostEqual(est['varServico'], self.servicos.var(ddof=1), places=8)
+        # Chegadas Poisson: coeficiente de variação² próximo de 1
+        self.assertAlmostEqual(est['ca2'], 1.0, delta=0.05)
+
+    def test_small_chunks_give_same_result(self):
+        """Blocos pequenos devem produzir a mesma estimativa"""
+        inteiro = estimate_from_logs(self.csv_chegadas)
+        em_blocos = estimate_from_logs(self.csv_chegadas, chunk_bytes=1000)
+        self.assertEqual(inteiro['numChegadas'], em_blocos['numChegadas'])
+        self.assertAlmostEqual(inteiro['lambda'], em_blocos['lambda'], places=9)
+        self.assertAlmostEqual(inteiro['varEntreChegadas'], em_blocos['varEntreChegadas'], places=9)
+
+    def test_binary_memmap(self):
+        """Logs binários float64 e .npy devem ser lidos por memmap"""
+        bin_path = os.path.join(self.tmpdir.name, 'chegadas.bin')
+        self.instantes.astype('<f8').tofile(bin_path)
+        npy_path = os.path.join(self.tmpdir.name, 'servicos.npy')
+        np.save(npy_path, self.servicos)
+
+        est = estimate_from_logs(bin_path, npy_path, chunk_bytes=4096)
+        self.assertAlmostEqual(est['lambda'], 1 / np.diff(self.instantes).mean(), places=6)
+        self.assertAlmostEqual(est['mu'], 1 / self.servicos.mean(), places=6)
+
+    def test_unordered_arrivals(self):
+        """Instantes de chegada fora de ordem devem dar erro"""
+        path = os.path.join(self.tmpdir.name, 'ruim.csv')
+        with open(path, 'w') as f:
+            f.write('1\n3\n2\n')
+        with self.assertRaises(ValueError):
+            estimate_from_logs(path)
+
+    def test_malformed_csv(self):
+        """Valores não numéricos devem dar erro"""
+        path = os.path.join(self.tmpdir.name, 'ruim.csv')
+        with open(path, 'w') as f:
+            f.write('1\n2\nabc\n')
+        with self.assertRaises(ValueError):
+            estimate_from_logs(path)
+
+    def test_evaluate_mg1(self):
+        """A estimativa deve alimentar diretamente o M/G/1"""
+        est = estimate_from_logs(self.csv_chegadas, self.csv_servicos, colunas_servico=(0, 1))
+        result = evaluate_model('mg1', est)
+        expected = calculate_mg1(est['lambda'], est['mu'], est['varServico'])
+        self.assertAlmostEqual(result['Lq'], expected['Lq'], places=10)
+
+    def test_evaluate_gg1_ggs(self):
+        """Os coeficientes de variação estimados alimentam o G/G/1 e o G/G/s"""
+        est = estimate_from_logs(self.csv_chegadas, self.csv_servicos, colunas_servico=(0, 1))
+        result = evaluate_model('gg1', est)
+        expected = calculate_mg1(est['lambda'], est['mu'], est['varServico'])
+        fator = (est['ca2'] + est['cs2']) / (1 + est['cs2'])
+        self.assertAlmostEqual(result['Lq'], expected['Lq'] * fator, places=10)
+        self.assertAlmostEqual(evaluate_model('ggs', est, s=1)['Wq'], result['Wq'], places=10)
+
+    def test_calculate_from_two_column_logs(self):
+        """calculate_from_logs deve repassar as colunas (início, fim) do atendimento"""
+        result = calculate_from_logs('mg1', self.csv_chegadas, self.csv_servicos, colunas_servico=(0, 1))
+        est = estimate_from_logs(self.csv_chegadas, self.csv_servicos, colunas_servico=(0, 1))
+        self.assertAlmostEqual(result['Lq'], evaluate_model('mg1', est)['Lq'], places=12)
+
+    def test_evaluate_without_services(self):
+        """Sem log de atendimento não há μ para calcular o modelo"""
+        est = estimate_from_logs(self.csv_chegadas)
+        with self.assertRaises(ValueError):
+            evaluate_model('mms', est, s=2)
+
+class TestSlidingMoments(unittest.TestCase):
+    """Testes para a janela deslizante de Welford"""
+
+    def test_window_matches_last_values(self):
+        """Média e variância devem ser as dos últimos `janela` valores"""
+        rng = np.random.default_rng(7)
+        valores = rng.normal(10, 3, 2_537)
+        janela = SlidingMoments(100)
+        for v in valores:
+            janela.push(v)
+        self.assertEqual(janela.count, 100)
+        self.assertAlmostEqual(janela.mean, valores[-100:].mean(), places=9)
+        self.assertAlmostEqual(janela.variance, valores[-100:].var(ddof=1), places=8)
+
+def _gerar_eventos(lambda_, mu, quantidade, seed=0):
+    rng = np.random.default_rng(seed)
+    t = 0.0
+    for _ in range(quantidade):
+        t += rng.exponential(1 / lambda_)
+        yield ('chegada', t)
+        yield {'tipo': 'conclusao', 't': t, 'duracao': rng.exponential(1 / mu)}
+
+class TestStreamingEstimator(unittest.TestCase):
+    """Testes para o estimador online"""
+
+    def test_consume_generator(self):
+        """Deve publicar métricas do modelo a partir de um gerador"""
+        estimador = StreamingEstimator('mms', janela=2000, cadencia=500, s=2)
+        publicacoes = list(estimador.consume(_gerar_eventos(3, 2, 5000)))
+        self.assertGreater(len(publicacoes), 0)
+        ultimo = publicacoes[-1]
+        self.assertAlmostEqual(ultimo['estimativa']['lambda'], 3, delta=0.3)
+        self.assertAlmostEqual(ultimo['estimativa']['mu'], 2, delta=0.2)
+        self.assertIn('Wq', ultimo['resultado'])
+        self.assertEqual(estimador.chegadas.buffer.size, 2000)
+
+    def test_tolerance_skips_reevaluation(self):
+        """Com tolerância alta o modelo só é recalculado na primeira vez"""
+        estimador = StreamingEstimator('mm1', janela=500, cadencia=100, tolerancia=10.0)
+        list(estimador.consume(_gerar_eventos(1, 2, 3000)))
+        self.assertEqual(estimador.num_avaliacoes, 1)
+
+    def test_arrival_variability_triggers_gg1(self):
+        """No G/G/1 uma mudança só em ca2 (λ, μ e σ² iguais) recalcula o modelo"""
+        rng = np.random.default_rng(0)
+        intervalos = np.concatenate([rng.exponential(1.0, 1000), np.ones(1000)])
+        eventos = []
+        for t, d in zip(np.cumsum(intervalos), rng.uniform(0.4, 0.6, intervalos.size)):
+            eventos += [('chegada', t), ('conclusao', t, d)]
+
+        avaliacoes = {}
+        for modelo in ('mg1', 'gg1'):
+            estimador = StreamingEstimator(modelo, janela=500, cadencia=1000, tolerancia=0.2)
+            list(estimador.consume(eventos))
+            avaliacoes[modelo] = estimador.num_avaliacoes
+        self.assertEqual(avaliacoes['mg1'], 1)
+        self.assertGreater(avaliacoes['gg1'], 1)
+
+    def test_unstable_window_is_reported(self):
+        """Janela instável deve ser publicada como erro, sem interromper o fluxo"""
+        estimador = StreamingEstimator('mm1', cadencia=200)
+        publicacoes = list(estimador.consume(_gerar_eventos(4, 2, 1000)))
+        self.assertIn('error', publicacoes[-1]['resultado'])
+
+    def test_invalid_event(self):
+        """Tipo de evento desconhecido deve dar erro"""
+        estimador = StreamingEstimator('mm1')
+        with self.assertRaises(ValueError):
+            estimador.push(('partida', 1.0))
+        with self.assertRaises(ValueError):
+            estimador.push({'tipo': 'chegada'})
+        with self.assertRaises(ValueError):
+            estimador.push(5)
+        for evento in (('conclusao', None, 1.0), {'tipo': 'conclusao', 't': 'x', 'duracao': 1.0}):
+            with self.assertRaises(ValueError):
+                estimador.push(evento)
+
+class TestStreamingRoutes(unittest.TestCase):
+    """Testes para o endpoint local de eventos"""
+
+    def setUp(self):
+        from app.main import app
+        self.client = app.test_client()
+
+    def test_stream_endpoint(self):
+        """Criar fluxo, enviar eventos e consultar a última publicação"""
+        resp = self.client.post('/api/estimation/streams', json={'modelo': 'mms', 's': 2, 'cadencia': 100})
+        self.assertEqual(resp.status_code, 201)
+        stream_id = resp.get_json()['id']
+
+        eventos = [
+            {'tipo': e[0], 't': e[1]} if isinstance(e, tuple) else e
+            for e in _gerar_eventos(3, 2, 300)
+        ]
+        resp = self.client.post(f'/api/estimation/streams/{stream_id}/events', json={'eventos': eventos})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.get_json()['atualizado'])
+
+        resp = self.client.get(f'/api/estimation/streams/{stream_id}')
+        self.assertEqual(resp.get_json()['eventos'], 600)
+
+    def test_malformed_events(self):
+        """Eventos malformados devem retornar 400, não 500"""
+        resp = self.client.post('/api/estimation/streams', json={'modelo': 'mm1'})
+        stream_id = resp.get_json()['id']
+        for evento in ({'tipo': 'chegada'}, 5, ['chegada'], {'tipo': 'conclusao', 't': 1, 'duracao': 'x'}):
+            resp = self.client.post(f'/api/estimation/streams/{stream_id}/events', json={'eventos': [evento]})
+            self.assertEqual(resp.status_code, 400, evento)
+
+    def test_stream_shared_between_workers(self):
+        """Com o registro em SQLite, outro processo (worker) vê o mesmo fluxo"""
+        import multiprocessing
+        import tempfile
+        from app.estimation import registry
+
+        with tempfile.TemporaryDirectory() as tmp:
+            registro = registry.SQLiteStreamRegistry(os.path.join(tmp, 'fluxos.sqlite3'))
+            stream_id = registro.create(StreamingEstimator('mm1', cadencia=10))
+            processo = multiprocessing.get_context('fork').Process(
+                target=registro.update,
+                args=(stream_id, lambda e: list(e.consume(_gerar_eventos(1, 2, 50)))),
+            )
+            processo.start()
+            processo.join()
+            self.assertEqual(registro.update(stream_id, lambda e: e.num_eventos), 100)
+            with self.assertRaises(registry.StreamNotFound):
+                registro.update('nao-existe', lambda e: None)
+
+    def test_unknown_stream(self):
+        """Fluxo inexistente deve retornar 404"""
+        resp = self.client.get('/api/estimation/streams/nao-existe')
+        self.assertEqual(resp.status_code, 404)
+
+class TestLindleyTrace(unittest.TestCase):
+    """Testes para o G/G/1 dirigido por traços (recursão de Lindley)"""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.A = rng.exponential(1 / 4, 50_000)
+        self.S = rng.gamma(0.5, 0.4, 50_000)
+
+    def _lindley_laco(self, A, S):
+        esperas = np.zeros(A.size)
+        for k in range(1, A.size):
+            esperas[k] = max(0.0, esperas[k - 1] + S[k - 1] - A[k])
+        return esperas
+
+    def test_matches_python_loop_across_chunks(self):
+        """A varredura vetorizada bate com o laço, com estado carregado entre blocos"""
+        esperado = self._lindley_laco(self.A, self.S)
+        traco = LindleyTrace()
+        esperas = np.concatenate([traco.update(self.A[i:i + 777], self.S[i:i + 777])
+                                  for i in range(0, self.A.size, 777)])
+        np.testing.assert_allclose(esperas, esperado, rtol=0, atol=1e-10)
+
+        result = simulate_trace(self.A, self.S, chunk_clientes=1000)
+        self.assertAlmostEqual(result['Wq'], esperado.mean(), places=10)
+        self.assertAlmostEqual(result['W'], (esperado + self.S).mean(), places=10)
+        self.assertEqual(result['PWqIgualZero'], float(np.mean(esperado == 0)))
+        for p in (50, 90, 99):
+            exato = np.percentile(esperado, p, method='inverted_cdf')
+            self.assertAlmostEqual(result['percentisWq'][str(p)] / exato, 1, delta=RESOLUCAO)
+
+    def test_mg1_keys_and_little(self):
+        """Devolve as chaves do calculate_mg1, com L = λ×W e Lq = λ×Wq"""
+        result = simulate_trace(self.A, self.S)
+        for chave in calculate_mg1(4, 5, 0.08):
+            self.assertIn(chave, result)
+        self.assertAlmostEqual(result['L'], result['lambda'] * result['W'], places=12)
+        self.assertAlmostEqual(result['rho'], result['lambda'] / result['mu'], places=12)
+        self.assertAlmostEqual(result['rho'], 0.8, delta=0.02)
+        self.assertAlmostEqual(result['P0'], 1 - result['rho'], delta=0.01)
+
+    def test_mm1_trace_converges(self):
+        """Traço exponencial longo: Wq próximo de ρ/(μ - λ) do M/M/1"""
+        rng = np.random.default_rng(11)
+        result = simulate_trace(rng.exponential(1 / 4, 2_000_000), rng.exponential(1 / 5, 2_000_000))
+        self.assertAlmostEqual(result['Wq'] / 0.8, 1, delta=0.05)
+        self.assertAlmostEqual(result['PWqIgualZero'], 0.2, delta=0.01)
+
+    def test_deterministic_trace(self):
+        """D/D/1 com ρ < 1 não tem fila"""
+        result = simulate_trace(np.ones(1000), np.full(1000, 0.5), chunk_clientes=64)
+        self.assertEqual(result['Wq'], 0)
+        self.assertEqual(result['PWqIgualZero'], 1)
+        self.assertEqual(result['percentisWq']['99'], 0)
+        self.assertAlmostEqual(result['percentisW']['50'] / 0.5, 1, delta=RESOLUCAO)
+
+    def test_from_logs_matches_arrays(self):
+        """Logs com cortes de bloco diferentes são alinhados cliente a cliente"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            chegadas = os.path.join(tmpdir, 'chegadas.csv')
+            servicos = os.path.join(tmpdir, 'servicos.csv')
+            instantes = np.cumsum(self.A)
+            np.savetxt(chegadas, instantes, fmt='%.17g')
+            np.savetxt(servicos, self.S, fmt='%.17g', header='duracao', comments='')
+            result = simulate_from_logs(chegadas, servicos, chunk_bytes=4096)
+            esperado = simulate_trace(np.concatenate(([0.0], np.diff(instantes))), self.S)
+            for chave in ('Wq', 'W', 'rho', 'P0', 'PWqIgualZero'):
+                self.assertAlmostEqual(result[chave], esperado[chave], places=9)
+
+            np.savetxt(servicos, self.S[:-1], fmt='%.17g')
+            with self.assertRaises(ValueError):
+                simulate_from_logs(chegadas, servicos)
+
+    def test_invalid_trace(self):
+        """Tamanhos diferentes ou tempos negativos geram ValueError"""
+        with self.assertRaises(ValueError):
+            simulate_trace(np.ones(3), np.ones(4))
+        with self.assertRaises(ValueError):
+            simulate_trace(np.ones(3), np.array([1.0, -1.0, 1.0]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import time
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import jobs
+from app.solvers.staffing import plan_staffing
+
+STAFFING = {'tipo': 'staffing', 'parametros': {'lambdas': [10, 50, 100], 'mu': 1, 'alvo': 0.2, 't': 0.1}}
+
+# Monte Carlo longo (dezenas de blocos), para cancelar no meio
+LONGA = {'tipo': 'uncertainty', 'parametros': {
+    'modelo': 'mms', 'amostras': 5_000_000, 'semente': 1,
+    'parametros': {'lambda': {'tipo': 'normal', 'media': 8, 'desvio': 0.5}, 'mu': 1, 's': 10},
+}}
+
+
+class TestJobs(unittest.TestCase):
+    """Testes para a fila de tarefas em segundo plano (/api/jobs)"""
+
+    def setUp(self):
+        from app.main import app
+        self.client = app.test_client()
+        self.diretorio = tempfile.mkdtemp()
+        self.path = os.path.join(self.diretorio, 'jobs.sqlite3')
+        jobs.configure(self.path)
+
+    def tearDown(self):
+        jobs.get_jobs().shutdown()
+        jobs._jobs = None
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def esperar(self, job_id, status=jobs.TERMINADOS, limite=10.0):
+        fim = time.monotonic() + limite
+        while time.monotonic() < fim:
+            resumo = self.client.get(f'/api/jobs/{job_id}').get_json()
+            if resumo['status'] in status:
+                return resumo
+            time.sleep(0.01)
+        self.fail(f"Tarefa {job_id} não chegou a {status}")
+
+    def test_submit_and_result(self):
+        """A tarefa conclui com o mesmo resultado da rota síncrona"""
+        resp = self.client.post('/api/jobs', json=STAFFING)
+        self.assertEqual(resp.status_code, 202)
+        job_id = resp.get_json()['id']
+        self.assertFalse(resp.get_json()['duplicado'])
+        resumo = self.esperar(job_id)
+        self.assertEqual(resumo['status'], jobs.CONCLUIDO)
+        self.assertIn('servidores', resumo['progresso'])
+
+        resp = self.client.get(f'/api/jobs/{job_id}/result')
+        self.assertEqual(resp.status_code, 200)
+        esperado = plan_staffing([10, 50, 100], 1, alvo=0.2, t=0.1)
+        self.assertEqual(resp.get_json()['servidores'], esperado['servidores'])
+
+    def test_dedup(self):
+        """Envios idênticos recebem a mesma tarefa; parâmetros diferentes não"""
+        primeira = self.client.post('/api/jobs', json=STAFFING).get_json()
+        segunda = self.client.post('/api/jobs', json=STAFFING).get_json()
+        self.assertEqual(segunda['id'], primeira['id'])
+        self.assertTrue(segunda['duplicado'])
+        self.esperar(primeira['id'])
+        # Concluída: continua deduplicada, sem recalcular
+        self.assertEqual(self.client.post('/api/jobs', json=STAFFING).get_json()['id'], primeira['id'])
+
+        outra = {'tipo': 'staffing', 'parametros': {**STAFFING['parametros'], 'alvo': 0.1}}
+        self.assertNotEqual(self.client.post('/api/jobs', json=outra).get_json()['id'], primeira['id'])
+
+    def test_cancel(self):
+        """Cancelar interrompe o cálculo; o resultado responde 409 e um novo envio recalcula"""
+        job_id = self.client.post('/api/jobs', json=LONGA).get_json()['id']
+        self.esperar(job_id, (jobs.EXECUTANDO,))
+        self.assertEqual(self.client.post(f'/api/jobs/{job_id}/cancel').status_code, 200)
+        resumo = self.esperar(job_id, limite=2.0)
+        self.assertEqual(resumo['status'], jobs.CANCELADO)
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/result').status_code, 409)
+
+        nova = self.client.post('/api/jobs', json=LONGA).get_json()
+        self.assertNotEqual(nova['id'], job_id)
+        self.client.post(f"/api/jobs/{nova['id']}/cancel")
+
+    def test_pool_full(self):
+        """Sem thread nem vaga na fila, o envio é recusado com 503"""
+        jobs.configure(self.path, threads=1, fila=0)
+        job_id = self.client.post('/api/jobs', json=LONGA).get_json()['id']
+        resp = self.client.post('/api/jobs', json=STAFFING)
+        self.assertEqual(resp.status_code, 503)
+        # Um envio idêntico ainda recebe a tarefa existente
+        self.assertEqual(self.client.post('/api/jobs', json=LONGA).get_json()['id'], job_id)
+        self.client.post(f'/api/jobs/{job_id}/cancel')
+        self.esperar(job_id)
+        time.sleep(0.05)
+        self.assertEqual(self.client.post('/api/jobs', json=STAFFING).status_code, 202)
+
+    def test_persistence_and_dead_process(self):
+        """Resultados sobrevivem ao reinício; tarefas de um processo morto viram falhas"""
+        job_id = self.client.post('/api/jobs', json=STAFFING).get_json()['id']
+        self.esperar(job_id)
+
+        # Processo que já terminou: sua tarefa nunca vai concluir
+        morto = subprocess.Popen([sys.executable, '-c', 'pass'])
+        morto.wait()
+        fila = jobs.configure(self.path)
+        fila._conn().execute(
+            "INSERT INTO tarefas (id, chave, tipo, parametros, status, pid, criado) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ('orfa', 'x', 'staffing', json.dumps({}), jobs.EXECUTANDO, morto.pid, time.time()),
+        )
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/result').status_code, 200)
+        resumo = self.client.get('/api/jobs/orfa').get_json()
+        self.assertEqual(resumo['status'], jobs.FALHOU)
+        self.assertIn('Processo encerrado', resumo['error'])
+
+    def test_invalid(self):
+        """Tipo ou parâmetros inválidos respondem 400; tarefa inexistente, 404"""
+        self.assertEqual(self.client.post('/api/jobs', json={'tipo': 'x', 'parametros': {}}).status_code, 400)
+        resp = self.client.post('/api/jobs', json={'tipo': 'staffing', 'parametros': {
+            **STAFFING['parametros'], 'sla': 'xyz'}})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(self.client.post('/api/jobs', json={'tipo': 'grid'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/jobs/nada').status_code, 404)
+        self.assertEqual(self.client.get('/api/jobs/nada/result').status_code, 404)
+        self.assertEqual(self.client.post('/api/jobs/nada/cancel').status_code, 404)
+
+    def test_grid(self):
+        """Tarefas 'grid' devolvem o formato json de /api/grid"""
+        corpo = {'modelo': 'mm1', 'metricas': ['W'], 'formato': 'json',
+                 'eixoX': {'parametro': 'lambda', 'inicio': 1, 'fim': 5, 'passos': 5},
+                 'eixoY': {'parametro': 'mu', 'inicio': 2, 'fim': 4, 'passos': 2}}
+        job_id = self.client.post('/api/jobs', json={'tipo': 'grid', 'parametros': corpo}).get_json()['id']
+        self.assertEqual(self.esperar(job_id)['status'], jobs.CONCLUIDO)
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/result').get_json(),
+                         self.client.post('/api/grid', json=corpo).get_json())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,9 @@ import unittest
 import sys
 import os
 import math
+import time
+
+import numpy as np
 
 # Adicionar o diretório raiz do projeto ao sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -12,6 +15,22 @@ from app.models.mm1k import calculate_mm1k
 from app.models.mm1n import calculate_mm1n
 from app.models.mmsk import calculate_mmsk
 from app.models.mmsn import calculate_mmsn
+from app.models.erlang import erlang_b, erlang_c
+from app.models.mmsm import calculate_mmsm
+from app.models.batch import (
+    calculate_mms_batch, calculate_mmsm_batch, calculate_mm1_batch, calculate_mm1k_batch,
+    calculate_mmsk_batch, calculate_mm1n_batch, calculate_mmsn_batch, calculate_mg1_batch,
+    calculate_priority_sem_batch, calculate_gg1_batch, calculate_ggs_batch,
+)
+from app.models.priority_sem import calculate_priority_sem
+from app.models.mg1 import calculate_mg1
+from app.models.ggs import calculate_gg1, calculate_ggs
+from app.models.precision import Orcamento, com_orcamento, mmsk_high_precision, mmsn_high_precision
+from app.models.incremental import MMsKSession, MMsNSession
+from app.models.qed import CAMINHO_ASSINTOTICO, erlang_qed
+from app.models.debug import com_debug, fase, rastrear, termos
+from app.models.results import Resultado, para_json
+from app.models.numeric import log_binomial, log_factorial, log_power_ratio, log_sum_exp, log_sum_power_ratios
 
 class TestMM1(unittest.TestCase):
     """Testes para o modelo M/M/1"""
@@ -185,6 +204,33 @@ class TestMMs(unittest.TestCase):
         with self.assertRaises(ValueError):
             calculate_mms(8, 5, 2, t=-1)
 
+    def test_mms_exact_many_servers(self):
+        """Caminho exato com s = 1000 (antes estourava em s!): bate com o Erlang vetorizado"""
+        result = calculate_mms(900, 1, 1000, n=10, r=5, tolerancia=1e-300)
+        lote = calculate_mms_batch(900, 1, 1000, tolerancia=1e-300)
+        self.assertEqual(result['caminhoNumerico'], 'float64')
+        self.assertAlmostEqual(result['Lq'] / float(lote['Lq']), 1, places=10)
+        self.assertAlmostEqual(result['PWqIgualZero'], float(lote['PWqIgualZero']), places=12)
+        # P0 ≈ e^(-900): underflow para 0, sem erro
+        self.assertEqual(result['P0'], 0.0)
+        self.assertEqual(result['Pn'], 0.0)
+        self.assertEqual(result['PnMaiorQueR'], 1.0)
+
+        from app.main import app
+        resposta = app.test_client().post('/api/calculate/mms', json={'lambda': 900, 'mu': 1, 's': 1000})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertAlmostEqual(resposta.get_json()['Lq'] / float(lote['Lq']), 1, places=10)
+
+    def test_mms_small_state_probabilities(self):
+        """P(n) e P(n>r) com n, r < s batem com a soma direta de a^n/n!"""
+        a, s = 3.2, 5
+        result = calculate_mms(a * 2, 2, s, n=2, r=3)
+        termos = [a**k / math.factorial(k) for k in range(s)]
+        P0 = 1 / (sum(termos) + a**s / math.factorial(s) / (1 - a / s))
+        self.assertAlmostEqual(result['P0'], P0, places=14)
+        self.assertAlmostEqual(result['Pn'], P0 * termos[2], places=14)
+        self.assertAlmostEqual(result['PnMaiorQueR'], 1 - P0 * sum(termos[:4]), places=14)
+
 class TestMM1K(unittest.TestCase):
     """Testes para o modelo M/M/1/K"""
 
@@ -583,5 +629,840 @@ class TestMM1N(unittest.TestCase):
         expected_Lq = result['L'] - (1 - result['P0'])
         self.assertAlmostEqual(result['Lq'], expected_Lq, places=4)
 
+class TestFiniteSourceChain(unittest.TestCase):
+    """Pesos da cadeia de fonte finita (M/M/1/N e M/M/s/N) e exemplo dos robôs"""
+
+    @staticmethod
+    def _por_estados(lambda_, mu, s, N):
+        # P(n) ∝ N!/(N-n)! × aⁿ / (n! se n < s, s!×s^(n-s) se n ≥ s)
+        a = lambda_ / mu
+        pesos = []
+        for n in range(N + 1):
+            divisor = math.factorial(n) if n < s else math.factorial(s) * s ** (n - s)
+            pesos.append(math.perm(N, n) * a ** n / divisor)
+        total = sum(pesos)
+        P = [w / total for w in pesos]
+        L = sum(n * p for n, p in enumerate(P))
+        Lq = sum((n - s) * p for n, p in enumerate(P) if n > s)
+        return P[0], L, Lq
+
+    def test_robot_example_mm1n(self):
+        """5 robôs, λ = 1/30, μ = 1/3, um técnico: 4,360 operacionais"""
+        result = calculate_mm1n(1 / 30, 1 / 3, 5)
+        self.assertAlmostEqual(result['numOperacionais'], 4.360, places=3)
+        self.assertAlmostEqual(result['P0'], 0.564, places=3)
+        # Pesos binomiais antigos C(N,n)×aⁿ davam 4,545
+        self.assertNotAlmostEqual(result['numOperacionais'], 5 - 5 * 0.1 / 1.1, places=2)
+
+    def test_robot_example_mmsn(self):
+        """Mesmo exemplo com dois técnicos: 4,535 operacionais"""
+        result = calculate_mmsn(1 / 30, 1 / 3, 2, 5)
+        self.assertAlmostEqual(result['numOperacionais'], 4.535, places=3)
+        self.assertAlmostEqual(result['P0'], 0.619, places=3)
+
+    def test_matches_state_sums(self):
+        """Escalar e vetorizado devem bater com a soma direta dos estados"""
+        for lambda_, mu, s, N in [(0.5, 1, 1, 10), (0.2, 1, 1, 30), (0.5, 1, 2, 10),
+                                  (0.1, 1, 3, 40), (2.0, 1, 4, 12)]:
+            P0, L, Lq = self._por_estados(lambda_, mu, s, N)
+            if s == 1:
+                result = calculate_mm1n(lambda_, mu, N)
+                lote = calculate_mm1n_batch(lambda_, mu, N)
+            else:
+                result = calculate_mmsn(lambda_, mu, s, N)
+                lote = calculate_mmsn_batch(lambda_, mu, s, N)
+            for chave, esperado in (('P0', P0), ('L', L), ('Lq', Lq)):
+                self.assertAlmostEqual(result[chave], esperado, places=10)
+                self.assertAlmostEqual(float(lote[chave]), esperado, places=10)
+
+    def test_routes_robot_example(self):
+        """As rotas devolvem os valores do exemplo dos robôs"""
+        from app.main import app
+        client = app.test_client()
+        resp = client.post('/api/calculate/mm1n', json={'lambda': 1 / 30, 'mu': 1 / 3, 'N': 5})
+        self.assertEqual(resp.status_code, 200)
+        self.assertAlmostEqual(resp.get_json()['numOperacionais'], 4.360, places=3)
+        resp = client.post('/api/calculate/mmsn', json={'lambda': 1 / 30, 'mu': 1 / 3, 's': 2, 'N': 5})
+        self.assertEqual(resp.status_code, 200)
+        self.assertAlmostEqual(resp.get_json()['numOperacionais'], 4.535, places=3)
+
+class TestIncrementalSession(unittest.TestCase):
+    """Testes para as sessões incrementais (what-if) do M/M/s/K e M/M/s/N"""
+
+    def _comparar(self, obtido, esperado, chaves):
+        for chave in chaves:
+            self.assertAlmostEqual(obtido[chave] / float(esperado[chave]), 1, places=11, msg=chave)
+
+    def test_mmsk_slider_matches_model(self):
+        """Cada passo de K bate com o modelo e calcula só os estados novos"""
+        sessao = MMsKSession(4, 2, 3, 10)
+        for K, termos in ((11, 1), (12, 1), (8, 0), (12, 0), (60, 48)):
+            self.assertEqual(sessao.update(K=K), termos)
+            self._comparar(sessao.result(), calculate_mmsk(4, 2, 3, K), ('P0', 'PK', 'L', 'Lq', 'W', 'Wq'))
+        # Mudar s reconstrói até o K atual
+        self.assertEqual(sessao.update(s=4), 61)
+        self._comparar(sessao.result(), calculate_mmsk(4, 2, 4, 60), ('P0', 'PK', 'L', 'Lq', 'W'))
+
+    def test_mmsk_heavy_load(self):
+        """Com PK ≈ 1, λ_eff não perde precisão (Z(K-1)/Z(K) em vez de 1 - PK)"""
+        sessao = MMsKSession(30, 1, 5, 2000)
+        esperado = mmsk_high_precision(30, 1, 5, 2000)
+        self._comparar(sessao.result(), esperado, ('PK', 'L', 'Lq', 'W', 'lambdaEfetivo'))
+
+    def test_mmsn_slider_matches_model(self):
+        """Cada passo de N bate com o modelo (exemplo dos robôs e N grande)"""
+        sessao = MMsNSession(1 / 30, 1 / 3, 2, 5)
+        self.assertAlmostEqual(sessao.result()['numOperacionais'], 4.535, places=3)
+        for N, termos in ((6, 1), (7, 1), (5, 0), (300, 293)):
+            self.assertEqual(sessao.update(N=N), termos)
+            self._comparar(sessao.result(), calculate_mmsn(1 / 30, 1 / 3, 2, N),
+                           ('P0', 'L', 'Lq', 'W', 'Wq', 'numOperacionais', 'PWqIgualZero'))
+        sessao.update(lambda_=0.2, s=4)
+        self._comparar(sessao.result(), calculate_mmsn(0.2, 1 / 3, 4, 300), ('L', 'Lq', 'W', 'numOperacionais'))
+
+    def test_mmsn_single_server(self):
+        """s = 1 (M/M/1/N)"""
+        sessao = MMsNSession(0.5, 1, 1, 10)
+        self._comparar(sessao.result(), calculate_mm1n(0.5, 1, 10), ('P0', 'L', 'Lq', 'W'))
+
+    def test_invalid(self):
+        """Parâmetros inválidos geram ValueError e não alteram a sessão"""
+        sessao = MMsKSession(4, 2, 3, 10)
+        with self.assertRaises(ValueError):
+            sessao.update(K=2)
+        self.assertEqual(sessao.K, 10)
+        with self.assertRaises(ValueError):
+            MMsNSession(1, 1, 3, 2)
+
+    def test_routes_shared_between_workers(self):
+        """Com o registro em SQLite a sessão sobrevive entre requisições (workers)"""
+        import tempfile
+        from app.estimation import registry
+        from app.main import app
+        client = app.test_client()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            anterior = (registry._registry, registry._sessions)
+            registry.configure(os.path.join(tmp, 'fluxos.sqlite3'))
+            try:
+                resp = client.post('/api/sessions', json={'modelo': 'mmsk', 'lambda': 4, 'mu': 2, 's': 3, 'K': 10})
+                self.assertEqual(resp.status_code, 201)
+                session_id = resp.get_json()['id']
+
+                resp = client.post(f'/api/sessions/{session_id}', json={'K': 11})
+                self.assertEqual(resp.status_code, 200)
+                self.assertEqual(resp.get_json()['termosCalculados'], 1)
+                self.assertAlmostEqual(resp.get_json()['resultado']['W'], calculate_mmsk(4, 2, 3, 11)['W'], places=12)
+
+                self.assertEqual(client.get(f'/api/sessions/{session_id}').get_json()['resultado']['K'], 11)
+                self.assertEqual(client.post(f'/api/sessions/{session_id}', json={'N': 5}).status_code, 400)
+                self.assertEqual(client.post(f'/api/sessions/{session_id}', json={'K': 1}).status_code, 400)
+                self.assertEqual(client.post('/api/sessions/nao-existe', json={'K': 5}).status_code, 404)
+                self.assertEqual(client.post('/api/sessions', json={'modelo': 'mmsn', 'lambda': 1, 'mu': 1}).status_code, 400)
+            finally:
+                registry._registry, registry._sessions = anterior
+
+    def test_pickle_keeps_only_parameters(self):
+        """A sessão serializada não leva os prefixos; sem o cache eles são reconstruídos"""
+        import pickle
+        from app.models import incremental
+
+        for sessao, mudar in [(MMsKSession(0.9, 1, 4, 200_000), {'K': 200_001}),
+                              (MMsNSession(0.01, 1, 2, 200_000), {'N': 200_001})]:
+            dados = pickle.dumps(sessao)
+            self.assertLess(len(dados), 1000)
+
+            # Mesmo processo: os prefixos continuam no cache
+            copia = pickle.loads(dados)
+            self.assertEqual(copia.update(**mudar), 1)
+
+            # Outro worker (cache vazio): reconstrói até o K/N atual
+            incremental._cache.pop(sessao._chave)
+            copia = pickle.loads(dados)
+            self.assertGreater(copia.update(**mudar), 100_000)
+            esperado = sessao.result()
+            sessao.update(**mudar)
+            self.assertEqual(copia.result(), sessao.result())
+            self.assertNotEqual(copia.result(), esperado)
+
+class TestErlang(unittest.TestCase):
+    """Testes para as fórmulas de Erlang vetorizadas"""
+
+    def _erlang_b_recorrencia(self, a, s):
+        B = 1.0
+        for k in range(1, s + 1):
+            B = a * B / (k + a * B)
+        return B
+
+    def test_erlang_b_matches_recurrence(self):
+        """Erlang B deve bater com a recorrência clássica"""
+        for a, s in [(1.6, 2), (10, 12), (100, 90), (50, 3), (1000, 1050), (2000, 10)]:
+            self.assertAlmostEqual(erlang_b(a, s), self._erlang_b_recorrencia(a, s), places=10)
+
+    def test_erlang_c_matches_mms(self):
+        """1 - C deve ser o PWqIgualZero do M/M/s"""
+        result = calculate_mms(8, 5, 2)
+        self.assertAlmostEqual(1 - erlang_c(8 / 5, 2), result['PWqIgualZero'], places=10)
+
+    def test_erlang_c_large_s(self):
+        """Erlang C deve funcionar para milhares de servidores"""
+        C = erlang_c(9900, 10000)
+        self.assertGreater(C, 0)
+        self.assertLess(C, 1)
+
+class TestNumeric(unittest.TestCase):
+    """Testes para o núcleo numérico (log-fatoriais, log-binomiais, log-sum-exp)"""
+
+    def test_log_factorial_and_binomial(self):
+        """Tabela e lgamma batem com math.lgamma e math.comb"""
+        n = np.array([0, 1, 5, 170, 5000])
+        np.testing.assert_allclose(log_factorial(n), [math.lgamma(k + 1) for k in n], rtol=1e-14)
+        self.assertAlmostEqual(float(log_binomial(50, 20)), math.log(math.comb(50, 20)), places=11)
+        np.testing.assert_allclose(np.exp(log_binomial(10, np.arange(11))),
+                                   [math.comb(10, k) for k in range(11)], rtol=1e-12)
+
+    def test_log_sum_exp(self):
+        """Sem overflow para termos grandes; -inf para soma vazia"""
+        self.assertAlmostEqual(float(log_sum_exp([1000.0, 1000.0])), 1000 + math.log(2), places=10)
+        self.assertEqual(log_sum_exp([]), -np.inf)
+        self.assertEqual(float(log_sum_exp([-np.inf, 0.0])), 0.0)
+
+    def test_power_ratios(self):
+        """x^n/n! e a soma dos n primeiros, inclusive em vários blocos"""
+        self.assertEqual(float(log_power_ratio(0.0, 0)), 0.0)
+        self.assertAlmostEqual(float(log_power_ratio(3.0, 4)), math.log(81 / 24), places=14)
+        self.assertAlmostEqual(log_sum_power_ratios(2.0, 8), math.log(sum(2**k / math.factorial(k) for k in range(8))),
+                               places=14)
+        self.assertEqual(log_sum_power_ratios(2.0, 0), -np.inf)
+        # Σ(k<n) x^k/k! → e^x quando n >> x (vários blocos de BLOCO_TERMOS)
+        self.assertAlmostEqual(log_sum_power_ratios(1e5, 3 * 10**5), 1e5, places=7)
+
+class TestMMsBatch(unittest.TestCase):
+    """Testes para a versão vetorizada do M/M/s"""
+
+    def test_batch_matches_scalar(self):
+        """Cada cenário do lote deve bater com calculate_mms"""
+        lambdas = [1, 4, 8, 9.5]
+        result = calculate_mms_batch(lambdas, 5, 2, t=0.5)
+        for i, lambda_ in enumerate(lambdas):
+            esperado = calculate_mms(lambda_, 5, 2, t=0.5)
+            for chave in ('L', 'Lq', 'W', 'Wq', 'P0', 'PWqIgualZero', 'PWqMaiorQueT', 'PWMaiorQueT'):
+                self.assertAlmostEqual(result[chave][i], esperado[chave], places=8)
+
+    def test_batch_masks_unstable(self):
+        """Cenários instáveis devem virar NaN em vez de erro"""
+        result = calculate_mms_batch([8, 12], 5, 2)
+        self.assertTrue(result['estavel'][0])
+        self.assertFalse(result['estavel'][1])
+        self.assertTrue(math.isnan(result['L'][1]))
+
+class TestQED(unittest.TestCase):
+    """Testes para a aproximação assintótica (Halfin–Whitt/QED) do M/M/s"""
+
+    def _log_B_direto(self, a, s):
+        # 1/B = Σ(k=0 até s) P(X = s-k)/P(X = s), razões Π(j<k) (s-j)/a (termos
+        # desprezíveis além de 80 desvios-padrão). Em long double: a soma
+        # acumulada de ~10⁵ logs em float64 erra mais que a própria aproximação.
+        j = np.arange(int(min(s, (s - a) + 80 * math.sqrt(a) + 200)), dtype=np.longdouble)
+        log_razoes = np.concatenate([[0.0], np.cumsum(np.log((np.longdouble(s) - j) / np.longdouble(a)))])
+        topo = log_razoes.max()
+        return -(topo + np.log(np.exp(log_razoes - topo).sum()))
+
+    def test_error_bound_holds(self):
+        """O erro observado de B fica abaixo da estimativa, de s = 10³ a 10⁷"""
+        for s in (1000, 2500, 40000, 10 ** 6, 10 ** 7):
+            for x in (0.05, 0.5, 1, 2, 4, 7, 9, 20):
+                a = s - x * math.sqrt(s)
+                if a <= 0:
+                    continue
+                q = erlang_qed(a, s)
+                self.assertTrue(np.isfinite(q['erro']))
+                erro = abs(float(np.expm1(np.log(np.longdouble(float(q['B']))) - self._log_B_direto(a, s))))
+                self.assertLessEqual(erro, float(q['erro']), msg=(s, x))
+
+    def test_matches_exact_erlang_c(self):
+        """C assintótico bate com o Erlang C exato dentro do erro estimado"""
+        for s in (1000, 5000, 20000):
+            for rho in (0.9, 0.98, 0.995, 0.9999):
+                q = erlang_qed(rho * s, s)
+                self.assertAlmostEqual(float(q['C']) / erlang_c(rho * s, s), 1, delta=float(q['erro']) + 1e-9)
+
+    def test_halfin_whitt_limit(self):
+        """Para s → ∞ com β fixo, C tende ao limite de Halfin–Whitt"""
+        from scipy.stats import norm
+        beta = 1.0
+        limite = 1 / (1 + beta * norm.cdf(beta) / norm.pdf(beta))
+        s = 10 ** 8
+        q = erlang_qed(s - beta * math.sqrt(s), s)
+        self.assertAlmostEqual(float(q['beta']), beta, places=9)
+        self.assertAlmostEqual(float(q['C']), limite, places=3)
+
+    def test_outside_domain(self):
+        """Poucos servidores ou sistema instável: sem estimativa (erro infinito)"""
+        q = erlang_qed([8, 990, 1200], [10, 1000, 1000])
+        self.assertTrue(np.isinf(q['erro'][0]))
+        self.assertTrue(np.isfinite(q['erro'][1]))
+        self.assertTrue(np.isinf(q['erro'][2]))
+
+    def test_batch_dispatch(self):
+        """O lote usa a aproximação só onde o erro estimado cabe na tolerância"""
+        lambdas = np.array([9, 800, 999, 9.9e6])
+        servidores = np.array([10, 1000, 1000, 1e7])
+        lote = calculate_mms_batch(lambdas, 1, servidores, t=1e-4, tolerancia=1e-8)
+        self.assertEqual(lote['assintotico'].tolist(), [False, True, False, True])
+        frouxo = calculate_mms_batch(lambdas, 1, servidores, t=1e-4, tolerancia=1e-3)
+        self.assertEqual(frouxo['assintotico'].tolist(), [False, True, True, True])
+        for i in range(4):
+            exato = erlang_c(lambdas[i], int(servidores[i]))
+            self.assertAlmostEqual(frouxo['C'][i] / exato, 1, delta=1e-3)
+            self.assertAlmostEqual(frouxo['PWqMaiorQueT'][i] / (exato * math.exp(-(servidores[i] - lambdas[i]) * 1e-4)),
+                                   1, delta=1e-3)
+
+    def test_scalar_dispatch(self):
+        """calculate_mms informa o caminho e o erro estimado"""
+        pequeno = calculate_mms(9, 1, 10)
+        self.assertEqual(pequeno['caminhoNumerico'], 'float64')
+        self.assertNotIn('erroEstimado', pequeno)
+
+        result = calculate_mms(99000, 1, 100000, r=100010, t=0.001, tolerancia=1e-5)
+        self.assertEqual(result['caminhoNumerico'], CAMINHO_ASSINTOTICO)
+        self.assertLess(result['erroEstimado'], 1e-5)
+        lote = calculate_mms_batch(99000, 1, 100000, t=0.001, tolerancia=1e-12)
+        self.assertFalse(lote['assintotico'])
+        for chave in ('Lq', 'Wq', 'PWqIgualZero', 'PWqMaiorQueT'):
+            self.assertAlmostEqual(result[chave] / float(lote[chave]), 1, delta=1e-5, msg=chave)
+        C = float(lote['C'])
+        self.assertAlmostEqual(result['PnMaiorQueR'] / (C * 0.99 ** 11), 1, delta=1e-5)
+
+        with self.assertRaises(ValueError):
+            calculate_mms(99000, 1, 100000, tolerancia=0)
+
+    def test_default_tolerance_uses_qed(self):
+        """Com a tolerância padrão (1e-6), s grande e ρ → 1 saem pela aproximação"""
+        result = calculate_mms(99_990, 1, 100_000)
+        self.assertEqual(result['caminhoNumerico'], CAMINHO_ASSINTOTICO)
+        exato = calculate_mms(99_990, 1, 100_000, tolerancia=1e-12)
+        self.assertEqual(exato['caminhoNumerico'], 'float64')
+        self.assertAlmostEqual(result['Wq'] / exato['Wq'], 1, delta=1e-6)
+
+        # s = 10⁷, ρ = 0.9: o arredondamento não cresce com s×δ
+        inicio = time.perf_counter()
+        self.assertEqual(calculate_mms(9e6, 1, 10**7)['caminhoNumerico'], CAMINHO_ASSINTOTICO)
+        self.assertLess(time.perf_counter() - inicio, 0.05)
+
+    def test_route_tolerance(self):
+        """A rota aceita a tolerância da aproximação assintótica"""
+        from app.main import app
+        resp = app.test_client().post('/api/calculate/mms',
+                                      json={'lambda': 99000, 'mu': 1, 's': 100000, 'tolerancia': 1e-5})
+        self.assertEqual(resp.status_code, 200)
+        corpo = resp.get_json()
+        self.assertEqual(corpo['caminhoNumerico'], CAMINHO_ASSINTOTICO)
+        self.assertLess(corpo['erroEstimado'], 1e-5)
+
+class TestMMsM(unittest.TestCase):
+    """Testes para o modelo M/M/s+M (Erlang A)"""
+
+    def _cadeia_truncada(self, lambda_, mu, s, theta, limite=500):
+        # Distribuição estacionária somando diretamente os estados (referência)
+        p = [1.0]
+        for n in range(1, limite):
+            p.append(p[-1] * lambda_ / (min(n, s) * mu + max(n - s, 0) * theta))
+        total = sum(p)
+        p = [v / total for v in p]
+        Lq = sum(max(n - s, 0) * v for n, v in enumerate(p))
+        return p, Lq
+
+    def test_mmsm_matches_state_sums(self):
+        """Métricas devem bater com a cadeia truncada (forma fechada e série)"""
+        for lambda_, s, theta in [(8, 10, 0.5), (12, 10, 0.5), (4, 5, 0.05), (2, 5, 0.2)]:
+            result = calculate_mmsm(lambda_, 1, s, theta)
+            p, Lq = self._cadeia_truncada(lambda_, 1, s, theta)
+            self.assertAlmostEqual(result['Lq'], Lq, places=8)
+            self.assertAlmostEqual(result['P0'], p[0], places=8)
+            self.assertAlmostEqual(result['PWqIgualZero'], sum(p[:s]), places=8)
+            self.assertAlmostEqual(result['PAbandono'], theta * Lq / lambda_, places=8)
+
+    def test_mmsm_overloaded_is_stable(self):
+        """λ ≥ s×μ é estável com abandono"""
+        result = calculate_mmsm(12, 1, 10, 0.5, t=0.3)
+        self.assertGreater(result['rho'], 1)
+        self.assertAlmostEqual(result['lambdaEfetivo'], 12 * (1 - result['PAbandono']), places=10)
+        self.assertGreater(result['PWqMaiorQueT'], 0)
+        self.assertLess(result['PWqMaiorQueT'], 1 - result['PWqIgualZero'])
+
+    def test_mmsm_small_theta_approaches_mms(self):
+        """Com θ → 0 o Erlang A tende ao M/M/s"""
+        mms = calculate_mms(8, 5, 2, t=0.2)
+        mmsm = calculate_mmsm(8, 5, 2, 1e-7, t=0.2)
+        self.assertAlmostEqual(mmsm['Lq'], mms['Lq'], places=4)
+        self.assertAlmostEqual(mmsm['PWqMaiorQueT'], mms['PWqMaiorQueT'], places=5)
+
+    def test_mmsm_thousands_of_servers(self):
+        """Deve funcionar para s na casa dos milhares"""
+        result = calculate_mmsm(5100, 1, 5000, 0.1, t=0.01)
+        self.assertGreater(result['PAbandono'], 0)
+        self.assertLess(result['PAbandono'], 1)
+        self.assertTrue(math.isfinite(result['Wq']))
+
+    def test_mmsm_light_load_many_servers(self):
+        """Carga leve com s grande: P0 = e^(-a) (sem underflow de π_s)"""
+        for s in (200, 300, 5000):
+            result = calculate_mmsm(2, 1, s, 1.0)
+            self.assertAlmostEqual(result['P0'], math.exp(-2), places=12)
+            self.assertAlmostEqual(result['PWqIgualZero'], 1.0, places=12)
+        lote = calculate_mmsm_batch(2, 1, [10, 300], 1.0)
+        self.assertAlmostEqual(lote['P0'][1], math.exp(-2), places=12)
+        self.assertAlmostEqual(lote['P0'][0], calculate_mmsm(2, 1, 10, 1.0)['P0'], places=12)
+
+        from app.main import app
+        resp = app.test_client().post('/api/calculate/mmsm', json={'lambda': 2, 'mu': 1, 's': 300, 'theta': 1})
+        self.assertAlmostEqual(resp.get_json()['P0'], math.exp(-2), places=12)
+
+    def test_mmsm_batch_matches_scalar(self):
+        """A versão vetorizada deve bater com a escalar"""
+        lambdas = [2, 8, 12, 30]
+        result = calculate_mmsm_batch(lambdas, 1, 10, 0.5, t=0.3)
+        for i, lambda_ in enumerate(lambdas):
+            esperado = calculate_mmsm(lambda_, 1, 10, 0.5, t=0.3)
+            for chave in ('L', 'Lq', 'Wq', 'PAbandono', 'PWqMaiorQueT'):
+                self.assertAlmostEqual(result[chave][i], esperado[chave], places=10)
+
+    def test_mmsm_invalid(self):
+        """θ deve ser positivo"""
+        with self.assertRaises(ValueError):
+            calculate_mmsm(8, 1, 10, 0)
+
+class TestBatchModels(unittest.TestCase):
+    """Testes para as versões vetorizadas dos demais modelos"""
+
+    def _comparar(self, result, esperado, i, chaves, places=8):
+        for chave in chaves:
+            self.assertAlmostEqual(result[chave][i], esperado[chave], places=places)
+
+    def test_mm1_and_mg1_batch(self):
+        """M/M/1 e M/G/1 vetorizados devem bater com os escalares"""
+        lambdas = [1, 2, 4]
+        mm1 = calculate_mm1_batch(lambdas, 5)
+        mg1 = calculate_mg1_batch(lambdas, 5, 0.01)
+        for i, lambda_ in enumerate(lambdas):
+            self._comparar(mm1, calculate_mm1(lambda_, 5), i, ('L', 'Lq', 'W', 'Wq', 'P0'))
+            self._comparar(mg1, calculate_mg1(lambda_, 5, 0.01), i, ('L', 'Lq', 'W', 'Wq', 'P0'))
+
+    def test_mmsk_and_mm1k_batch(self):
+        """M/M/s/K e M/M/1/K vetorizados devem bater com os escalares (inclusive ρ > 1)"""
+        lambdas = [1, 6, 9]
+        mmsk = calculate_mmsk_batch(lambdas, 2, 3, 10)
+        mm1k = calculate_mm1k_batch(lambdas, 2, 10)
+        chaves = ('P0', 'PK', 'L', 'Lq', 'W', 'Wq', 'lambdaEfetivo')
+        for i, lambda_ in enumerate(lambdas):
+            self._comparar(mmsk, calculate_mmsk(lambda_, 2, 3, 10), i, chaves)
+            self._comparar(mm1k, calculate_mm1k(lambda_, 2, 10), i, chaves)
+
+    def test_mmsk_batch_near_rho_one(self):
+        """Perto de ρ = 1 o resultado deve ser contínuo (sem cancelamento)"""
+        result = calculate_mmsk_batch([6 - 1e-7, 6, 6 + 1e-7], 2, 3, 10)
+        self.assertAlmostEqual(result['L'][0], result['L'][1], places=6)
+        self.assertAlmostEqual(result['L'][2], result['L'][1], places=6)
+
+    def test_mmsk_batch_large_capacity(self):
+        """K e s grandes não devem gerar overflow"""
+        result = calculate_mmsk_batch(900, 1, 500, 5000)
+        self.assertAlmostEqual(result['lambdaEfetivo'], 500, places=6)
+        self.assertTrue(math.isfinite(result['W']))
+
+    def test_finite_population_batch(self):
+        """M/M/1/N e M/M/s/N vetorizados devem bater com a soma direta dos estados"""
+        lambdas = [0.05, 0.2, 1.0]
+        mm1n = calculate_mm1n_batch(lambdas, 1, 10)
+        mmsn = calculate_mmsn_batch(lambdas, 1, 3, 10)
+        chaves = ('P0', 'L', 'Lq', 'W', 'Wq', 'lambdaEfetivo')
+        for i, lambda_ in enumerate(lambdas):
+            self._comparar(mm1n, mmsn_high_precision(lambda_, 1, 1, 10), i, chaves, places=10)
+            self._comparar(mmsn, mmsn_high_precision(lambda_, 1, 3, 10), i, chaves + ('PWqIgualZero',), places=10)
+
+    def test_batch_masks_invalid(self):
+        """Parâmetros inválidos devem virar NaN em vez de erro"""
+        result = calculate_mmsk_batch(3, 2, [3, 3.5, 3], [10, 10, 2])
+        self.assertEqual(result['estavel'].tolist(), [True, False, False])
+        self.assertTrue(math.isnan(result['W'][2]))
+
+class TestAdaptivePrecision(unittest.TestCase):
+    """Testes para a avaliação com precisão adaptativa (M/M/s/K e M/M/s/N)"""
+
+    def test_finite_population_course_examples(self):
+        """Exemplo 2 do PDF: 5 robôs, quebra a cada 30h, reparo de 3h"""
+        self.assertAlmostEqual(calculate_mm1n(1 / 30, 1 / 3, 5)['numOperacionais'], 4.360, places=3)
+        self.assertAlmostEqual(calculate_mmsn(1 / 30, 1 / 3, 2, 5)['numOperacionais'], 4.535, places=3)
+
+    def test_fast_path_near_rho_one(self):
+        """Perto de ρ = 1 o caminho float64 deve bastar e bater com a alta precisão"""
+        for lambda_ in (6 - 1e-9, 6 + 1e-6, 6.001):
+            result = calculate_mmsk(lambda_, 2, 3, 200)
+            self.assertEqual(result['caminhoNumerico'], 'float64')
+            exato = mmsk_high_precision(lambda_, 2, 3, 200)
+            for chave in ('P0', 'PK', 'L', 'Lq', 'W'):
+                self.assertAlmostEqual(result[chave] / exato[chave], 1, places=10)
+
+    def test_fallback_only_for_affected_cases(self):
+        """Só o cenário mal condicionado (pesos na casa de 10^(10^6)) vai para alta precisão"""
+        result = calculate_mmsk_batch([3, 1e300], 1, 2, 7000)
+        self.assertEqual(result['altaPrecisao'].tolist(), [False, True])
+        exato = mmsk_high_precision(1e300, 1, 2, 7000)
+        self.assertAlmostEqual(result['lambdaEfetivo'][1] / exato['lambdaEfetivo'], 1, places=12)
+        self.assertEqual(calculate_mmsk(1e300, 1, 2, 7000)['caminhoNumerico'], 'alta-precisao')
+
+    def test_blocking_near_one_stays_fast(self):
+        """PK ≈ 1: 1 - PK sai de Z(K-1)/Z(K), sem cancelamento nem alta precisão"""
+        result = calculate_mmsk(1e7, 1, 2, 10)
+        self.assertEqual(result['caminhoNumerico'], 'float64')
+        exato = mmsk_high_precision(1e7, 1, 2, 10)
+        for chave in ('PK', 'lambdaEfetivo', 'L', 'W'):
+            self.assertAlmostEqual(result[chave] / exato[chave], 1, places=12)
+
+    def test_huge_K_does_not_overflow(self):
+        """K = 10^6 com ρ enorme: sem decimal.Overflow e sem somar 10^6 estados"""
+        inicio = time.perf_counter()
+        result = calculate_mm1k(1e6, 1, 10**6)
+        self.assertLess(time.perf_counter() - inicio, 0.5)
+        self.assertEqual(result['caminhoNumerico'], 'float64-limitado')
+        self.assertAlmostEqual(result['PK'], 1 - 1e-6, places=9)
+        self.assertAlmostEqual(result['L'] / (10**6 - 1e-6), 1, places=8)
+
+        # A soma decimal aceita pesos muito além do expoente padrão (a^K ~ 10^300000)
+        exato = mmsk_high_precision(1e6, 1, 1, 50_000)
+        self.assertAlmostEqual(exato['PK'], 1 - 1e-6, places=9)
+
+    def test_fallback_work_is_bounded(self):
+        """Muitos cenários suspeitos grandes: o refino respeita o orçamento do lote"""
+        K = np.arange(90_000, 90_050)
+        inicio = time.perf_counter()
+        result = calculate_mmsk_batch(1e300, 1, 1, K)
+        self.assertLess(time.perf_counter() - inicio, 3.0)
+        refinados = int(result['altaPrecisao'].sum())
+        self.assertLessEqual(refinados * 90_050, 500_000)
+        self.assertTrue(result['precisaoLimitada'].any())
+        self.assertFalse(np.any(result['altaPrecisao'] & result['precisaoLimitada']))
+        self.assertTrue(np.all(np.isfinite(result['W'])))
+
+    def test_budget_shared_between_calls(self):
+        """Dentro de com_orcamento, chamadas sucessivas gastam do mesmo orçamento"""
+        orcamento = Orcamento(20_000)
+        with com_orcamento(orcamento):
+            primeiro = calculate_mmsk_batch(1e300, 1, 1, [7000] * 3)
+            segundo = calculate_mmsk_batch(1e300, 1, 1, [7000] * 3)
+        self.assertEqual(int(primeiro['altaPrecisao'].sum()), 2)
+        self.assertFalse(segundo['altaPrecisao'].any())
+        self.assertTrue(segundo['precisaoLimitada'].all())
+        self.assertEqual(orcamento.restante, 20_000 - 2 * 7001)
+        # Fora do bloco, cada chamada volta a ter o seu
+        self.assertTrue(calculate_mmsk_batch(1e300, 1, 1, [7000] * 3)['altaPrecisao'].all())
+
+    def test_large_population(self):
+        """N = 10^5 deve ser avaliado no caminho rápido, com precisão"""
+        result = calculate_mmsn(1e-3, 1, 50, 100_000)
+        self.assertEqual(result['caminhoNumerico'], 'float64')
+        exato = mmsn_high_precision(1e-3, 1, 50, 100_000)
+        for chave in ('L', 'Lq', 'W', 'numOperacionais'):
+            self.assertAlmostEqual(result[chave] / exato[chave], 1, places=10)
+
+    def test_light_load_queue(self):
+        """Com a fila quase sempre vazia Lq deve manter a precisão relativa"""
+        result = calculate_mmsn(1e-4, 1, 3, 50)
+        exato = mmsn_high_precision(1e-4, 1, 3, 50)
+        self.assertAlmostEqual(result['Lq'] / exato['Lq'], 1, places=10)
+
+    def test_state_probabilities_sum_to_one(self):
+        """P(n) vetorizado deve somar 1"""
+        n = np.arange(0, 41)
+        self.assertAlmostEqual(calculate_mmsn_batch(0.3, 1, 4, 40, n=n)['Pn'].sum(), 1, places=12)
+        self.assertAlmostEqual(calculate_mmsk_batch(9, 2, 4, 40, n=n)['Pn'].sum(), 1, places=12)
+
+class TestGGs(unittest.TestCase):
+    """Testes para as aproximações G/G/1 (Kingman) e G/G/s (Allen–Cunneen)"""
+
+    def test_gg1_poisson_arrivals_is_mg1(self):
+        """Com ca² = 1 o G/G/1 é exatamente o M/G/1"""
+        result = calculate_gg1(4, 5, 1, 0.5)
+        esperado = calculate_mg1(4, 5, 0.5 / 25)
+        for chave in ('rho', 'P0', 'Lq', 'Wq', 'L', 'W'):
+            self.assertAlmostEqual(result[chave], esperado[chave], places=12)
+
+    def test_gg1_kingman(self):
+        """Wq = ρ/(1-ρ) × (ca² + cs²)/2 × 1/μ; D/D/1 não tem fila"""
+        result = calculate_gg1(4, 5, 0.25, 2)
+        self.assertAlmostEqual(result['Wq'], 0.8 / 0.2 * 1.125 / 5, places=12)
+        self.assertAlmostEqual(result['Lq'], 4 * result['Wq'], places=12)
+        self.assertEqual(calculate_gg1(4, 5, 0, 0)['Lq'], 0)
+
+    def test_ggs_exponential_is_mms(self):
+        """Com ca² = cs² = 1 o G/G/s é o M/M/s"""
+        result = calculate_ggs(8, 5, 2, 1, 1)
+        esperado = calculate_mms(8, 5, 2)
+        for chave in ('L', 'Lq', 'W', 'Wq', 'PWqIgualZero'):
+            self.assertAlmostEqual(result[chave], esperado[chave], places=12)
+
+    def test_ggs_one_server_is_gg1(self):
+        """Com s = 1 o Allen–Cunneen coincide com o Kingman"""
+        for ca2, cs2 in ((0.3, 0.5), (2, 0), (1, 4)):
+            self.assertAlmostEqual(calculate_ggs(3, 4, 1, ca2, cs2)['Wq'], calculate_gg1(3, 4, ca2, cs2)['Wq'], places=12)
+
+    def test_ggs_scales_erlang_c(self):
+        """A espera é a do M/M/s multiplicada por (ca² + cs²)/2"""
+        result = calculate_ggs(90, 1, 100, 0.5, 1.5)
+        self.assertAlmostEqual(result['Wq'], calculate_mms(90, 1, 100)['Wq'], places=12)
+        self.assertAlmostEqual(result['Wq'] / calculate_ggs(90, 1, 100, 2, 2)['Wq'], 0.5, places=12)
+
+    def test_batch_matches_scalar(self):
+        """As versões vetorizadas batem com as escalares e mascaram cenários inválidos"""
+        lambdas = np.array([1, 3, 3.9, 5, 2])
+        ca2 = np.array([0.5, 1, 2, 1, -1])
+        g1 = calculate_gg1_batch(lambdas, 4, ca2, 0.7)
+        gs = calculate_ggs_batch(lambdas * 3, 4, 3, ca2, 0.7)
+        self.assertEqual(g1['estavel'].tolist(), [True, True, True, False, False])
+        self.assertEqual(gs['estavel'].tolist(), [True, True, True, False, False])
+        for i in range(3):
+            self.assertAlmostEqual(g1['W'][i], calculate_gg1(lambdas[i], 4, ca2[i], 0.7)['W'], places=12)
+            self.assertAlmostEqual(gs['W'][i], calculate_ggs(lambdas[i] * 3, 4, 3, ca2[i], 0.7)['W'], places=12)
+        self.assertTrue(np.isnan(gs['W'][3]))
+
+    def test_invalid(self):
+        """Instabilidade e coeficientes negativos geram ValueError"""
+        with self.assertRaises(ValueError):
+            calculate_gg1(5, 5, 1, 1)
+        with self.assertRaises(ValueError):
+            calculate_ggs(10, 5, 2, 1, 1)
+        with self.assertRaises(ValueError):
+            calculate_ggs(1, 5, 2, -0.1, 1)
+
+    def test_routes(self):
+        """As rotas usam ca² = cs² = 1 por padrão"""
+        from app.main import app
+        client = app.test_client()
+        resp = client.post('/api/calculate/gg1', json={'lambda': 4, 'mu': 5, 'ca2': 0.25, 'cs2': 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertAlmostEqual(resp.get_json()['Wq'], calculate_gg1(4, 5, 0.25, 2)['Wq'], places=12)
+        resp = client.post('/api/calculate/ggs', json={'lambda': 8, 'mu': 5, 's': 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertAlmostEqual(resp.get_json()['Wq'], calculate_mms(8, 5, 2)['Wq'], places=12)
+        resp = client.post('/api/calculate/ggs', json={'lambda': 8, 'mu': 5})
+        self.assertEqual(resp.status_code, 400)
+
+class TestDebugTracing(unittest.TestCase):
+    """Testes para o rastreamento das fases dos cálculos"""
+
+    def test_mmsn_phases(self):
+        """O M/M/s/N informa o tempo de cada fase, os termos e o caminho"""
+        result = com_debug(calculate_mmsn, 1 / 30, 1 / 3, 2, 5)
+        debug = result.pop('debug')
+        self.assertEqual(result, calculate_mmsn(1 / 30, 1 / 3, 2, 5))
+        for nome in ('normalizacao', 'Lq', 'L', 'estimativaErro'):
+            self.assertEqual(debug['fases'][nome]['chamadas'], 1)
+            self.assertGreaterEqual(debug['fases'][nome]['tempoMs'], 0)
+        self.assertGreater(debug['fases']['Lq']['termos'], 0)
+        self.assertEqual(debug['info']['caminho'], 'float64')
+        self.assertGreaterEqual(debug['tempoTotalMs'], sum(f['tempoMs'] for f in debug['fases'].values()))
+
+    def test_high_precision_terms(self):
+        """O refinamento em alta precisão conta os estados somados"""
+        debug = com_debug(calculate_mmsk, 1e300, 1, 2, 7000)['debug']
+        self.assertEqual(debug['info']['caminho'], 'alta-precisao')
+        self.assertEqual(debug['info']['cenariosAltaPrecisao'], 1)
+        self.assertEqual(debug['fases']['altaPrecisao']['termos'], 7001)
+
+    def test_mms_paths(self):
+        """O M/M/s informa as somas do caminho exato e o caminho assintótico"""
+        debug = com_debug(calculate_mms, 8, 5, 2, r=1)['debug']
+        self.assertEqual(debug['fases']['P0']['termos'], 3)
+        self.assertEqual(debug['fases']['PnMaiorQueR']['termos'], 2)
+        debug = com_debug(calculate_mms, 99000, 1, 100000, tolerancia=1e-5)['debug']
+        self.assertEqual(debug['info']['caminho'], CAMINHO_ASSINTOTICO)
+        self.assertIn('assintotico', debug['fases'])
+
+    def test_disabled_records_nothing(self):
+        """Sem rastrear() as fases são nulas e o resultado não muda"""
+        self.assertIs(fase('a'), fase('b'))
+        with fase('a'):
+            termos(10)
+        self.assertNotIn('debug', calculate_mmsn(1 / 30, 1 / 3, 2, 5))
+        with rastrear() as r:
+            with fase('externa'):
+                with fase('interna'):
+                    termos(3)
+                termos(2)
+            with fase('interna'):
+                termos(1)
+        self.assertEqual(r.fases['interna']['chamadas'], 2)
+        self.assertEqual(r.fases['interna']['termos'], 4)
+        self.assertEqual(r.fases['externa']['termos'], 2)
+
+    def test_route_debug(self):
+        """As rotas aceitam "debug": true ou ?debug=1, sem passar pelo cache"""
+        from app.main import app
+        client = app.test_client()
+        corpo = {'lambda': 1 / 30, 'mu': 1 / 3, 's': 2, 'N': 5}
+        self.assertNotIn('debug', client.post('/api/calculate/mmsn', json=corpo).get_json())
+        resp = client.post('/api/calculate/mmsn', json=dict(corpo, debug=True))
+        self.assertIn('Lq', resp.get_json()['debug']['fases'])
+        resp = client.post('/api/calculate/mmsk?debug=1', json={'lambda': 3, 'mu': 1, 's': 2, 'K': 10})
+        self.assertIn('normalizacao', resp.get_json()['debug']['fases'])
+
+class TestResultados(unittest.TestCase):
+    """Testes para os tipos de resultado (slots e métricas preguiçosas)"""
+
+    def test_mapping_interface(self):
+        """O resultado se comporta como o dict de antes"""
+        result = calculate_mm1(3, 5, n=2, t=1)
+        self.assertIsInstance(result, Resultado)
+        self.assertFalse(hasattr(result, '__dict__'))
+        self.assertEqual(list(result), ['rho', 'L', 'Lq', 'W', 'Wq', 'P0', 'Pn', 'n', 'PWMaiorQueT', 'PWqMaiorQueT', 't'])
+        self.assertEqual(len(result), 11)
+        self.assertEqual(result, result.to_dict())
+        self.assertEqual(dict(result), result.to_dict())
+        self.assertEqual(result['Pn'], result.Pn)
+        self.assertNotIn('PnMaiorQueR', result)
+        self.assertIsNone(result.get('r'))
+        with self.assertRaises(KeyError):
+            result['PnMaiorQueR']
+        with self.assertRaises(AttributeError):
+            result.inexistente
+
+    def test_optional_metrics_are_lazy(self):
+        """As métricas opcionais só são calculadas no primeiro acesso"""
+        result = calculate_mms(3, 1, 5, r=2)
+        with rastrear() as r:
+            result['L']
+        self.assertNotIn('PnMaiorQueR', r.fases)
+        with rastrear() as r:
+            valor = result['PnMaiorQueR']
+            self.assertEqual(result['PnMaiorQueR'], valor)
+        self.assertEqual(r.fases['PnMaiorQueR']['chamadas'], 1)
+
+        # Nos modelos finitos, P(n) não passa pelo lote
+        with rastrear() as r:
+            result = calculate_mmsk(3, 1, 2, 10, n=4)
+        self.assertNotIn('Pn', r.fases)
+        self.assertAlmostEqual(result['Pn'], float(calculate_mmsk_batch(3, 1, 2, 10, 4)['Pn']), places=14)
+
+    def test_lazy_pn_matches_batch(self):
+        """P(n) a partir de P0 coincide com o do lote, inclusive com P0 em underflow"""
+        casos = [
+            (calculate_mmsk, calculate_mmsk_batch, (1e7, 1, 2, 10), 10),
+            (calculate_mm1k, calculate_mm1k_batch, (1e7, 1, 60), 59),
+            (calculate_mmsn, calculate_mmsn_batch, (50, 1, 3, 200), 150),
+            (calculate_mm1n, calculate_mm1n_batch, (0.3, 1, 60), 3),
+        ]
+        for func, lote, args, n in casos:
+            esperado = float(lote(*args, n)['Pn'])
+            self.assertLess(abs(func(*args, n=n)['Pn'] - esperado), 1e-12 * esperado)
+        self.assertEqual(calculate_mm1k(1e7, 1, 60).P0, 0.0)
+        self.assertAlmostEqual(calculate_mm1k(1e7, 1, 60, n=60)['Pn'], 0.9999999, places=12)
+
+    def test_mms_state_probabilities(self):
+        """P(n) e P(n>r) do M/M/s batem com a soma dos estados"""
+        result = calculate_mms(9.5, 1, 10)
+        probs = [calculate_mms(9.5, 1, 10, n=k)['Pn'] for k in range(400)]
+        self.assertAlmostEqual(result['PWqIgualZero'], sum(probs[:10]), places=12)
+        for r in (3, 10, 25):
+            self.assertAlmostEqual(calculate_mms(9.5, 1, 10, r=r)['PnMaiorQueR'], 1 - sum(probs[:r + 1]), places=10)
+
+    def test_serialization(self):
+        """JSON e pickle sem disparar os cálculos pendentes"""
+        import json
+        import pickle
+        result = calculate_mms(3, 1, 5, n=7, t=0.5)
+        copia = pickle.loads(pickle.dumps(result))
+        self.assertEqual(copia, result)
+        self.assertEqual(json.loads(json.dumps(result, default=para_json)), result.to_dict())
+        with self.assertRaises(TypeError):
+            json.dumps(object(), default=para_json)
+
+    def test_route_json_shape(self):
+        """As rotas devolvem as mesmas chaves de antes"""
+        from app.main import app
+        client = app.test_client()
+        corpo = client.post('/api/calculate/mm1', json={'lambda': 3, 'mu': 5, 'n': 2, 'r': 3, 't': 1}).get_json()
+        self.assertEqual(set(corpo), {'rho', 'L', 'Lq', 'W', 'Wq', 'P0', 'Pn', 'n', 'PnMaiorQueR', 'r',
+                                      'PWMaiorQueT', 'PWqMaiorQueT', 't'})
+        self.assertAlmostEqual(corpo['Pn'], 0.144, places=10)
+        corpo = client.post('/api/calculate/mmsk', json={'lambda': 3, 'mu': 1, 's': 2, 'K': 10, 'n': 4}).get_json()
+        self.assertIn('Pn', corpo)
+        self.assertEqual(corpo['caminhoNumerico'], 'float64')
+
+class TestPrioritySem(unittest.TestCase):
+    """Testes para o M/M/s com prioridade sem interrupção"""
+
+    def _termo_A_fatorial(self, s, mu, lambda_total):
+        # Fórmula original do PDF, com fatoriais (referência para s pequeno)
+        r = lambda_total / mu
+        somatorio = sum(r ** j / math.factorial(j) for j in range(s))
+        return math.factorial(s) * (s * mu - lambda_total) / r ** s * somatorio + s * mu
+
+    def test_termo_A_matches_factorial_formula(self):
+        """O termo A via Erlang C deve bater com a fórmula com fatoriais"""
+        for s, mu, lambdas in [(1, 3, [1, 1]), (3, 1, [0.5, 0.7, 1.2]), (10, 2, [5, 5, 5])]:
+            result = calculate_priority_sem(s, mu, lambdas)
+            self.assertAlmostEqual(result['termoA'] / self._termo_A_fatorial(s, mu, sum(lambdas)), 1, places=12)
+
+    def test_highest_priority_waits_least(self):
+        """Wq deve crescer da classe mais prioritária para a menos prioritária"""
+        result = calculate_priority_sem(3, 1, [0.5, 0.7, 1.2])
+        Wq = [c['Wq'] for c in result['classes']]
+        self.assertEqual(Wq, sorted(Wq))
+        self.assertAlmostEqual(result['classes'][0]['L'], 0.5 * result['classes'][0]['W'], places=12)
+
+    def test_large_number_of_servers(self):
+        """s = 10^4 não deve estourar"""
+        result = calculate_priority_sem(10_000, 1, [4000, 3000, 2900])
+        self.assertTrue(math.isfinite(result['termoA']))
+        self.assertGreater(result['classes'][2]['Wq'], 0)
+
+    def test_termo_A_beyond_float_range(self):
+        """Com C(s, r) em underflow, termoA vem null e a resposta é JSON válido"""
+        import json
+        result = calculate_priority_sem(10_000, 1, [10, 20])
+        self.assertIsNone(result['termoA'])
+        self.assertTrue(math.isfinite(result['logTermoA']))
+        self.assertGreater(result['logTermoA'], math.log(1e308))
+        for classe in result['classes']:
+            self.assertEqual(classe['Wq'], 0.0)
+            self.assertAlmostEqual(classe['W'], 1.0, places=12)
+
+        from app.main import app
+        resp = app.test_client().post('/api/calculate/priority-sem',
+                                      json={'s': 10_000, 'mu': 1, 'lambdas': [10, 20]})
+        self.assertEqual(resp.status_code, 200)
+        corpo = json.loads(resp.get_data(as_text=True), parse_constant=self.fail)
+        self.assertIsNone(corpo['termoA'])
+        self.assertAlmostEqual(corpo['logTermoA'], result['logTermoA'], places=9)
+
+    def test_log_termo_A_matches_termo_A(self):
+        """logTermoA = log(termoA) quando termoA é representável"""
+        result = calculate_priority_sem(3, 1, [0.5, 0.7, 1.2])
+        self.assertAlmostEqual(result['logTermoA'], math.log(result['termoA']), places=12)
+
+    def test_batch_over_staffing_options(self):
+        """Vários valores de s de uma vez, inclusive instáveis"""
+        s = np.arange(1, 10_001)
+        result = calculate_priority_sem_batch(s, 1, [3000, 2000, 1000])
+        self.assertEqual(result['W'].shape, (10_000, 3))
+        self.assertFalse(result['estavel'][5999])
+        self.assertTrue(np.isnan(result['W'][5999]).all())
+        esperado = calculate_priority_sem(6500, 1, [3000, 2000, 1000])
+        self.assertAlmostEqual(result['Wq'][6499, 2], esperado['classes'][2]['Wq'], places=12)
+
+    def test_batch_scenarios_by_row(self):
+        """Cada linha de lambdas é um cenário"""
+        lambdas = [[0.5, 0.7, 1.2], [1.0, 0.2, 0.1]]
+        result = calculate_priority_sem_batch([3, 2], 1, lambdas)
+        for i, (s, l) in enumerate(zip([3, 2], lambdas)):
+            esperado = calculate_priority_sem(s, 1, l)
+            self.assertAlmostEqual(result['termoA'][i], esperado['termoA'], places=12)
+
+    def test_unstable(self):
+        """ρ ≥ 1 deve gerar ValueError"""
+        with self.assertRaises(ValueError):
+            calculate_priority_sem(2, 1, [1, 1.5])
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
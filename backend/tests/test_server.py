@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+import math
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.numeric import log_factorial, log_factorial_table
+from app.server import build_options, default_workers, preload
+
+class TestNumericTables(unittest.TestCase):
+    """Testes para as tabelas numéricas compartilhadas"""
+
+    def test_log_factorial(self):
+        """log(n!) deve bater com math.lgamma"""
+        for n in (0, 1, 5, 170, 5000):
+            self.assertAlmostEqual(float(log_factorial(n)), math.lgamma(n + 1), places=6)
+
+    def test_table_grows_on_demand(self):
+        """A tabela cresce quando necessário e é somente leitura"""
+        tabela = log_factorial_table(3000)
+        self.assertGreaterEqual(tabela.size, 3001)
+        self.assertFalse(tabela.flags.writeable)
+
+class TestProductionServer(unittest.TestCase):
+    """Testes para a configuração do servidor de produção"""
+
+    def test_options(self):
+        """Workers por núcleo, preload e timeouts configuráveis"""
+        opcoes = build_options(port=8080, timeout=300)
+        self.assertEqual(opcoes['bind'], '0.0.0.0:8080')
+        self.assertEqual(opcoes['workers'], default_workers())
+        self.assertTrue(opcoes['preload_app'])
+        self.assertEqual(opcoes['timeout'], 300)
+
+    def test_optional_preload(self):
+        """Sem preload, cada worker importa o app (HUP recarrega o código)"""
+        from app.server import ProductionServer
+        self.assertFalse(build_options(preload=False)['preload_app'])
+        servidor = ProductionServer.__new__(ProductionServer)
+        servidor.application = None
+        from app.main import app
+        self.assertIs(servidor.load(), app)
+
+    def test_models_use_shared_table(self):
+        """Os modelos vetorizados consomem a tabela (inclusive com s em float)"""
+        import numpy as np
+        valores = log_factorial(np.array([0.0, 3.0, 2.5, 5000.0]))
+        self.assertAlmostEqual(valores[1], math.log(6), places=12)
+        self.assertAlmostEqual(valores[2], math.lgamma(3.5), places=12)
+        self.assertAlmostEqual(valores[3], math.lgamma(5001), places=6)
+
+    def test_preload(self):
+        """O preload deve montar a tabela de log-fatoriais antes do fork"""
+        preload()
+        self.assertGreaterEqual(log_factorial_table(0).size, 1_000_001)
+
+class TestAppFactory(unittest.TestCase):
+    """Testes para a fábrica do app e os blueprints carregados sob demanda"""
+
+    def test_blueprints_load_on_first_access(self):
+        """Cada blueprint só é importado no primeiro acesso ao seu prefixo"""
+        from app.main import create_app
+        app = create_app()
+        rotas = app.extensions['blueprints_preguicosos']
+        client = app.test_client()
+        self.assertEqual(client.get('/api/health').status_code, 200)
+        self.assertEqual(rotas.carregados(), [])
+        resposta = client.post('/api/calculate/mm1', json={'lambda': 3, 'mu': 5})
+        self.assertEqual(resposta.status_code, 200)
+        self.assertAlmostEqual(resposta.get_json()['L'], 1.5)
+        self.assertEqual(rotas.carregados(), ['app.routes.queue_routes'])
+        self.assertEqual(client.get('/api/inexistente').status_code, 404)
+
+    def test_eager_load(self):
+        """Sem preguiça (ou com load_blueprints) todos os blueprints ficam carregados"""
+        from app.main import BLUEPRINTS, create_app
+        app = create_app(preguicoso=False)
+        modulos = sorted({modulo for modulo, _ in BLUEPRINTS.values()})
+        self.assertEqual(app.extensions['blueprints_preguicosos'].carregados(), modulos)
+
+    def test_health_without_heavy_imports(self):
+        """Um processo novo responde /api/health sem importar NumPy nem SciPy"""
+        from bench_startup import medir_uma_vez
+        medicao = medir_uma_vez()
+        self.assertEqual(medicao['status'], 200)
+        self.assertEqual(medicao['pesados'], [])
+
+    def test_first_mm1_without_scipy(self):
+        """O primeiro M/M/1 de um processo novo não importa o scipy.special (só quem o usa)"""
+        import subprocess
+        codigo = (
+            "import sys\n"
+            "from app.main import create_app\n"
+            "r = create_app().test_client().post('/api/calculate/mm1', json={'lambda': 3, 'mu': 5})\n"
+            "assert r.status_code == 200, r.status_code\n"
+            "print('scipy.special' in sys.modules)\n"
+        )
+        diretorio = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        saida = subprocess.run([sys.executable, '-c', codigo], cwd=diretorio,
+                               capture_output=True, text=True, check=True).stdout
+        self.assertEqual(saida.strip().splitlines()[-1], 'False')
+
+if __name__ == '__main__':
+    unittest.main()
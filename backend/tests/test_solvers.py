@@ -0,0 +1,395 @@
+import unittest
+import sys
+import os
+import time
+
+import numpy as np
+from unittest import mock
+
+# Adicionar o diretório raiz do projeto ao sys.path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.models.mms import calculate_mms
+from app.models.mm1k import calculate_mm1k
+from app.models.mmsk import calculate_mmsk
+from app.models.mm1n import calculate_mm1n
+from app.models.mmsn import calculate_mmsn
+from app.models.numeric import BLOCO_TERMOS
+from app.solvers.buffer import optimal_buffer
+from app.solvers.capacity import max_arrival_rate
+from app.solvers.repair import max_fleet, min_repair_crew
+from app.solvers import staffing
+from app.solvers.staffing import plan_staffing, offered_load
+from app.routes.sse import ler_eventos
+
+class TestStaffing(unittest.TestCase):
+    """Testes para o dimensionamento por intervalo"""
+
+    def setUp(self):
+        # 7 dias em intervalos de 15 minutos (tempo em horas)
+        horas = np.arange(7 * 96) * 0.25
+        self.lambdas = 200 + 150 * np.sin(2 * np.pi * horas / 24)
+
+    def test_psa_is_minimal(self):
+        """s de cada intervalo deve ser o menor que atende P(Wq>t) ≤ α"""
+        lambdas = self.lambdas[:20] / 4
+        plano = plan_staffing(lambdas, 2.0, alvo=0.2, t=1 / 6, duracao_intervalo=0.25)
+        for lambda_, s in zip(lambdas, plano['servidores']):
+            self.assertLessEqual(calculate_mms(lambda_, 2.0, s, t=1 / 6)['PWqMaiorQueT'], 0.2)
+            if lambda_ < 2.0 * (s - 1):
+                self.assertGreater(calculate_mms(lambda_, 2.0, s - 1, t=1 / 6)['PWqMaiorQueT'], 0.2)
+
+    def test_wq_sla(self):
+        """SLA de Wq deve ser respeitado em todos os intervalos"""
+        plano = plan_staffing([0, 4, 8], 5.0, sla='Wq', alvo=0.05)
+        self.assertEqual(plano['servidores'][0], 0)
+        self.assertTrue(all(wq <= 0.05 for wq in plano['Wq']))
+
+    def test_week_plan_is_fast(self):
+        """Plano de 7 dias em intervalos de 15 minutos em bem menos de 1 segundo"""
+        inicio = time.perf_counter()
+        for metodo in ('psa', 'lag', 'mol'):
+            plano = plan_staffing(self.lambdas, 2.0, alvo=0.2, t=1 / 6, metodo=metodo, duracao_intervalo=0.25)
+            self.assertEqual(len(plano['servidores']), 672)
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+
+    def test_mol_constant_curve(self):
+        """Com λ constante, o offered load modificado é igual ao PSA"""
+        carga = offered_load([10.0] * 8, 2.0, metodo='mol', duracao_intervalo=0.5)
+        np.testing.assert_allclose(carga, 5.0)
+
+    def test_lag_shifts_curve(self):
+        """O método 'lag' atrasa a curva em 1/μ"""
+        carga = offered_load([0, 0, 10, 0], 1.0, metodo='lag', duracao_intervalo=1.0)
+        self.assertEqual(int(np.argmax(carga)), 3)
+
+    def test_erlang_a_staffing(self):
+        """Com abandono, o plano respeita P(abandono) e pode ter s < λ/μ"""
+        plano = plan_staffing([50, 100], 1.0, sla='PAbandono', alvo=0.3, theta=1.0)
+        self.assertTrue(all(p <= 0.3 for p in plano['PAbandono']))
+        self.assertLess(plano['servidores'][1], 100)
+
+    def test_invalid_method(self):
+        """Método desconhecido deve dar erro"""
+        with self.assertRaises(ValueError):
+            plan_staffing([1, 2], 1.0, alvo=0.2, t=1, metodo='xyz')
+
+    def test_staffing_route(self):
+        """Endpoint /api/solve/staffing"""
+        from app.main import app
+        resp = app.test_client().post('/api/solve/staffing', json={
+            'lambdas': [10, 20, 30], 'mu': 2, 'alvo': 0.2, 't': 0.1, 'metodo': 'mol',
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()['servidores']), 3)
+
+class TestStaffingRoute(unittest.TestCase):
+    """Testes de validação do endpoint /api/solve/staffing"""
+
+    def setUp(self):
+        from app.main import app
+        self.client = app.test_client()
+        self.corpo = {'lambdas': [40, 0, 0, 0], 'mu': 1, 'alvo': 0.2, 't': 0.1, 'metodo': 'lag'}
+
+    def test_periodico_string(self):
+        """"false" deve ser tratado como falso, igual a false"""
+        com_string = self.client.post('/api/solve/staffing', json={**self.corpo, 'periodico': 'false'})
+        com_bool = self.client.post('/api/solve/staffing', json={**self.corpo, 'periodico': False})
+        periodico = self.client.post('/api/solve/staffing', json={**self.corpo, 'periodico': True})
+        self.assertEqual(com_string.get_json()['cargaOferecida'], com_bool.get_json()['cargaOferecida'])
+        self.assertNotEqual(com_bool.get_json()['cargaOferecida'], periodico.get_json()['cargaOferecida'])
+        resp = self.client.post('/api/solve/staffing', json={**self.corpo, 'periodico': 'talvez'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_zero_duration_rejected(self):
+        """duracaoIntervalo = 0 deve ser rejeitada, não trocada por 1"""
+        resp = self.client.post('/api/solve/staffing', json={**self.corpo, 'duracaoIntervalo': 0})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_stream(self):
+        """Em SSE: o melhor plano a cada passo e o mesmo resultado da rota normal"""
+        corpo = {'lambdas': [10, 50, 100], 'mu': 1, 'alvo': 0.2, 't': 0.1}
+        resp = self.client.post('/api/solve/staffing/stream', json=corpo)
+        self.assertEqual(resp.status_code, 200)
+        eventos = ler_eventos(resp.get_data(as_text=True))
+        self.assertEqual(eventos[0], ('inicio', {'intervalos': 3, 'cargaOferecida': [10.0, 50.0, 100.0]}))
+        self.assertEqual(eventos[-1], ('resultado', self.client.post('/api/solve/staffing', json=corpo).get_json()))
+        final = eventos[-1][1]['servidores']
+        progresso = [d for e, d in eventos if e == 'progresso']
+        self.assertGreater(len(progresso), 1)
+        for antes, depois in zip(progresso, progresso[1:]):
+            # O melhor plano só melhora e sempre atende ao SLA
+            self.assertTrue(all(b <= a for a, b in zip(antes['servidores'], depois['servidores'])))
+        for d in progresso:
+            self.assertTrue(all(lo < s_final <= s for lo, s_final, s in
+                                zip(d['limiteInferior'], final, d['servidores'])))
+
+        resp = self.client.post('/api/solve/staffing/stream', json={**corpo, 'sla': 'xyz'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_stream_disconnect(self):
+        """Cliente desconectado: a busca para no evento seguinte"""
+        corpo = {'lambdas': [10, 5_000, 100_000], 'mu': 1, 'alvo': 0.2, 't': 0.1}
+        with mock.patch.object(staffing, '_meets_sla', wraps=staffing._meets_sla) as avaliacoes:
+            plan_staffing(corpo['lambdas'], 1, alvo=0.2, t=0.1)
+            completo = avaliacoes.call_count
+            avaliacoes.reset_mock()
+
+            resp = self.client.post('/api/solve/staffing/stream', json=corpo, buffered=False)
+            partes = iter(resp.response)
+            self.assertIn('event: inicio', next(partes).decode())
+            self.assertIn('event: progresso', next(partes).decode())
+            resp.close()
+            antes = avaliacoes.call_count
+            self.assertEqual(list(partes), [])
+        self.assertEqual(avaliacoes.call_count, antes)
+        self.assertLess(antes, completo // 2)
+
+class TestMaxArrivalRate(unittest.TestCase):
+    """Testes para o maior λ sustentável"""
+
+    def test_mms_meets_sla_exactly(self):
+        """Em λmax, P(Wq > t) do M/M/s deve ser igual ao alvo"""
+        r = max_arrival_rate('mms', 2.0, s=10, alvo=0.2, t=0.1)
+        self.assertAlmostEqual(calculate_mms(r['lambdaMax'], 2.0, 10, t=0.1)['PWqMaiorQueT'], 0.2, places=10)
+        self.assertGreater(calculate_mms(r['lambdaMax'] * 1.001, 2.0, 10, t=0.1)['PWqMaiorQueT'], 0.2)
+
+    def test_mm1_closed_form(self):
+        """M/M/1 com t = 0: P(Wq > 0) = ρ, então λmax = α×μ"""
+        r = max_arrival_rate('mm1', 4.0, alvo=0.3, t=0)
+        self.assertAlmostEqual(r['lambdaMax'], 1.2, places=10)
+
+    def test_mmsk_blocking(self):
+        """Em λmax, P(K) do M/M/s/K deve ser igual ao alvo (inclusive com ρ > 1)"""
+        r = max_arrival_rate('mmsk', 1.0, s=3, K=6, alvo=0.05)
+        self.assertAlmostEqual(calculate_mmsk(r['lambdaMax'], 1.0, 3, 6)['PK'], 0.05, places=10)
+        r = max_arrival_rate('mm1k', 1.0, K=5, alvo=0.5)
+        self.assertGreater(r['rho'], 1)
+        self.assertAlmostEqual(calculate_mm1k(r['lambdaMax'], 1.0, 5)['PK'], 0.5, places=10)
+
+    def test_vectorized_matches_scalar(self):
+        """Modo vetorizado: cada cenário igual à solução escalar"""
+        r = max_arrival_rate('mms', 2.0, s=[[5], [10], [20]], alvo=[0.05, 0.2], t=[0.1, 0.3])
+        for i, s in enumerate([5, 10, 20]):
+            for j, (alvo, t) in enumerate([(0.05, 0.1), (0.2, 0.3)]):
+                lambda_max = r['lambdaMax'][i][j]
+                self.assertAlmostEqual(lambda_max, max_arrival_rate('mms', 2.0, s=s, alvo=alvo, t=t)['lambdaMax'], places=9)
+                self.assertAlmostEqual(calculate_mms(lambda_max, 2.0, s, t=t)['PWqMaiorQueT'], alvo, places=10)
+
+        r = max_arrival_rate('mmsk', 1.0, s=[2, 3, 4], K=10, alvo=0.01)
+        for s, lambda_max in zip([2, 3, 4], r['lambdaMax']):
+            self.assertAlmostEqual(calculate_mmsk(lambda_max, 1.0, s, 10)['PK'], 0.01, places=10)
+
+    def test_metric_is_evaluated_at_lambda_max(self):
+        """A métrica devolvida é a do λmax devolvido (não a da iteração anterior ao último passo)"""
+        from app.models.batch import calculate_mmsk_batch
+        K = np.array([3, 10, 50, 200])
+        r = max_arrival_rate('mmsk', 1.0, s=2, K=K, alvo=0.05)
+        np.testing.assert_array_equal(r['PK'], calculate_mmsk_batch(np.array(r['lambdaMax']), 1.0, 2, K)['PK'])
+
+    def test_vectorized_large_s(self):
+        """s de 1 a 10^4 com 3 alvos de uma vez"""
+        s = np.arange(1, 10_001)[:, None]
+        alvos = np.array([0.01, 0.1, 0.3])
+        inicio = time.perf_counter()
+        r = max_arrival_rate('mms', 1.0, s=s, alvo=alvos, t=0.5)
+        self.assertLess(time.perf_counter() - inicio, 2.0)
+        np.testing.assert_allclose(r['PWqMaiorQueT'], np.broadcast_to(alvos, (10_000, 3)), rtol=1e-9)
+        self.assertTrue(np.all(np.diff(np.array(r['lambdaMax']), axis=0) > 0))
+
+    def test_invalid_parameters(self):
+        """Modelo sem K, alvo fora de (0, 1) ou modelo desconhecido"""
+        with self.assertRaises(ValueError):
+            max_arrival_rate('mmsk', 1.0, s=2, alvo=0.1)
+        with self.assertRaises(ValueError):
+            max_arrival_rate('mms', 1.0, s=2, alvo=1.5, t=1)
+        with self.assertRaises(ValueError):
+            max_arrival_rate('mg1', 1.0, alvo=0.1)
+
+    def test_max_lambda_route(self):
+        """Endpoint /api/solve/max-lambda (modo vetorizado)"""
+        from app.main import app
+        resp = app.test_client().post('/api/solve/max-lambda', json={
+            'modelo': 'mms', 'mu': 2, 's': [5, 10, 20], 'alvo': 0.2, 't': 0.1,
+        })
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.get_json()['lambdaMax']), 3)
+        resp = app.test_client().post('/api/solve/max-lambda', json={'modelo': 'mmsk', 'mu': 2, 'alvo': 0.2})
+        self.assertEqual(resp.status_code, 400)
+
+class TestOptimalBuffer(unittest.TestCase):
+    """Testes para o tamanho ótimo do buffer (K)"""
+
+    def menor_K(self, lambda_, mu, s, alvo):
+        # Referência: K = s, s+1, ... recalculando o modelo inteiro
+        K = s
+        while True:
+            r = calculate_mmsk(lambda_, mu, s, K) if s > 1 else calculate_mm1k(lambda_, mu, K)
+            if r['PK'] <= alvo:
+                return K, r
+            K += 1
+
+    def test_matches_linear_search(self):
+        """Menor K com P(K) ≤ α igual ao da busca recalculando o modelo"""
+        for lambda_, mu, s, alvo in [(9.5, 1, 10, 1e-3), (2, 3, 1, 0.01), (12, 1, 10, 0.2),
+                                     (5, 1, 10, 1e-8), (700, 1, 1000, 1e-5)]:
+            modelo = 'mmsk' if s > 1 else 'mm1k'
+            result = optimal_buffer(modelo, lambda_, mu, s, alvo=alvo)
+            K, r = self.menor_K(lambda_, mu, s, alvo)
+            self.assertEqual(result['K'], K)
+            # passos: valores de K avaliados, em blocos inteiros
+            self.assertGreaterEqual(result['passos'], K - s + 1)
+            for chave in ('PK', 'L', 'Lq', 'W', 'Wq', 'lambdaEfetivo'):
+                self.assertLessEqual(abs(result[chave] - r[chave]), 1e-10 * abs(r[chave]), msg=chave)
+
+    def test_millions(self):
+        """ρ = 1: P(K) = 1/(K+1) no M/M/1/K, então α = 10^-7 exige K ≈ 10^7"""
+        inicio = time.perf_counter()
+        result = optimal_buffer('mm1k', 1.0, 1.0, alvo=1e-7)
+        self.assertLess(time.perf_counter() - inicio, 2.0)
+        self.assertEqual(result['K'], 10**7 - 1)
+        self.assertEqual(result['passos'] % BLOCO_TERMOS, 0)
+        self.assertAlmostEqual(result['L'], (10**7 - 1) / 2, delta=1e-3)
+        # ρ > 1 com K grande: as somas são reescaladas sem estourar
+        result = optimal_buffer('mmsk', 12.0, 1.0, 10, alvo=0.1667)
+        self.assertAlmostEqual(result['PK'], calculate_mmsk(12.0, 1.0, 10, result['K'])['PK'], places=12)
+
+    def test_cost(self):
+        """K de menor custo igual ao da busca exaustiva"""
+        for lambda_, ce, cp in [(9, 1, 50), (30, 0.01, 5), (5, 1, 0)]:
+            result = optimal_buffer('mmsk', lambda_, 1.0, 10, objetivo='custo', custo_espera=ce, custo_perda=cp)
+
+            def custo(K):
+                r = calculate_mmsk(lambda_, 1.0, 10, K)
+                return ce * r['L'] + cp * lambda_ * r['PK']
+
+            melhor = min(range(10, 500), key=custo)
+            self.assertEqual(result['K'], melhor)
+            self.assertAlmostEqual(result['custo'], custo(melhor), places=9)
+            self.assertFalse(result['limiteAtingido'])
+        com_posicao = optimal_buffer('mmsk', 9, 1.0, 10, objetivo='custo', custo_espera=1, custo_perda=50,
+                                     custo_posicao=0.5)
+        self.assertLess(com_posicao['K'], optimal_buffer('mmsk', 9, 1.0, 10, objetivo='custo', custo_espera=1,
+                                                         custo_perda=50)['K'])
+
+    def test_invalid(self):
+        """Alvo inalcançável (ρ > 1), parâmetros e custos inválidos"""
+        casos = [
+            dict(modelo='mm1k', lambda_=3, mu=2, alvo=0.3),       # P(K) → 1/3
+            dict(modelo='mmsk', lambda_=9, mu=1, s=1, alvo=0.1),
+            dict(modelo='mmsk', lambda_=9, mu=1, s=10, alvo=1e-30, K_max=50),
+            dict(modelo='mmsk', lambda_=9, mu=1, s=10, objetivo='custo', custo_perda=1),
+            dict(modelo='mmsk', lambda_=9, mu=1, s=10, objetivo='x'),
+            dict(modelo='mm1', lambda_=9, mu=1, alvo=0.1),
+        ]
+        for kwargs in casos:
+            with self.assertRaises(ValueError, msg=kwargs):
+                optimal_buffer(**kwargs)
+
+    def test_route(self):
+        """Endpoint /api/solve/buffer"""
+        from app.main import app
+        client = app.test_client()
+        resp = client.post('/api/solve/buffer', json={'modelo': 'mmsk', 'lambda': 9.5, 'mu': 1, 's': 10, 'alvo': 1e-3})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['K'], 83)
+        resp = client.post('/api/solve/buffer', json={'modelo': 'mmsk', 'lambda': 9, 'mu': 1, 's': 10,
+                                                      'objetivo': 'custo', 'custoEspera': 1, 'custoPerda': 50})
+        self.assertEqual(resp.get_json()['K'], 65)
+        resp = client.post('/api/solve/buffer', json={'modelo': 'mm1k', 'lambda': 2, 'mu': 1, 'alvo': 0.1})
+        self.assertEqual(resp.status_code, 400)
+
+class TestRepairCrew(unittest.TestCase):
+    """Testes para o dimensionamento da equipe de reparo (M/M/s/N)"""
+
+    def modelo(self, lambda_, mu, s, N):
+        return calculate_mm1n(lambda_, mu, N) if s == 1 else calculate_mmsn(lambda_, mu, s, N)
+
+    def test_min_crew_matches_linear_search(self):
+        """Menor s igual ao da busca recalculando o modelo, para os dois SLAs"""
+        for sla, alvo in [('disponibilidade', 0.85), ('disponibilidade', 0.9), ('Wq', 0.05)]:
+            result = min_repair_crew(0.1, 1.0, 50, sla=sla, alvo=alvo)
+            s = 1
+            while True:
+                r = self.modelo(0.1, 1.0, s, 50)
+                if (r['numOperacionais'] / 50 >= alvo) if sla == 'disponibilidade' else (r['Wq'] <= alvo):
+                    break
+                s += 1
+            self.assertEqual(result['s'], s)
+            self.assertAlmostEqual(result['Wq'], r['Wq'], places=9)
+            self.assertEqual(result['curva']['s'], list(range(1, s + 1)))
+            self.assertAlmostEqual(result['curva']['disponibilidade'][0],
+                                   calculate_mm1n(0.1, 1.0, 50)['numOperacionais'] / 50, places=12)
+
+    def test_max_fleet_matches_linear_search(self):
+        """Maior N: atende ao SLA e N + 1 não; a curva termina no primeiro N que falha"""
+        for s, sla, alvo in [(5, 'disponibilidade', 0.85), (1, 'disponibilidade', 0.8), (5, 'Wq', 0.5)]:
+            result = max_fleet(0.1, 1.0, s, sla=sla, alvo=alvo)
+            N = result['N']
+            dentro, fora = self.modelo(0.1, 1.0, s, N + 1), self.modelo(0.1, 1.0, s, N) if N > s else None
+            if sla == 'disponibilidade':
+                self.assertLess(dentro['numOperacionais'] / (N + 1), alvo)
+                self.assertGreaterEqual(result['disponibilidade'], alvo)
+            else:
+                self.assertGreater(dentro['Wq'], alvo)
+                self.assertLessEqual(result['Wq'], alvo)
+            if fora is not None:
+                self.assertAlmostEqual(result['numOperacionais'], fora['numOperacionais'], places=9)
+            self.assertEqual(result['curva']['N'], list(range(s, N + 2)))
+            self.assertFalse(result['limiteAtingido'])
+        self.assertTrue(max_fleet(0.1, 1.0, 5, alvo=0.85, N_max=20)['limiteAtingido'])
+
+    def test_large_fleet(self):
+        """Frotas de 10^5 máquinas em frações de segundo, com curvas monótonas"""
+        inicio = time.perf_counter()
+        equipe = min_repair_crew(0.01, 1.0, 10**5, alvo=0.985)
+        frota = max_fleet(0.01, 1.0, equipe['s'], alvo=0.985)
+        self.assertLess(time.perf_counter() - inicio, 5.0)
+        self.assertGreaterEqual(frota['N'], 10**5)
+        # Monótonas a menos do arredondamento (trechos quase planos, sem fila)
+        self.assertTrue(np.all(np.diff(equipe['curva']['disponibilidade']) >= -1e-12))
+        self.assertTrue(np.all(np.diff(frota['curva']['disponibilidade']) <= 1e-12))
+        anterior = calculate_mmsn(0.01, 1.0, equipe['s'] - 1, 10**5)
+        self.assertLess(anterior['numOperacionais'] / 10**5, 0.985)
+
+    def test_large_fleet_wq_bisection(self):
+        """SLA de Wq com resposta perto de MAX_FROTA: poucos blocos, N exato e curva esparsa"""
+        inicio = time.perf_counter()
+        frota = max_fleet(1e-4, 1.0, 50, sla='Wq', alvo=0.1)
+        self.assertLess(time.perf_counter() - inicio, 1.0)
+        N = frota['N']
+        self.assertLessEqual(calculate_mmsn(1e-4, 1.0, 50, N)['Wq'], 0.1)
+        self.assertGreater(calculate_mmsn(1e-4, 1.0, 50, N + 1)['Wq'], 0.1)
+        self.assertLess(len(frota['curva']['N']), 2000)
+        self.assertEqual(frota['curva']['N'][-2:], [N, N + 1])
+        self.assertTrue(np.all(np.diff(frota['curva']['N']) > 0))
+        self.assertTrue(np.all(np.diff(frota['curva']['Wq']) >= -1e-12))
+
+    def test_invalid(self):
+        """Disponibilidade acima de 1/(1 + λ/μ) e parâmetros inválidos"""
+        with self.assertRaises(ValueError):
+            min_repair_crew(0.1, 1.0, 50, alvo=0.95)
+        with self.assertRaises(ValueError):
+            max_fleet(0.1, 1.0, 5, alvo=0.95)
+        with self.assertRaises(ValueError):
+            min_repair_crew(0.1, 1.0, 50, sla='PK', alvo=0.1)
+        with self.assertRaises(ValueError):
+            min_repair_crew(0.1, 1.0, 2.5, alvo=0.5)
+        with self.assertRaises(ValueError):
+            max_fleet(0.1, 0.0, 5, alvo=0.5)
+
+    def test_routes(self):
+        """Endpoints /api/solve/repair-crew e /api/solve/max-fleet"""
+        from app.main import app
+        client = app.test_client()
+        resp = client.post('/api/solve/repair-crew', json={'lambda': 0.1, 'mu': 1, 'N': 50, 'alvo': 0.85})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()['s'], 5)
+        resp = client.post('/api/solve/max-fleet', json={'lambda': 0.1, 'mu': 1, 's': 5, 'alvo': 0.85})
+        self.assertEqual(resp.get_json()['N'], 53)
+        resp = client.post('/api/solve/repair-crew', json={'lambda': 0.1, 'mu': 1, 'N': 50, 'alvo': 0.95})
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(client.post('/api/solve/max-fleet', json={'lambda': 0.1}).status_code, 400)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -305,7 +305,7 @@ export const Priority1: React.FC = () => {
                   </div>
                   <div className="bg-white p-3 rounded border">
                     <p className="text-gray-600">Termo A</p>
-                    <p className="font-bold text-lg">{results.termoA.toFixed(4)}</p>
+                    <p className="font-bold text-lg">{results.termoA !== null ? results.termoA.toFixed(4) : `e^${results.logTermoA.toFixed(4)}`}</p>
                   </div>
                 </div>
               </div>
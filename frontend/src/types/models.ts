@@ -230,7 +230,8 @@ export interface PrioritySemResult extends BaseQueueResult {
   rho: number;              // Taxa de utilização do sistema (λ_total / (s×μ))
   lambdaTotal: number;      // Soma de todas as taxas de chegada
   capacidadeTotal: number;  // s × μ (capacidade total do sistema)
-  termoA: number;           // Termo A usado nos cálculos
+  termoA: number | null;    // Termo A usado nos cálculos (null se passar do maior float)
+  logTermoA: number;        // log do termo A (sempre finito)
   classes: ClassResult[];   // Resultados por classe de prioridade
 }
 